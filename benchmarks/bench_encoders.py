@@ -0,0 +1,94 @@
+"""Compare SQL result encodings: payload bytes and encode time.
+
+Usage: python benchmarks/bench_encoders.py [--rows N] [--cols N] [--repeat N]
+
+`dict-json` is the legacy encoding (a dict per row, then `json.dumps`) that
+`run_sql_query` used before result formats existed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools import encoders  # noqa: E402
+
+
+def make_rows(n_rows: int, n_cols: int):
+    rnd = random.Random(42)
+    columns = [f"column_{i}" for i in range(n_cols)]
+    rows = []
+    for i in range(n_rows):
+        row = []
+        for c in range(n_cols):
+            kind = c % 3
+            if kind == 0:
+                row.append(i * n_cols + c)
+            elif kind == 1:
+                row.append(rnd.random() * 1000)
+            else:
+                row.append(f"value-{rnd.randrange(10_000)}")
+        rows.append(tuple(row))
+    return columns, rows
+
+
+def legacy(columns, rows) -> str:
+    return json.dumps([{k: v for k, v in zip(columns, r)} for r in rows], default=str)
+
+
+def measure(fn, repeat: int):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--cols", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    columns, rows = make_rows(args.rows, args.cols)
+    results = []
+
+    elapsed, payload = measure(lambda: legacy(columns, rows), args.repeat)
+    results.append(("dict-json", len(payload.encode()), elapsed))
+    for fmt in ("rows", "columns", "csv"):
+        elapsed, payload = measure(lambda: encoders.encode_result(columns, rows, fmt), args.repeat)
+        results.append((fmt, len(payload.encode()), elapsed))
+
+    paths = []
+
+    def binary() -> str:
+        path = encoders.write_columnar(columns, rows)
+        paths.append(path)
+        return path
+
+    elapsed, path = measure(binary, args.repeat)
+    results.append(("binary", os.path.getsize(path), elapsed))
+    for p in paths:
+        os.remove(p)
+
+    base_bytes, base_time = results[0][1], results[0][2]
+    print(f"{args.rows} rows x {args.cols} cols (best of {args.repeat})")
+    print(f"{'format':<10} {'bytes':>12} {'vs legacy':>10} {'encode ms':>10} {'vs legacy':>10}")
+    for name, size, elapsed in results:
+        print(
+            f"{name:<10} {size:>12,} {size / base_bytes:>9.2f}x "
+            f"{elapsed * 1000:>10.1f} {elapsed / base_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure the per-call overhead of the registry wrapper (admission control + metrics).
+
+Usage: python benchmarks/bench_metrics.py [--calls N] [--repeat N]
+
+Compares a bare async function against the same function registered with
+`@tool()`, with metrics on and off, plus a sync tool. Results are
+microseconds per call (best of `--repeat` runs).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools import get_metrics, registry  # noqa: E402
+
+
+async def bare(text: str) -> str:
+    return text
+
+
+registered = registry.tool(name="bench_echo")(bare)
+
+
+@registry.tool(name="bench_sync_echo")
+def sync_echo(text: str) -> str:
+    return text
+
+
+def time_async(fn, calls: int, repeat: int) -> float:
+    async def loop() -> None:
+        for _ in range(calls):
+            await fn("payload")
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(loop())
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def time_sync(fn, calls: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn("payload")
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    metrics = get_metrics()
+    base = time_async(bare, args.calls, args.repeat)
+    rows = [("bare async", base)]
+    metrics.configure(enabled=False)
+    rows.append(("@tool, metrics off", time_async(registered, args.calls, args.repeat)))
+    metrics.configure(enabled=True)
+    rows.append(("@tool, metrics on", time_async(registered, args.calls, args.repeat)))
+    rows.append(("@tool sync, metrics on", time_sync(sync_echo, args.calls, args.repeat)))
+
+    print(f"{'variant':<24} {'us/call':>9} {'overhead':>9}")
+    for label, us in rows:
+        print(f"{label:<24} {us:>9.2f} {us - base:>+9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""Benchmark every tool against local stand-ins and compare with a stored baseline.
+
+Usage: python benchmarks/bench_tools.py [--quick] [--only SUBSTR] [--output PATH]
+                                        [--baseline PATH] [--threshold F] [--save-baseline]
+
+Stand-ins, all created in a temporary directory:
+- generated sqlite datasets of increasing size for `run_sql_query`
+- a fake `hdfs` CLI on PATH for the CLI code paths of `hdfs_list`/`hdfs_put`
+- the in-process WebHDFS stand-in (tests/webhdfs_standin.py) for the WebHDFS paths
+- a fake `spark-submit` on PATH for `run_spark_job`
+
+Each scenario reports latency percentiles from sequential calls, throughput
+with `concurrency` calls in flight, and peak Python heap (tracemalloc, measured
+in a separate pass so tracing does not skew timings). Results are written as
+JSON; with `--baseline`, regressions beyond `--threshold` are listed and the
+exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import fnmatch
+import json
+import os
+import platform
+import sqlite3
+import stat
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from src.tools import hdfs_listing, spark_jobs, webhdfs  # noqa: E402
+from src.tools import hdfs_head, hdfs_list, hdfs_put, run_spark_job, run_sql_query  # noqa: E402
+from src.tools.cache import get_query_cache  # noqa: E402
+from webhdfs_standin import WebHDFSStandIn  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DATASET_SIZES = (1_000, 10_000, 100_000)
+QUICK_SIZES = (1_000, 10_000)
+
+# regressions smaller than these are treated as noise
+MIN_LATENCY_DELTA_MS = 0.5
+MIN_MEMORY_DELTA_KB = 256
+
+FAKE_HDFS = """#!/bin/sh
+# fake Hadoop CLI: dfs -ls [-R] <path> | dfs -put [-f] <src> <dst> | dfs -cat <path>
+shift
+op="$1"; shift
+case "$op" in
+  -ls) cat "{listing}" ;;
+  -put) exit 0 ;;
+  -cat) cat "{listing}" ;;
+  *) echo "unsupported: $op" >&2; exit 1 ;;
+esac
+"""
+
+FAKE_SPARK_SUBMIT = """#!/bin/sh
+i=0
+while [ $i -lt 200 ]; do echo "INFO progress $i" >&2; i=$((i+1)); done
+echo "result for $*"
+"""
+
+
+class Scenario:
+    """One benchmarked tool call."""
+
+    def __init__(
+        self,
+        name: str,
+        call: Callable[[], Awaitable[Any]],
+        iterations: int,
+        concurrency: int = 8,
+        setup: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.name = name
+        self.call = call
+        self.iterations = iterations
+        self.concurrency = concurrency
+        self.setup = setup
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+async def _latencies(call: Callable[[], Awaitable[Any]], n: int) -> List[float]:
+    await call()  # warm-up: pools, clients, caches
+    out = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await call()
+        out.append(time.perf_counter() - start)
+    return out
+
+
+async def _throughput(call: Callable[[], Awaitable[Any]], total: int, concurrency: int, rounds: int = 3) -> Dict[str, Any]:
+    """Best of `rounds` runs of `total` calls with `concurrency` in flight (the best run is the least noisy)."""
+    best: Dict[str, Any] = {"throughput_per_s": None, "errors": 0}
+    for _ in range(rounds):
+        result = await _throughput_round(call, total, concurrency)
+        if best["throughput_per_s"] is None or (result["throughput_per_s"] or 0) > best["throughput_per_s"]:
+            best = result
+    return best
+
+
+async def _throughput_round(call: Callable[[], Awaitable[Any]], total: int, concurrency: int) -> Dict[str, Any]:
+    sem = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with sem:
+            try:
+                await call()
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    return {"throughput_per_s": round(total / elapsed, 2) if elapsed > 0 else None, "errors": errors}
+
+
+async def _peak_memory(call: Callable[[], Awaitable[Any]], n: int) -> int:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in range(n):
+            await call()
+        return max(0, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+
+def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    if scenario.setup is not None:
+        scenario.setup()
+
+    async def body() -> Dict[str, Any]:
+        try:
+            lat = await _latencies(scenario.call, scenario.iterations)
+            thr = await _throughput(scenario.call, scenario.iterations, scenario.concurrency)
+            peak = await _peak_memory(scenario.call, max(1, scenario.iterations // 10))
+        finally:
+            client = webhdfs._client  # pooled connections belong to this loop
+            webhdfs.configure_webhdfs()
+            if client is not None:
+                await client.aclose()
+        ms = [v * 1000 for v in lat]
+        return {
+            "iterations": scenario.iterations,
+            "concurrency": scenario.concurrency,
+            "mean_ms": round(sum(ms) / len(ms), 3),
+            "p50_ms": round(percentile(ms, 50), 3),
+            "p95_ms": round(percentile(ms, 95), 3),
+            "p99_ms": round(percentile(ms, 99), 3),
+            **thr,
+            "peak_mem_kb": round(peak / 1024, 1),
+        }
+
+    return asyncio.run(body())
+
+
+# ---------- stand-ins ----------
+
+
+def make_dataset(path: str, rows: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, ts TEXT, user_id INTEGER, kind TEXT, amount REAL)")
+    kinds = ("click", "view", "purchase", "signup", "refund")
+    conn.executemany(
+        "INSERT INTO events VALUES (?, ?, ?, ?, ?)",
+        (
+            (i, f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00", i % 997, kinds[i % len(kinds)], (i * 7919) % 10_000 / 100)
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _write_script(directory: str, name: str, body: str) -> None:
+    path = os.path.join(directory, name)
+    with open(path, "w") as fh:
+        fh.write(body)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+@contextlib.contextmanager
+def stand_ins(quick: bool) -> Iterator[Dict[str, Any]]:
+    """Create datasets, fake CLIs and a WebHDFS stand-in; restores the environment on exit."""
+    tmp = tempfile.TemporaryDirectory(prefix="etl-bench-")
+    old_path = os.environ.get("PATH", "")
+    server = WebHDFSStandIn().start()
+    try:
+        root = tmp.name
+        bin_dir = os.path.join(root, "bin")
+        os.makedirs(bin_dir)
+        listing = os.path.join(root, "listing.txt")
+        with open(listing, "w") as fh:
+            for i in range(1000):
+                fh.write(f"-rw-r--r--   3 hdfs supergroup   {1000 + i:>8} 2024-01-01 12:00 /data/dt={i % 10}/part-{i:05d}\n")
+        _write_script(bin_dir, "hdfs", FAKE_HDFS.format(listing=listing))
+        _write_script(bin_dir, "spark-submit", FAKE_SPARK_SUBMIT)
+        os.environ["PATH"] = bin_dir + os.pathsep + old_path
+
+        datasets = {}
+        for rows in QUICK_SIZES if quick else DATASET_SIZES:
+            path = os.path.join(root, f"events_{rows}.db")
+            make_dataset(path, rows)
+            datasets[rows] = path
+
+        for d in range(20):
+            for f in range(25):
+                server.fs.write(f"/warehouse/events/dt=2024-01-{d + 1:02d}/part-{f:05d}.parquet", b"x" * 128)
+        server.fs.write("/logs/app.log", b"".join(f"line {i}\n".encode() for i in range(50_000)))
+        upload = os.path.join(root, "upload.bin")
+        with open(upload, "wb") as fh:
+            fh.write(os.urandom(256 * 1024))
+
+        yield {"root": root, "datasets": datasets, "server": server, "upload": upload}
+    finally:
+        os.environ["PATH"] = old_path
+        webhdfs.configure_webhdfs(url="")
+        hdfs_listing.get_directory_cache().clear()
+        spark_jobs.close_job_manager()
+        server.stop()
+        tmp.cleanup()
+
+
+def build_scenarios(env: Dict[str, Any], quick: bool) -> List[Scenario]:
+    n = 20 if quick else 100
+    server_url = env["server"].url
+    cache = hdfs_listing.get_directory_cache()
+
+    def use_webhdfs() -> None:
+        webhdfs.configure_webhdfs(url=server_url)
+        cache.configure(ttl=0)  # measure real listings, not the cache
+
+    def use_cli() -> None:
+        webhdfs.configure_webhdfs(url="")
+        cache.configure(ttl=0)
+
+    scenarios: List[Scenario] = []
+    for rows, path in env["datasets"].items():
+        conn = f"sqlite:///{path}"
+        scenarios += [
+            Scenario(
+                f"sql_point_{rows}",
+                lambda c=conn: run_sql_query(c, "SELECT * FROM events WHERE id = 42", use_cache=False),
+                n,
+            ),
+            Scenario(
+                f"sql_groupby_{rows}",
+                lambda c=conn: run_sql_query(
+                    c, "SELECT kind, COUNT(*), SUM(amount) FROM events GROUP BY kind", use_cache=False
+                ),
+                max(5, n // 5) if rows >= 100_000 else n,
+            ),
+            Scenario(
+                f"sql_fetch1000_{rows}",
+                lambda c=conn: run_sql_query(c, "SELECT * FROM events", fetch=1000, use_cache=False),
+                n,
+            ),
+        ]
+    largest = f"sqlite:///{env['datasets'][max(env['datasets'])]}"
+    scenarios.append(
+        Scenario(
+            "sql_groupby_cached",
+            lambda: run_sql_query(largest, "SELECT kind, COUNT(*), SUM(amount) FROM events GROUP BY kind"),
+            n,
+            setup=lambda: get_query_cache().clear(),
+        )
+    )
+    scenarios += [
+        Scenario("hdfs_list_cli_1000", lambda: hdfs_list("/data", recursive=True), n, setup=use_cli),
+        Scenario("hdfs_put_cli", lambda: hdfs_put(env["upload"], "/landing/upload.bin", overwrite=True), n, setup=use_cli),
+        Scenario(
+            "hdfs_list_webhdfs_recursive_520",
+            lambda: hdfs_list("/warehouse/events", recursive=True, details=True),
+            max(5, n // 4),
+            setup=use_webhdfs,
+        ),
+        Scenario(
+            "hdfs_put_webhdfs_256k",
+            lambda: hdfs_put(env["upload"], "/landing/upload.bin", overwrite=True, skip_unchanged=False),
+            n,
+            setup=use_webhdfs,
+        ),
+        Scenario("hdfs_head_webhdfs_100_lines", lambda: hdfs_head("/logs/app.log", lines=100), n, setup=use_webhdfs),
+        Scenario("run_spark_job", lambda: run_spark_job("app.py", ["--date", "2024-01-01"]), max(5, n // 4), 2),
+    ]
+    return scenarios
+
+
+# ---------- baseline comparison ----------
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Scenarios whose latency, throughput or memory regressed beyond `threshold` (a fraction).
+
+    p95 latency and peak memory are allowed `2 * threshold`; deltas under
+    MIN_LATENCY_DELTA_MS / MIN_MEMORY_DELTA_KB are ignored as noise.
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, cur in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base:
+            continue
+        # tail latency is noisier than the median, so it gets twice the slack
+        for metric, limit in (("p50_ms", threshold), ("p95_ms", 2 * threshold)):
+            if cur[metric] > base[metric] * (1 + limit) and cur[metric] - base[metric] > MIN_LATENCY_DELTA_MS:
+                regressions.append(_regression(name, metric, base[metric], cur[metric]))
+        if base.get("throughput_per_s") and cur.get("throughput_per_s") is not None:
+            if cur["throughput_per_s"] < base["throughput_per_s"] * (1 - threshold):
+                regressions.append(_regression(name, "throughput_per_s", base["throughput_per_s"], cur["throughput_per_s"]))
+        if cur["peak_mem_kb"] > base["peak_mem_kb"] * (1 + 2 * threshold) and cur["peak_mem_kb"] - base["peak_mem_kb"] > MIN_MEMORY_DELTA_KB:
+            regressions.append(_regression(name, "peak_mem_kb", base["peak_mem_kb"], cur["peak_mem_kb"]))
+    return regressions
+
+
+def _regression(name: str, metric: str, base: float, cur: float) -> Dict[str, Any]:
+    change = (cur - base) / base if base else None
+    return {"scenario": name, "metric": metric, "baseline": base, "current": cur, "change": round(change, 3) if change is not None else None}
+
+
+def run(quick: bool = False, only: Optional[str] = None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with stand_ins(quick) as env:
+        for scenario in build_scenarios(env, quick):
+            if only and not fnmatch.fnmatch(scenario.name, f"*{only}*"):
+                continue
+            results[scenario.name] = run_scenario(scenario)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller datasets and fewer iterations")
+    parser.add_argument("--only", help="run scenarios whose name contains this substring")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", default=None, help=f"compare against a baseline (e.g. {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true", help="write results to the baseline path")
+    args = parser.parse_args()
+
+    report = run(quick=args.quick, only=args.only)
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    print(f"{'scenario':<34} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'peak KB':>9}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<34} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['throughput_per_s'] or 0:>9.1f} {r['peak_mem_kb']:>9.1f}"
+        )
+    print(f"results written to {args.output}")
+
+    if args.save_baseline:
+        path = args.baseline or DEFAULT_BASELINE
+        with open(path, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"baseline saved to {path}")
+        return
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(baseline, report, args.threshold)
+        for reg in regressions:
+            print(
+                f"REGRESSION {reg['scenario']} {reg['metric']}: {reg['baseline']} -> {reg['current']} "
+                f"({reg['change']:+.0%})"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
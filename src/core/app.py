@@ -8,11 +8,235 @@ otherwise it logs and returns — useful for local development.
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Callable, Optional
+
+from .manifest import LazyTools, find_tools_module, get_manifest, make_stub
 
 logger = logging.getLogger(__name__)
 
 
+def _configure_tools(tools_module: Any, config: Any) -> None:
+	"""Apply config-driven settings (connection pools, ...) to the tools package."""
+	hdfs = getattr(config, "hdfs", None)
+	configure_webhdfs = getattr(tools_module, "configure_webhdfs", None)
+	if hdfs is not None and configure_webhdfs is not None:
+		try:
+			configure_webhdfs(
+				url=getattr(hdfs, "namenode_url", None),
+				user=getattr(hdfs, "user", None),
+				timeout=getattr(hdfs, "timeout", None),
+				max_connections=getattr(hdfs, "max_connections", None),
+			)
+		except Exception:
+			logger.warning("Failed to configure WebHDFS client", exc_info=True)
+	get_directory_cache = getattr(tools_module, "get_directory_cache", None)
+	if hdfs is not None and get_directory_cache is not None:
+		get_directory_cache().configure(ttl=getattr(hdfs, "list_cache_ttl", None))
+
+	scheduler = getattr(config, "scheduler", None)
+	configure_scheduler = getattr(tools_module, "configure_scheduler", None)
+	if scheduler is not None and configure_scheduler is not None:
+		try:
+			configure_scheduler(
+				max_concurrency=getattr(scheduler, "max_concurrency", None),
+				max_queue=getattr(scheduler, "max_queue", None),
+				tools=getattr(scheduler, "tools", None),
+			)
+		except Exception:
+			logger.warning("Failed to configure tool scheduler", exc_info=True)
+
+	metrics = getattr(config, "metrics", None)
+	get_metrics = getattr(tools_module, "get_metrics", None)
+	if metrics is not None and get_metrics is not None:
+		get_metrics().configure(enabled=getattr(metrics, "enabled", None))
+
+	results = getattr(config, "results", None)
+	get_result_store = getattr(tools_module, "get_result_store", None)
+	if results is not None and get_result_store is not None:
+		get_result_store().configure(
+			directory=getattr(results, "directory", None),
+			threshold=getattr(results, "spill_threshold", None),
+			chunk_bytes=getattr(results, "chunk_bytes", None),
+			max_bytes=getattr(results, "max_bytes", None),
+			max_age=getattr(results, "max_age", None),
+		)
+
+	coalescing = getattr(config, "coalescing", None)
+	get_single_flight = getattr(tools_module, "get_single_flight", None)
+	if coalescing is not None and get_single_flight is not None:
+		try:
+			get_single_flight().configure(
+				enabled=getattr(coalescing, "enabled", None),
+				tools=getattr(coalescing, "tools", None),
+			)
+		except ValueError:
+			logger.warning("Invalid coalescing config", exc_info=True)
+
+	profiling = getattr(config, "profiling", None)
+	get_profiler = getattr(tools_module, "get_profiler", None)
+	if profiling is not None and get_profiler is not None:
+		profiler = get_profiler()
+		profiler.configure(
+			directory=getattr(profiling, "directory", None),
+			max_files=getattr(profiling, "max_files", None),
+		)
+		for name, options in (getattr(profiling, "tools", None) or {}).items():
+			try:
+				profiler.arm(
+					name,
+					calls=int(options.get("calls", 1)),
+					cpu=bool(options.get("cpu", True)),
+					memory=bool(options.get("memory", False)),
+				)
+			except Exception:
+				logger.warning("Failed to arm profiling for %s", name, exc_info=True)
+
+	spark = getattr(config, "spark", None)
+	get_job_manager = getattr(tools_module, "get_job_manager", None)
+	if spark is not None and get_job_manager is not None:
+		get_job_manager().configure(
+			max_concurrent=getattr(spark, "max_concurrent_jobs", None),
+			log_buffer_bytes=getattr(spark, "log_buffer_bytes", None),
+			max_jobs=getattr(spark, "max_jobs", None),
+			log_dir=getattr(spark, "log_dir", None),
+			default_timeout=getattr(spark, "job_timeout", None),
+		)
+	get_spark_cache = getattr(tools_module, "get_spark_cache", None)
+	if spark is not None and get_spark_cache is not None:
+		get_spark_cache().configure(
+			directory=getattr(spark, "result_cache_dir", None),
+			max_entries=getattr(spark, "result_cache_max_entries", None),
+			max_bytes=getattr(spark, "result_cache_max_bytes", None),
+			max_entry_bytes=getattr(spark, "result_cache_max_entry_bytes", None),
+			enabled=getattr(spark, "result_cache", None),
+		)
+
+	sql = getattr(config, "sql", None)
+	if sql is None:
+		return
+	try:
+		configure_pools = getattr(tools_module, "configure_pools", None)
+		if configure_pools is not None:
+			configure_pools(
+				size=getattr(sql, "pool_size", None),
+				idle_timeout=getattr(sql, "pool_idle_timeout", None),
+				ping_after=getattr(sql, "pool_ping_after", None),
+				statement_cache=getattr(sql, "statement_cache", None),
+			)
+		get_cursor_store = getattr(tools_module, "get_cursor_store", None)
+		if get_cursor_store is not None:
+			get_cursor_store().configure(
+				ttl=getattr(sql, "cursor_ttl", None),
+				max_handles=getattr(sql, "max_cursors", None),
+				max_page=getattr(sql, "max_page", None),
+			)
+		get_query_cache = getattr(tools_module, "get_query_cache", None)
+		if get_query_cache is not None:
+			get_query_cache().configure(
+				max_entries=getattr(sql, "cache_max_entries", None),
+				max_rows=getattr(sql, "cache_max_rows", None),
+				ttl=getattr(sql, "cache_ttl", None),
+				enabled=getattr(sql, "cache_enabled", None),
+			)
+		get_catalog = getattr(tools_module, "get_catalog", None)
+		if get_catalog is not None:
+			get_catalog().configure(
+				ttl=getattr(sql, "catalog_ttl", None),
+				sample_rows=getattr(sql, "catalog_sample_rows", None),
+			)
+		get_query_log = getattr(tools_module, "get_query_log", None)
+		if get_query_log is not None:
+			get_query_log().configure(
+				max_queries=getattr(sql, "workload_log_size", None),
+				enabled=getattr(sql, "workload_log", None),
+			)
+		get_db_executor = getattr(tools_module, "get_db_executor", None)
+		if get_db_executor is not None:
+			get_db_executor().configure(
+				max_workers=getattr(sql, "executor_workers", None),
+				max_writers=getattr(sql, "max_writers", None),
+				default_timeout=getattr(sql, "query_timeout", None),
+			)
+		get_watermark_store = getattr(tools_module, "get_watermark_store", None)
+		if get_watermark_store is not None:
+			get_watermark_store().configure(path=getattr(sql, "watermark_store", None))
+	except Exception:
+		logger.warning("Failed to configure SQL tools", exc_info=True)
+
+
+def _shutdown_tools(tools_module: Any) -> None:
+	"""Release pooled resources held by the tools package.
+
+	Open cursors are closed first so their connections go back to the pools
+	before the pools themselves are closed. The shared event loop goes last,
+	after the clients bound to it.
+	"""
+	for hook in ("close_job_manager", "close_cursors", "close_db_executor", "close_query_cache", "close_pools", "close_webhdfs", "close_runner"):
+		func = getattr(tools_module, hook, None)
+		if func is None:
+			continue
+		try:
+			func()
+			logger.info("Shutdown hook %s completed", hook)
+		except Exception:
+			logger.warning("Shutdown hook %s failed", hook, exc_info=True)
+
+
+_REGISTRATION_METHODS = ("add_tool", "register_tool", "register", "register_function")
+
+
+def _registrar(server: Any) -> Optional[Callable[..., Any]]:
+	"""The server's tool registration method, looked up once."""
+	for attr in _REGISTRATION_METHODS:
+		method = getattr(server, attr, None)
+		if callable(method):
+			return method
+	return None
+
+
+def register_tools(server: Any, tools: LazyTools, manifest_path: Optional[str] = None) -> int:
+	"""Register every tool in the (cached) manifest on `server`; returns the count.
+
+	Tools are registered as lazy stubs, so this does not import the tools
+	package unless the manifest is missing or stale.
+	"""
+	manifest = get_manifest(tools.module_name, manifest_path)
+	method = _registrar(server)
+	registered = 0
+	for entry in manifest["tools"]:
+		name = entry["name"]
+		func = make_stub(entry, tools) if entry.get("lazy", True) else tools.resolve(name)
+		if method is None:
+			setattr(server, name, func)
+		else:
+			try:
+				method(func, name=name, description=entry.get("doc") or None)
+			except TypeError:
+				method(func)
+		registered += 1
+	return registered
+
+
+# chunked reads of results spilled by the tools (see tools/results.py)
+RESULT_RESOURCE = "etl-result://{handle}/{chunk}"
+
+
+def register_resources(server: Any, tools: LazyTools) -> bool:
+	"""Expose spilled tool results as an MCP resource template, if the server supports resources."""
+	resource = getattr(server, "resource", None)
+	if not callable(resource):
+		return False
+
+	def read_result(handle: str, chunk: str) -> str:
+		return tools.module.read_result_chunk(handle, int(chunk))
+
+	try:
+		resource(RESULT_RESOURCE, name="tool_result", description="Chunk of a large tool result.", mime_type="text/plain")(read_result)
+	except TypeError:
+		resource(RESULT_RESOURCE)(read_result)
+	return True
+
+
 def run(config: Any) -> None:
 	"""Start the core application.
 
@@ -29,67 +253,21 @@ def run(config: Any) -> None:
 		server = FastMCP()
 		logger.info("FastMCP instance created: %s", server)
 
-		# Attempt to discover and register tools from the project's tools package.
-		tools_module = None
-		for module_name in ("etl_mcp_serv.tools", "src.tools", "tools"):
+		# Register tools from the cached manifest; the tools package itself is
+		# imported (and configured) on the first tool call.
+		tools = None
+		registered = 0
+		module_name = find_tools_module()
+		if module_name is not None:
+			tools = LazyTools(module_name, on_load=lambda module: _configure_tools(module, config))
 			try:
-				tools_module = __import__(module_name, fromlist=["*"])
-				break
+				registered = register_tools(server, tools)
 			except Exception:
-				tools_module = None
-
-		registered = 0
-		if tools_module is not None and hasattr(tools_module, "list_tools"):
+				logger.warning("Failed to register tools from %s", module_name, exc_info=True)
 			try:
-				names = tools_module.list_tools()
+				register_resources(server, tools)
 			except Exception:
-				names = []
-
-			for name in names:
-				try:
-					func = tools_module.get_tool(name)
-				except Exception:
-					func = None
-				if not func:
-					continue
-
-				# Try multiple possible registration method names on the FastMCP
-				reg_methods = [
-					"register_tool",
-					"register",
-					"add_tool",
-					"add_tools",
-					"register_tools",
-					"register_function",
-				]
-				was_registered = False
-				for reg in reg_methods:
-					if hasattr(server, reg):
-						try:
-							getattr(server, reg)(func)
-							was_registered = True
-							break
-						except TypeError:
-							try:
-								getattr(server, reg)(name, func)
-								was_registered = True
-								break
-							except Exception:
-								# ignore and try next
-								pass
-						except Exception:
-							pass
-
-				if not was_registered:
-					# best-effort fallback: attach on the server object for discovery
-					try:
-						setattr(server, name, func)
-						was_registered = True
-					except Exception:
-						was_registered = False
-
-				if was_registered:
-					registered += 1
+				logger.warning("Failed to register result resources", exc_info=True)
 
 		logger.info("Registered %d tools on FastMCP (attempted)", registered)
 
@@ -105,7 +283,11 @@ def run(config: Any) -> None:
 			for sm in start_methods:
 				if hasattr(server, sm):
 					logger.info("Starting FastMCP server via %s()", sm)
-					getattr(server, sm)()
+					try:
+						getattr(server, sm)()
+					finally:
+						if tools is not None and tools.loaded:
+							_shutdown_tools(tools.module)
 					return
 
 		logger.info("FastMCP configured but not started (set mcp.auto_start=true to start automatically)")
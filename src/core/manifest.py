@@ -0,0 +1,392 @@
+"""Cached tool manifest for fast, lazy server startup.
+
+Importing the tools package pulls in every tool module (and, through them,
+optional dependencies) before the server can answer anything. Instead the
+server registers lightweight stubs built from a JSON manifest of tool names,
+docstrings and signatures. The real tools package is imported (and
+configured) on the first tool invocation.
+
+The manifest is keyed by a fingerprint of the tools package's source files
+(path, size, mtime), computed with `os.scandir` and no imports, so any code
+change rebuilds it on the next start.
+
+The fingerprint is not a secret, so the manifest must not be writable by
+anyone else: it lives in the per-user cache directory (created 0700, file
+0600), a manifest owned by another user or writable by group/others is
+ignored, its shape is validated before use, and annotations are rebuilt by
+parsing names against a fixed table (`_TYPE_NAMES`), never evaluated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import re
+import stat
+import threading
+import typing
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+TOOL_MODULES = ("etl_mcp_serv.tools", "src.tools", "tools")
+
+_TYPE_NAMES: Dict[str, Any] = {
+	name: getattr(typing, name) for name in ("Any", "Dict", "List", "Optional", "Sequence", "Tuple", "Union")
+}
+_TYPE_NAMES.update({"str": str, "int": int, "float": float, "bool": bool, "bytes": bytes, "dict": dict, "list": list, "None": None})
+_JSON_TYPES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean", "dict": "object", "Dict": "object", "list": "array", "List": "array", "Sequence": "array", "Tuple": "array"}
+
+
+def default_manifest_path() -> str:
+	"""`$ETL_MCP_MANIFEST`, else a file in the per-user cache directory."""
+	path = os.environ.get("ETL_MCP_MANIFEST")
+	if path:
+		return path
+	base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+	return os.path.join(base, "etl-mcp-serv", "tool-manifest.json")
+
+
+def find_tools_module(candidates: tuple = TOOL_MODULES) -> Optional[str]:
+	"""Name of the first importable tools package, located without importing it."""
+	for name in candidates:
+		try:
+			if importlib.util.find_spec(name) is not None:
+				return name
+		except (ImportError, ValueError):
+			continue
+	return None
+
+
+def source_fingerprint(module_name: str) -> Optional[str]:
+	"""Hash of (name, size, mtime) of the package's .py files."""
+	spec = importlib.util.find_spec(module_name)
+	if spec is None or not spec.submodule_search_locations:
+		return None
+	digest = hashlib.sha1(module_name.encode())
+	for directory in spec.submodule_search_locations:
+		try:
+			entries = sorted(os.scandir(directory), key=lambda e: e.name)
+		except OSError:
+			continue
+		for entry in entries:
+			if entry.name.endswith(".py"):
+				st = entry.stat()
+				digest.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+	return digest.hexdigest()
+
+
+# ---------- building ----------
+
+
+def _annotation_text(annotation: Any) -> Optional[str]:
+	if annotation is inspect.Parameter.empty:
+		return None
+	if isinstance(annotation, str):
+		return annotation
+	return inspect.formatannotation(annotation).replace("typing.", "")
+
+
+def annotation_schema(text: Optional[str]) -> Dict[str, Any]:
+	"""Best-effort JSON schema for a (string) type annotation."""
+	if not text:
+		return {}
+	text = text.replace(" ", "")
+	if text.startswith("Optional[") and text.endswith("]"):
+		inner = annotation_schema(text[len("Optional["):-1])
+		if "type" in inner:
+			inner["type"] = [inner["type"], "null"]
+		return inner
+	if "|None" in text:
+		return annotation_schema(f"Optional[{text.replace('|None', '')}]")
+	head, _, rest = text.partition("[")
+	json_type = _JSON_TYPES.get(head)
+	if json_type is None:
+		return {}
+	schema: Dict[str, Any] = {"type": json_type}
+	if json_type == "array" and rest:
+		items = annotation_schema(rest[:-1].split(",")[0])
+		if items:
+			schema["items"] = items
+	return schema
+
+
+def describe_tool(name: str, func: Callable[..., Any]) -> Dict[str, Any]:
+	"""Manifest entry for one tool: doc, parameters and a JSON input schema."""
+	sig = inspect.signature(func)
+	params: List[Dict[str, Any]] = []
+	properties: Dict[str, Any] = {}
+	required: List[str] = []
+	lazy = True
+	for p in sig.parameters.values():
+		entry: Dict[str, Any] = {"name": p.name, "kind": p.kind.name, "annotation": _annotation_text(p.annotation)}
+		schema = annotation_schema(entry["annotation"])
+		if p.default is inspect.Parameter.empty:
+			if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY):
+				required.append(p.name)
+		else:
+			try:
+				json.dumps(p.default)
+			except (TypeError, ValueError):
+				lazy = False  # a stub could not reproduce this default faithfully
+			else:
+				entry["default"] = p.default
+				schema["default"] = p.default
+		params.append(entry)
+		if p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD):
+			properties[p.name] = schema
+	return {
+		"name": name,
+		"doc": inspect.getdoc(func) or "",
+		"params": params,
+		"returns": _annotation_text(sig.return_annotation),
+		"schema": {"type": "object", "properties": properties, "required": required},
+		"lazy": lazy,
+	}
+
+
+def build_manifest(module_name: str) -> Dict[str, Any]:
+	"""Import the tools package and describe every registered tool."""
+	module = importlib.import_module(module_name)
+	tools = [describe_tool(name, module.get_tool(name)) for name in module.list_tools()]
+	return {
+		"version": MANIFEST_VERSION,
+		"module": module_name,
+		"fingerprint": source_fingerprint(module_name),
+		"tools": tools,
+	}
+
+
+def write_manifest(manifest: Dict[str, Any], path: str) -> None:
+	"""Write atomically, readable and writable by the current user only."""
+	os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+	tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+	fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+	try:
+		with os.fdopen(fd, "w", encoding="utf-8") as fh:
+			json.dump(manifest, fh)
+		os.replace(tmp, path)
+	except BaseException:
+		try:
+			os.remove(tmp)
+		except OSError:
+			pass
+		raise
+
+
+def _private(path: str) -> bool:
+	"""True unless the file or its directory is owned by, or writable for, someone else."""
+	if not hasattr(os, "getuid"):
+		return True
+	uid = os.getuid()
+	try:
+		st = os.stat(path)
+		parent = os.stat(os.path.dirname(os.path.abspath(path)))
+	except OSError:
+		return False
+	if st.st_uid != uid or st.st_mode & 0o022:
+		return False
+	# a shared directory is fine only with the sticky bit (others cannot replace our file)
+	return parent.st_uid in (uid, 0) and (not parent.st_mode & 0o022 or bool(parent.st_mode & stat.S_ISVTX))
+
+
+_PARAM_KINDS = {"POSITIONAL_ONLY", "POSITIONAL_OR_KEYWORD", "VAR_POSITIONAL", "KEYWORD_ONLY", "VAR_KEYWORD"}
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _valid_entry(entry: Any) -> bool:
+	if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) or not _IDENT_RE.fullmatch(entry["name"]):
+		return False
+	if not isinstance(entry.get("doc", ""), str) or not isinstance(entry.get("returns"), (str, type(None))):
+		return False
+	if not isinstance(entry.get("schema"), dict) or not isinstance(entry.get("lazy"), bool):
+		return False
+	params = entry.get("params")
+	if not isinstance(params, list):
+		return False
+	for p in params:
+		if (
+			not isinstance(p, dict)
+			or not isinstance(p.get("name"), str)
+			or not _IDENT_RE.fullmatch(p["name"])
+			or p.get("kind") not in _PARAM_KINDS
+			or not isinstance(p.get("annotation"), (str, type(None)))
+		):
+			return False
+	return True
+
+
+def load_manifest(path: str, module_name: str) -> Optional[Dict[str, Any]]:
+	"""The cached manifest if it exists, is private and well-formed, and matches the current sources, else None."""
+	if not _private(path):
+		if os.path.exists(path):
+			logger.warning("Ignoring tool manifest %s: owned by or writable for another user", path)
+		return None
+	try:
+		with open(path, "r", encoding="utf-8") as fh:
+			manifest = json.load(fh)
+	except (OSError, ValueError):
+		return None
+	if not isinstance(manifest, dict) or not isinstance(manifest.get("tools"), list):
+		return None
+	if not all(_valid_entry(t) for t in manifest["tools"]):
+		logger.warning("Ignoring malformed tool manifest %s", path)
+		return None
+	if (
+		manifest.get("version") != MANIFEST_VERSION
+		or manifest.get("module") != module_name
+		or manifest.get("fingerprint") != source_fingerprint(module_name)
+	):
+		return None
+	return manifest
+
+
+def get_manifest(module_name: str, path: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+	"""Load the cached manifest, rebuilding (and caching) it when stale."""
+	path = path or default_manifest_path()
+	manifest = None if refresh else load_manifest(path, module_name)
+	if manifest is None:
+		logger.info("Tool manifest missing or stale; rebuilding %s", path)
+		manifest = build_manifest(module_name)
+		try:
+			write_manifest(manifest, path)
+		except OSError:
+			logger.warning("Could not cache tool manifest at %s", path, exc_info=True)
+	return manifest
+
+
+# ---------- lazy stubs ----------
+
+
+class LazyTools:
+	"""Imports and configures the tools package on first use."""
+
+	def __init__(self, module_name: str, on_load: Optional[Callable[[Any], None]] = None) -> None:
+		self.module_name = module_name
+		self._on_load = on_load
+		self._module: Any = None
+		self._lock = threading.Lock()
+
+	@property
+	def loaded(self) -> bool:
+		return self._module is not None
+
+	@property
+	def module(self) -> Any:
+		if self._module is None:
+			with self._lock:
+				if self._module is None:
+					module = importlib.import_module(self.module_name)
+					if self._on_load is not None:
+						self._on_load(module)
+					self._module = module
+		return self._module
+
+	def resolve(self, name: str) -> Callable[..., Any]:
+		func = self.module.get_tool(name)
+		if func is None:
+			raise KeyError(f"tool not found: {name}")
+		return func
+
+
+def _parse_type(text: str) -> Tuple[Any, str]:
+	"""Parse `T | U` from the front of `text`; returns (type, unparsed rest)."""
+	value, rest = _parse_atom(text)
+	while rest.startswith("|"):
+		other, rest = _parse_atom(rest[1:])
+		value = typing.Union[value, other]
+	return value, rest
+
+
+def _parse_atom(text: str) -> Tuple[Any, str]:
+	"""Parse `Name` or `Name[T, ...]`, with names looked up in `_TYPE_NAMES` only."""
+	m = _IDENT_RE.match(text)
+	if m is None:
+		raise ValueError(text)
+	value, rest = _TYPE_NAMES[m.group(0)], text[m.end():]
+	if rest.startswith("["):
+		args: List[Any] = []
+		rest = rest[1:]
+		while True:
+			arg, rest = _parse_type(rest)
+			args.append(arg)
+			if rest.startswith(","):
+				rest = rest[1:]
+			elif rest.startswith("]"):
+				rest = rest[1:]
+				break
+			else:
+				raise ValueError(text)
+		value = value[tuple(args)] if len(args) > 1 else value[args[0]]
+	return value, rest
+
+
+def _resolve_annotation(text: Optional[str]) -> Any:
+	"""Rebuild an annotation from its manifest text; anything unrecognised becomes `Any`."""
+	if not text:
+		return inspect.Parameter.empty
+	try:
+		value, rest = _parse_type(text.replace(" ", ""))
+	except (KeyError, TypeError, ValueError, RecursionError):
+		return Any
+	return Any if rest else value
+
+
+def make_stub(entry: Dict[str, Any], loader: LazyTools) -> Callable[..., Any]:
+	"""An async callable with the tool's name, doc and signature that loads the real tool on first call."""
+	name = entry["name"]
+	params = []
+	for p in entry["params"]:
+		params.append(
+			inspect.Parameter(
+				p["name"],
+				getattr(inspect.Parameter, p["kind"]),
+				default=p.get("default", inspect.Parameter.empty),
+				annotation=_resolve_annotation(p.get("annotation")),
+			)
+		)
+	returns = _resolve_annotation(entry.get("returns"))
+	signature = inspect.Signature(params, return_annotation=returns)
+
+	async def stub(*args: Any, **kwargs: Any) -> Any:
+		import asyncio  # deferred: keeps it off the startup path
+
+		func = await asyncio.to_thread(loader.resolve, name) if not loader.loaded else loader.resolve(name)
+		res = func(*args, **kwargs)
+		if asyncio.iscoroutine(res):
+			return await res
+		return res
+
+	stub.__name__ = stub.__qualname__ = name
+	stub.__doc__ = entry.get("doc") or None
+	stub.__signature__ = signature  # type: ignore[attr-defined]
+	stub.__annotations__ = {
+		p.name: p.annotation for p in params if p.annotation is not inspect.Parameter.empty
+	}
+	if returns is not inspect.Parameter.empty:
+		stub.__annotations__["return"] = returns
+	stub.__etl_tool_name__ = name  # type: ignore[attr-defined]
+	stub.__etl_tool_schema__ = entry.get("schema")  # type: ignore[attr-defined]
+	return stub
+
+
+__all__ = [
+	"LazyTools",
+	"annotation_schema",
+	"build_manifest",
+	"default_manifest_path",
+	"describe_tool",
+	"find_tools_module",
+	"get_manifest",
+	"load_manifest",
+	"make_stub",
+	"source_fingerprint",
+	"write_manifest",
+]
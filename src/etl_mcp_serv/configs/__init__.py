@@ -15,6 +15,158 @@ class _MCPSettings(SimpleNamespace):
         super().__init__(debug=debug, auto_start=auto_start)
 
 
+class _SQLSettings(SimpleNamespace):
+    def __init__(
+        self,
+        pool_size: int = 5,
+        pool_idle_timeout: float = 300.0,
+        pool_ping_after: float = 30.0,
+        statement_cache: int = 128,
+        cursor_ttl: float = 300.0,
+        max_cursors: int = 32,
+        max_page: int = 10_000,
+        cache_enabled: bool = True,
+        cache_max_entries: int = 256,
+        cache_max_rows: int = 10_000,
+        cache_ttl: float = 60.0,
+        watermark_store: str | None = None,
+        executor_workers: int | None = None,
+        max_writers: int = 16,
+        query_timeout: float | None = None,
+        catalog_ttl: float = 300.0,
+        catalog_sample_rows: int = 10_000,
+        workload_log: bool = True,
+        workload_log_size: int = 200,
+        **_: Any,
+    ):
+        super().__init__(
+            pool_size=int(pool_size),
+            pool_idle_timeout=float(pool_idle_timeout),
+            pool_ping_after=float(pool_ping_after),
+            statement_cache=int(statement_cache),
+            cursor_ttl=float(cursor_ttl),
+            max_cursors=int(max_cursors),
+            max_page=int(max_page),
+            cache_enabled=bool(cache_enabled),
+            cache_max_entries=int(cache_max_entries),
+            cache_max_rows=int(cache_max_rows),
+            cache_ttl=float(cache_ttl),
+            watermark_store=watermark_store,
+            # threads for blocking driver calls (None = default); one extra writer per sqlite file
+            executor_workers=int(executor_workers) if executor_workers is not None else None,
+            max_writers=int(max_writers),
+            query_timeout=float(query_timeout) if query_timeout is not None else None,
+            catalog_ttl=float(catalog_ttl),
+            catalog_sample_rows=int(catalog_sample_rows),
+            # recent run_sql_query statements kept per source for sql_index_advisor
+            workload_log=bool(workload_log),
+            workload_log_size=int(workload_log_size),
+        )
+
+
+class _HDFSSettings(SimpleNamespace):
+    def __init__(
+        self,
+        namenode_url: str | None = None,
+        user: str | None = None,
+        timeout: float = 30.0,
+        max_connections: int = 32,
+        list_cache_ttl: float = 5.0,
+        **_: Any,
+    ):
+        super().__init__(
+            namenode_url=namenode_url,
+            user=user,
+            timeout=float(timeout),
+            max_connections=int(max_connections),
+            list_cache_ttl=float(list_cache_ttl),
+        )
+
+
+class _SparkSettings(SimpleNamespace):
+    def __init__(
+        self,
+        max_concurrent_jobs: int = 2,
+        log_buffer_bytes: int = 256 * 1024,
+        max_jobs: int = 100,
+        log_dir: str | None = None,
+        job_timeout: float | None = None,
+        result_cache: bool = False,
+        result_cache_dir: str | None = None,
+        result_cache_max_entries: int = 100,
+        result_cache_max_bytes: int = 1024 * 1024 * 1024,
+        result_cache_max_entry_bytes: int = 64 * 1024 * 1024,
+        **_: Any,
+    ):
+        # result_cache: default for run_spark_job's `cache` argument (opt-in)
+        super().__init__(
+            max_concurrent_jobs=int(max_concurrent_jobs),
+            log_buffer_bytes=int(log_buffer_bytes),
+            max_jobs=int(max_jobs),
+            log_dir=log_dir,
+            job_timeout=float(job_timeout) if job_timeout is not None else None,
+            result_cache=bool(result_cache),
+            result_cache_dir=result_cache_dir,
+            result_cache_max_entries=int(result_cache_max_entries),
+            result_cache_max_bytes=int(result_cache_max_bytes),
+            result_cache_max_entry_bytes=int(result_cache_max_entry_bytes),
+        )
+
+
+class _SchedulerSettings(SimpleNamespace):
+    def __init__(
+        self,
+        max_concurrency: int = 0,
+        max_queue: int = 0,
+        tools: dict[str, dict[str, Any]] | None = None,
+        **_: Any,
+    ):
+        # 0 = unlimited; `tools` overrides per-tool limits declared in code
+        super().__init__(max_concurrency=int(max_concurrency), max_queue=int(max_queue), tools=dict(tools or {}))
+
+
+class _MetricsSettings(SimpleNamespace):
+    def __init__(self, enabled: bool = True, **_: Any):
+        super().__init__(enabled=bool(enabled))
+
+
+class _ResultsSettings(SimpleNamespace):
+    def __init__(
+        self,
+        directory: str | None = None,
+        spill_threshold: int = 256 * 1024,
+        chunk_bytes: int = 64 * 1024,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age: float = 6 * 3600.0,
+        **_: Any,
+    ):
+        super().__init__(
+            directory=directory,
+            spill_threshold=int(spill_threshold),
+            chunk_bytes=int(chunk_bytes),
+            max_bytes=int(max_bytes),
+            max_age=float(max_age),
+        )
+
+
+class _CoalescingSettings(SimpleNamespace):
+    def __init__(self, enabled: bool = True, tools: dict[str, bool] | None = None, **_: Any):
+        # `tools` switches coalescing on/off per tool, e.g. {"hdfs_head": false}
+        super().__init__(enabled=bool(enabled), tools=dict(tools or {}))
+
+
+class _ProfilingSettings(SimpleNamespace):
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_files: int = 50,
+        tools: dict[str, dict[str, Any]] | None = None,
+        **_: Any,
+    ):
+        # `tools` arms sampling at startup, e.g. {"run_sql_query": {"calls": 5, "memory": true}}
+        super().__init__(directory=directory, max_files=int(max_files), tools=dict(tools or {}))
+
+
 class Config:
     """Lightweight config object used by the main entrypoint.
 
@@ -27,6 +179,22 @@ class Config:
         # expected top-level 'mcp' key with optional 'debug'
         mcp = data.get("mcp") or {}
         self.mcp = _MCPSettings(debug=bool(mcp.get("debug", False)), auto_start=bool(mcp.get("auto_start", False)))
+        # optional 'sql' key tunes connection pooling for run_sql_query
+        self.sql = _SQLSettings(**(data.get("sql") or {}))
+        # optional 'hdfs' key points the WebHDFS client at a namenode
+        self.hdfs = _HDFSSettings(**(data.get("hdfs") or {}))
+        # optional 'spark' key bounds background spark-submit jobs
+        self.spark = _SparkSettings(**(data.get("spark") or {}))
+        # optional 'scheduler' key caps concurrent tool calls globally / per tool
+        self.scheduler = _SchedulerSettings(**(data.get("scheduler") or {}))
+        # optional 'metrics' key toggles per-tool call instrumentation
+        self.metrics = _MetricsSettings(**(data.get("metrics") or {}))
+        # optional 'results' key bounds the spill directory for large tool outputs
+        self.results = _ResultsSettings(**(data.get("results") or {}))
+        # optional 'coalescing' key shares one execution among identical concurrent calls
+        self.coalescing = _CoalescingSettings(**(data.get("coalescing") or {}))
+        # optional 'profiling' key samples named tools under cProfile/tracemalloc
+        self.profiling = _ProfilingSettings(**(data.get("profiling") or {}))
         # preserve raw data for diagnostics
         self._data = data
 
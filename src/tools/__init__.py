@@ -1,5 +1,20 @@
-from .registry import tools, tool, list_tools, get_tool, call_tool, call_tool_async
-from .tools import run_spark_job, hdfs_list, hdfs_put, run_sql_query
+from .registry import tools, tool, list_tools, get_tool, call_tool, call_tool_async, call_tools_batch, call_tools_batch_async, close_runner, get_runner, call_options, configure_scheduler, get_scheduler, ToolRejected, ToolDeadlineExceeded
+from .advisor import get_query_log
+from .cache import close_query_cache, get_query_cache
+from .catalog import get_catalog
+from .coalesce import get_single_flight
+from .cursors import close_cursors, get_cursor_store
+from .db_executor import close_db_executor, get_db_executor, QueryTimeout
+from .hdfs_listing import get_directory_cache
+from .incremental import get_watermark_store
+from .metrics import get_metrics
+from .profiling import get_profiler
+from .results import get_result_store, read_result_chunk
+from .pool import configure_pools, close_pools, get_pool_manager
+from .spark_cache import get_spark_cache
+from .spark_jobs import close_job_manager, get_job_manager
+from .webhdfs import close_webhdfs, configure_webhdfs, get_webhdfs_client
+from .tools import run_spark_job, spark_submit, spark_job_status, spark_job_logs, spark_job_cancel, spark_cache_stats, hdfs_list, hdfs_put, hdfs_head, hdfs_get, run_sql_query, sql_fetch_page, sql_close_cursor, sql_cache_stats, sql_bulk_load, sql_incremental_extract, sql_watermarks, sql_catalog, sql_preview, sql_explain, sql_index_advisor, etl_pipeline, result_read, result_delete, tool_metrics, profile_tool, profile_report
 
 __all__ = [
 	"tools",
@@ -8,8 +23,65 @@ __all__ = [
 	"get_tool",
 	"call_tool",
 	"call_tool_async",
+	"call_tools_batch",
+	"call_tools_batch_async",
+	"get_runner",
+	"close_runner",
+	"call_options",
+	"configure_scheduler",
+	"get_scheduler",
+	"ToolRejected",
+	"ToolDeadlineExceeded",
 	"run_spark_job",
+	"spark_submit",
+	"spark_job_status",
+	"spark_job_logs",
+	"spark_job_cancel",
+	"spark_cache_stats",
 	"hdfs_list",
 	"hdfs_put",
+	"hdfs_head",
+	"hdfs_get",
 	"run_sql_query",
+	"sql_fetch_page",
+	"sql_close_cursor",
+	"sql_cache_stats",
+	"sql_bulk_load",
+	"sql_incremental_extract",
+	"sql_watermarks",
+	"sql_catalog",
+	"sql_preview",
+	"sql_explain",
+	"sql_index_advisor",
+	"etl_pipeline",
+	"result_read",
+	"result_delete",
+	"tool_metrics",
+	"profile_tool",
+	"profile_report",
+	"configure_pools",
+	"close_pools",
+	"get_pool_manager",
+	"close_cursors",
+	"get_cursor_store",
+	"close_db_executor",
+	"get_db_executor",
+	"QueryTimeout",
+	"close_query_cache",
+	"get_query_cache",
+	"get_catalog",
+	"get_query_log",
+	"close_webhdfs",
+	"configure_webhdfs",
+	"get_webhdfs_client",
+	"get_directory_cache",
+	"get_watermark_store",
+	"get_metrics",
+	"get_single_flight",
+	"get_profiler",
+	"get_result_store",
+	"read_result_chunk",
+	"close_job_manager",
+	"get_job_manager",
+	"get_spark_cache",
 ]
@@ -0,0 +1,558 @@
+"""Query plan inspection and index suggestions for sqlite sources.
+
+Three parts:
+
+- `QueryLog` records the statements `run_sql_query` executes (per
+  connection string, keyed by normalized SQL, with call counts and
+  timings), so the recent workload is available without asking the caller
+  to repeat it.
+- `explain()` runs `EXPLAIN QUERY PLAN` and flags the steps that usually
+  make a query slow: full table scans, full index scans, automatic
+  (per-execution) indexes and temp B-trees built for ORDER BY / GROUP BY /
+  DISTINCT.
+- `advise()` derives candidate indexes from the columns a query filters,
+  joins and sorts on (equality columns first, then one range column, then
+  sort columns, then the remaining referenced columns when that keeps the
+  index covering). Each candidate is checked against a schema-only
+  in-memory copy of the database: only indexes the planner would actually
+  use are suggested. The estimated benefit comes from the table's row
+  estimate and the catalog's per-column distinct counts. With `dry_run`
+  the database is copied, the workload timed, the indexes created and the
+  workload timed again; the source database is never modified.
+
+Column references are found with a tokenizer rather than a full SQL
+parser, so unusual syntax can lead to missed candidates, never to wrong
+results: every suggestion is validated by sqlite's own planner.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .cache import is_read_only, normalize_sql
+from .catalog import get_catalog
+from .db_executor import interruptible
+from .loader import quote_ident
+from .pool import get_pool_manager, sqlite_path
+
+DEFAULT_MAX_QUERIES = 200
+DEFAULT_MAX_SOURCES = 32
+MAX_INDEX_COLUMNS = 6
+DEFAULT_MAX_COPY_BYTES = 512 * 1024 * 1024
+RANGE_SELECTIVITY = 0.25
+
+# ---------- workload log ----------
+
+
+class QueryLog:
+    """Bounded per-source record of executed statements and their timings."""
+
+    def __init__(self, max_queries: int = DEFAULT_MAX_QUERIES, max_sources: int = DEFAULT_MAX_SOURCES) -> None:
+        self.max_queries = max_queries
+        self.max_sources = max_sources
+        self.enabled = True
+        self._sources: "OrderedDict[str, OrderedDict[str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_queries: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+        if max_queries is not None:
+            self.max_queries = max(1, int(max_queries))
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def record(self, conn_str: str, query: str, seconds: float, rows: int = 0) -> None:
+        if not self.enabled:
+            return
+        key = normalize_sql(query)
+        with self._lock:
+            queries = self._sources.get(conn_str)
+            if queries is None:
+                queries = self._sources[conn_str] = OrderedDict()
+                while len(self._sources) > self.max_sources:
+                    self._sources.popitem(last=False)
+            self._sources.move_to_end(conn_str)
+            entry = queries.get(key)
+            if entry is None:
+                entry = queries[key] = {"query": key, "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "rows": 0}
+            entry["calls"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["rows"] = rows
+            entry["last_seen"] = time.time()
+            queries.move_to_end(key)
+            while len(queries) > self.max_queries:
+                queries.popitem(last=False)
+
+    def workload(self, conn_str: str, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded statements for a source, most total time first."""
+        with self._lock:
+            entries = [dict(e) for e in self._sources.get(conn_str, {}).values()]
+        entries.sort(key=lambda e: e["total_seconds"], reverse=True)
+        return entries[:top] if top else entries
+
+    def clear(self, conn_str: Optional[str] = None) -> None:
+        with self._lock:
+            if conn_str is None:
+                self._sources.clear()
+            else:
+                self._sources.pop(conn_str, None)
+
+
+_LOG = QueryLog()
+
+
+def get_query_log() -> QueryLog:
+    return _LOG
+
+
+# ---------- plans ----------
+
+_STEP_RE = re.compile(r"^(SCAN|SEARCH)(?: TABLE)? (\S+)(?: AS (\S+))?(.*)$")
+
+
+def _plan(conn: sqlite3.Connection, query: str) -> List[Tuple[int, int, str]]:
+    return [(r[0], r[1], r[3]) for r in conn.execute("EXPLAIN QUERY PLAN " + query)]
+
+
+def _flags(plan: Sequence[Tuple[int, int, str]]) -> List[Dict[str, Any]]:
+    flags = []
+    for _, _, detail in plan:
+        m = _STEP_RE.match(detail)
+        if m:
+            name, rest = m.group(3) or m.group(2), m.group(4)
+            if "AUTOMATIC" in rest:
+                flags.append({"issue": "automatic_index", "table": name, "detail": detail})
+            elif m.group(1) == "SCAN" and "USING" not in rest:
+                flags.append({"issue": "full_scan", "table": name, "detail": detail})
+            elif m.group(1) == "SCAN":
+                flags.append({"issue": "index_scan", "table": name, "detail": detail})
+        elif detail.startswith("USE TEMP B-TREE"):
+            flags.append({"issue": "temp_btree", "for": detail.rsplit(" FOR ", 1)[-1].lower(), "detail": detail})
+    return flags
+
+
+def _require_sqlite(conn_str: str) -> None:
+    if not conn_str.startswith("sqlite"):
+        raise RuntimeError("query plans and index advice are only available for sqlite sources")
+
+
+def explain(conn_str: str, query: str) -> Dict[str, Any]:
+    """`EXPLAIN QUERY PLAN` for one statement, with its slow steps flagged."""
+    _require_sqlite(conn_str)
+    with get_pool_manager().connection(conn_str) as conn, interruptible(conn):
+        plan = _plan(conn, query)
+    return {
+        "plan": [{"id": i, "parent": p, "detail": d} for i, p, d in plan],
+        "flags": _flags(plan),
+    }
+
+
+# ---------- column references ----------
+
+_TOKEN_RE = re.compile(
+    r"'(?:[^']|'')*'"
+    r"|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\]"
+    r"|\d+(?:\.\d+)?"
+    r"|[A-Za-z_][A-Za-z0-9_$]*"
+    r"|<=|>=|<>|!=|==|\|\||[(),.;=<>*+\-/%?:@$]"
+)
+_KEYWORDS = set(
+    """select from where join inner left right full outer cross natural on using group order by having
+    limit offset as and or not in is null between like glob regexp match exists case when then else end
+    distinct all union intersect except asc desc collate escape with recursive values insert update
+    delete set into default cast nulls first last indexed window over partition filter true false""".split()
+)
+_CLAUSES = {"select": "select", "where": "where", "on": "where", "having": "having", "set": "select"}
+_EQ_OPS = {"=", "==", "is", "in"}
+_RANGE_OPS = {"<", ">", "<=", ">=", "between", "like", "glob"}
+
+
+def _ident(tok: str) -> Optional[str]:
+    if tok[0] in "\"`[":
+        return tok[1:-1].replace('""', '"')
+    if tok[0].isalpha() or tok[0] == "_":
+        return None if tok.lower() in _KEYWORDS else tok
+    return None
+
+
+class _Usage:
+    """Columns of one table referenced by a query, by role."""
+
+    def __init__(self) -> None:
+        self.eq: List[str] = []
+        self.range: List[str] = []
+        self.order: List[str] = []
+        self.other: List[str] = []
+
+    @staticmethod
+    def _add(target: List[str], col: str) -> None:
+        if col not in target:
+            target.append(col)
+
+
+def _references(
+    query: str, columns: Dict[str, Set[str]]
+) -> Tuple[Dict[str, _Usage], Set[str], Dict[str, str]]:
+    """Map each table the query reads to the columns it uses.
+
+    `columns` maps lower-cased table names to their lower-cased column names.
+    Also returns the tables read with `*` and the alias -> table map.
+    """
+    toks = _TOKEN_RE.findall(query)
+    low = [t.lower() for t in toks]
+    aliases: Dict[str, str] = {}
+    star: Set[str] = set()
+    clause = "select"
+    refs: List[Tuple[Optional[str], str, str, int]] = []  # (qualifier, column, clause, token index)
+    i = 0
+    while i < len(toks):
+        t = low[i]
+        if t in ("from", "join", "update", "into") or (t == "," and clause == "from"):
+            clause = "from"
+            j = i + 1
+            name = _ident(toks[j]) if j < len(toks) else None
+            if name is not None:
+                while j + 2 < len(toks) and toks[j + 1] == "." and _ident(toks[j + 2]):
+                    j += 2
+                    name = _ident(toks[j])
+                table = name.lower()  # type: ignore[union-attr]
+                aliases[table] = table
+                j += 1
+                if j < len(toks) and low[j] == "as":
+                    j += 1
+                alias = _ident(toks[j]) if j < len(toks) else None
+                if alias is not None:
+                    aliases[alias.lower()] = table
+                    j += 1
+                i = j
+                continue
+        elif t in _CLAUSES:
+            clause = _CLAUSES[t]
+        elif t in ("order", "group") and i + 1 < len(toks) and low[i + 1] == "by":
+            clause = "order"
+            i += 2
+            continue
+        elif t == "*":
+            if i > 1 and toks[i - 1] == "." and _ident(toks[i - 2]):
+                star.add(_ident(toks[i - 2]).lower())  # type: ignore[union-attr]
+            elif clause == "select" and i > 0 and low[i - 1] in (",", "select", "distinct"):
+                star.add("*")
+        elif clause != "from":
+            name = _ident(toks[i])
+            nxt = low[i + 1] if i + 1 < len(toks) else ""
+            if name is not None and nxt != "(" and (i == 0 or toks[i - 1] != "."):
+                if nxt == "." and i + 2 < len(toks) and _ident(toks[i + 2]):
+                    refs.append((name.lower(), _ident(toks[i + 2]).lower(), clause, i + 2))  # type: ignore[union-attr]
+                    i += 3
+                    continue
+                refs.append((None, name.lower(), clause, i))
+        i += 1
+
+    tables = set(aliases.values())
+    usage: Dict[str, _Usage] = {}
+    for qualifier, col, where, idx in refs:
+        if qualifier is not None:
+            table = aliases.get(qualifier)
+        else:
+            owners = [t for t in tables if col in columns.get(t, ())]
+            table = owners[0] if len(owners) == 1 else None
+        if table is None or col not in columns.get(table, ()):
+            continue
+        u = usage.setdefault(table, _Usage())
+        if where == "where":
+            nxt = low[idx + 1] if idx + 1 < len(toks) else ""
+            prev = low[idx - 1] if idx > 0 else ""
+            if qualifier is not None:
+                prev = low[idx - 3] if idx >= 3 else ""
+            op = nxt if nxt in _EQ_OPS or nxt in _RANGE_OPS else prev
+            if op in _EQ_OPS:
+                _Usage._add(u.eq, col)
+                continue
+            if op in _RANGE_OPS:
+                _Usage._add(u.range, col)
+                continue
+        _Usage._add(u.order if where == "order" else u.other, col)
+    for table in tables:
+        usage.setdefault(table, _Usage())
+    if "*" in star:
+        star = set(tables)
+    return usage, {aliases.get(s, s) for s in star}, aliases
+
+
+# ---------- candidates ----------
+
+
+def _schema(conn_str: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Set[str]]]:
+    """Catalog detail per table (lower-cased keys) and lower-cased column sets."""
+    catalog = get_catalog()
+    tables: Dict[str, Dict[str, Any]] = {}
+    for t in catalog.describe(conn_str)["tables"]:
+        if t["type"] == "table":
+            tables[t["name"].lower()] = catalog.table(conn_str, t["name"], stats=False)
+    return tables, {k: {c["name"].lower() for c in v["columns"]} for k, v in tables.items()}
+
+
+def _rowid_alias(info: Dict[str, Any]) -> Optional[str]:
+    pk = [c for c in info["columns"] if c["pk"]]
+    if len(pk) == 1 and (pk[0]["type"] or "").upper() == "INTEGER":
+        return pk[0]["name"].lower()
+    return None
+
+
+def _candidate(usage: _Usage, info: Dict[str, Any], sorts: bool, star: bool) -> Optional[Tuple[List[str], bool]]:
+    """Index columns for one table of a query, and whether the index covers the query."""
+    skip = {_rowid_alias(info)}
+    key = [c for c in usage.eq if c not in skip]
+    ranged = [c for c in usage.range if c not in skip and c not in key][:1]
+    key += ranged
+    if sorts and not ranged:
+        key += [c for c in usage.order if c not in key and c not in skip]
+    if not key:
+        return None
+    rest = list(dict.fromkeys(c for c in usage.eq + usage.range + usage.order + usage.other if c not in key and c not in skip))
+    covering = not star and len(key) + len(rest) <= MAX_INDEX_COLUMNS
+    if covering:
+        key += rest  # the table itself is never read
+    names = {c["name"].lower(): c["name"] for c in info["columns"]}
+    key = [names[c] for c in key[:MAX_INDEX_COLUMNS]]
+    for idx in info["indexes"]:
+        if [c.lower() for c in idx["columns"][: len(key)]] == [c.lower() for c in key]:
+            return None  # an existing index already starts with these columns
+    return key, covering
+
+
+def _index_name(table: str, columns: Sequence[str]) -> str:
+    return re.sub(r"\W+", "_", f"idx_{table}_{'_'.join(columns)}")[:60]
+
+
+def _create_sql(table: str, columns: Sequence[str]) -> str:
+    cols = ", ".join(quote_ident(c) for c in columns)
+    return f"CREATE INDEX {quote_ident(_index_name(table, columns))} ON {quote_ident(table)} ({cols})"
+
+
+def _schema_copy(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """An empty in-memory database with the same tables, indexes and planner statistics."""
+    shadow = sqlite3.connect(":memory:")
+    for kind, sql in conn.execute(
+        "SELECT type, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+        "ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END"
+    ):
+        if kind in ("table", "index", "view"):
+            try:
+                shadow.execute(sql)
+            except sqlite3.Error:
+                pass  # e.g. virtual tables whose module is not loaded here
+    try:
+        stats = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.Error:
+        stats = []
+    if stats:
+        shadow.execute("ANALYZE")
+        shadow.execute("DELETE FROM sqlite_stat1")
+        shadow.executemany("INSERT INTO sqlite_stat1 VALUES (?, ?, ?)", stats)
+        shadow.execute("ANALYZE sqlite_master")  # reload the statistics
+    return shadow
+
+
+def _badness(flags: Sequence[Dict[str, Any]], names: Set[str]) -> int:
+    """Weighted count of slow steps that touch a table (known by `names`) or sort."""
+    weights = {"full_scan": 3, "automatic_index": 2, "index_scan": 1}
+    score = 0
+    for f in flags:
+        if f["issue"] == "temp_btree":
+            score += 1
+        elif f["table"].lower() in names:
+            score += weights.get(f["issue"], 0)
+    return score
+
+
+def _estimate(info: Dict[str, Any], columns: Sequence[str], usage: _Usage) -> Dict[str, Any]:
+    rows = max(1, int(info.get("rows") or 1))
+    distinct = {c["name"].lower(): c.get("distinct") for c in info["columns"]}
+    selectivity = 1.0
+    for col in columns:
+        c = col.lower()
+        if c in usage.eq:
+            selectivity /= max(1, distinct.get(c) or 1)
+        elif c in usage.range:
+            selectivity *= RANGE_SELECTIVITY
+            break
+        else:
+            break
+    after = max(1.0, rows * selectivity) + math.log2(rows + 1)
+    return {
+        "table_rows": rows,
+        "est_rows_read_before": rows,
+        "est_rows_read_after": int(round(after)),
+        "est_speedup": round(rows / after, 1),
+    }
+
+
+def advise(
+    conn_str: str,
+    queries: Optional[Sequence[str]] = None,
+    top: int = 20,
+    dry_run: bool = False,
+    repeat: int = 3,
+    max_copy_bytes: int = DEFAULT_MAX_COPY_BYTES,
+) -> Dict[str, Any]:
+    """Flag slow plan steps in a workload and suggest indexes the planner would use."""
+    _require_sqlite(conn_str)
+    if queries:
+        workload = [{"query": normalize_sql(q), "calls": 1, "total_seconds": 0.0} for q in queries]
+    else:
+        workload = get_query_log().workload(conn_str, top)
+    tables, columns = _schema(conn_str)
+    pool = get_pool_manager().sqlite(conn_str)
+    conn = pool.acquire()
+    try:
+        with interruptible(conn):
+            shadow = _schema_copy(conn)
+    finally:
+        pool.release(conn)
+
+    analysed: List[Dict[str, Any]] = []
+    candidates: "OrderedDict[Tuple[str, Tuple[str, ...]], Dict[str, Any]]" = OrderedDict()
+    try:
+        for item in workload:
+            query = item["query"]
+            try:
+                flags = _flags(_plan(shadow, query))
+            except sqlite3.Error as exc:
+                analysed.append({**item, "error": str(exc)})
+                continue
+            entry = {**item, "flags": flags}
+            analysed.append(entry)
+            if not flags:
+                continue
+            usage, star, aliases = _references(query, columns)
+            sorts = any(f["issue"] == "temp_btree" for f in flags)
+            for table, u in usage.items():
+                info = tables.get(table)
+                if info is None:
+                    continue
+                names = {a for a, t in aliases.items() if t == table}
+                if not sorts and not any(f.get("table", "").lower() in names for f in flags):
+                    continue
+                found = _candidate(u, info, sorts, table in star)
+                if found is None:
+                    continue
+                key, covering = found
+                cand = candidates.setdefault(
+                    (info["name"], tuple(key)),
+                    {"usage": u, "covering": covering, "queries": []},
+                )
+                cand["queries"].append((entry, names))
+
+        suggestions = []
+        for (table, key), cand in candidates.items():
+            improved = []
+            removes_sort = False
+            shadow.execute(_create_sql(table, key))
+            try:
+                for entry, names in cand["queries"]:
+                    after = _flags(_plan(shadow, entry["query"]))
+                    if _badness(after, names) < _badness(entry["flags"], names):
+                        improved.append({"query": entry["query"], "flags_after": after, "seconds": entry["total_seconds"]})
+                        sorts_before = sum(f["issue"] == "temp_btree" for f in entry["flags"])
+                        removes_sort |= sum(f["issue"] == "temp_btree" for f in after) < sorts_before
+            finally:
+                shadow.execute(f"DROP INDEX {quote_ident(_index_name(table, key))}")
+            if not improved:
+                continue  # the planner would not use it
+            info = get_catalog().table(conn_str, table)  # with column statistics
+            benefit = _estimate(info, key, cand["usage"])
+            benefit["removes_sort"] = removes_sort
+            recorded = sum(q.pop("seconds") for q in improved)
+            benefit["recorded_seconds"] = round(recorded, 6)
+            benefit["est_seconds_saved"] = round(recorded * (1 - 1 / max(1.0, benefit["est_speedup"])), 6)
+            suggestions.append(
+                {
+                    "table": table,
+                    "columns": list(key),
+                    "sql": _create_sql(table, key),
+                    "covering": cand["covering"],
+                    "queries_improved": improved,
+                    "benefit": benefit,
+                }
+            )
+    finally:
+        shadow.close()
+    suggestions.sort(key=lambda s: (s["benefit"]["est_seconds_saved"], s["benefit"]["est_speedup"]), reverse=True)
+    out: Dict[str, Any] = {"workload": analysed, "suggestions": suggestions}
+    if dry_run and suggestions:
+        reads = [a["query"] for a in analysed if "flags" in a]
+        out["dry_run"] = _dry_run(conn_str, reads, suggestions, repeat, max_copy_bytes)
+    return out
+
+
+# ---------- dry run ----------
+
+
+def _time(conn: sqlite3.Connection, query: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _dry_run(
+    conn_str: str, queries: Sequence[str], suggestions: Sequence[Dict[str, Any]], repeat: int, max_copy_bytes: int
+) -> Dict[str, Any]:
+    """Copy the database, time the read-only workload, add the indexes and time it again."""
+    path = sqlite_path(conn_str)
+    size = os.path.getsize(path) if path != ":memory:" and os.path.exists(path) else 0
+    if size > max_copy_bytes:
+        return {"skipped": f"database is {size} bytes, above max_copy_bytes={max_copy_bytes}"}
+    reads = [q for q in queries if is_read_only(q)]
+    with tempfile.TemporaryDirectory(prefix="etl-advisor-") as tmp:
+        copy = sqlite3.connect(os.path.join(tmp, "copy.db"))
+        try:
+            pool = get_pool_manager().sqlite(conn_str)
+            src = pool.acquire()
+            try:
+                with interruptible(src):
+                    src.backup(copy)
+            finally:
+                pool.release(src)
+            with interruptible(copy):
+                before = {q: _time(copy, q, repeat) for q in reads}
+                start = time.perf_counter()
+                for s in suggestions:
+                    copy.execute(s["sql"])
+                copy.execute("ANALYZE")
+                build = time.perf_counter() - start
+                after = {q: _time(copy, q, repeat) for q in reads}
+        finally:
+            copy.close()
+    per_query = [
+        {
+            "query": q,
+            "before_ms": round(before[q] * 1000, 3),
+            "after_ms": round(after[q] * 1000, 3),
+            "speedup": round(before[q] / after[q], 2) if after[q] > 0 else None,
+        }
+        for q in reads
+    ]
+    total_before, total_after = sum(before.values()), sum(after.values())
+    return {
+        "copy_bytes": size,
+        "index_build_ms": round(build * 1000, 3),
+        "queries": per_query,
+        "total_before_ms": round(total_before * 1000, 3),
+        "total_after_ms": round(total_after * 1000, 3),
+        "speedup": round(total_before / total_after, 2) if total_after > 0 else None,
+    }
+
+
+__all__ = ["QueryLog", "get_query_log", "explain", "advise"]
@@ -0,0 +1,222 @@
+"""LRU/TTL cache for read-only SQL query results.
+
+Entries are keyed by (connection string, normalized SQL, fetch size) and hold
+the column names and row tuples, so any result format can be served from a
+hit. sqlite entries also record a database version token and are dropped as
+soon as the database changes. The token comes from `PRAGMA data_version` on a
+dedicated watcher connection (it changes whenever another connection commits),
+falling back to the file's mtime/size.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .pool import sqlite_path
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_ROWS = 10_000
+DEFAULT_TTL = 60.0
+
+_TOKEN_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+|[^'\"\s]+")
+_READ_ONLY_RE = re.compile(r"^\s*(select|with|values)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(insert|update|delete|replace|create|drop|alter|attach|pragma)\b", re.IGNORECASE)
+_VOLATILE_RE = re.compile(
+    r"\b(random|randomblob|now|current_timestamp|current_date|current_time|changes|"
+    r"total_changes|last_insert_rowid)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace outside string literals and drop a trailing semicolon."""
+    parts = []
+    for tok in _TOKEN_RE.findall(query.strip()):
+        parts.append(" " if tok.isspace() else tok)
+    return "".join(parts).rstrip("; ")
+
+
+def _outside_literals(query: str) -> str:
+    return "".join(t for t in _TOKEN_RE.findall(query) if not t.startswith(("'", '"')))
+
+
+def is_read_only(query: str) -> bool:
+    """True for statements that cannot modify the database."""
+    bare = _outside_literals(query)
+    return bool(_READ_ONLY_RE.match(bare)) and not _WRITE_RE.search(bare)
+
+
+def is_cacheable(query: str) -> bool:
+    """True for read-only statements whose result does not depend on call time."""
+    # volatile markers are also checked inside literals, e.g. datetime('now')
+    return is_read_only(query) and not _VOLATILE_RE.search(query)
+
+
+class _Entry:
+    __slots__ = ("columns", "rows", "expires", "version")
+
+    def __init__(self, columns: List[str], rows: List[Tuple[Any, ...]], expires: float, version: Any) -> None:
+        self.columns = columns
+        self.rows = rows
+        self.expires = expires
+        self.version = version
+
+
+class QueryCache:
+    """Size-bounded LRU of query results with per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        ttl: float = DEFAULT_TTL,
+        enabled: bool = True,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, str, int], _Entry]" = OrderedDict()
+        self._watchers: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def configure(
+        self,
+        max_entries: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        ttl: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        if max_entries is not None:
+            self.max_entries = max(1, int(max_entries))
+        if max_rows is not None:
+            self.max_rows = int(max_rows)
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def key(self, conn_str: str, query: str, fetch: int) -> Optional[Tuple[str, str, int]]:
+        """Return the cache key for a query, or None if it must not be cached."""
+        if not self.enabled or not is_cacheable(query):
+            return None
+        if conn_str.startswith("sqlite") and sqlite_path(conn_str) in (":memory:", ""):
+            # private in-memory databases cannot be watched for changes
+            return None
+        return (conn_str, normalize_sql(query), int(fetch))
+
+    # ---------- sqlite change detection ----------
+
+    def version(self, conn_str: str) -> Any:
+        """Return a token that changes whenever the sqlite database changes."""
+        if not conn_str.startswith("sqlite"):
+            return None
+        path = sqlite_path(conn_str)
+        if not os.path.exists(path):
+            return None
+        try:
+            with self._lock:
+                watcher = self._watchers.get(path)
+                if watcher is None:
+                    watcher = sqlite3.connect(path, check_same_thread=False)
+                    self._watchers[path] = watcher
+                return ("data_version", watcher.execute("PRAGMA data_version").fetchone()[0])
+        except Exception:
+            pass
+        try:
+            st = os.stat(path)
+            return ("mtime", st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    # ---------- lookup / store ----------
+
+    def get(self, key: Tuple[str, str, int], version: Any) -> Optional[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """Look up a result; `version` is the current `version(conn_str)` token."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if entry.version != version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.columns, entry.rows
+
+    def put(self, key: Tuple[str, str, int], columns: Sequence[str], rows: Sequence[Sequence[Any]], version: Any) -> None:
+        """Store a result; `version` must be read *before* the query executed."""
+        if len(rows) > self.max_rows:
+            return
+        entry = _Entry(list(columns), [tuple(r) for r in rows], time.monotonic() + self.ttl, version)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            watchers, self._watchers = list(self._watchers.values()), {}
+        for w in watchers:
+            try:
+                w.close()
+            except Exception:
+                pass
+
+    def stats(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            out = {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+            if reset:
+                self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+            return out
+
+
+_CACHE = QueryCache()
+
+
+def get_query_cache() -> QueryCache:
+    return _CACHE
+
+
+def close_query_cache() -> None:
+    _CACHE.close()
+
+
+__all__ = ["QueryCache", "normalize_sql", "is_cacheable", "is_read_only", "get_query_cache", "close_query_cache"]
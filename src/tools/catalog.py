@@ -0,0 +1,350 @@
+"""Cached schema catalog for SQL sources.
+
+One `sql_catalog` call answers what would otherwise take a dozen
+`run_sql_query` round trips: which tables and views exist, their columns,
+types, keys and indexes, roughly how many rows they hold, and per-column
+statistics. sqlite sources are introspected with `PRAGMA`s, others with
+SQLAlchemy's inspector.
+
+Catalogs are cached per connection string. For sqlite every lookup first
+reads `PRAGMA schema_version` (a single integer read from the file header)
+and rebuilds the catalog only when it changed; data changes leave the
+schema version alone, so the row estimates of a cached sqlite catalog are
+re-read once they are older than `ttl`. Other databases have no cheap
+change token, so their entries expire after `ttl`. Column statistics scan
+a bounded prefix of the table and are cached for `ttl` as well.
+
+Row counts are estimates: `sqlite_stat1` (written by `ANALYZE`) when
+present, otherwise `max(rowid)`, which ignores deleted rows. Both are
+O(1)/O(log n); the catalog never runs `COUNT(*)` over a whole table.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .loader import quote_ident
+from .pool import get_pool_manager
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_SAMPLE_ROWS = 10_000
+MAX_VALUE_CHARS = 64
+
+
+def _short(value: Any) -> Any:
+    """Keep min/max values compact and JSON-friendly."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(bytes(value))} bytes>"
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    value = str(value)
+    return value[:MAX_VALUE_CHARS] + "…" if len(value) > MAX_VALUE_CHARS else value
+
+
+class _Entry:
+    __slots__ = ("version", "fetched", "rows_fetched", "tables", "stats")
+
+    def __init__(self, version: Any, tables: Dict[str, Dict[str, Any]]) -> None:
+        self.version = version
+        self.fetched = self.rows_fetched = time.monotonic()
+        self.tables = tables
+        # table -> (fetched, sample_rows, _column_stats() result)
+        self.stats: Dict[str, Tuple[float, int, Dict[str, Any]]] = {}
+
+
+# ---------- sqlite ----------
+
+
+def _sqlite_version(conn: Any) -> int:
+    return conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
+def _sqlite_row_estimates(conn: Any, names: Sequence[str]) -> Dict[str, Tuple[Optional[int], Optional[str]]]:
+    estimates: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
+    try:
+        for tbl, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            rows = int(str(stat).split()[0])
+            if rows >= (estimates.get(tbl, (None, None))[0] or 0):
+                estimates[tbl] = (rows, "sqlite_stat1")
+    except Exception:
+        pass  # no ANALYZE yet
+    for name in names:
+        if name in estimates:
+            continue
+        try:
+            value = conn.execute(f"SELECT max(rowid) FROM {quote_ident(name)}").fetchone()[0]
+            estimates[name] = (int(value or 0), "max_rowid")
+        except Exception:
+            estimates[name] = (None, None)  # WITHOUT ROWID table
+    return estimates
+
+
+def _sqlite_tables(conn: Any) -> Dict[str, Dict[str, Any]]:
+    objects = conn.execute(
+        "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    ).fetchall()
+    estimates = _sqlite_row_estimates(conn, [n for n, kind in objects if kind == "table"])
+    tables: Dict[str, Dict[str, Any]] = {}
+    for name, kind in objects:
+        q = quote_ident(name)
+        columns = [
+            {"name": c[1], "type": c[2] or None, "nullable": not c[3], "default": c[4], "pk": c[5]}
+            for c in conn.execute(f"PRAGMA table_info({q})")
+        ]
+        indexes = []
+        for idx in conn.execute(f"PRAGMA index_list({q})"):
+            cols = [r[2] for r in conn.execute(f"PRAGMA index_info({quote_ident(idx[1])})")]
+            indexes.append({"name": idx[1], "columns": cols, "unique": bool(idx[2])})
+        fks: Dict[int, Dict[str, Any]] = {}
+        for fk in conn.execute(f"PRAGMA foreign_key_list({q})"):
+            ref = fks.setdefault(fk[0], {"columns": [], "ref_table": fk[2], "ref_columns": []})
+            ref["columns"].append(fk[3])
+            ref["ref_columns"].append(fk[4])
+        rows, source = estimates.get(name, (None, None))
+        tables[name] = {
+            "name": name,
+            "type": kind,
+            "rows": rows,
+            "rows_source": source,
+            "primary_key": [c["name"] for c in sorted(columns, key=lambda c: c["pk"]) if c["pk"]],
+            "columns": columns,
+            "indexes": indexes,
+            "foreign_keys": list(fks.values()),
+        }
+    return tables
+
+
+# ---------- SQLAlchemy ----------
+
+
+def _sqlalchemy_tables(conn_str: str) -> Dict[str, Dict[str, Any]]:
+    from sqlalchemy import inspect  # type: ignore
+
+    inspector = inspect(get_pool_manager().engine(conn_str))
+    tables: Dict[str, Dict[str, Any]] = {}
+    names = [(n, "table") for n in inspector.get_table_names()] + [(n, "view") for n in inspector.get_view_names()]
+    for name, kind in sorted(names):
+        pk = (inspector.get_pk_constraint(name) or {}).get("constrained_columns") or []
+        columns = [
+            {
+                "name": c["name"],
+                "type": str(c["type"]),
+                "nullable": bool(c.get("nullable", True)),
+                "default": c.get("default"),
+                "pk": pk.index(c["name"]) + 1 if c["name"] in pk else 0,
+            }
+            for c in inspector.get_columns(name)
+        ]
+        tables[name] = {
+            "name": name,
+            "type": kind,
+            "rows": None,
+            "rows_source": None,
+            "primary_key": list(pk),
+            "columns": columns,
+            "indexes": [
+                {"name": i["name"], "columns": list(i["column_names"]), "unique": bool(i.get("unique"))}
+                for i in (inspector.get_indexes(name) if kind == "table" else [])
+            ],
+            "foreign_keys": [
+                {"columns": fk["constrained_columns"], "ref_table": fk["referred_table"], "ref_columns": fk["referred_columns"]}
+                for fk in (inspector.get_foreign_keys(name) if kind == "table" else [])
+            ],
+        }
+    return tables
+
+
+# ---------- column statistics ----------
+
+
+def _stats_sql(table: str, columns: Sequence[str], sample_rows: int) -> str:
+    parts = ["count(*)"]
+    for c in columns:
+        q = quote_ident(c)
+        parts += [f"count({q})", f"count(DISTINCT {q})", f"min({q})", f"max({q})"]
+    names = ", ".join(quote_ident(c) for c in columns)
+    return f"SELECT {', '.join(parts)} FROM (SELECT {names} FROM {quote_ident(table)} LIMIT {int(sample_rows)}) AS s"
+
+
+def _column_stats(conn_str: str, table: str, columns: Sequence[str], sample_rows: int) -> Dict[str, Any]:
+    """Null fraction, distinct count and min/max over the first `sample_rows` rows, in one query."""
+    sql = _stats_sql(table, columns, sample_rows)
+    if conn_str.startswith("sqlite"):
+        with get_pool_manager().connection(conn_str) as conn:
+            row = conn.execute(sql).fetchone()
+    else:
+        from sqlalchemy import text  # type: ignore
+
+        with get_pool_manager().engine(conn_str).connect() as conn:
+            row = tuple(conn.execute(text(sql)).fetchone())
+    scanned = row[0]
+    stats: Dict[str, Dict[str, Any]] = {}
+    for i, name in enumerate(columns):
+        non_null, distinct, lo, hi = row[1 + 4 * i: 5 + 4 * i]
+        stats[name] = {
+            "null_frac": round(1 - non_null / scanned, 4) if scanned else None,
+            "distinct": distinct,
+            "unique": bool(scanned) and distinct == scanned,
+            "min": _short(lo),
+            "max": _short(hi),
+        }
+    return {"scanned": scanned, "columns": stats}
+
+
+# ---------- catalog ----------
+
+
+class SchemaCatalog:
+    """LRU of introspected schemas, keyed by connection string."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sample_rows = sample_rows
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def configure(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        sample_rows: Optional[int] = None,
+    ) -> None:
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if max_entries is not None:
+            self.max_entries = max(1, int(max_entries))
+        if sample_rows is not None:
+            self.sample_rows = max(1, int(sample_rows))
+
+    def _load(self, conn_str: str, refresh: bool) -> Tuple[_Entry, bool]:
+        """Return the current entry and whether it came from the cache."""
+        sqlite = conn_str.startswith("sqlite")
+        with self._lock:
+            entry = self._entries.get(conn_str)
+        if sqlite:
+            with get_pool_manager().connection(conn_str) as conn:
+                version = _sqlite_version(conn)
+                fresh = entry is not None and entry.version == version
+                if not fresh or refresh:
+                    entry = _Entry(version, _sqlite_tables(conn))
+                elif time.monotonic() - entry.rows_fetched >= self.ttl:
+                    self._refresh_rows(conn, entry)
+        else:
+            fresh = entry is not None and time.monotonic() - entry.fetched < self.ttl
+            if not fresh or refresh:
+                try:
+                    entry = _Entry(None, _sqlalchemy_tables(conn_str))
+                except ImportError:
+                    raise RuntimeError(
+                        "No SQL client available: install sqlalchemy or use a sqlite connection string."
+                    ) from None
+        assert entry is not None
+        cached = fresh and not refresh
+        with self._lock:
+            if cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if conn_str in self._entries:
+                    self.invalidations += 1
+            self._entries[conn_str] = entry
+            self._entries.move_to_end(conn_str)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry, cached
+
+    def _refresh_rows(self, conn: Any, entry: _Entry) -> None:
+        """Re-read the row estimates of a cached sqlite catalog whose schema is unchanged."""
+        names = [name for name, t in entry.tables.items() if t["type"] == "table"]
+        estimates = _sqlite_row_estimates(conn, names)
+        tables = dict(entry.tables)
+        for name in names:
+            rows, source = estimates.get(name, (None, None))
+            # copy rather than mutate: other threads may be reading the old dicts
+            tables[name] = {**tables[name], "rows": rows, "rows_source": source}
+        with self._lock:
+            entry.tables = tables
+            entry.rows_fetched = time.monotonic()
+
+    def describe(self, conn_str: str, refresh: bool = False) -> Dict[str, Any]:
+        """Compact listing: each table's kind, estimated rows and `column: type` map."""
+        entry, cached = self._load(conn_str, refresh)
+        return {
+            "cached": cached,
+            "schema_version": entry.version,
+            "tables": [
+                {
+                    "name": t["name"],
+                    "type": t["type"],
+                    "rows": t["rows"],
+                    "primary_key": t["primary_key"],
+                    "columns": {c["name"]: c["type"] for c in t["columns"]},
+                }
+                for t in entry.tables.values()
+            ],
+        }
+
+    def table(
+        self, conn_str: str, table: str, refresh: bool = False, stats: bool = True, sample_rows: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Full detail for one table or view, with cached column statistics."""
+        entry, cached = self._load(conn_str, refresh)
+        info = entry.tables.get(table)
+        if info is None:
+            raise KeyError(f"no table or view named {table!r}; available: {sorted(entry.tables)}")
+        out = {**info, "cached": cached, "schema_version": entry.version}
+        if not stats or not info["columns"]:
+            return out
+        sample = max(1, int(sample_rows or self.sample_rows))
+        with self._lock:
+            hit = entry.stats.get(table)
+        out["stats_cached"] = not (refresh or hit is None or hit[1] != sample or time.monotonic() - hit[0] >= self.ttl)
+        if not out["stats_cached"]:
+            computed = _column_stats(conn_str, table, [c["name"] for c in info["columns"]], sample)
+            hit = (time.monotonic(), sample, computed)
+            with self._lock:
+                entry.stats[table] = hit
+        computed = hit[2]  # type: ignore[index]
+        out["stats_rows_scanned"] = computed["scanned"]
+        out["columns"] = [{**c, **computed["columns"].get(c["name"], {})} for c in info["columns"]]
+        return out
+
+    def invalidate(self, conn_str: Optional[str] = None) -> None:
+        with self._lock:
+            if conn_str is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(conn_str, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+_CATALOG = SchemaCatalog()
+
+
+def get_catalog() -> SchemaCatalog:
+    return _CATALOG
+
+
+__all__ = ["SchemaCatalog", "get_catalog"]
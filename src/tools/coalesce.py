@@ -0,0 +1,186 @@
+"""Single-flight coalescing of identical concurrent tool calls.
+
+When several callers invoke the same tool with the same arguments while a
+call is already in flight, they wait for that execution and share its
+result (or exception) instead of spawning another subprocess, query or
+HTTP request. Calls are matched on the tool name plus the bound arguments
+(defaults applied), so `f(x)` and `f(x=x)` coalesce.
+
+Coalescing is opt-in per tool (`@tool(coalesce=True)`, or a predicate over
+the bound arguments for tools that are only sometimes read-only). Tools
+with side effects declare `coalesce=False` and can never be switched on
+from config. Followers skip admission control and profiling; they share
+the leader's priority and deadline. The in-flight execution is shielded,
+so cancelling the first caller does not cancel the work the others wait on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Union
+
+# True: always coalesce; callable(arguments) -> bool: coalesce when it returns True
+Policy = Union[bool, Callable[[Dict[str, Any]], bool]]
+
+
+class _Flight:
+    __slots__ = ("future", "followers")
+
+    def __init__(self) -> None:
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.followers = 0
+
+
+class SingleFlight:
+    """Tracks in-flight calls by key and lets identical calls join them."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._declared: Dict[str, Policy] = {}
+        self._active: Dict[str, Policy] = {}
+        self._excluded: Set[str] = set()
+        self._signatures: Dict[str, inspect.Signature] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"executions": 0, "coalesced": 0})
+
+    def configure(self, enabled: Optional[bool] = None, tools: Optional[Dict[str, bool]] = None) -> None:
+        """Toggle coalescing globally and per tool (e.g. from config)."""
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        for name, on in (tools or {}).items():
+            self.set_enabled(name, bool(on))
+
+    def declare(self, name: str, policy: Optional[Policy]) -> None:
+        """Record a tool's policy from its decorator; None leaves the tool off."""
+        with self._lock:
+            self._signatures.pop(name, None)
+            if policy is False:
+                self._excluded.add(name)
+                self._declared.pop(name, None)
+                self._active.pop(name, None)
+            elif policy is not None:
+                self._excluded.discard(name)
+                self._declared[name] = policy
+                self._active[name] = policy
+
+    def set_enabled(self, name: str, on: bool) -> None:
+        with self._lock:
+            if not on:
+                self._active.pop(name, None)
+                return
+            if name in self._excluded:
+                raise ValueError(f"tool {name!r} has side effects and cannot be coalesced")
+            self._active[name] = self._declared.get(name, True)
+
+    def is_enabled(self, name: str) -> bool:
+        return self.enabled and name in self._active
+
+    def key(self, name: str, func: Callable[..., Any], args: Any, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Coalescing key for a call, or None when the call must run on its own."""
+        if not self.enabled:
+            return None
+        policy = self._active.get(name)
+        if policy is None:
+            return None
+        signature = self._signatures.get(name)
+        if signature is None:
+            signature = self._signatures.setdefault(name, inspect.signature(func))
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            return None  # let the call itself raise
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        if callable(policy) and not policy(arguments):
+            return None
+        try:
+            blob = json.dumps(arguments, sort_keys=True, default=repr)
+        except (TypeError, ValueError):
+            return None
+        return f"{name}\x00{blob}"
+
+    def _join(self, key: str, name: str) -> Tuple[_Flight, bool]:
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self._counters[name]["coalesced"] += 1
+                return flight, False
+            flight = self._inflight[key] = _Flight()
+            self._counters[name]["executions"] += 1
+            return flight, True
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+    async def run_async(self, key: str, name: str, factory: Callable[[], Any]) -> Any:
+        """Await the in-flight call for `key`, or start `factory()` as the leader."""
+        flight, leader = self._join(key, name)
+        if not leader:
+            return await asyncio.shield(asyncio.wrap_future(flight.future))
+
+        def settle(task: "asyncio.Task[Any]") -> None:
+            self._land(key, flight)
+            if task.cancelled():
+                flight.future.cancel()
+            elif task.exception() is not None:
+                flight.future.set_exception(task.exception())  # type: ignore[arg-type]
+            else:
+                flight.future.set_result(task.result())
+
+        try:
+            task = asyncio.ensure_future(factory())
+        except BaseException as exc:
+            self._land(key, flight)
+            flight.future.set_exception(exc)
+            raise
+        task.add_done_callback(settle)
+        return await asyncio.shield(task)
+
+    def run(self, key: str, name: str, func: Callable[[], Any]) -> Any:
+        """Blocking counterpart of `run_async` for sync tools."""
+        flight, leader = self._join(key, name)
+        if not leader:
+            return flight.future.result()
+        try:
+            result = func()
+        except BaseException as exc:
+            self._land(key, flight)
+            flight.future.set_exception(exc)
+            raise
+        self._land(key, flight)
+        flight.future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            names = set(self._active) | set(self._counters)
+            in_flight: Dict[str, int] = defaultdict(int)
+            for key in self._inflight:
+                in_flight[key.split("\x00", 1)[0]] += 1
+            return {
+                "enabled": self.enabled,
+                "excluded": sorted(self._excluded),
+                "tools": {
+                    n: {"enabled": n in self._active, "in_flight": in_flight[n], **self._counters[n]}
+                    for n in sorted(names)
+                },
+            }
+
+
+_SINGLE_FLIGHT = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _SINGLE_FLIGHT
+
+
+__all__ = ["SingleFlight", "get_single_flight"]
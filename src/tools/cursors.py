@@ -0,0 +1,287 @@
+"""Open cursor handles so SQL results can be paged without re-running the query.
+
+A handle keeps its connection and cursor open between tool calls. Each page is
+read with `fetchmany`, so paging costs O(page) regardless of how far into the
+result set the caller is. Handles idle longer than the TTL are reaped, and the
+number of open handles is capped (oldest-idle first) to bound server memory.
+
+sqlite is the exception. An open statement holds a SHARED lock on the file,
+which in rollback-journal mode blocks every writer until the cursor is
+exhausted or reaped. So unless the database is in WAL mode (where readers
+do not block writers), a read-only query is re-run for each page as
+`SELECT * FROM (query) LIMIT ? OFFSET ?` and its statement is closed
+before the page is returned: nothing is locked between calls, at the cost
+of re-reading the skipped rows (and re-sorting, for an unindexed ORDER BY)
+on every page, and rows written between pages can shift the window.
+Handles that must keep a statement open there (`stream=True`, or a query
+that cannot be wrapped) are reaped after `lock_ttl` instead of `ttl`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import is_read_only
+from .db_executor import interruptible
+from .pool import get_pool_manager
+
+DEFAULT_TTL = 300.0
+DEFAULT_LOCK_TTL = 30.0
+DEFAULT_MAX_HANDLES = 32
+DEFAULT_MAX_PAGE = 10_000
+
+
+class CursorHandle:
+    """An open result set plus the resources needed to close it."""
+
+    def __init__(
+        self, cursor: Any, columns: List[str], closer: Callable[[], None], connection: Any = None
+    ) -> None:
+        self.id = uuid.uuid4().hex
+        self.cursor = cursor
+        self.connection = connection  # interrupted when a page times out
+        self.columns = columns
+        self._closer = closer
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.rows_served = 0
+        self.done = False
+        self.holds_lock = False  # a sqlite statement stays open, blocking rollback-journal writers
+        self.lock = threading.Lock()
+
+    def fetch(self, size: int) -> List[Tuple[Any, ...]]:
+        rows = [tuple(r) for r in self.cursor.fetchmany(size)] if not self.done else []
+        self.rows_served += len(rows)
+        self.last_used = time.monotonic()
+        if len(rows) < size:
+            self.done = True
+        return rows
+
+    def close(self) -> None:
+        try:
+            self._closer()
+        except Exception:
+            pass
+
+
+class CursorStore:
+    """Thread-safe registry of open cursor handles."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_handles: int = DEFAULT_MAX_HANDLES,
+        max_page: int = DEFAULT_MAX_PAGE,
+        lock_ttl: float = DEFAULT_LOCK_TTL,
+    ) -> None:
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.max_handles = max_handles
+        self.max_page = max_page
+        self._handles: Dict[str, CursorHandle] = {}
+        self._lock = threading.Lock()
+        self.reaped = 0
+
+    def configure(
+        self,
+        ttl: Optional[float] = None,
+        max_handles: Optional[int] = None,
+        max_page: Optional[int] = None,
+        lock_ttl: Optional[float] = None,
+    ) -> None:
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if lock_ttl is not None:
+            self.lock_ttl = float(lock_ttl)
+        if max_handles is not None:
+            self.max_handles = max(1, int(max_handles))
+        if max_page is not None:
+            self.max_page = max(1, int(max_page))
+
+    def open(self, conn_str: str, query: str, stream: bool = False) -> CursorHandle:
+        """Execute `query` and keep its cursor open under a new handle.
+
+        `stream=True` keeps a sqlite statement open even outside WAL mode; for
+        callers that page continuously rather than across tool calls.
+        """
+        self.reap()
+        try:
+            handle = _open_sqlalchemy(conn_str, query)
+        except Exception:
+            # mirror run_sql_query: sqlite URLs fall back to the stdlib driver
+            if not conn_str.startswith("sqlite"):
+                raise
+            handle = None
+        if handle is None:
+            if not conn_str.startswith("sqlite"):
+                raise RuntimeError(
+                    "No SQL client available: install sqlalchemy or use a sqlite connection string."
+                )
+            handle = _open_sqlite(conn_str, query, stream)
+        evicted: List[CursorHandle] = []
+        with self._lock:
+            self._handles[handle.id] = handle
+            while len(self._handles) > self.max_handles:
+                oldest = min(self._handles.values(), key=lambda h: h.last_used)
+                evicted.append(self._handles.pop(oldest.id))
+            self.reaped += len(evicted)
+        for h in evicted:
+            h.close()
+        return handle
+
+    def get(self, handle_id: str) -> CursorHandle:
+        self.reap()
+        with self._lock:
+            handle = self._handles.get(handle_id)
+        if handle is None:
+            raise KeyError(f"cursor not found or expired: {handle_id}")
+        return handle
+
+    def page(self, handle: CursorHandle, size: int) -> List[Tuple[Any, ...]]:
+        """Read the next page; exhausted handles are closed immediately."""
+        size = max(1, min(int(size), self.max_page))
+        try:
+            with handle.lock, interruptible(handle.connection):
+                rows = handle.fetch(size)
+        except Exception:
+            # an interrupted or failed cursor cannot be resumed
+            self.close(handle.id)
+            raise
+        if handle.done:
+            self.close(handle.id)
+        return rows
+
+    def close(self, handle_id: str) -> bool:
+        with self._lock:
+            handle = self._handles.pop(handle_id, None)
+        if handle is None:
+            return False
+        handle.close()
+        return True
+
+    def reap(self, now: Optional[float] = None) -> int:
+        """Close handles idle for longer than the TTL."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [
+                h
+                for h in self._handles.values()
+                if now - h.last_used >= (min(self.ttl, self.lock_ttl) if h.holds_lock else self.ttl)
+            ]
+            for h in expired:
+                del self._handles[h.id]
+            self.reaped += len(expired)
+        for h in expired:
+            h.close()
+        return len(expired)
+
+    def close_all(self) -> None:
+        with self._lock:
+            handles, self._handles = list(self._handles.values()), {}
+        for h in handles:
+            h.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open": len(self._handles),
+                "holding_locks": sum(1 for h in self._handles.values() if h.holds_lock),
+                "reaped": self.reaped,
+                "ttl": self.ttl,
+                "lock_ttl": self.lock_ttl,
+            }
+
+
+def _open_sqlalchemy(conn_str: str, query: str) -> Optional[CursorHandle]:
+    try:
+        from sqlalchemy import text  # type: ignore
+
+        engine = get_pool_manager().engine(conn_str)
+    except Exception:
+        return None
+    conn = engine.connect()
+    try:
+        # stream_results asks the driver for a server-side cursor where supported
+        with interruptible(conn):
+            result = conn.execution_options(stream_results=True).execute(text(query))
+    except Exception:
+        conn.close()
+        raise
+    columns = list(result.keys()) if result.returns_rows else []
+
+    def closer() -> None:
+        try:
+            result.close()
+        finally:
+            conn.close()
+
+    return CursorHandle(result, columns, closer, conn)
+
+
+class _PagedCursor:
+    """`fetchmany` over a read-only sqlite query re-run per page; no statement stays open."""
+
+    def __init__(self, conn: Any, query: str) -> None:
+        self.conn = conn
+        self.sql = f"SELECT * FROM ({query.strip().rstrip(';')}) LIMIT ? OFFSET ?"
+        self.offset = 0
+        cur = conn.execute(self.sql, (0, 0))  # validates the query and yields its columns
+        self.description = cur.description
+        cur.close()
+
+    def fetchmany(self, size: int) -> List[Tuple[Any, ...]]:
+        cur = self.conn.execute(self.sql, (size, self.offset))
+        try:
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        self.offset += len(rows)
+        return rows
+
+    def close(self) -> None:
+        pass
+
+
+def _open_sqlite(conn_str: str, query: str, stream: bool = False) -> CursorHandle:
+    pool = get_pool_manager().sqlite(conn_str)
+    conn = pool.acquire()
+    try:
+        wal = conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        paged = not (stream or wal) and is_read_only(query)
+        with interruptible(conn):
+            if paged:
+                cur: Any = _PagedCursor(conn, query)
+            else:
+                cur = conn.cursor()
+                cur.execute(query)
+    except Exception:
+        pool.release(conn)
+        raise
+    columns = [d[0] for d in cur.description] if cur.description else []
+
+    def closer() -> None:
+        try:
+            cur.close()
+        finally:
+            pool.release(conn)
+
+    handle = CursorHandle(cur, columns, closer, conn)
+    handle.holds_lock = not (paged or wal)
+    return handle
+
+
+_STORE = CursorStore()
+
+
+def get_cursor_store() -> CursorStore:
+    return _STORE
+
+
+def close_cursors() -> None:
+    _STORE.close_all()
+
+
+__all__ = ["CursorHandle", "CursorStore", "get_cursor_store", "close_cursors"]
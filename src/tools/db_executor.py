@@ -0,0 +1,283 @@
+"""Run blocking database driver work off the event loop.
+
+`sqlite3` and SQLAlchemy calls block the calling thread for the whole query,
+so running them inside an `async` tool stalls every other in-flight call.
+`DBExecutor` moves that work onto threads:
+
+- reads (and everything that is not sqlite) go to one bounded thread pool,
+  so heavy queries cannot take over the default executor the other tools
+  use for file and subprocess work;
+- writes to a sqlite file go to a dedicated single-thread worker for that
+  file, so they are serialized in submission order instead of contending
+  for the database lock. At most `max_writers` idle workers are kept; a
+  worker with queued or running writes is never retired, so there is only
+  ever one writer thread per file.
+
+Awaiting callers can give up: on a timeout or cancellation a job that has
+not started is dropped, and a running statement is interrupted through the
+connection it registered with `interruptible()` (`sqlite3.Connection.interrupt`,
+or the driver's `cancel()`), which releases the worker and its connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .pool import sqlite_path
+
+DEFAULT_MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+DEFAULT_MAX_WRITERS = 16
+
+
+class QueryTimeout(TimeoutError):
+    """A statement did not finish within its timeout and was interrupted."""
+
+
+class QueryCancelled(RuntimeError):
+    """A statement was interrupted because its caller went away."""
+
+
+def _interrupt(conn: Any) -> None:
+    """Abort whatever `conn` is executing; best effort across drivers."""
+    raw = conn
+    # SQLAlchemy Connection -> pooled DBAPI connection -> driver connection
+    for attr in ("connection", "driver_connection"):
+        if not hasattr(raw, "interrupt") and not hasattr(raw, "cancel"):
+            raw = getattr(raw, attr, raw)
+    stop = getattr(raw, "interrupt", None) or getattr(raw, "cancel", None)
+    if stop is not None:
+        try:
+            stop()
+        except Exception:
+            pass
+
+
+class _Job:
+    """Cancellation state shared by an awaiting caller and its worker thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conns: List[Any] = []
+        self.cancelled = False
+
+    def bind(self, conn: Any) -> None:
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("statement cancelled before it started")
+            self._conns.append(conn)
+
+    def unbind(self, conn: Any) -> None:
+        with self._lock:
+            self._conns.remove(conn)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            # only connections still inside interruptible(): never a connection back in its pool
+            for conn in self._conns:
+                _interrupt(conn)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def interruptible(conn: Any) -> Iterator[Any]:
+    """Let a timeout or cancellation interrupt `conn` while the block runs.
+
+    A no-op outside `DBExecutor` jobs (or for `conn=None`), so driver code
+    can use it unconditionally.
+    """
+    job: Optional[_Job] = getattr(_local, "job", None)
+    if job is None or conn is None:
+        yield conn
+        return
+    job.bind(conn)
+    try:
+        yield conn
+    finally:
+        job.unbind(conn)
+
+
+class DBExecutor:
+    """A bounded pool for reads plus one worker thread per written sqlite file."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_writers: int = DEFAULT_MAX_WRITERS,
+        default_timeout: Optional[float] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_writers = max_writers
+        self.default_timeout = default_timeout
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._writers: "OrderedDict[str, concurrent.futures.ThreadPoolExecutor]" = OrderedDict()
+        self._pending: Dict[str, int] = {}  # writes queued or running per writer path
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.active = 0
+
+    def configure(
+        self,
+        max_workers: Optional[int] = None,
+        max_writers: Optional[int] = None,
+        default_timeout: Optional[float] = None,
+    ) -> None:
+        """Update limits. A new worker count applies once the current pool is replaced."""
+        with self._lock:
+            if max_workers is not None and max(1, int(max_workers)) != self.max_workers:
+                self.max_workers = max(1, int(max_workers))
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                    self._pool = None
+            if max_writers is not None:
+                self.max_writers = max(1, int(max_writers))
+                self._retire_idle()
+        if default_timeout is not None:
+            # 0 disables the default
+            self.default_timeout = float(default_timeout) or None
+
+    def _executor(self, conn_str: str, write: bool) -> Tuple[concurrent.futures.ThreadPoolExecutor, Optional[str]]:
+        """The executor for a job, plus the writer path it reserved (release with `_release`)."""
+        with self._lock:
+            if write and conn_str.startswith("sqlite"):
+                path = sqlite_path(conn_str)
+                writer = self._writers.get(path)
+                if writer is None:
+                    writer = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="sqlite-writer")
+                    self._writers[path] = writer
+                self._writers.move_to_end(path)
+                self._pending[path] = self._pending.get(path, 0) + 1
+                self._retire_idle()
+                return writer, path
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(self.max_workers, thread_name_prefix="db")
+            return self._pool, None
+
+    def _retire_idle(self) -> None:
+        """Shut down least recently used idle writers while over `max_writers` (lock held)."""
+        for path in list(self._writers):
+            if len(self._writers) <= self.max_writers:
+                return
+            if not self._pending.get(path):
+                self._writers.pop(path).shutdown(wait=False)
+
+    def _release(self, path: str) -> None:
+        with self._lock:
+            left = self._pending.get(path, 1) - 1
+            if left > 0:
+                self._pending[path] = left
+            else:
+                self._pending.pop(path, None)
+                self._retire_idle()
+
+    def _call(self, job: _Job, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        if job.cancelled:
+            raise QueryCancelled("statement cancelled before it started")
+        with self._lock:
+            self.active += 1
+        _local.job = job
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.job = None
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    async def run(
+        self,
+        conn_str: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        write: bool = False,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run `fn(*args, **kwargs)` on a database worker and await its result.
+
+        `write=True` routes sqlite work to the file's dedicated writer.
+        `timeout` (seconds; defaults to `default_timeout`) raises `QueryTimeout`
+        after interrupting the statement.
+        """
+        timeout = self.default_timeout if timeout is None else (float(timeout) or None)
+        job = _Job()
+        executor, writer = self._executor(conn_str, write)
+        try:
+            future = executor.submit(self._call, job, fn, args, kwargs)
+        except BaseException:
+            if writer is not None:
+                self._release(writer)
+            raise
+        if writer is not None:
+            # also fires for futures cancelled before they ran
+            future.add_done_callback(lambda _f: self._release(writer))
+        with self._lock:
+            self.submitted += 1
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            job.cancel()
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise QueryTimeout(f"statement did not finish within {timeout}s") from None
+        except asyncio.CancelledError:
+            job.cancel()
+            future.cancel()
+            with self._lock:
+                self.cancelled += 1
+            raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools = list(self._writers.values()) + ([self._pool] if self._pool is not None else [])
+            self._writers.clear()
+            self._pending.clear()
+            self._pool = None
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "writers": len(self._writers),
+                "active": self.active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "default_timeout": self.default_timeout,
+            }
+
+
+_EXECUTOR = DBExecutor()
+
+
+def get_db_executor() -> DBExecutor:
+    return _EXECUTOR
+
+
+def close_db_executor() -> None:
+    _EXECUTOR.shutdown()
+
+
+__all__ = [
+    "DBExecutor",
+    "QueryTimeout",
+    "QueryCancelled",
+    "interruptible",
+    "get_db_executor",
+    "close_db_executor",
+]
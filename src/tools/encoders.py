@@ -0,0 +1,237 @@
+"""Result encodings for SQL tools.
+
+Every encoder works on the column names plus the raw row tuples returned by
+the cursor, so no per-row dict is built unless the legacy `rows` format is
+requested.
+
+Formats:
+
+- `rows`: the original list of `{column: value}` objects.
+- `columns`: `{"columns": [...], "data": [[...], ...]}` with one array per column.
+- `csv`: a header line followed by one line per row.
+- `binary`: a compact columnar file (see `write_columnar`) kept in the
+  result store, so it ages out under the same `results.max_age` /
+  `results.max_bytes` limits as spilled outputs; the payload is a reference
+  to it (path plus result handle).
+"""
+
+from __future__ import annotations
+
+import array
+import csv
+import io
+import json
+import os
+import struct
+import sys
+import uuid
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .results import get_result_store
+
+FORMATS = ("rows", "columns", "csv", "binary")
+
+MAGIC = b"ETLCOL1\n"
+CONTENT_TYPE = "application/x-etl-columnar"
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown result format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def to_rows(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    return [dict(zip(columns, r)) for r in rows]
+
+
+def to_columns(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    data = [list(c) for c in zip(*rows)] if rows else [[] for _ in columns]
+    return {"columns": list(columns), "data": data}
+
+
+def to_csv(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def encode_result(columns: Sequence[str], rows: Sequence[Sequence[Any]], fmt: str = "rows") -> str:
+    """Encode a fetched result as the string payload returned by the SQL tools."""
+    check_format(fmt)
+    if fmt == "rows":
+        return json.dumps(to_rows(columns, rows), default=str)
+    if fmt == "columns":
+        return json.dumps(to_columns(columns, rows), default=str)
+    if fmt == "csv":
+        return to_csv(columns, rows)
+    ref = get_result_store().store_chunks(iter_columnar(columns, rows), "sql", CONTENT_TYPE)
+    return json.dumps(
+        {
+            "format": "binary",
+            "path": get_result_store().path(ref["result_handle"]),
+            "result_handle": ref["result_handle"],
+            "columns": list(columns),
+            "row_count": len(rows),
+            "bytes": ref["bytes"],
+            "expires_at": ref["expires_at"],
+        }
+    )
+
+
+# ---------- binary columnar format ----------
+#
+# MAGIC, then a little-endian u32 header length and a JSON header
+# {"columns": [{"name", "type"}], "rows": n}. Each column follows as a null
+# bitmap (ceil(n / 8) bytes, bit set = NULL) and a value block:
+#
+# - int64 / float64: n packed 8-byte values (NULL slots are zero)
+# - text / bytes: n int64 byte lengths followed by the concatenated payload
+
+
+def _column_type(values: Sequence[Any]) -> str:
+    kind = None
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool) or isinstance(v, int):
+            t = "int64" if _INT64_MIN <= v <= _INT64_MAX else "text"
+        elif isinstance(v, float):
+            t = "float64"
+        elif isinstance(v, (bytes, bytearray, memoryview)):
+            t = "bytes"
+        else:
+            t = "text"
+        if kind is None or kind == t:
+            kind = t
+        elif {kind, t} == {"int64", "float64"}:
+            kind = "float64"
+        else:
+            return "text"
+    return kind or "text"
+
+
+def _null_bitmap(values: Sequence[Any]) -> bytes:
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, v in enumerate(values):
+        if v is None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    return bytes(bitmap)
+
+
+def _packed(typecode: str, values: Sequence[Any]) -> bytes:
+    arr = array.array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _encode_column(kind: str, values: Sequence[Any]) -> bytes:
+    if kind == "int64":
+        return _packed("q", [0 if v is None else int(v) for v in values])
+    if kind == "float64":
+        return _packed("d", [0.0 if v is None else float(v) for v in values])
+    if kind == "bytes":
+        blobs = [b"" if v is None else bytes(v) for v in values]
+    else:
+        blobs = [b"" if v is None else str(v).encode("utf-8") for v in values]
+    return _packed("q", [len(b) for b in blobs]) + b"".join(blobs)
+
+
+def iter_columnar(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> Iterator[bytes]:
+    """Encode rows in the binary columnar format, one block per column."""
+    data = list(zip(*rows)) if rows else [() for _ in columns]
+    kinds = [_column_type(col) for col in data]
+    header = json.dumps(
+        {"columns": [{"name": n, "type": k} for n, k in zip(columns, kinds)], "rows": len(rows)}
+    ).encode("utf-8")
+    yield MAGIC + struct.pack("<I", len(header)) + header
+    for kind, col in zip(kinds, data):
+        yield _null_bitmap(col) + _encode_column(kind, col)
+
+
+def write_columnar(columns: Sequence[str], rows: Sequence[Sequence[Any]], directory: Optional[str] = None) -> str:
+    """Write rows to a binary columnar file and return its path.
+
+    Without `directory` the file is kept in the result store and expires with
+    it; a file written to an explicit `directory` is the caller's to delete.
+    """
+    if directory is None:
+        store = get_result_store()
+        return store.path(store.store_chunks(iter_columnar(columns, rows), "sql", CONTENT_TYPE)["result_handle"])
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}.etlcol")
+    with open(path, "wb") as fh:
+        for block in iter_columnar(columns, rows):
+            fh.write(block)
+    return path
+
+
+def _unpacked(typecode: str, raw: bytes) -> List[Any]:
+    arr = array.array(typecode)
+    arr.frombytes(raw)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tolist()
+
+
+def _read_exact(fh: BinaryIO, n: int) -> bytes:
+    data = fh.read(n)
+    if len(data) != n:
+        raise ValueError("truncated columnar result file")
+    return data
+
+
+def iter_columns(path: str) -> Iterator[Tuple[str, List[Any]]]:
+    """Yield `(name, values)` for each column of a `write_columnar` file, reading one column at a time."""
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a columnar result file: {path}")
+        (hlen,) = struct.unpack("<I", _read_exact(fh, 4))
+        header = json.loads(_read_exact(fh, hlen))
+        n = header["rows"]
+        for col in header["columns"]:
+            bitmap = _read_exact(fh, (n + 7) // 8)
+            if col["type"] in ("int64", "float64"):
+                values = _unpacked("q" if col["type"] == "int64" else "d", _read_exact(fh, 8 * n))
+            else:
+                lengths = _unpacked("q", _read_exact(fh, 8 * n))
+                blob = _read_exact(fh, sum(lengths))
+                values, pos = [], 0
+                for ln in lengths:
+                    chunk = blob[pos:pos + ln]
+                    pos += ln
+                    values.append(chunk if col["type"] == "bytes" else chunk.decode("utf-8"))
+            for i in range(n):
+                if bitmap[i >> 3] & (1 << (i & 7)):
+                    values[i] = None
+            yield col["name"], values
+
+
+def read_columnar(path: str) -> Tuple[List[str], List[List[Any]]]:
+    """Read a file written by `write_columnar` into column names and column arrays."""
+    names: List[str] = []
+    data: List[List[Any]] = []
+    for name, values in iter_columns(path):
+        names.append(name)
+        data.append(values)
+    return names, data
+
+
+__all__ = [
+    "FORMATS",
+    "check_format",
+    "encode_result",
+    "to_rows",
+    "to_columns",
+    "to_csv",
+    "iter_columnar",
+    "write_columnar",
+    "iter_columns",
+    "read_columnar",
+]
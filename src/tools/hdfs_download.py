@@ -0,0 +1,207 @@
+"""Streaming HDFS reads: byte ranges, line previews and chunked downloads.
+
+Nothing here holds a whole file in memory. Previews stop the transfer as
+soon as enough bytes or lines have arrived; downloads are written chunk by
+chunk to a `.part` file that is renamed into place when complete, with up to
+`parallelism` files in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import posixpath
+import time
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional, Tuple
+
+from .hdfs_listing import walk_webhdfs
+from .webhdfs import WebHDFSClient
+
+DEFAULT_PARALLELISM = 8
+DEFAULT_HEAD_BYTES = 1024 * 1024
+
+
+# ---------- previews ----------
+
+
+async def read_range(client: WebHDFSClient, path: str, offset: int = 0, length: int = 65536) -> bytes:
+    """Return `length` bytes of `path` starting at `offset`."""
+    buf = bytearray()
+    async with aclosing(client.read(path, offset=offset, length=length)) as chunks:
+        async for chunk in chunks:
+            buf += chunk
+            if len(buf) >= length:
+                break
+    return bytes(buf[:length])
+
+
+def _take_lines(buf: bytes, lines: int) -> Tuple[bytes, bool]:
+    """Return the first `lines` lines of `buf` and whether that many were found."""
+    pos = 0
+    for _ in range(lines):
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            return buf, False
+        pos = nl + 1
+    return buf[:pos], True
+
+
+async def head_lines(
+    client: WebHDFSClient,
+    path: str,
+    lines: int = 10,
+    offset: int = 0,
+    max_bytes: int = DEFAULT_HEAD_BYTES,
+) -> bytes:
+    """Return the first `lines` lines from `offset`, reading at most `max_bytes`."""
+    buf = bytearray()
+    async with aclosing(client.read(path, offset=offset, length=max_bytes, chunk_size=64 * 1024)) as chunks:
+        async for chunk in chunks:
+            buf += chunk
+            head, complete = _take_lines(bytes(buf), lines)
+            if complete:
+                return head
+            if len(buf) >= max_bytes:
+                break
+    return _take_lines(bytes(buf[:max_bytes]), lines)[0]
+
+
+async def _cli_stream(path: str, limit_bytes: int, offset: int = 0, lines: Optional[int] = None) -> bytes:
+    """`hdfs dfs -cat` with early termination once enough data has been read."""
+    proc = await asyncio.create_subprocess_exec(
+        "hdfs", "dfs", "-cat", path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    assert proc.stdout is not None
+    buf = bytearray()
+    skipped = 0
+    try:
+        while len(buf) < limit_bytes:
+            chunk = await proc.stdout.read(64 * 1024)
+            if not chunk:
+                break
+            if skipped < offset:
+                drop = min(len(chunk), offset - skipped)
+                skipped += drop
+                chunk = chunk[drop:]
+            buf += chunk
+            if lines is not None and _take_lines(bytes(buf), lines)[1]:
+                break
+    finally:
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        _, err = await proc.communicate()
+    if proc.returncode not in (0, -9) and not buf:
+        raise RuntimeError("hdfs dfs -cat failed: " + err.decode(errors="ignore"))
+    data = bytes(buf[:limit_bytes])
+    return _take_lines(data, lines)[0] if lines is not None else data
+
+
+async def cli_read_range(path: str, offset: int, length: int) -> bytes:
+    return await _cli_stream(path, length, offset=offset)
+
+
+async def cli_head_lines(path: str, lines: int, offset: int = 0, max_bytes: int = DEFAULT_HEAD_BYTES) -> bytes:
+    return await _cli_stream(path, max_bytes, offset=offset, lines=lines)
+
+
+# ---------- downloads ----------
+
+
+async def download_file(client: WebHDFSClient, hdfs_path: str, local_path: str, overwrite: bool = False) -> Dict[str, Any]:
+    """Stream one file to disk and return its transfer stats."""
+    result: Dict[str, Any] = {"hdfs": hdfs_path, "local": local_path}
+    start = time.perf_counter()
+    if os.path.exists(local_path) and not overwrite:
+        raise FileExistsError(f"{local_path} already exists (pass overwrite=True)")
+    os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+    tmp = local_path + ".part"
+    size = 0
+    try:
+        with open(tmp, "wb") as fh:
+            async with aclosing(client.read(hdfs_path)) as chunks:
+                async for chunk in chunks:
+                    await asyncio.to_thread(fh.write, chunk)
+                    size += len(chunk)
+        os.replace(tmp, local_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    elapsed = time.perf_counter() - start
+    result.update(
+        status="downloaded",
+        bytes=size,
+        seconds=round(elapsed, 3),
+        mb_per_s=round(size / 1e6 / elapsed, 2) if elapsed > 0 else None,
+    )
+    return result
+
+
+async def plan_downloads(client: WebHDFSClient, hdfs_path: str, local_path: str) -> Tuple[List[Tuple[str, str]], bool]:
+    """Map an HDFS file or directory to `(hdfs, local)` pairs; `single` for a file."""
+    status = await client.status(hdfs_path)
+    if status.get("type") != "DIRECTORY":
+        target = local_path
+        if os.path.isdir(local_path):
+            target = os.path.join(local_path, posixpath.basename(hdfs_path.rstrip("/")))
+        return [(hdfs_path, target)], True
+    entries, _ = await walk_webhdfs(client, hdfs_path, recursive=True, limit=10**9)
+    pairs = []
+    for e in entries:
+        if e["type"] != "file":
+            continue
+        rel = posixpath.relpath(e["path"], hdfs_path)
+        pairs.append((e["path"], os.path.join(local_path, *rel.split("/"))))
+    return pairs, False
+
+
+async def download_many(
+    client: WebHDFSClient,
+    hdfs_path: str,
+    local_path: str,
+    parallelism: int = DEFAULT_PARALLELISM,
+    overwrite: bool = False,
+    fail_fast: bool = False,
+) -> Dict[str, Any]:
+    """Download a file or a whole directory tree; returns a summary."""
+    pairs, single = await plan_downloads(client, hdfs_path, local_path)
+    sem = asyncio.Semaphore(max(1, parallelism))
+
+    async def run(src: str, dst: str) -> Dict[str, Any]:
+        async with sem:
+            try:
+                return await download_file(client, src, dst, overwrite=overwrite)
+            except Exception as exc:
+                if fail_fast or single:
+                    raise
+                return {"hdfs": src, "local": dst, "status": "failed", "error": str(exc), "bytes": 0}
+
+    start = time.perf_counter()
+    files = await asyncio.gather(*(run(src, dst) for src, dst in pairs))
+    elapsed = time.perf_counter() - start
+    received = sum(f["bytes"] for f in files)
+    return {
+        "files": files,
+        "single": single,
+        "downloaded": sum(1 for f in files if f["status"] == "downloaded"),
+        "failed": sum(1 for f in files if f["status"] == "failed"),
+        "bytes": received,
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(received / 1e6 / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+__all__ = [
+    "read_range",
+    "head_lines",
+    "cli_read_range",
+    "cli_head_lines",
+    "download_file",
+    "download_many",
+]
@@ -0,0 +1,259 @@
+"""Recursive HDFS listings with file metadata and a short-TTL directory cache.
+
+WebHDFS walks fan out across subdirectories with bounded concurrency; the CLI
+backend uses a single `hdfs dfs -ls -R`. Both produce the same entry shape:
+`{"path", "type", "size", "mtime", "replication"}` with `mtime` in epoch
+milliseconds and `type` either "file" or "directory".
+
+Glob `pattern`s are matched against the path relative to the listing root.
+`partitions` (e.g. `{"dt": "2024-01-*"}`) prune `key=value` directories
+whose value does not match, so excluded partitions are never listed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_TTL = 5.0
+DEFAULT_CACHE_ENTRIES = 4096
+DEFAULT_CONCURRENCY = 16
+DEFAULT_LIMIT = 100_000
+
+
+class DirectoryCache:
+    """LRU of directory listings, each valid for `ttl` seconds."""
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_CACHE_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: Tuple[str, str], value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: str) -> None:
+        """Drop cached listings of `path` and every ancestor directory."""
+        path = posixpath.normpath(path)
+        affected = {path}
+        while path not in ("/", "", "."):
+            path = posixpath.dirname(path)
+            affected.add(path or "/")
+        with self._lock:
+            for key in [k for k in self._entries if posixpath.normpath(k[1]) in affected]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def configure(self, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if max_entries is not None:
+            self.max_entries = max(1, int(max_entries))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+_CACHE = DirectoryCache()
+
+
+def get_directory_cache() -> DirectoryCache:
+    return _CACHE
+
+
+# ---------- filters ----------
+
+
+def partition_ok(rel_path: str, partitions: Optional[Dict[str, str]]) -> bool:
+    """False if any `key=value` component of `rel_path` fails its partition glob."""
+    if not partitions:
+        return True
+    for part in rel_path.split("/"):
+        key, sep, value = part.partition("=")
+        if sep and key in partitions and not fnmatch.fnmatchcase(value, str(partitions[key])):
+            return False
+    return True
+
+
+def _relative(root: str, path: str) -> str:
+    rel = posixpath.relpath(path, root) if path != root else ""
+    return "" if rel == "." else rel
+
+
+def _matches(root: str, entry: Dict[str, Any], pattern: Optional[str], partitions: Optional[Dict[str, str]]) -> bool:
+    rel = _relative(root, entry["path"])
+    if not partition_ok(rel, partitions):
+        return False
+    return pattern is None or fnmatch.fnmatchcase(rel, pattern)
+
+
+# ---------- WebHDFS ----------
+
+
+def _entry(parent: str, status: Dict[str, Any]) -> Dict[str, Any]:
+    suffix = status.get("pathSuffix") or ""
+    return {
+        "path": posixpath.join(parent, suffix) if suffix else parent,
+        "type": "directory" if status.get("type") == "DIRECTORY" else "file",
+        "size": int(status.get("length", 0)),
+        "mtime": int(status.get("modificationTime", 0)),
+        "replication": int(status.get("replication", 0)),
+    }
+
+
+async def list_dir(client: Any, path: str, cache: Optional[DirectoryCache] = None) -> List[Dict[str, Any]]:
+    """One directory level as entries, served from `cache` when fresh."""
+    cache = _CACHE if cache is None else cache
+    key = (client.base_url, posixpath.normpath(path))
+    entries = cache.get(key)
+    if entries is None:
+        entries = [_entry(path, s) for s in await client.list_status(path)]
+        cache.put(key, entries)
+    return entries
+
+
+async def walk_webhdfs(
+    client: Any,
+    root: str,
+    recursive: bool = True,
+    max_depth: Optional[int] = None,
+    pattern: Optional[str] = None,
+    partitions: Optional[Dict[str, str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    limit: int = DEFAULT_LIMIT,
+    cache: Optional[DirectoryCache] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """List `root` (recursively) and return `(entries, truncated)`."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    results: List[Dict[str, Any]] = []
+    truncated = False
+
+    async def visit(path: str, depth: int) -> None:
+        nonlocal truncated
+        if truncated:
+            return
+        async with sem:
+            entries = await list_dir(client, path, cache)
+        subdirs = []
+        for e in entries:
+            rel = _relative(root, e["path"])
+            if not partition_ok(rel, partitions):
+                continue
+            if pattern is None or fnmatch.fnmatchcase(rel, pattern):
+                if len(results) >= limit:
+                    truncated = True
+                    return
+                results.append(e)
+            if e["type"] == "directory" and recursive and (max_depth is None or depth < max_depth):
+                subdirs.append(e["path"])
+        if subdirs:
+            await asyncio.gather(*(visit(d, depth + 1) for d in subdirs))
+
+    await visit(root, 1)
+    results.sort(key=lambda e: e["path"])
+    return results, truncated
+
+
+# ---------- CLI ----------
+
+
+def parse_ls_line(line: str) -> Optional[Dict[str, Any]]:
+    """Parse one `hdfs dfs -ls` line:
+
+    `drwxr-xr-x   - user group          0 2024-01-01 12:00 /path`
+    """
+    parts = line.split(None, 7)
+    if len(parts) < 8 or parts[0][:1] not in ("d", "-"):
+        return None
+    perms, repl, _owner, _group, size, day, hm, path = parts
+    try:
+        mtime = int(datetime.strptime(f"{day} {hm}", "%Y-%m-%d %H:%M").timestamp() * 1000)
+    except ValueError:
+        mtime = 0
+    return {
+        "path": path,
+        "type": "directory" if perms.startswith("d") else "file",
+        "size": int(size) if size.isdigit() else 0,
+        "mtime": mtime,
+        "replication": int(repl) if repl.isdigit() else 0,
+    }
+
+
+async def walk_cli(
+    root: str,
+    recursive: bool = True,
+    max_depth: Optional[int] = None,
+    pattern: Optional[str] = None,
+    partitions: Optional[Dict[str, str]] = None,
+    limit: int = DEFAULT_LIMIT,
+    cache: Optional[DirectoryCache] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """List `root` with a single `hdfs dfs -ls [-R]` call."""
+    cache = _CACHE if cache is None else cache
+    key = ("cli" + (":R" if recursive else ""), posixpath.normpath(root))
+    entries = cache.get(key)
+    if entries is None:
+        cmd = ["hdfs", "dfs", "-ls"] + (["-R"] if recursive else []) + [root]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        out, err = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError("hdfs dfs command failed: " + err.decode(errors="ignore"))
+        entries = [e for e in (parse_ls_line(ln) for ln in out.decode(errors="ignore").splitlines()) if e]
+        cache.put(key, entries)
+
+    results: List[Dict[str, Any]] = []
+    for e in entries:
+        rel = _relative(root, e["path"])
+        if max_depth is not None and rel and rel.count("/") + 1 > max_depth:
+            continue
+        if not _matches(root, e, pattern, partitions):
+            continue
+        if len(results) >= limit:
+            return results, True
+        results.append(e)
+    return results, False
+
+
+__all__ = [
+    "DirectoryCache",
+    "get_directory_cache",
+    "list_dir",
+    "walk_webhdfs",
+    "walk_cli",
+    "parse_ls_line",
+    "partition_ok",
+]
@@ -0,0 +1,500 @@
+"""Watermark-based incremental extraction.
+
+Instead of re-reading a whole table every cycle, `extract` reads only the
+rows whose watermark column (an auto-increment id, an `updated_at`
+timestamp, ...) is greater than the value recorded after the previous run.
+Batches are fetched with keyset pagination:
+
+    SELECT ... FROM t WHERE col > :watermark ORDER BY col LIMIT :batch_size
+
+so with an index on the column the cost is proportional to the number of
+new rows, not the table size. Watermark columns need not be unique: when a
+batch ends inside a run of equal values, the rest of that run is pulled
+into the same batch so no row is skipped at the boundary. That read is
+bounded by `max_ties` (default `MAX_TIE_ROWS`): a longer run of one value
+(a date or batch-id column) fails loudly instead of being loaded whole,
+since the checkpoint is a single watermark and cannot resume inside a run.
+
+The last watermark per source lives in a small local sqlite state store,
+by default `$XDG_STATE_HOME/etl-mcp-serv/watermarks.sqlite` in a directory
+only the current user may write (see `paths.py`): anyone who could edit it
+could make later extracts skip rows.
+Exports are appended to a CSV/JSONL file and checkpointed after every batch
+together with the file's committed length, so an interrupted run truncates
+any partially written batch and resumes exactly where it stopped.
+
+Rows returned inline cannot be checkpointed that way: the caller may never
+receive them (a lost response, an expired spilled result). An inline run
+therefore leaves the watermark alone and returns a `commit_token`; passing
+it back as `ack` (on the next run, or with `max_batches=0`) advances the
+watermark. Until then a re-run returns the same rows again (at-least-once).
+`commit=True` checkpoints inline rows immediately instead, which is
+at-most-once: rows lost in transit are skipped for good.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import decimal
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .loader import quote_ident
+from .paths import ensure_private_dir, state_dir
+from .pool import get_pool_manager
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_TIE_ROWS = 100_000
+EXPORT_FORMATS = ("jsonl", "csv")
+
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    """JSON form of a watermark, keeping enough type information to bind it again."""
+    if isinstance(value, datetime.datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"type": "decimal", "value": str(value)}
+    if isinstance(value, bytes):
+        return {"type": "bytes", "value": value.hex()}
+    return {"type": "json", "value": value}
+
+
+def _decode_value(data: Optional[Dict[str, Any]]) -> Any:
+    if not data:
+        return None
+    kind, value = data.get("type"), data.get("value")
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    if kind == "date":
+        return datetime.date.fromisoformat(value)
+    if kind == "decimal":
+        return decimal.Decimal(value)
+    if kind == "bytes":
+        return bytes.fromhex(value)
+    return value
+
+
+def default_source(conn_str: str, table: str, column: str) -> str:
+    """State key for a table/column; the connection string is hashed so credentials are not stored."""
+    return f"{table}.{column}@{hashlib.sha1(conn_str.encode()).hexdigest()[:12]}"
+
+
+class WatermarkStore:
+    """Last extracted watermark per source, persisted in a local sqlite file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or state_dir("watermarks.sqlite")
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def configure(self, path: Optional[str] = None) -> None:
+        if path and path != self.path:
+            with self._lock:
+                self.path = path
+                self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            ensure_private_dir(directory, "watermark store directory (sql.watermark_store)")
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " source TEXT PRIMARY KEY, table_name TEXT, column_name TEXT, watermark TEXT,"
+                " rows_total INTEGER NOT NULL DEFAULT 0, batches INTEGER NOT NULL DEFAULT 0,"
+                " export_path TEXT, export_offset INTEGER, updated_at REAL)"
+            )
+            # inline runs awaiting acknowledgement; `base` is the watermark they started from
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " token TEXT PRIMARY KEY, source TEXT NOT NULL, table_name TEXT, column_name TEXT,"
+                " base TEXT, watermark TEXT, rows INTEGER, batches INTEGER, created_at REAL)"
+            )
+            self._ready = True
+        return conn
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT source, table_name, column_name, watermark, rows_total, batches,"
+                    " export_path, export_offset, updated_at FROM watermarks WHERE source = ?",
+                    (source,),
+                ).fetchone()
+            finally:
+                conn.close()
+        if row is None:
+            return None
+        keys = ("source", "table", "column", "watermark", "rows_total", "batches", "export_path", "export_offset", "updated_at")
+        state = dict(zip(keys, row))
+        state["watermark"] = json.loads(state["watermark"]) if state["watermark"] else None
+        return state
+
+    def checkpoint(
+        self,
+        source: str,
+        table: str,
+        column: str,
+        watermark: Any,
+        rows: int,
+        export_path: Optional[str] = None,
+        export_offset: Optional[int] = None,
+        batches: int = 1,
+    ) -> None:
+        """Atomically advance a source's watermark after `batches` batches of `rows` rows in total."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    encoded = json.dumps(_encode_value(watermark))
+                    self._advance(conn, source, table, column, encoded, rows, batches, export_path, export_offset)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _advance(
+        conn: sqlite3.Connection,
+        source: str,
+        table: str,
+        column: str,
+        encoded: str,
+        rows: int,
+        batches: int,
+        export_path: Optional[str],
+        export_offset: Optional[int],
+    ) -> None:
+        conn.execute(
+            "INSERT INTO watermarks (source, table_name, column_name, watermark, rows_total, batches,"
+            " export_path, export_offset, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(source) DO UPDATE SET watermark = excluded.watermark,"
+            " rows_total = rows_total + excluded.rows_total, batches = batches + excluded.batches,"
+            " export_path = excluded.export_path, export_offset = excluded.export_offset,"
+            " updated_at = excluded.updated_at",
+            (source, table, column, encoded, rows, batches, export_path, export_offset, time.time()),
+        )
+
+    def stage(self, source: str, table: str, column: str, base: Any, watermark: Any, rows: int, batches: int) -> str:
+        """Record an inline run's end watermark until it is acknowledged; returns its commit token."""
+        token = uuid.uuid4().hex
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    # tokens are only useful for the latest few runs; drop ones older than a day
+                    conn.execute("DELETE FROM pending WHERE created_at < ?", (time.time() - 86400,))
+                    conn.execute(
+                        "INSERT INTO pending VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            token,
+                            source,
+                            table,
+                            column,
+                            json.dumps(_encode_value(base)),
+                            json.dumps(_encode_value(watermark)),
+                            rows,
+                            batches,
+                            time.time(),
+                        ),
+                    )
+            finally:
+                conn.close()
+        return token
+
+    def commit(self, source: str, token: str) -> Any:
+        """Advance `source` to the watermark staged under `token`; returns the new watermark.
+
+        Raises KeyError for an unknown token and RuntimeError when the watermark
+        has moved since the token's run started (another run was acknowledged).
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT table_name, column_name, base, watermark, rows, batches FROM pending"
+                        " WHERE token = ? AND source = ?",
+                        (token, source),
+                    ).fetchone()
+                    if row is None:
+                        raise KeyError(token)
+                    table, column, base, watermark, rows, batches = row
+                    current = conn.execute("SELECT watermark FROM watermarks WHERE source = ?", (source,)).fetchone()
+                    current_value = _decode_value(json.loads(current[0])) if current and current[0] else None
+                    if current_value != _decode_value(json.loads(base)):
+                        raise RuntimeError(f"commit token {token} is stale: the watermark of {source!r} has moved")
+                    self._advance(conn, source, table, column, watermark, rows, batches, None, None)
+                    conn.execute("DELETE FROM pending WHERE source = ?", (source,))
+            finally:
+                conn.close()
+        return _decode_value(json.loads(watermark))
+
+    def delete(self, source: str) -> bool:
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM pending WHERE source = ?", (source,))
+                    return conn.execute("DELETE FROM watermarks WHERE source = ?", (source,)).rowcount > 0
+            finally:
+                conn.close()
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                sources = [r[0] for r in conn.execute("SELECT source FROM watermarks ORDER BY source")]
+            finally:
+                conn.close()
+        return [s for s in (self.get(name) for name in sources) if s is not None]
+
+
+# ---------- querying ----------
+
+
+def _run(conn_str: str, sql: str, params: Sequence[Any]) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """Execute a query with positional `?` parameters and return columns and all rows."""
+    try:
+        from sqlalchemy import text  # type: ignore
+    except Exception:
+        text = None  # type: ignore
+    if text is not None and not conn_str.startswith("sqlite"):
+        named = sql
+        binds: Dict[str, Any] = {}
+        for i, value in enumerate(params):
+            named = named.replace("?", f":p{i}", 1)
+            binds[f"p{i}"] = value
+        engine = get_pool_manager().engine(conn_str)
+        with engine.connect() as conn:
+            result = conn.execute(text(named), binds)
+            return list(result.keys()), [tuple(r) for r in result.fetchall()]
+    if conn_str.startswith("sqlite"):
+        with get_pool_manager().connection(conn_str) as conn:
+            cur = conn.execute(sql, tuple(params))
+            try:
+                return [d[0] for d in cur.description], cur.fetchall()
+            finally:
+                cur.close()
+    raise RuntimeError("No SQL client available: install sqlalchemy or use a sqlite connection string.")
+
+
+def _select(table: str, column: str, columns: Optional[Sequence[str]]) -> str:
+    cols = ", ".join(quote_ident(c) for c in columns) if columns else "*"
+    return f"SELECT {cols} FROM {quote_ident(table)}"
+
+
+def iter_batches(
+    conn_str: str,
+    table: str,
+    column: str,
+    after: Any = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    columns: Optional[Sequence[str]] = None,
+    max_ties: int = MAX_TIE_ROWS,
+) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]], Any]]:
+    """Yield (columns, rows, last watermark) for rows with `column > after`, in watermark order.
+
+    Raises RuntimeError when more than `max_ties` rows share the watermark a batch ends on.
+    """
+    if columns and column not in columns:
+        columns = list(columns) + [column]
+    base = _select(table, column, columns)
+    col = quote_ident(column)
+    batch_size = max(1, int(batch_size))
+    while True:
+        if after is None:
+            sql, params = f"{base} WHERE {col} IS NOT NULL ORDER BY {col} LIMIT ?", [batch_size]
+        else:
+            sql, params = f"{base} WHERE {col} > ? ORDER BY {col} LIMIT ?", [after, batch_size]
+        names, rows = _run(conn_str, sql, params)
+        if not rows:
+            return
+        index = _column_index(names, column)
+        last = rows[-1][index]
+        full = len(rows) == batch_size
+        if full:
+            # the batch may have cut a run of equal watermarks: take the whole run
+            rows = [r for r in rows if r[index] != last]
+            _, ties = _run(conn_str, f"{base} WHERE {col} = ? LIMIT ?", [last, max_ties + 1])
+            if len(ties) > max_ties:
+                raise RuntimeError(
+                    f"more than {max_ties} rows have {column} = {last!r}; a batch cannot end inside "
+                    "that run. Use a more selective watermark column (e.g. an id or timestamp)."
+                )
+            rows.extend(ties)
+        yield names, rows, last
+        if not full:
+            return
+        after = last
+
+
+def _column_index(names: List[str], column: str) -> int:
+    lowered = [n.lower() for n in names]
+    try:
+        return lowered.index(column.lower())
+    except ValueError:
+        raise ValueError(f"watermark column {column!r} not in result columns {names}") from None
+
+
+# ---------- export ----------
+
+
+def _encode_rows(names: List[str], rows: List[Tuple[Any, ...]], fmt: str, header: bool) -> bytes:
+    if fmt == "jsonl":
+        return "".join(json.dumps(dict(zip(names, r)), default=str) + "\n" for r in rows).encode("utf-8")
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(names)
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _prepare_export(path: str, state: Optional[Dict[str, Any]]) -> int:
+    """Cut off anything written after the last checkpoint; returns the committed length.
+
+    The directory must be private: whoever can replace the file could splice rows into it.
+    """
+    ensure_private_dir(os.path.dirname(os.path.abspath(path)), "export directory")
+    committed = None
+    if state and state.get("export_path") == os.path.abspath(path):
+        committed = state.get("export_offset")
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+    if committed is not None and size > committed:
+        with open(path, "r+b") as fh:
+            fh.truncate(committed)
+        return committed
+    return size
+
+
+def extract(
+    conn_str: str,
+    table: str,
+    column: str,
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    export_path: Optional[str] = None,
+    format: str = "jsonl",
+    source: Optional[str] = None,
+    store: Optional[WatermarkStore] = None,
+    ack: Optional[str] = None,
+    commit: bool = False,
+) -> Dict[str, Any]:
+    """Extract rows added since the last checkpoint of `source`.
+
+    Without `export_path` the rows are returned under `"data"` (with column
+    names under `"columns"`) and at most `max_batches` (default 1) batches
+    are read. The watermark only advances when the returned `commit_token` is
+    passed back as `ack`, which is applied before reading; `commit=True`
+    checkpoints at once instead (at-most-once). With `export_path` batches
+    are appended to the file and every batch is checkpointed once it is
+    flushed to disk; `max_batches` defaults to unlimited.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    store = store or get_watermark_store()
+    source = source or default_source(conn_str, table, column)
+    lock = _source_lock(source)
+    if not lock.acquire(blocking=False):
+        raise RuntimeError(f"incremental extract for {source!r} is already running")
+    try:
+        acked = None
+        if ack:
+            try:
+                store.commit(source, ack)
+            except KeyError:
+                raise RuntimeError(f"unknown commit token {ack!r} for {source!r}") from None
+            acked = ack
+        state = store.get(source)
+        previous = _decode_value(state["watermark"]) if state else None
+        limit = max_batches if max_batches is not None else (None if export_path else 1)
+        report: Dict[str, Any] = {"source": source, "previous_watermark": _encode_value(previous)["value"], "rows": 0, "batches": 0}
+        if acked:
+            report["acked"] = acked
+        # inline rows are checkpointed per batch only with commit=True; otherwise staged below
+        checkpoint = export_path is not None or commit
+        names: List[str] = []
+        collected: List[Tuple[Any, ...]] = []
+        watermark = previous
+        exhausted = True
+        fh = None
+        offset = 0
+        if export_path:
+            export_path = os.path.abspath(export_path)
+            offset = _prepare_export(export_path, state)
+            fh = open(export_path, "ab")
+        try:
+            started = time.perf_counter()
+            batches = iter_batches(conn_str, table, column, previous, batch_size, columns) if limit != 0 else iter(())
+            for names, rows, last in batches:
+                if fh is not None:
+                    fh.write(_encode_rows(names, rows, format, header=format == "csv" and offset == 0))
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                    offset = fh.tell()
+                else:
+                    collected.extend(rows)
+                if checkpoint:
+                    store.checkpoint(source, table, column, last, len(rows), export_path, offset if fh else None)
+                watermark = last
+                report["rows"] += len(rows)
+                report["batches"] += 1
+                if limit is not None and report["batches"] >= limit:
+                    exhausted = False
+                    break
+            report["seconds"] = round(time.perf_counter() - started, 6)
+        finally:
+            if fh is not None:
+                fh.close()
+        report["watermark"] = _encode_value(watermark)["value"]
+        # a stop at max_batches may coincide with the end; the next run then returns 0 rows
+        report["done"] = exhausted and limit != 0
+        if export_path:
+            report["export_path"] = export_path
+            report["bytes"] = offset
+        else:
+            report["columns"] = names
+            report["data"] = collected
+            report["committed"] = commit or not report["batches"]
+            if not report["committed"]:
+                report["commit_token"] = store.stage(
+                    source, table, column, previous, watermark, report["rows"], report["batches"]
+                )
+        return report
+    finally:
+        lock.release()
+
+
+_LOCKS: Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _source_lock(source: str) -> threading.Lock:
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(source, threading.Lock())
+
+
+_STORE = WatermarkStore()
+
+
+def get_watermark_store() -> WatermarkStore:
+    return _STORE
+
+
+__all__ = ["WatermarkStore", "default_source", "extract", "iter_batches", "get_watermark_store"]
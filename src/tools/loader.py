@@ -0,0 +1,343 @@
+"""Stream CSV / JSONL files into SQL tables in batched transactions.
+
+Rows are read lazily and inserted with `executemany` one batch at a time, so
+memory use depends on the batch size rather than the file size. sqlite
+targets are loaded over a dedicated stdlib `sqlite3` connection with bulk-load
+pragmas; other databases go through a pooled SQLAlchemy engine.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .pool import get_pool_manager, sqlite_path
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_INFER_ROWS = 1000
+
+# applied to the loader's own connection only; pooled connections are untouched
+SQLITE_BULK_PRAGMAS = (
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+)
+
+
+def quote_ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        fmt = fmt.lower()
+    else:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = {".csv": "csv", ".tsv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext, "")
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"cannot load {path!r}: format must be 'csv' or 'jsonl'")
+    return fmt
+
+
+# ---------- readers ----------
+
+
+def _csv_reader(path: str, delimiter: str) -> Tuple[List[str], Iterator[List[Any]]]:
+    fh = open(path, "r", newline="", encoding="utf-8")
+    reader = csv.reader(fh, delimiter=delimiter)
+    try:
+        header = next(reader)
+    except StopIteration:
+        fh.close()
+        return [], iter(())
+
+    def rows() -> Iterator[List[Any]]:
+        try:
+            for row in reader:
+                if row:
+                    yield row
+        finally:
+            fh.close()
+
+    return header, rows()
+
+
+def _jsonl_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _jsonl_reader(path: str, infer_rows: int) -> Tuple[List[str], Iterator[List[Any]]]:
+    # columns are the union of keys in the inference sample, in first-seen order
+    columns: Dict[str, None] = {}
+    for rec in islice(_jsonl_records(path), max(1, infer_rows)):
+        for k in rec:
+            columns.setdefault(k, None)
+    names = list(columns)
+
+    def rows() -> Iterator[List[Any]]:
+        for rec in _jsonl_records(path):
+            yield [_jsonl_value(rec.get(k)) for k in names]
+
+    return names, rows()
+
+
+def _jsonl_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def open_source(path: str, fmt: str, delimiter: str = ",", infer_rows: int = DEFAULT_INFER_ROWS) -> Tuple[List[str], Iterator[List[Any]]]:
+    """Return the column names and a lazy row iterator for a CSV/JSONL file."""
+    if fmt == "csv":
+        if os.path.splitext(path)[1].lower() == ".tsv" and delimiter == ",":
+            delimiter = "\t"
+        return _csv_reader(path, delimiter)
+    return _jsonl_reader(path, infer_rows)
+
+
+# ---------- schema inference ----------
+
+
+_LEADING_ZERO = re.compile(r"[+-]?0\d")
+
+
+def _value_type(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if isinstance(value, str):
+        if _LEADING_ZERO.match(value):
+            return "TEXT"  # zip codes, IDs like "007": keep the text as written
+        try:
+            # only when the text survives a round trip ("+5", " 5" and "1_000" stay TEXT)
+            return "INTEGER" if str(int(value)) == value else "TEXT"
+        except ValueError:
+            pass
+        try:
+            # "nan", "inf", "Infinity" are words in a text column, not numbers
+            return "REAL" if math.isfinite(float(value)) else "TEXT"
+        except ValueError:
+            pass
+    return "TEXT"
+
+
+def infer_schema(sample: Sequence[Sequence[Any]], n_cols: int) -> List[str]:
+    """Pick INTEGER / REAL / TEXT per column from a sample of rows."""
+    types: List[Optional[str]] = [None] * n_cols
+    for row in sample:
+        for i in range(n_cols):
+            t = _value_type(row[i] if i < len(row) else None)
+            if t is None or types[i] == t or types[i] == "TEXT":
+                continue
+            if types[i] is None:
+                types[i] = t
+            elif {types[i], t} == {"INTEGER", "REAL"}:
+                types[i] = "REAL"
+            else:
+                types[i] = "TEXT"
+    return [t or "TEXT" for t in types]
+
+
+def _converter(sql_type: str) -> Callable[[Any], Any]:
+    # values past the inference sample get the same checks as `_value_type`:
+    # text that would not survive the conversion is stored as written
+    def to_int(v: Any) -> Any:
+        if v is None or v == "":
+            return None
+        try:
+            n = int(v)
+        except (TypeError, ValueError):
+            return v
+        return v if isinstance(v, str) and str(n) != v else n
+
+    def to_real(v: Any) -> Any:
+        if v is None or v == "":
+            return None
+        try:
+            f = float(v)
+        except (TypeError, ValueError):
+            return v
+        return v if isinstance(v, str) and not math.isfinite(f) else f
+
+    return {"INTEGER": to_int, "REAL": to_real}.get(sql_type, lambda v: v)
+
+
+def _batches(rows: Iterator[List[Any]], n_cols: int, size: int, converters: List[Callable[[Any], Any]]) -> Iterator[List[Tuple[Any, ...]]]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        batch = []
+        for row in chunk:
+            if len(row) < n_cols:
+                row = list(row) + [None] * (n_cols - len(row))
+            batch.append(tuple(conv(row[i]) for i, conv in enumerate(converters)))
+        yield batch
+
+
+# ---------- loaders ----------
+
+
+def _create_sql(table: str, columns: Sequence[str], types: Sequence[str]) -> str:
+    cols = ", ".join(f"{quote_ident(c)} {t}" for c, t in zip(columns, types))
+    return f"CREATE TABLE IF NOT EXISTS {quote_ident(table)} ({cols})"
+
+
+def _load_sqlite(
+    conn_str: str,
+    table: str,
+    columns: List[str],
+    types: List[str],
+    batches: Iterator[List[Tuple[Any, ...]]],
+    create_table: bool,
+    replace: bool,
+) -> Tuple[int, int, bool]:
+    path = sqlite_path(conn_str)
+    if path == ":memory:":
+        raise ValueError("cannot bulk load into a private :memory: database")
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        for pragma in SQLITE_BULK_PRAGMAS:
+            conn.execute(pragma)
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+        if replace and exists:
+            conn.execute(f"DROP TABLE {quote_ident(table)}")
+            exists = False
+        created = False
+        if not exists:
+            if not create_table:
+                raise RuntimeError(f"table {table!r} does not exist (pass create_table=True)")
+            conn.execute(_create_sql(table, columns, types))
+            created = True
+        placeholders = ", ".join("?" for _ in columns)
+        insert = f"INSERT INTO {quote_ident(table)} ({', '.join(quote_ident(c) for c in columns)}) VALUES ({placeholders})"
+        total = n_batches = 0
+        for batch in batches:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(insert, batch)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            total += len(batch)
+            n_batches += 1
+        return total, n_batches, created
+    finally:
+        conn.close()
+
+
+def _load_sqlalchemy(
+    conn_str: str,
+    table: str,
+    columns: List[str],
+    types: List[str],
+    batches: Iterator[List[Tuple[Any, ...]]],
+    create_table: bool,
+    replace: bool,
+) -> Tuple[int, int, bool]:
+    from sqlalchemy import inspect, text  # type: ignore
+
+    engine = get_pool_manager().engine(conn_str)
+    exists = inspect(engine).has_table(table)
+    created = False
+    with engine.begin() as conn:
+        if replace and exists:
+            conn.execute(text(f"DROP TABLE {quote_ident(table)}"))
+            exists = False
+        if not exists:
+            if not create_table:
+                raise RuntimeError(f"table {table!r} does not exist (pass create_table=True)")
+            conn.execute(text(_create_sql(table, columns, types)))
+            created = True
+    params = [f"p{i}" for i in range(len(columns))]
+    insert = text(
+        f"INSERT INTO {quote_ident(table)} ({', '.join(quote_ident(c) for c in columns)}) "
+        f"VALUES ({', '.join(':' + p for p in params)})"
+    )
+    total = n_batches = 0
+    for batch in batches:
+        with engine.begin() as conn:
+            conn.execute(insert, [dict(zip(params, row)) for row in batch])
+        total += len(batch)
+        n_batches += 1
+    return total, n_batches, created
+
+
+def bulk_load(
+    conn_str: str,
+    table: str,
+    path: str,
+    format: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    create_table: bool = True,
+    if_exists: str = "append",
+    delimiter: str = ",",
+    infer_rows: int = DEFAULT_INFER_ROWS,
+) -> Dict[str, Any]:
+    """Load a CSV or JSONL file into `table` and return a load report."""
+    if if_exists not in ("append", "replace"):
+        raise ValueError("if_exists must be 'append' or 'replace'")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+    fmt = detect_format(path, format)
+    batch_size = max(1, int(batch_size))
+
+    # a short first pass infers the schema; the load itself streams from the start
+    columns, sample_rows = open_source(path, fmt, delimiter, infer_rows)
+    if not columns:
+        raise ValueError(f"{path!r} has no header / records to load")
+    sample = list(islice(sample_rows, max(1, infer_rows)))
+    if hasattr(sample_rows, "close"):
+        sample_rows.close()
+    types = infer_schema(sample, len(columns))
+    converters = [_converter(t) for t in types]
+
+    _, rows = open_source(path, fmt, delimiter, infer_rows)
+    batches = _batches(rows, len(columns), batch_size, converters)
+
+    start = time.perf_counter()
+    if conn_str.startswith("sqlite"):
+        loaded, n_batches, created = _load_sqlite(
+            conn_str, table, columns, types, batches, create_table, if_exists == "replace"
+        )
+    else:
+        try:
+            import sqlalchemy  # type: ignore  # noqa: F401
+        except Exception:
+            raise RuntimeError("No SQL client available: install sqlalchemy or use a sqlite connection string.")
+        loaded, n_batches, created = _load_sqlalchemy(
+            conn_str, table, columns, types, batches, create_table, if_exists == "replace"
+        )
+    elapsed = time.perf_counter() - start
+    return {
+        "table": table,
+        "path": path,
+        "format": fmt,
+        "rows": loaded,
+        "batches": n_batches,
+        "created": created,
+        "columns": dict(zip(columns, types)),
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(loaded / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+__all__ = ["bulk_load", "infer_schema", "detect_format", "open_source", "quote_ident"]
@@ -0,0 +1,49 @@
+"""Per-user private directories for spill files, caches, logs and state.
+
+The server keeps data other local users must neither read nor replace:
+spilled query results, Spark stdout and logs, profiles, watermarks. The
+defaults therefore live under `$XDG_CACHE_HOME/etl-mcp-serv` (state under
+`$XDG_STATE_HOME/etl-mcp-serv`) rather than a predictable shared temp path,
+are created with mode 0700, and a directory owned by someone else or
+writable by group or others is refused instead of adopted.
+"""
+
+from __future__ import annotations
+
+import os
+
+APP_DIR = "etl-mcp-serv"
+
+
+def cache_dir(name: str) -> str:
+    """`$XDG_CACHE_HOME/etl-mcp-serv/<name>` (`~/.cache` when unset)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, APP_DIR, name)
+
+
+def state_dir(name: str) -> str:
+    """`$XDG_STATE_HOME/etl-mcp-serv/<name>` (`~/.local/state` when unset)."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, APP_DIR, name)
+
+
+def ensure_private_dir(path: str, what: str = "directory") -> str:
+    """Create `path` (mode 0700) if needed and check that only the current user controls it.
+
+    Raises RuntimeError when it cannot be created, is owned by another user
+    or is writable by group or others. `what` names it in the message.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.stat(path)
+    except OSError as exc:
+        raise RuntimeError(f"{what} {path!r} is unusable: {exc}") from exc
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+        raise RuntimeError(
+            f"{what} {path!r} is owned by another user or writable by group/others; "
+            "point it at a private directory"
+        )
+    return path
+
+
+__all__ = ["cache_dir", "state_dir", "ensure_private_dir"]
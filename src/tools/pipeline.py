@@ -0,0 +1,452 @@
+"""Streaming extract → transform → load pipelines that run inside the server.
+
+A pipeline is a declarative spec:
+
+    {
+      "source": {"conn_str": "sqlite:///src.db", "query": "SELECT ...", "batch_size": 1000},
+      "transform": [
+        {"select": ["id", "name", "amount"]},
+        {"rename": {"name": "customer"}},
+        {"filter": {"column": "amount", "op": ">", "value": 0}},
+        {"cast": {"amount": "float"}}
+      ],
+      "sink": {"type": "file", "path": "/data/out.jsonl", "format": "jsonl"},
+      "queue_size": 4
+    }
+
+Sinks: `file` (`jsonl`/`csv`, local path), `table` (`conn_str`, `table`,
+`create_table`, `if_exists`; sqlite or SQLAlchemy, via the bulk loader) and
+`hdfs` (`path`, `format`, `overwrite`; staged to a local temp file and
+uploaded with `hdfs_put` at the end).
+
+The three stages run concurrently and pass row batches through bounded
+`asyncio.Queue`s, so a slow stage applies backpressure upstream and memory
+stays at roughly `(2 * queue_size + 3) * batch_size` rows whatever the
+source size. The source is read through a server-side cursor; rows never
+leave the server, and the tool returns only a report with per-stage row
+counts, busy/wait time and throughput.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .cursors import get_cursor_store
+from .db_executor import get_db_executor
+from .loader import _load_sqlalchemy, _load_sqlite, infer_schema
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_SIZE = 4
+SINK_TYPES = ("file", "table", "hdfs")
+FILE_FORMATS = ("jsonl", "csv")
+
+Rows = List[Tuple[Any, ...]]
+Batch = Tuple[List[str], Rows]
+Uploader = Callable[[str, str, bool], Awaitable[Any]]
+
+_ABORT: Any = object()  # tells a loader thread blocked on the queue to give up
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "not_in": lambda a, b: a not in b,
+    "is_null": lambda a, _: a is None,
+    "not_null": lambda a, _: a is not None,
+}
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "t", "yes", "y")
+    return bool(value)
+
+
+_CASTS: Dict[str, Callable[[Any], Any]] = {
+    "int": lambda v: int(float(v)) if isinstance(v, str) and "." in v else int(v),
+    "float": float,
+    "str": str,
+    "bool": _to_bool,
+}
+
+
+class PipelineError(ValueError):
+    """An invalid pipeline spec."""
+
+
+# ---------- transforms ----------
+
+
+Step = Callable[[List[str], Rows], Batch]
+
+
+def _index(columns: List[str], name: str) -> int:
+    try:
+        return columns.index(name)
+    except ValueError:
+        raise PipelineError(f"unknown column {name!r}; available: {columns}") from None
+
+
+def _select(names: Sequence[str]) -> Step:
+    def step(columns: List[str], rows: Rows) -> Batch:
+        idx = [_index(columns, n) for n in names]
+        return list(names), [tuple(r[i] for i in idx) for r in rows]
+
+    return step
+
+
+def _rename(mapping: Dict[str, str]) -> Step:
+    def step(columns: List[str], rows: Rows) -> Batch:
+        for old in mapping:
+            _index(columns, old)
+        return [mapping.get(c, c) for c in columns], rows
+
+    return step
+
+
+def _filter(spec: Dict[str, Any]) -> Step:
+    op = spec.get("op", "=")
+    if op not in _OPS:
+        raise PipelineError(f"unknown filter op {op!r}; expected one of {sorted(_OPS)}")
+    test, column, value = _OPS[op], spec.get("column"), spec.get("value")
+    if not column:
+        raise PipelineError("filter needs a 'column'")
+    if op in ("in", "not_in"):
+        value = set(value or ())
+
+    def step(columns: List[str], rows: Rows) -> Batch:
+        i = _index(columns, column)
+        return columns, [r for r in rows if test(r[i], value)]
+
+    return step
+
+
+def _cast(mapping: Dict[str, str], errors: str = "raise") -> Step:
+    for name, kind in mapping.items():
+        if kind not in _CASTS:
+            raise PipelineError(f"cannot cast {name!r} to {kind!r}; expected one of {sorted(_CASTS)}")
+
+    def convert(fn: Callable[[Any], Any], value: Any) -> Any:
+        if value is None:
+            return None
+        try:
+            return fn(value)
+        except (TypeError, ValueError):
+            if errors == "null":
+                return None
+            raise
+
+    def step(columns: List[str], rows: Rows) -> Batch:
+        plan = [(_index(columns, name), _CASTS[kind]) for name, kind in mapping.items()]
+        out = []
+        for r in rows:
+            r = list(r)
+            for i, fn in plan:
+                r[i] = convert(fn, r[i])
+            out.append(tuple(r))
+        return columns, out
+
+    return step
+
+
+def compile_transforms(steps: Optional[Sequence[Dict[str, Any]]]) -> List[Step]:
+    """Turn the spec's `transform` list into batch functions (validated up front)."""
+    compiled: List[Step] = []
+    for raw in steps or ():
+        if not isinstance(raw, dict) or len([k for k in raw if k != "errors"]) != 1:
+            raise PipelineError(f"each transform step must have exactly one of select/rename/filter/cast: {raw!r}")
+        if "select" in raw:
+            compiled.append(_select(list(raw["select"])))
+        elif "rename" in raw:
+            compiled.append(_rename(dict(raw["rename"])))
+        elif "filter" in raw:
+            compiled.append(_filter(dict(raw["filter"])))
+        elif "cast" in raw:
+            compiled.append(_cast(dict(raw["cast"]), raw.get("errors", "raise")))
+        else:
+            raise PipelineError(f"unknown transform step {raw!r}")
+    return compiled
+
+
+# ---------- stage accounting ----------
+
+
+class StageStats:
+    """Rows, batches and busy / waiting time of one stage."""
+
+    def __init__(self) -> None:
+        self.rows_in = 0
+        self.rows_out = 0
+        self.batches = 0
+        self.busy = 0.0
+        self.wait = 0.0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "batches": self.batches,
+            "busy_seconds": round(self.busy, 6),
+            "wait_seconds": round(self.wait, 6),
+            "rows_per_sec": round(self.rows_out / self.busy, 1) if self.busy > 0 else None,
+        }
+
+
+async def _get(queue: "asyncio.Queue[Optional[Batch]]", stats: StageStats) -> Optional[Batch]:
+    start = time.perf_counter()
+    item = await queue.get()
+    stats.wait += time.perf_counter() - start
+    return item
+
+
+async def _put(queue: "asyncio.Queue[Optional[Batch]]", item: Optional[Batch], stats: StageStats) -> None:
+    start = time.perf_counter()
+    await queue.put(item)
+    stats.wait += time.perf_counter() - start
+
+
+# ---------- stages ----------
+
+
+async def _extract(source: Dict[str, Any], out: "asyncio.Queue[Optional[Batch]]", stats: StageStats) -> None:
+    store, db = get_cursor_store(), get_db_executor()
+    batch_size = max(1, min(int(source.get("batch_size", DEFAULT_BATCH_SIZE)), store.max_page))
+    start = time.perf_counter()
+    # pages back to back, so a streaming cursor holds its sqlite lock only for the run
+    handle = await db.run(source["conn_str"], store.open, source["conn_str"], source["query"], True)
+    stats.busy += time.perf_counter() - start
+    try:
+        columns = list(handle.columns)
+        while not handle.done:
+            start = time.perf_counter()
+            rows = await db.run(source["conn_str"], store.page, handle, batch_size)
+            stats.busy += time.perf_counter() - start
+            if rows:
+                stats.rows_in += len(rows)
+                stats.rows_out += len(rows)
+                stats.batches += 1
+                await _put(out, (columns, rows), stats)
+            if not columns:
+                break
+    finally:
+        store.close(handle.id)
+    await _put(out, None, stats)
+
+
+async def _transform(
+    steps: List[Step],
+    inp: "asyncio.Queue[Optional[Batch]]",
+    out: "asyncio.Queue[Optional[Batch]]",
+    stats: StageStats,
+) -> None:
+    while True:
+        item = await _get(inp, stats)
+        if item is None:
+            break
+        start = time.perf_counter()
+        columns, rows = item
+        stats.rows_in += len(rows)
+        for step in steps:
+            columns, rows = step(columns, rows)
+        stats.busy += time.perf_counter() - start
+        stats.batches += 1
+        if rows:
+            stats.rows_out += len(rows)
+            await _put(out, (columns, rows), stats)
+    await _put(out, None, stats)
+
+
+def _encode(columns: List[str], rows: Rows, fmt: str, header: bool) -> bytes:
+    if fmt == "jsonl":
+        return "".join(json.dumps(dict(zip(columns, r)), default=str) + "\n" for r in rows).encode("utf-8")
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+async def _load_file(path: str, fmt: str, inp: "asyncio.Queue[Optional[Batch]]", stats: StageStats) -> Dict[str, Any]:
+    os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+    tmp = f"{path}.part"
+    fh = open(tmp, "wb")
+    try:
+        first = True
+        while True:
+            item = await _get(inp, stats)
+            if item is None:
+                break
+            start = time.perf_counter()
+            columns, rows = item
+            await asyncio.to_thread(fh.write, _encode(columns, rows, fmt, header=first))
+            first = False
+            stats.rows_in += len(rows)
+            stats.rows_out += len(rows)
+            stats.batches += 1
+            stats.busy += time.perf_counter() - start
+        fh.close()
+        os.replace(tmp, path)
+    except BaseException:
+        fh.close()
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return {"path": path, "format": fmt, "bytes": os.path.getsize(path)}
+
+
+async def _load_table(sink: Dict[str, Any], inp: "asyncio.Queue[Optional[Batch]]", stats: StageStats) -> Dict[str, Any]:
+    first = await _get(inp, stats)
+    if first is None:
+        return {"table": sink["table"], "created": False}
+    columns, sample = first
+    types = infer_schema(sample, len(columns))
+    loop = asyncio.get_running_loop()
+
+    def batches() -> Iterator[Rows]:
+        # runs in the loader thread; pulls batches from the queue on the loop
+        item: Optional[Batch] = first
+        while item is not None:
+            stats.rows_in += len(item[1])
+            stats.batches += 1
+            yield item[1]
+            stats.rows_out += len(item[1])
+            start = time.perf_counter()
+            item = asyncio.run_coroutine_threadsafe(inp.get(), loop).result()
+            stats.wait += time.perf_counter() - start
+            if item is _ABORT:
+                raise RuntimeError("pipeline aborted")
+
+    if_exists = sink.get("if_exists", "append")
+    if if_exists not in ("append", "replace"):
+        raise PipelineError("sink.if_exists must be 'append' or 'replace'")
+    conn_str = sink["conn_str"]
+    load = _load_sqlite if conn_str.startswith("sqlite") else _load_sqlalchemy
+    start = time.perf_counter()
+    wait_before = stats.wait
+    try:
+        _, _, created = await get_db_executor().run(
+            conn_str,
+            load,
+            conn_str,
+            sink["table"],
+            columns,
+            types,
+            batches(),
+            bool(sink.get("create_table", True)),
+            if_exists == "replace",
+            write=True,
+        )
+    except asyncio.CancelledError:
+        # upstream stages are gone: make the loader thread's next get() fail instead of blocking
+        while not inp.empty():
+            inp.get_nowait()
+        inp.put_nowait(_ABORT)
+        raise
+    stats.busy += (time.perf_counter() - start) - (stats.wait - wait_before)
+    return {"table": sink["table"], "created": created, "columns": dict(zip(columns, types))}
+
+
+async def _load(
+    sink: Dict[str, Any],
+    inp: "asyncio.Queue[Optional[Batch]]",
+    stats: StageStats,
+    uploader: Optional[Uploader],
+) -> Dict[str, Any]:
+    kind = sink["type"]
+    if kind == "file":
+        return await _load_file(sink["path"], sink.get("format", "jsonl"), inp, stats)
+    if kind == "table":
+        return await _load_table(sink, inp, stats)
+    # hdfs: stage locally with constant memory, then upload the finished file
+    if uploader is None:
+        raise PipelineError("hdfs sink is not available")
+    with tempfile.TemporaryDirectory(prefix="etl-pipeline-") as tmp:
+        local = os.path.join(tmp, os.path.basename(sink["path"].rstrip("/")) or "part")
+        info = await _load_file(local, sink.get("format", "jsonl"), inp, stats)
+        start = time.perf_counter()
+        await uploader(local, sink["path"], bool(sink.get("overwrite", False)))
+        upload_seconds = time.perf_counter() - start
+        stats.busy += upload_seconds
+    return {"hdfs_path": sink["path"], "format": info["format"], "bytes": info["bytes"], "upload_seconds": round(upload_seconds, 6)}
+
+
+# ---------- orchestration ----------
+
+
+def validate(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a spec and fill in defaults; raises PipelineError."""
+    if not isinstance(spec, dict):
+        raise PipelineError("pipeline spec must be an object")
+    source, sink = spec.get("source"), spec.get("sink")
+    if not isinstance(source, dict) or not source.get("conn_str") or not source.get("query"):
+        raise PipelineError("source needs 'conn_str' and 'query'")
+    if not isinstance(sink, dict) or sink.get("type") not in SINK_TYPES:
+        raise PipelineError(f"sink.type must be one of {', '.join(SINK_TYPES)}")
+    if sink["type"] in ("file", "hdfs"):
+        if not sink.get("path"):
+            raise PipelineError(f"{sink['type']} sink needs a 'path'")
+        if sink.get("format", "jsonl") not in FILE_FORMATS:
+            raise PipelineError(f"sink.format must be one of {', '.join(FILE_FORMATS)}")
+    if sink["type"] == "table" and (not sink.get("conn_str") or not sink.get("table")):
+        raise PipelineError("table sink needs 'conn_str' and 'table'")
+    return {**spec, "queue_size": max(1, int(spec.get("queue_size", DEFAULT_QUEUE_SIZE)))}
+
+
+async def run_pipeline(spec: Dict[str, Any], uploader: Optional[Uploader] = None) -> Dict[str, Any]:
+    """Run a pipeline spec to completion and return its report.
+
+    If any stage fails the others are cancelled and the error is raised;
+    file sinks leave no partial output behind.
+    """
+    spec = validate(spec)
+    steps = compile_transforms(spec.get("transform"))
+    size = spec["queue_size"]
+    extracted: "asyncio.Queue[Optional[Batch]]" = asyncio.Queue(size)
+    transformed: "asyncio.Queue[Optional[Batch]]" = asyncio.Queue(size)
+    stats = {"extract": StageStats(), "transform": StageStats(), "load": StageStats()}
+
+    started = time.perf_counter()
+    tasks = [
+        asyncio.ensure_future(_extract(spec["source"], extracted, stats["extract"])),
+        asyncio.ensure_future(_transform(steps, extracted, transformed, stats["transform"])),
+        asyncio.ensure_future(_load(spec["sink"], transformed, stats["load"], uploader)),
+    ]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()  # type: ignore[misc]
+        sink_info = tasks[2].result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    loaded = stats["load"].rows_out
+    return {
+        "rows_extracted": stats["extract"].rows_out,
+        "rows_loaded": loaded,
+        "seconds": round(elapsed, 6),
+        "rows_per_sec": round(loaded / elapsed, 1) if elapsed > 0 else None,
+        "queue_size": size,
+        "stages": {name: s.report() for name, s in stats.items()},
+        "sink": {"type": spec["sink"]["type"], **sink_info},
+    }
+
+
+__all__ = ["PipelineError", "StageStats", "compile_transforms", "run_pipeline", "validate"]
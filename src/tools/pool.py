@@ -0,0 +1,290 @@
+"""Connection and engine pooling for the SQL tools.
+
+Pools are keyed by connection string. SQLAlchemy URLs get one cached engine
+(SQLAlchemy does the pooling itself); sqlite URLs served by the stdlib
+fallback get a small pool of `sqlite3` connections, each with its own
+prepared statement cache.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_PING_AFTER = 30.0
+DEFAULT_STATEMENT_CACHE = 128
+
+
+def sqlite_path(conn_str: str) -> str:
+    """Extract the database path from a `sqlite:///...` connection string."""
+    if conn_str in ("sqlite://", "sqlite:///"):
+        return ":memory:"
+    if conn_str.startswith("sqlite:///"):
+        return conn_str[len("sqlite:///"):]
+    return conn_str
+
+
+class SQLitePool:
+    """A LIFO pool of `sqlite3` connections for a single database path.
+
+    At most `size` idle connections are kept. When every pooled connection is
+    checked out, an overflow connection is opened and closed again on release,
+    so callers never block on the pool.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        ping_after: float = DEFAULT_PING_AFTER,
+        statement_cache: int = DEFAULT_STATEMENT_CACHE,
+    ) -> None:
+        self.path = path
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.statement_cache = statement_cache
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._closed = False
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, cached_statements=self.statement_cache
+        )
+        self.created += 1
+        return conn
+
+    @staticmethod
+    def _healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, reusing the most recently returned one."""
+        now = time.monotonic()
+        self.evict_idle(now)
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError(f"connection pool for {self.path!r} is closed")
+                if not self._idle:
+                    self._in_use += 1
+                    break
+                conn, returned_at = self._idle.pop()
+                self._in_use += 1
+            if now - returned_at < self.ping_after or self._healthy(conn):
+                self.reused += 1
+                return conn
+            # stale connection failed its health check; drop it and try the next
+            with self._lock:
+                self._in_use -= 1
+                self.evicted += 1
+            _close_quietly(conn)
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """Return a connection to the pool.
+
+        Any open transaction is rolled back so the next borrower starts clean,
+        matching the previous open/close-per-call behaviour.
+        """
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._lock:
+            self._in_use -= 1
+            keep = not discard and not self._closed and len(self._idle) < self.size
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+        if not keep:
+            _close_quietly(conn)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Close connections idle for longer than `idle_timeout`."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            stale = [c for c, t in self._idle if now - t >= self.idle_timeout]
+            self._idle = [(c, t) for c, t in self._idle if now - t < self.idle_timeout]
+            self.evicted += len(stale)
+        for conn in stale:
+            _close_quietly(conn)
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+            }
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class PoolManager:
+    """Owns every pool and engine, keyed by connection string."""
+
+    def __init__(self) -> None:
+        self.size = DEFAULT_POOL_SIZE
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.ping_after = DEFAULT_PING_AFTER
+        self.statement_cache = DEFAULT_STATEMENT_CACHE
+        self._sqlite: Dict[str, SQLitePool] = {}
+        self._engines: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        ping_after: Optional[float] = None,
+        statement_cache: Optional[int] = None,
+    ) -> None:
+        """Update pool settings. Applies to pools created afterwards."""
+        if size is not None:
+            self.size = max(1, int(size))
+        if idle_timeout is not None:
+            self.idle_timeout = float(idle_timeout)
+        if ping_after is not None:
+            self.ping_after = float(ping_after)
+        if statement_cache is not None:
+            self.statement_cache = int(statement_cache)
+
+    def sqlite(self, conn_str: str) -> SQLitePool:
+        with self._lock:
+            pool = self._sqlite.get(conn_str)
+            if pool is None:
+                pool = SQLitePool(
+                    sqlite_path(conn_str),
+                    size=self.size,
+                    idle_timeout=self.idle_timeout,
+                    ping_after=self.ping_after,
+                    statement_cache=self.statement_cache,
+                )
+                self._sqlite[conn_str] = pool
+            return pool
+
+    @contextmanager
+    def connection(self, conn_str: str) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled `sqlite3` connection for the duration of the block."""
+        pool = self.sqlite(conn_str)
+        conn = pool.acquire()
+        try:
+            yield conn
+        finally:
+            # release() discards handles that can no longer be rolled back
+            pool.release(conn)
+
+    def engine(self, conn_str: str) -> Any:
+        """Return a cached SQLAlchemy engine, creating it on first use."""
+        with self._lock:
+            engine = self._engines.get(conn_str)
+            if engine is not None:
+                return engine
+        from sqlalchemy import create_engine  # type: ignore
+
+        try:
+            engine = create_engine(
+                conn_str,
+                pool_size=self.size,
+                pool_recycle=self.idle_timeout,
+                pool_pre_ping=True,
+            )
+        except TypeError:
+            # some pool classes (e.g. for sqlite :memory:) reject sizing arguments
+            engine = create_engine(conn_str, pool_pre_ping=True)
+        with self._lock:
+            existing = self._engines.setdefault(conn_str, engine)
+        if existing is not engine:
+            engine.dispose()
+        return existing
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            pools = list(self._sqlite.values())
+        return sum(p.evict_idle() for p in pools)
+
+    def close_all(self) -> None:
+        """Close every pooled connection and dispose every engine."""
+        with self._lock:
+            pools, self._sqlite = list(self._sqlite.values()), {}
+            engines, self._engines = list(self._engines.values()), {}
+        for pool in pools:
+            pool.close()
+        for engine in engines:
+            try:
+                engine.dispose()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self._sqlite)
+            engines = list(self._engines)
+        return {
+            "sqlite": {k: p.stats() for k, p in pools.items()},
+            "engines": engines,
+        }
+
+
+_MANAGER = PoolManager()
+
+
+def get_pool_manager() -> PoolManager:
+    return _MANAGER
+
+
+def configure_pools(**settings: Any) -> None:
+    _MANAGER.configure(**settings)
+
+
+def close_pools() -> None:
+    _MANAGER.close_all()
+
+
+__all__ = [
+    "SQLitePool",
+    "PoolManager",
+    "sqlite_path",
+    "get_pool_manager",
+    "configure_pools",
+    "close_pools",
+]
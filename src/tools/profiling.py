@@ -0,0 +1,271 @@
+"""On-demand cProfile / tracemalloc sampling of tool calls.
+
+`arm(tool, calls=N)` makes the next N invocations of that tool run under
+cProfile and/or tracemalloc; the registry dispatch path asks `begin()` on
+every call, which is a single dict lookup while nothing is armed. Each
+sample is written to a rotating directory (`<tool>-<time>-<n>.prof` for
+pstats, `.tracemalloc` for snapshots) and summarised as top functions by
+cumulative time and top allocation sites by bytes allocated during the call.
+The directory defaults to `$XDG_CACHE_HOME/etl-mcp-serv/profiles` and must be
+private to the user (see `paths.py`): rotation deletes files from it.
+
+Only one call is profiled at a time process-wide (cProfile and tracemalloc
+are global); calls that overlap an in-progress sample simply run unprofiled.
+For async tools the profile covers everything the event loop thread ran
+while the call was awaited, which may include other tasks.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .paths import cache_dir, ensure_private_dir
+
+if TYPE_CHECKING:  # imported lazily: only needed once a tool is armed
+    import cProfile
+    import tracemalloc
+
+DEFAULT_MAX_FILES = 50
+DEFAULT_TOP = 20
+TRACE_FRAMES = 10
+
+
+class _Session:
+    def __init__(self, tool: str, calls: int, cpu: bool, memory: bool) -> None:
+        self.tool = tool
+        self.requested = calls
+        self.remaining = calls
+        self.cpu = cpu
+        self.memory = memory
+        self.armed_at = time.time()
+        self.samples: List[Dict[str, Any]] = []
+        self.prof_files: List[str] = []
+        self.allocations: Dict[str, List[int]] = {}
+
+    @property
+    def state(self) -> str:
+        return "armed" if self.remaining > 0 else "done"
+
+
+class Sample:
+    """One profiled call; created by `Profiler.begin`."""
+
+    def __init__(self, session: _Session) -> None:
+        self.session = session
+        self.profile: Optional[cProfile.Profile] = None
+        self.before: Optional[tracemalloc.Snapshot] = None
+        self.after: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        import cProfile
+        import tracemalloc
+
+        if self.session.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._started_tracing = True
+            self.before = tracemalloc.take_snapshot()
+        if self.session.cpu:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.started = time.perf_counter()
+
+    def stop(self) -> None:
+        import tracemalloc
+
+        self.elapsed = time.perf_counter() - self.started
+        if self.profile is not None:
+            self.profile.disable()
+        if self.before is not None:
+            self.after = tracemalloc.take_snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+
+def _snapshot_filter(snapshot: "tracemalloc.Snapshot") -> "tracemalloc.Snapshot":
+    import cProfile
+    import tracemalloc
+
+    ignored = (tracemalloc.__file__, cProfile.__file__, "<frozen importlib._bootstrap>")
+    return snapshot.filter_traces([tracemalloc.Filter(False, path) for path in ignored])
+
+
+class Profiler:
+    """Arms tools for sampling and keeps their profiles and summaries."""
+
+    def __init__(self, directory: Optional[str] = None, max_files: int = DEFAULT_MAX_FILES) -> None:
+        self.directory = directory or cache_dir("profiles")
+        self.max_files = max(1, int(max_files))
+        self._sessions: Dict[str, _Session] = {}
+        self._armed: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._seq = 0
+
+    def configure(self, directory: Optional[str] = None, max_files: Optional[int] = None) -> None:
+        if directory:
+            self.directory = directory
+        if max_files is not None:
+            self.max_files = max(1, int(max_files))
+
+    def arm(self, tool: str, calls: int = 1, cpu: bool = True, memory: bool = False) -> Dict[str, Any]:
+        """Profile the next `calls` invocations of `tool`; replaces any earlier session."""
+        if calls < 1:
+            raise ValueError("calls must be >= 1")
+        if not (cpu or memory):
+            raise ValueError("enable at least one of cpu / memory")
+        ensure_private_dir(self.directory, "profile directory (profiling.directory)")
+        session = _Session(tool, int(calls), cpu, memory)
+        with self._lock:
+            self._sessions[tool] = session
+            self._armed[tool] = session
+        return self.report(tool)
+
+    def disarm(self, tool: str) -> bool:
+        with self._lock:
+            session = self._armed.pop(tool, None)
+            if session is not None:
+                session.remaining = 0
+            return session is not None
+
+    def begin(self, tool: str) -> Optional[Sample]:
+        """Called by the registry for every tool call; returns a started Sample or None."""
+        if tool not in self._armed:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        with self._lock:
+            session = self._armed.get(tool)
+            if session is None or session.remaining <= 0:
+                self._busy.release()
+                return None
+            session.remaining -= 1
+            if session.remaining == 0:
+                del self._armed[tool]
+        sample = Sample(session)
+        try:
+            sample.start()
+        except BaseException:
+            self._busy.release()
+            raise
+        return sample
+
+    def finish(self, sample: Sample, error: Optional[BaseException] = None) -> None:
+        """Stop a sample, persist it and fold it into the session summary."""
+        try:
+            sample.stop()
+        finally:
+            self._busy.release()
+        session = sample.session
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        record: Dict[str, Any] = {"seconds": round(sample.elapsed, 6), "error": repr(error) if error else None}
+        try:
+            ensure_private_dir(self.directory, "profile directory (profiling.directory)")
+        except RuntimeError as exc:
+            # never fail the profiled call itself: keep the timing, drop the files
+            record["not_saved"] = str(exc)
+            with self._lock:
+                session.samples.append(record)
+            return
+        stem = os.path.join(self.directory, f"{session.tool}-{int(time.time() * 1000)}-{seq}")
+        if sample.profile is not None:
+            path = stem + ".prof"
+            sample.profile.dump_stats(path)
+            record["profile"] = path
+            with self._lock:
+                session.prof_files.append(path)
+        if sample.before is not None and sample.after is not None:
+            path = stem + ".tracemalloc"
+            after = _snapshot_filter(sample.after)
+            after.dump(path)
+            record["snapshot"] = path
+            diff = after.compare_to(_snapshot_filter(sample.before), "lineno")
+            record["allocated_bytes"] = sum(max(0, d.size_diff) for d in diff)
+            with self._lock:
+                for d in diff:
+                    if d.size_diff <= 0:
+                        continue
+                    frame = d.traceback[0]
+                    key = f"{frame.filename}:{frame.lineno}"
+                    size, count = session.allocations.get(key, [0, 0])
+                    session.allocations[key] = [size + d.size_diff, count + max(0, d.count_diff)]
+        with self._lock:
+            session.samples.append(record)
+        self._rotate()
+
+    def _rotate(self) -> None:
+        files = glob.glob(os.path.join(self.directory, "*.prof")) + glob.glob(
+            os.path.join(self.directory, "*.tracemalloc")
+        )
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda p: os.path.getmtime(p))
+        for path in files[: len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def report(self, tool: str, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        """Summary for a tool's latest session: top functions and allocation sites."""
+        with self._lock:
+            session = self._sessions.get(tool)
+            if session is None:
+                raise KeyError(tool)
+            prof_files = [p for p in session.prof_files if os.path.exists(p)]
+            allocations = sorted(session.allocations.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+            samples = list(session.samples)
+        return {
+            "tool": tool,
+            "state": session.state,
+            "requested": session.requested,
+            "remaining": session.remaining,
+            "sampled": len(samples),
+            "cpu": session.cpu,
+            "memory": session.memory,
+            "directory": self.directory,
+            "samples": samples,
+            "top_functions": _top_functions(prof_files, top) if prof_files else [],
+            "top_allocations": [{"site": site, "bytes": size, "blocks": count} for site, (size, count) in allocations],
+        }
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"tool": s.tool, "state": s.state, "requested": s.requested, "sampled": len(s.samples)}
+                for s in self._sessions.values()
+            ]
+
+
+def _top_functions(paths: List[str], top: int) -> List[Dict[str, Any]]:
+    import pstats
+
+    stats = pstats.Stats(*paths)
+    rows = []
+    for (filename, lineno, func), (_cc, ncalls, tottime, cumtime, _callers) in stats.stats.items():  # type: ignore[attr-defined]
+        if filename == "~":
+            where = func  # built-in
+        else:
+            where = f"{filename}:{lineno}({func})"
+        rows.append({"function": where, "calls": ncalls, "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)})
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return rows[:top]
+
+
+_PROFILER = Profiler()
+
+
+def get_profiler() -> Profiler:
+    return _PROFILER
+
+
+__all__ = ["Profiler", "Sample", "get_profiler"]
@@ -1,7 +1,18 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Callable, Dict, List, Optional
+import bisect
+import contextlib
+import contextvars
+import functools
+import itertools
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .coalesce import get_single_flight
+from .metrics import get_metrics
+from .profiling import Sample, get_profiler
 
 try:
     import mcp
@@ -18,20 +29,392 @@ def _register(name: str, func: Callable[..., Any]) -> None:
     _REGISTRY[name] = func
 
 
+# ---------- admission control ----------
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+_SCHEDULING_KWARGS = ("max_concurrency", "max_queue", "priority", "queue_timeout")
+
+
+class ToolRejected(RuntimeError):
+    """A call was refused because its queue was full."""
+
+
+class ToolDeadlineExceeded(ToolRejected):
+    """A queued call did not start before its deadline and was dropped."""
+
+
+def _priority(value: Union[str, int, None]) -> int:
+    if value is None:
+        return PRIORITIES["normal"]
+    if isinstance(value, int):
+        return value
+    try:
+        return PRIORITIES[value]
+    except KeyError:
+        raise ValueError(f"unknown priority {value!r} (expected one of {sorted(PRIORITIES)})") from None
+
+
+class _Waiter:
+    __slots__ = ("key", "name", "event", "loop", "future", "granted")
+
+    def __init__(self, key: Tuple[int, int], name: str) -> None:
+        self.key = key
+        self.name = name
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+        self.granted = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+    def grant(self) -> bool:
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(_resolve, self.future)  # type: ignore[union-attr]
+        except RuntimeError:  # the waiting loop is gone
+            return False
+        return True
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Scheduler:
+    """Per-tool and global concurrency limits with priority-ordered queues.
+
+    A call runs at once when both its tool and the global limit have a free
+    slot; otherwise it waits in a queue ordered by (priority, arrival). A full
+    queue rejects the call immediately, and a call still queued at its
+    deadline is dropped. Limits of None mean unlimited. Waiters may live on
+    any event loop or thread, so direct calls, `call_tool` and MCP dispatch
+    share the same limits.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._limits: Dict[str, Dict[str, Any]] = {}
+        self._running: Dict[str, int] = defaultdict(int)
+        self._queued: Dict[str, int] = defaultdict(int)
+        self._total = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"admitted": 0, "rejected": 0, "expired": 0})
+
+    def configure(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None) -> None:
+        """Set global limits; 0 means unlimited and None leaves a limit unchanged."""
+        with self._lock:
+            if max_concurrency is not None:
+                self.max_concurrency = int(max_concurrency) or None
+            if max_queue is not None:
+                self.max_queue = int(max_queue) or None
+            self._dispatch()
+
+    def set_limits(
+        self,
+        name: str,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        priority: Union[str, int, None] = None,
+        queue_timeout: Optional[float] = None,
+    ) -> None:
+        """Declare (or override) limits for one tool; None leaves a field unchanged."""
+        with self._lock:
+            limits = self._limits.setdefault(name, {})
+            if max_concurrency is not None:
+                limits["max_concurrency"] = int(max_concurrency) or None
+            if max_queue is not None:
+                limits["max_queue"] = int(max_queue)
+            if priority is not None:
+                limits["priority"] = _priority(priority)
+            if queue_timeout is not None:
+                limits["queue_timeout"] = float(queue_timeout) or None
+            self._dispatch()
+
+    def limits(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._limits.get(name, {}))
+
+    # ---------- admission ----------
+
+    def _has_slot(self, name: str) -> bool:
+        if self.max_concurrency is not None and self._total >= self.max_concurrency:
+            return False
+        limit = self._limits.get(name, {}).get("max_concurrency")
+        return limit is None or self._running[name] < limit
+
+    def _enter(self, name: str) -> None:
+        self._running[name] += 1
+        self._total += 1
+        self._counters[name]["admitted"] += 1
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued waiters in priority order (caller holds the lock)."""
+        i = 0
+        while i < len(self._waiters):
+            if self.max_concurrency is not None and self._total >= self.max_concurrency:
+                return
+            waiter = self._waiters[i]
+            if not self._has_slot(waiter.name):
+                i += 1
+                continue
+            self._waiters.pop(i)
+            self._queued[waiter.name] -= 1
+            self._enter(waiter.name)
+            waiter.granted = True
+            if not waiter.grant():
+                waiter.granted = False
+                self._leave(waiter.name)
+
+    def _leave(self, name: str) -> None:
+        self._running[name] -= 1
+        self._total -= 1
+
+    def _admit(self, name: str, priority: int) -> Optional[_Waiter]:
+        """Enter immediately (returns None) or enqueue a waiter; raises when the queue is full."""
+        if self._has_slot(name):
+            self._enter(name)
+            return None
+        max_queue = self._limits.get(name, {}).get("max_queue")
+        if (max_queue is not None and self._queued[name] >= max_queue) or (
+            self.max_queue is not None and len(self._waiters) >= self.max_queue
+        ):
+            self._counters[name]["rejected"] += 1
+            raise ToolRejected(
+                f"tool {name!r} rejected: {self._queued[name]} calls already queued "
+                f"({self._running[name]} running); retry later"
+            )
+        waiter = _Waiter((priority, next(self._seq)), name)
+        bisect.insort(self._waiters, waiter)
+        self._queued[name] += 1
+        return waiter
+
+    def _abandon(self, waiter: _Waiter, expired: bool) -> bool:
+        """Remove a waiter that gave up; returns False if it had already been granted."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            self._queued[waiter.name] -= 1
+            if expired:
+                self._counters[waiter.name]["expired"] += 1
+            return True
+
+    def _deadline_error(self, name: str, timeout: Optional[float]) -> ToolDeadlineExceeded:
+        return ToolDeadlineExceeded(f"tool {name!r} did not start within {timeout}s; dropped from the queue")
+
+    def resolve(self, name: str, priority: Union[str, int, None] = None, timeout: Optional[float] = None) -> Tuple[int, Optional[float]]:
+        """Effective (priority, queue timeout) for a call: per-call options win over tool defaults."""
+        limits = self._limits.get(name, {})
+        prio = _priority(priority) if priority is not None else limits.get("priority", PRIORITIES["normal"])
+        return prio, timeout if timeout is not None else limits.get("queue_timeout")
+
+    async def acquire_async(self, name: str, priority: int, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            waiter = self._admit(name, priority)
+            if waiter is None:
+                return
+            waiter.loop = asyncio.get_running_loop()
+            waiter.future = waiter.loop.create_future()
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            expired = isinstance(exc, asyncio.TimeoutError)
+            if not self._abandon(waiter, expired):
+                self.release(name)
+            if expired:
+                raise self._deadline_error(name, timeout) from None
+            raise
+
+    def acquire(self, name: str, priority: int, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            waiter = self._admit(name, priority)
+            if waiter is None:
+                return
+            waiter.event = threading.Event()
+        if not waiter.event.wait(timeout) and self._abandon(waiter, True):
+            raise self._deadline_error(name, timeout)
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            self._leave(name)
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            names = set(self._counters) | set(self._limits)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "running": self._total,
+                "queued": len(self._waiters),
+                "tools": {
+                    n: {"running": self._running[n], "queued": self._queued[n], **self._counters[n], **self._limits.get(n, {})}
+                    for n in sorted(names)
+                },
+            }
+
+
+_SCHEDULER = Scheduler()
+_call_options: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("etl_tool_call_options", default={})
+
+
+def get_scheduler() -> Scheduler:
+    return _SCHEDULER
+
+
+def configure_scheduler(
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    tools: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> None:
+    """Apply global limits and per-tool overrides (e.g. from config)."""
+    _SCHEDULER.configure(max_concurrency=max_concurrency, max_queue=max_queue)
+    for name, limits in (tools or {}).items():
+        _SCHEDULER.set_limits(name, **{k: v for k, v in limits.items() if k in _SCHEDULING_KWARGS})
+
+
+@contextlib.contextmanager
+def call_options(priority: Union[str, int, None] = None, timeout: Optional[float] = None) -> Iterator[None]:
+    """Set the priority / queue deadline for tool calls made inside the block."""
+    if priority is not None:
+        _priority(priority)  # validate early
+    token = _call_options.set({"priority": priority, "timeout": timeout})
+    try:
+        yield
+    finally:
+        _call_options.reset(token)
+
+
+async def _with_options(coro: Any, options: Dict[str, Any]) -> Any:
+    _call_options.set(options)
+    return await coro
+
+
+async def _profiled_async(sample: Sample, func: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+    error: Optional[BaseException] = None
+    try:
+        return await func(*args, **kwargs)
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        get_profiler().finish(sample, error)
+
+
+def _profiled(sample: Sample, func: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+    error: Optional[BaseException] = None
+    try:
+        return func(*args, **kwargs)
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        get_profiler().finish(sample, error)
+
+
+def _scheduled(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool so every invocation is metered, coalesced with identical
+    in-flight calls when enabled, admitted by the scheduler and, when armed,
+    sampled by the profiler."""
+    metrics = get_metrics()
+    profiler = get_profiler()
+    flight = get_single_flight()
+
+    if asyncio.iscoroutinefunction(func):
+
+        async def admitted(*args: Any, **kwargs: Any) -> Any:
+            priority, timeout = _SCHEDULER.resolve(name, **_call_options.get())
+            await _SCHEDULER.acquire_async(name, priority, timeout)
+            try:
+                sample = profiler.begin(name)
+                if sample is None:
+                    return await func(*args, **kwargs)
+                return await _profiled_async(sample, func, args, kwargs)
+            finally:
+                _SCHEDULER.release(name)
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = metrics.start(name, args, kwargs)
+            outcome, result = "error", None
+            try:
+                key = flight.key(name, func, args, kwargs)
+                if key is None:
+                    result = await admitted(*args, **kwargs)
+                else:
+                    result = await flight.run_async(key, name, lambda: admitted(*args, **kwargs))
+                outcome = "ok"
+                return result
+            except ToolRejected:
+                outcome = "rejected"
+                raise
+            finally:
+                metrics.finish(name, started, outcome, result)
+
+        return async_wrapper
+
+    def admitted_sync(*args: Any, **kwargs: Any) -> Any:
+        priority, timeout = _SCHEDULER.resolve(name, **_call_options.get())
+        _SCHEDULER.acquire(name, priority, timeout)
+        try:
+            sample = profiler.begin(name)
+            if sample is None:
+                return func(*args, **kwargs)
+            return _profiled(sample, func, args, kwargs)
+        finally:
+            _SCHEDULER.release(name)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = metrics.start(name, args, kwargs)
+        outcome, result = "error", None
+        try:
+            key = flight.key(name, func, args, kwargs)
+            if key is None:
+                result = admitted_sync(*args, **kwargs)
+            else:
+                result = flight.run(key, name, lambda: admitted_sync(*args, **kwargs))
+            outcome = "ok"
+            return result
+        except ToolRejected:
+            outcome = "rejected"
+            raise
+        finally:
+            metrics.finish(name, started, outcome, result)
+
+    return wrapper
+
+
 def tools(_func: Optional[Callable] = None, **mcp_decorator_kwargs):
     """Wrapper around mcp.tool that also records the decorated callable locally.
 
-    Supports both `@tools` and `@tools(...)` usage.
+    Supports both `@tools` and `@tools(...)` usage. Admission-control kwargs
+    (`max_concurrency`, `max_queue`, `priority`, `queue_timeout`) are consumed
+    here and registered with the scheduler, and `coalesce` (True, False for
+    side-effecting tools, or a predicate over the bound arguments) opts the
+    tool into single-flight coalescing; the rest go to `mcp.tool`.
     """
+    scheduling = {k: mcp_decorator_kwargs.pop(k) for k in _SCHEDULING_KWARGS if k in mcp_decorator_kwargs}
+    coalesce = mcp_decorator_kwargs.pop("coalesce", None)
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        name = mcp_decorator_kwargs.get("name") or getattr(func, "__name__", None) or func.__name__
+        _SCHEDULER.set_limits(name, **scheduling)
+        get_single_flight().declare(name, coalesce)
+        func = _scheduled(name, func)
         # If `mcp` is available, use its decorator so tools are also visible to MCP.
         if _HAS_MCP and hasattr(mcp, "tool"):
             decorated = mcp.tool(**mcp_decorator_kwargs)(func)
         else:
             # Fallback: use the original function as the decorated callable.
             decorated = func
-        name = mcp_decorator_kwargs.get("name") or getattr(func, "__name__", None) or func.__name__
         _register(name, decorated)
         try:
             decorated.__etl_tool_name__ = name  # attach metadata
@@ -56,13 +439,85 @@ def get_tool(name: str) -> Optional[Callable[..., Any]]:
     return _REGISTRY.get(name)
 
 
+class LoopRunner:
+    """A long-lived event loop on a daemon thread for running coroutines from sync code.
+
+    Reusing one loop keeps loop-bound resources (pooled HTTP clients, ...)
+    valid across calls, avoids per-call loop setup and teardown, and works
+    even when the calling thread already has a running loop.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="tool-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro: Any, timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the background loop and block until it finishes."""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopRunner.run called from its own loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+
+        async def _drain() -> None:
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_drain(), loop).result(timeout=5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+
+_RUNNER = LoopRunner()
+
+
+def get_runner() -> LoopRunner:
+    return _RUNNER
+
+
+def close_runner() -> None:
+    _RUNNER.close()
+
+
 def call_tool(name: str, *args, **kwargs) -> Any:
     func = get_tool(name)
     if func is None:
         raise KeyError(f"tool not found: {name}")
     res = func(*args, **kwargs)
     if asyncio.iscoroutine(res):
-        return asyncio.run(res)
+        # carry this thread's call_options over to the runner loop
+        return _RUNNER.run(_with_options(res, _call_options.get()))
     return res
 
 
@@ -76,4 +531,72 @@ async def call_tool_async(name: str, *args, **kwargs) -> Any:
     return res
 
 
-__all__ = ["tools", "tool", "list_tools", "get_tool", "call_tool", "call_tool_async"]
+# a batch entry: "name", (name, args), (name, args, kwargs) or
+# {"name", "args", "kwargs", "priority", "timeout"}
+ToolCall = Union[str, Tuple[Any, ...], Dict[str, Any]]
+
+
+def _parse_call(call: ToolCall) -> Tuple[str, Sequence[Any], Dict[str, Any], Dict[str, Any]]:
+    if isinstance(call, str):
+        return call, (), {}, {}
+    if isinstance(call, dict):
+        options = {k: call[k] for k in ("priority", "timeout") if call.get(k) is not None}
+        return call["name"], call.get("args") or (), call.get("kwargs") or {}, options
+    name, *rest = call
+    args = rest[0] if len(rest) > 0 and rest[0] is not None else ()
+    kwargs = rest[1] if len(rest) > 1 and rest[1] is not None else {}
+    return name, args, kwargs, {}
+
+
+async def call_tools_batch_async(calls: Sequence[ToolCall], concurrency: int = 16) -> List[Any]:
+    """Run many tool calls concurrently, at most `concurrency` at a time.
+
+    Returns one entry per call, in order: the tool's result, or the exception
+    it raised (including `ToolRejected` from admission control). Sync tools
+    run in worker threads so they overlap as well.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(call: ToolCall) -> Any:
+        async with sem:
+            name, args, kwargs, options = _parse_call(call)
+            func = get_tool(name)
+            if func is None:
+                raise KeyError(f"tool not found: {name}")
+            if options:
+                # each gather() task runs in its own context copy
+                _call_options.set({**_call_options.get(), **options})
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            res = await asyncio.to_thread(func, *args, **kwargs)
+            if asyncio.iscoroutine(res):
+                return await res
+            return res
+
+    return await asyncio.gather(*(one(c) for c in calls), return_exceptions=True)
+
+
+def call_tools_batch(calls: Sequence[ToolCall], concurrency: int = 16, timeout: Optional[float] = None) -> List[Any]:
+    """Sync wrapper around `call_tools_batch_async` using the background loop."""
+    return _RUNNER.run(call_tools_batch_async(calls, concurrency), timeout)
+
+
+__all__ = [
+    "tools",
+    "tool",
+    "list_tools",
+    "get_tool",
+    "call_tool",
+    "call_tool_async",
+    "call_tools_batch",
+    "call_tools_batch_async",
+    "call_options",
+    "Scheduler",
+    "ToolRejected",
+    "ToolDeadlineExceeded",
+    "get_scheduler",
+    "configure_scheduler",
+    "LoopRunner",
+    "get_runner",
+    "close_runner",
+]
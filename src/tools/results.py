@@ -0,0 +1,398 @@
+"""Spill-to-disk store for large tool results.
+
+Tools that can produce large outputs (`run_spark_job`, `run_sql_query`)
+pass them through `ResultStore.maybe_spill` / `spill_chunks`. Outputs up to
+`threshold` bytes are returned inline as before; larger ones are written to
+a managed spill directory and the tool returns a small JSON handle instead:
+
+    {"result_handle": "<id>", "uri": "etl-result://<id>", "bytes": ..., "lines": ...,
+     "chunk_bytes": ..., "chunks": ..., "content_type": ..., "preview": "...", "summary": {...}}
+
+The content is then read in chunks, either with the `result_read` tool or
+through the MCP resource template `etl-result://{handle}/{chunk}`.
+`spill_chunks` streams from an iterator of byte blocks, so producers that
+already keep their output on disk (Spark log buffers) never hold it in memory.
+Binary SQL results (`format="binary"`, see `encoders.py`) are always stored
+here, so they share the same retention.
+
+The default spill directory is private to the user
+(`$XDG_CACHE_HOME/etl-mcp-serv/spill`, mode 0700, see `paths.py`); one
+owned by someone else or writable by group or others is refused, since
+anyone who can write there could swap the file behind a handle.
+
+Retention is bounded by age (`max_age` seconds) and total size
+(`max_bytes`, oldest first); both are enforced on every write and on reads
+of expired handles. Files left by a previous process are picked up on first
+use and age out normally.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from .paths import cache_dir, ensure_private_dir
+
+RESULT_URI_SCHEME = "etl-result"
+DEFAULT_THRESHOLD = 256 * 1024
+DEFAULT_CHUNK_BYTES = 64 * 1024
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_MAX_AGE = 6 * 3600.0
+PREVIEW_BYTES = 2048
+SUFFIX = ".result"
+
+_HANDLE_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def _utf8_prefix(data: bytes) -> bytes:
+    """Drop a trailing partial UTF-8 sequence so `data` decodes cleanly."""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:  # lead byte or ASCII
+            if byte >= 0xC0:
+                need = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                if back < need:
+                    return data[:-back]
+            return data
+    return data
+
+
+class _Entry:
+    __slots__ = ("id", "path", "size", "lines", "created", "tool", "content_type", "summary")
+
+    def __init__(
+        self,
+        id: str,
+        path: str,
+        size: int,
+        lines: Optional[int],
+        created: float,
+        tool: Optional[str],
+        content_type: str,
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.path = path
+        self.size = size
+        self.lines = lines
+        self.created = created
+        self.tool = tool
+        self.content_type = content_type
+        self.summary = summary
+
+
+class ResultStore:
+    """Writes oversized results to disk and serves them back in chunks."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        threshold: int = DEFAULT_THRESHOLD,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.directory = directory or cache_dir("spill")
+        self.threshold = int(threshold)
+        self.chunk_bytes = max(1024, int(chunk_bytes))
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age)
+        self._entries: Dict[str, _Entry] = {}
+        self._scanned = False
+        self._lock = threading.Lock()
+        self._counters = {"spilled": 0, "inline": 0, "evicted": 0, "expired": 0}
+
+    def configure(
+        self,
+        directory: Optional[str] = None,
+        threshold: Optional[int] = None,
+        chunk_bytes: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            if directory and directory != self.directory:
+                self.directory = directory
+                self._entries.clear()
+                self._scanned = False
+            if threshold is not None:
+                self.threshold = int(threshold)
+            if chunk_bytes is not None:
+                self.chunk_bytes = max(1024, int(chunk_bytes))
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes)
+            if max_age is not None:
+                self.max_age = float(max_age)
+        self.sweep()
+
+    # ---------- writing ----------
+
+    def maybe_spill(
+        self,
+        text: str,
+        tool: Optional[str] = None,
+        content_type: str = "text/plain",
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Return `text` unchanged when small, else spill it and return a handle payload."""
+        if len(text) <= self.threshold // 4:  # cheap bound: <= 4 bytes per char
+            self._counters["inline"] += 1
+            return text
+        data = text.encode("utf-8")
+        if len(data) <= self.threshold:
+            self._counters["inline"] += 1
+            return text
+        return self.spill_chunks((data,), tool, content_type, summary)
+
+    def spill_chunks(
+        self,
+        chunks: Iterable[bytes],
+        tool: Optional[str] = None,
+        content_type: str = "text/plain",
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Stream byte blocks into a new result file and return its handle payload."""
+        return json.dumps(self.store_chunks(chunks, tool, content_type, summary))
+
+    def store_chunks(
+        self,
+        chunks: Iterable[bytes],
+        tool: Optional[str] = None,
+        content_type: str = "text/plain",
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Like `spill_chunks`, but return the handle payload as a dict."""
+        self._scan()
+        ensure_private_dir(self.directory, "result spill directory (results.directory)")
+        handle = uuid.uuid4().hex
+        path = os.path.join(self.directory, handle + SUFFIX)
+        tmp = path + ".part"
+        size = lines = 0
+        head = last = b""
+        try:
+            with open(tmp, "wb") as fh:
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    fh.write(chunk)
+                    size += len(chunk)
+                    lines += chunk.count(b"\n")
+                    last = chunk
+                    if len(head) < PREVIEW_BYTES:
+                        head += chunk[: PREVIEW_BYTES - len(head)]
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        if last and not last.endswith(b"\n"):
+            lines += 1  # unterminated last line
+        entry = _Entry(handle, path, size, lines, time.time(), tool, content_type, summary)
+        with self._lock:
+            self._entries[handle] = entry
+            self._counters["spilled"] += 1
+        self.sweep(keep=handle)
+        return self._describe(entry, preview=_preview(head, size))
+
+    # ---------- reading ----------
+
+    def _entry(self, handle: str) -> _Entry:
+        if not _HANDLE_RE.fullmatch(handle or ""):
+            raise KeyError(handle)
+        self._scan()
+        with self._lock:
+            entry = self._entries.get(handle)
+        if entry is None:
+            raise KeyError(handle)
+        if self.max_age and time.time() - entry.created > self.max_age:
+            self.sweep()
+            raise KeyError(handle)
+        return entry
+
+    def path(self, handle: str) -> str:
+        """Local file holding a result, for in-process readers of binary results."""
+        return self._entry(handle).path
+
+    def info(self, handle: str) -> Dict[str, Any]:
+        return self._describe(self._entry(handle))
+
+    def read(self, handle: str, offset: int = 0, length: Optional[int] = None) -> Dict[str, Any]:
+        """Read up to `length` bytes (default `chunk_bytes`) starting at byte `offset`.
+
+        The returned `data` never ends in a split UTF-8 sequence; continue from
+        `next_offset` until `eof` is true.
+        """
+        entry = self._entry(handle)
+        offset = max(0, int(offset))
+        length = self.chunk_bytes if not length or length <= 0 else min(int(length), 16 * self.chunk_bytes)
+        try:
+            with open(entry.path, "rb") as fh:
+                fh.seek(offset)
+                data = fh.read(length)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(handle, None)
+            raise KeyError(handle) from None
+        if offset + len(data) < entry.size:
+            data = _utf8_prefix(data)
+        next_offset = offset + len(data)
+        return {
+            "result_handle": handle,
+            "offset": offset,
+            "next_offset": next_offset,
+            "bytes": len(data),
+            "total_bytes": entry.size,
+            "eof": next_offset >= entry.size,
+            "data": data.decode("utf-8", errors="replace"),
+        }
+
+    def chunk(self, handle: str, index: int) -> str:
+        """Text of fixed-size chunk `index` (used by the MCP resource template).
+
+        Chunk boundaries are byte offsets, so a multi-byte character split
+        across two chunks is replaced; use `read` for exact text.
+        """
+        entry = self._entry(handle)
+        if index < 0 or (index and index * self.chunk_bytes >= entry.size):
+            raise IndexError(f"chunk {index} out of range for result {handle}")
+        with open(entry.path, "rb") as fh:
+            fh.seek(index * self.chunk_bytes)
+            return fh.read(self.chunk_bytes).decode("utf-8", errors="replace")
+
+    def delete(self, handle: str) -> bool:
+        if not _HANDLE_RE.fullmatch(handle or ""):
+            return False
+        self._scan()
+        with self._lock:
+            entry = self._entries.pop(handle, None)
+        if entry is None:
+            return False
+        _remove(entry.path)
+        return True
+
+    # ---------- retention ----------
+
+    def _scan(self) -> None:
+        """Index result files left in the directory by an earlier process."""
+        if self._scanned:
+            return
+        with self._lock:
+            if self._scanned:
+                return
+            ensure_private_dir(self.directory, "result spill directory (results.directory)")
+            self._scanned = True
+            try:
+                entries = list(os.scandir(self.directory))
+            except OSError:
+                return
+            for de in entries:
+                name = de.name
+                if not name.endswith(SUFFIX) or not _HANDLE_RE.fullmatch(name[: -len(SUFFIX)]):
+                    continue
+                handle = name[: -len(SUFFIX)]
+                if handle in self._entries:
+                    continue
+                try:
+                    st = de.stat()
+                except OSError:
+                    continue
+                self._entries[handle] = _Entry(handle, de.path, st.st_size, None, st.st_mtime, None, "text/plain")
+        self.sweep()
+
+    def sweep(self, keep: Optional[str] = None) -> int:
+        """Delete expired results, then the oldest ones (never `keep`) until under `max_bytes`."""
+        now = time.time()
+        doomed = []
+        with self._lock:
+            for entry in sorted(self._entries.values(), key=lambda e: e.created):
+                if self.max_age and now - entry.created > self.max_age:
+                    doomed.append(self._entries.pop(entry.id))
+                    self._counters["expired"] += 1
+            total = sum(e.size for e in self._entries.values())
+            if self.max_bytes and total > self.max_bytes:
+                for entry in sorted(self._entries.values(), key=lambda e: e.created):
+                    if total <= self.max_bytes:
+                        break
+                    if entry.id == keep:
+                        continue
+                    doomed.append(self._entries.pop(entry.id))
+                    total -= entry.size
+                    self._counters["evicted"] += 1
+        for entry in doomed:
+            _remove(entry.path)
+        return len(doomed)
+
+    def clear(self) -> None:
+        self._scan()
+        with self._lock:
+            doomed, self._entries = list(self._entries.values()), {}
+        for entry in doomed:
+            _remove(entry.path)
+
+    def stats(self) -> Dict[str, Any]:
+        self._scan()
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "results": len(self._entries),
+                "bytes": sum(e.size for e in self._entries.values()),
+                "threshold": self.threshold,
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                **self._counters,
+            }
+
+    def _describe(self, entry: _Entry, preview: Optional[str] = None) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "result_handle": entry.id,
+            "uri": f"{RESULT_URI_SCHEME}://{entry.id}",
+            "tool": entry.tool,
+            "bytes": entry.size,
+            "lines": entry.lines,
+            "content_type": entry.content_type,
+            "chunk_bytes": self.chunk_bytes,
+            "chunks": max(1, -(-entry.size // self.chunk_bytes)),
+            "expires_at": entry.created + self.max_age if self.max_age else None,
+        }
+        if preview is not None:
+            out["preview"] = preview
+        if entry.summary:
+            out["summary"] = entry.summary
+        return out
+
+
+def _preview(head: bytes, size: int) -> str:
+    """Leading text of a result, cut at the last full line when there is one."""
+    if len(head) < size:
+        cut = head.rfind(b"\n")
+        head = head[: cut + 1] if cut > 0 else _utf8_prefix(head)
+    return head.decode("utf-8", errors="replace")
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_STORE = ResultStore()
+
+
+def get_result_store() -> ResultStore:
+    return _STORE
+
+
+def read_result_chunk(handle: str, chunk: int) -> str:
+    """Serve chunk `chunk` of a spilled result (MCP resource `etl-result://{handle}/{chunk}`)."""
+    return _STORE.chunk(handle, int(chunk))
+
+
+__all__ = ["ResultStore", "RESULT_URI_SCHEME", "get_result_store", "read_result_chunk"]
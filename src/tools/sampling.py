@@ -0,0 +1,267 @@
+"""Bounded-cost previews of SQL results: random samples and approximate counts.
+
+Showing a few representative rows or estimating `COUNT(*)` / `COUNT(DISTINCT)`
+should not cost a full table scan. Two sampling methods are available:
+
+- `rowid`: sqlite tables only. Random rowids between `min(rowid)` and
+  `max(rowid)` are probed with `WHERE rowid >= ? LIMIT 1`, an index seek,
+  so the cost is O(k log n) whatever the table size. Rows that follow a
+  large gap in the rowid space are slightly over-represented.
+- `reservoir`: any read-only query. Rows are streamed through a cursor and
+  a sample is kept with reservoir sampling (Algorithm R), reading at most
+  `row_budget` rows. The sample is uniform over the rows read only: when
+  the budget cuts the pass short it is drawn from the first `row_budget`
+  rows in the query's order, not from the whole result. `sample_scope`
+  in the output says which (`"table"`, `"all rows"` or `"first N rows"`).
+
+With `approx=True` the same streaming pass feeds one HyperLogLog sketch per
+column, so row and distinct counts come out of a single read of at most
+`row_budget` rows. When the budget cuts the pass short, counts are reported
+as lower bounds (`complete: false`); for sqlite tables the total row count
+is then estimated from `sqlite_stat1` / `max(rowid)` instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .cache import is_read_only
+from .catalog import _sqlite_row_estimates
+from .db_executor import interruptible
+from .loader import quote_ident
+from .pool import get_pool_manager
+
+DEFAULT_SAMPLE_ROWS = 20
+DEFAULT_ROW_BUDGET = 100_000
+DEFAULT_PRECISION = 14  # 16384 registers, ~0.8% standard error
+MAX_SAMPLE_ROWS = 10_000
+_PAGE = 1000
+
+Row = Tuple[Any, ...]
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**p one-byte registers (standard error ~1.04/sqrt(2**p))."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._rest = 64 - precision
+        self._mask = (1 << self._rest) - 1
+
+    @staticmethod
+    def _hash(value: Any) -> int:
+        if isinstance(value, str):
+            data = b"s" + value.encode("utf-8")
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            data = b"b" + bytes(value)
+        elif isinstance(value, float) and value.is_integer():
+            data = b"n" + str(int(value)).encode()  # SQL treats 2 and 2.0 as equal
+        else:
+            data = b"n" + repr(value).encode()
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+    def add(self, value: Any) -> None:
+        h = self._hash(value)
+        index = h >> self._rest
+        rank = self._rest - (h & self._mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("cannot merge sketches of different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    @property
+    def error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+
+def reservoir_sample(rows: Iterator[Row], k: int, rng: random.Random) -> Tuple[List[Row], int]:
+    """Uniform sample of `k` rows from a stream (Algorithm R); returns (sample, rows seen)."""
+    sample: List[Row] = []
+    seen = 0
+    for row in rows:
+        if seen < k:
+            sample.append(row)
+        else:
+            j = rng.randrange(seen + 1)
+            if j < k:
+                sample[j] = row
+        seen += 1
+    return sample, seen
+
+
+@contextmanager
+def _stream(conn_str: str, sql: str) -> Iterator[Tuple[List[str], Iterator[Row]]]:
+    """Execute `sql` and yield its columns and a lazy row iterator."""
+
+    def pages(cur: Any) -> Iterator[Row]:
+        while True:
+            batch = cur.fetchmany(_PAGE)
+            if not batch:
+                return
+            for row in batch:
+                yield tuple(row)
+
+    if conn_str.startswith("sqlite"):
+        with get_pool_manager().connection(conn_str) as conn, interruptible(conn):
+            cur = conn.execute(sql)
+            try:
+                yield [d[0] for d in cur.description or ()], pages(cur)
+            finally:
+                cur.close()
+        return
+    try:
+        from sqlalchemy import text  # type: ignore
+    except ImportError:
+        raise RuntimeError("No SQL client available: install sqlalchemy or use a sqlite connection string.") from None
+    with get_pool_manager().engine(conn_str).connect() as conn, interruptible(conn):
+        result = conn.execution_options(stream_results=True).execute(text(sql))
+        try:
+            yield list(result.keys()) if result.returns_rows else [], pages(result)
+        finally:
+            result.close()
+
+
+def _budgeted(rows: Iterator[Row], budget: int, state: Dict[str, Any]) -> Iterator[Row]:
+    for i, row in enumerate(rows):
+        if i >= budget:
+            state["complete"] = False
+            return
+        yield row
+
+
+def _table_select(table: str, columns: Optional[Sequence[str]]) -> str:
+    cols = ", ".join(quote_ident(c) for c in columns) if columns else "*"
+    return f"SELECT {cols} FROM {quote_ident(table)}"
+
+
+def rowid_sample(
+    conn_str: str, table: str, k: int, rng: random.Random, columns: Optional[Sequence[str]] = None
+) -> Tuple[List[str], List[Row]]:
+    """Sample up to `k` distinct rows of a sqlite table by probing random rowids."""
+    cols = ", ".join(quote_ident(c) for c in columns) if columns else "*"
+    probe = f"SELECT rowid, {cols} FROM {quote_ident(table)} WHERE rowid >= ? ORDER BY rowid LIMIT 1"
+    with get_pool_manager().connection(conn_str) as conn, interruptible(conn):
+        lo, hi = conn.execute(f"SELECT min(rowid), max(rowid) FROM {quote_ident(table)}").fetchone()
+        cur = conn.execute(probe, (lo if lo is not None else 0,))
+        names = [d[0] for d in cur.description][1:]
+        cur.close()
+        if lo is None:
+            return names, []
+        picked: Dict[int, Row] = {}
+        # a few extra probes make up for duplicates landing on the same row after a gap
+        for _ in range(4 * k):
+            if len(picked) >= k:
+                break
+            row = conn.execute(probe, (rng.randint(lo, hi),)).fetchone()
+            if row is not None:
+                picked.setdefault(row[0], tuple(row[1:]))
+    return names, [picked[r] for r in sorted(picked)]
+
+
+def _is_table(conn_str: str, table: str) -> bool:
+    with get_pool_manager().connection(conn_str) as conn:
+        row = conn.execute("SELECT type, sql FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    return bool(row) and row[0] == "table" and "WITHOUT ROWID" not in (row[1] or "").upper()
+
+
+def preview(
+    conn_str: str,
+    query: Optional[str] = None,
+    table: Optional[str] = None,
+    rows: int = DEFAULT_SAMPLE_ROWS,
+    method: str = "auto",
+    approx: bool = False,
+    columns: Optional[Sequence[str]] = None,
+    row_budget: int = DEFAULT_ROW_BUDGET,
+    seed: Optional[int] = None,
+    precision: int = DEFAULT_PRECISION,
+) -> Dict[str, Any]:
+    """Sample rows and optionally estimate counts for a table or query within a row budget."""
+    if (query is None) == (table is None):
+        raise ValueError("pass exactly one of 'query' or 'table'")
+    if query is not None and not is_read_only(query):
+        raise ValueError("query must be a read-only SELECT, WITH or VALUES statement")
+    if method not in ("auto", "rowid", "reservoir"):
+        raise ValueError("method must be 'auto', 'rowid' or 'reservoir'")
+    k = max(0, min(int(rows), MAX_SAMPLE_ROWS))
+    budget = max(1, int(row_budget))
+    rng = random.Random(seed)
+    sqlite_table = table is not None and conn_str.startswith("sqlite") and _is_table(conn_str, table)
+    if method == "rowid" and not sqlite_table:
+        raise ValueError("rowid sampling needs a sqlite table (with rowids)")
+    use_rowid = method == "rowid" or (method == "auto" and sqlite_table)
+    sql = query if query is not None else _table_select(table, columns)  # type: ignore[arg-type]
+
+    started = time.perf_counter()
+    out: Dict[str, Any] = {"method": "rowid" if use_rowid else "reservoir"}
+    names: List[str] = []
+    sample: List[Row] = []
+    if use_rowid:
+        names, sample = rowid_sample(conn_str, table, k, rng, columns)  # type: ignore[arg-type]
+        out["sample_scope"] = "table"
+    if approx or not use_rowid:
+        state: Dict[str, Any] = {"complete": True}
+        with _stream(conn_str, sql) as (names_, stream):
+            names = names_
+            limited = _budgeted(stream, budget, state)
+            if approx:
+                sketches = [HyperLogLog(precision) for _ in names]
+                non_null = [0] * len(names)
+
+                def sketched(it: Iterator[Row]) -> Iterator[Row]:
+                    for row in it:
+                        for i, value in enumerate(row):
+                            if value is not None:
+                                non_null[i] += 1
+                                sketches[i].add(value)
+                        yield row
+
+                limited = sketched(limited)
+            reservoir, scanned = reservoir_sample(limited, k if not use_rowid else 0, rng)
+        if not use_rowid:
+            sample = reservoir
+            out["sample_scope"] = "all rows" if state["complete"] else f"first {budget} rows"
+        out["rows_scanned"] = scanned
+        out["complete"] = state["complete"]
+        if approx:
+            approx_out: Dict[str, Any] = {
+                "count": scanned,
+                "count_exact": state["complete"],
+                "distinct": {n: s.estimate() for n, s in zip(names, sketches)},
+                "non_null": dict(zip(names, non_null)),
+                "relative_error": round(sketches[0].error, 4) if sketches else None,
+            }
+            if not state["complete"] and sqlite_table:
+                with get_pool_manager().connection(conn_str) as conn:
+                    estimate, source = _sqlite_row_estimates(conn, [table]).get(table, (None, None))  # type: ignore[list-item]
+                if estimate is not None and estimate > scanned:
+                    approx_out.update(count=estimate, count_source=source)
+            out["approx"] = approx_out
+    out["columns"] = names
+    out["rows"] = [dict(zip(names, r)) for r in sample]
+    out["seconds"] = round(time.perf_counter() - started, 6)
+    return out
+
+
+__all__ = ["HyperLogLog", "reservoir_sample", "rowid_sample", "preview"]
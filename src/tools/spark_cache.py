@@ -0,0 +1,355 @@
+"""Content-addressed cache of successful `run_spark_job` results.
+
+Opt-in (`spark.result_cache` in the config or `run_spark_job(cache=True)`).
+A run is keyed on the application, the argument list and a fingerprint of
+every declared input. A local application is identified by the SHA-256 of
+its contents (`app_sha256`); an HDFS one by its listing fingerprint
+(`app_fingerprint`: the WebHDFS file checksum, or size and modification
+time with the `hdfs` CLI). Local input files and directories are
+fingerprinted by size and mtime, HDFS paths by their listing. With
+`checksum=True` local files are hashed and HDFS files use the WebHDFS file
+checksum instead, which survives touch-without-change but costs a full read.
+A later call with the same key returns the stored stdout and the declared
+output locations at once, with provenance (original job ID, age, run time,
+fingerprints) instead of resubmitting the job.
+
+Entries live in `directory` as `<key>.out` (stdout) plus `<key>.json`
+(metadata), so they survive restarts. The default directory is private to
+the user (`$XDG_CACHE_HOME/etl-mcp-serv/spark-results`, created with mode
+0700); a directory owned by someone else or writable by group or others is
+refused, since a planted entry would be served as a job's output.
+
+Entries are evicted least recently used once `max_entries` or `max_bytes`
+is exceeded; stdout larger than `max_entry_bytes` is not cached. Only
+succeeded jobs are stored, and a hit whose declared outputs have
+disappeared is dropped so the job runs again.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .paths import cache_dir, ensure_private_dir
+
+DEFAULT_MAX_ENTRIES = 100
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 64 * 1024 * 1024
+KEY_VERSION = 2
+_READ_SIZE = 1024 * 1024
+
+_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_hdfs(path: str) -> bool:
+    return path.startswith("hdfs:")
+
+
+def hdfs_path(path: str) -> str:
+    """`hdfs://namenode:8020/data/x` -> `/data/x` (the namenode comes from the WebHDFS/CLI config)."""
+    rest = path[len("hdfs:"):]
+    if rest.startswith("//"):
+        slash = rest.find("/", 2)
+        rest = rest[slash:] if slash >= 0 else "/"
+    return rest or "/"
+
+
+def fingerprint(
+    path: str, kind: str, files: Optional[Sequence[Tuple[str, int, Any]]], mode: str = "mtime"
+) -> Dict[str, Any]:
+    """Summarise `(relative path, size, mtime or checksum)` triples; `files=None` means missing."""
+    if files is None:
+        return {"path": path, "kind": kind, "exists": False}
+    ordered = sorted(files)
+    return {
+        "path": path,
+        "kind": kind,
+        "exists": True,
+        "mode": mode,
+        "files": len(ordered),
+        "bytes": sum(size for _, size, _ in ordered),
+        "digest": hashlib.sha256(json.dumps(ordered, default=str).encode()).hexdigest(),
+    }
+
+
+def local_fingerprint(path: str, checksum: bool = False) -> Dict[str, Any]:
+    """Fingerprint a local file or directory tree (hidden files included)."""
+    path = os.path.abspath(path[len("file://"):] if path.startswith("file://") else path)
+    if not os.path.exists(path):
+        return fingerprint(path, "local", None)
+    if os.path.isdir(path):
+        found = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            found.extend(os.path.join(dirpath, name) for name in filenames)
+    else:
+        found = [path]
+    files = []
+    for full in found:
+        st = os.stat(full)
+        stamp = sha256_file(full) if checksum else st.st_mtime_ns
+        files.append((os.path.relpath(full, path) if full != path else "", st.st_size, stamp))
+    return fingerprint(path, "local", files, "checksum" if checksum else "mtime")
+
+
+def default_directory() -> str:
+    return cache_dir("spark-results")
+
+
+def cache_key(app_digest: str, args: Sequence[str], inputs: Sequence[Dict[str, Any]]) -> str:
+    """SHA-256 of the app's digest, the args and the input digests (input order does not matter)."""
+    material = {
+        "v": KEY_VERSION,
+        "app": app_digest,
+        "args": list(args),
+        "inputs": sorted((f["kind"], f["path"], f.get("digest")) for f in inputs),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+class SparkResultCache:
+    """On-disk LRU of job stdout and provenance, bounded by entry count and bytes."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+        enabled: bool = False,
+    ) -> None:
+        self.directory = directory or default_directory()
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes)
+        self.max_entry_bytes = int(max_entry_bytes)
+        self.enabled = bool(enabled)
+        # key -> bytes on disk (stdout + metadata), least recently used first
+        self._entries: "collections.OrderedDict[str, int]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._scanned = False
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "too_large": 0, "stale": 0, "evictions": 0}
+
+    def configure(
+        self,
+        directory: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        with self._lock:
+            if directory and directory != self.directory:
+                self.directory = directory
+                self._entries.clear()
+                self._scanned = False
+            if max_entries is not None:
+                self.max_entries = max(1, int(max_entries))
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes)
+            if max_entry_bytes is not None:
+                self.max_entry_bytes = int(max_entry_bytes)
+            if enabled is not None:
+                self.enabled = bool(enabled)
+        self._evict()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + ".out", base + ".json"
+
+    def _prepare(self) -> None:
+        ensure_private_dir(self.directory, "spark result cache directory (spark.result_cache_dir)")
+
+    def _scan(self) -> None:
+        """Index entries left by an earlier process, oldest use first (metadata mtime)."""
+        if self._scanned:
+            return
+        with self._lock:
+            if self._scanned:
+                return
+            self._prepare()
+            self._scanned = True
+            found = []
+            try:
+                listing = list(os.scandir(self.directory))
+            except OSError:
+                return
+            for de in listing:
+                key = de.name[: -len(".json")]
+                if not de.name.endswith(".json") or not _KEY_RE.fullmatch(key) or key in self._entries:
+                    continue
+                out, _ = self._paths(key)
+                try:
+                    st = de.stat()
+                    found.append((st.st_mtime, key, st.st_size + os.path.getsize(out)))
+                except OSError:
+                    continue
+            for _, key, size in sorted(found):
+                self._entries[key] = size
+        self._evict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Metadata of a cached run (marked as recently used), or None."""
+        self._scan()
+        _, meta_path = self._paths(key)
+        with self._lock:
+            if key not in self._entries:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(meta_path, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            self.invalidate(key)
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        with self._lock:
+            self._counters["hits"] += 1
+        return meta
+
+    def read_stdout(self, key: str) -> str:
+        return b"".join(self.iter_stdout(key)).decode("utf-8", errors="replace")
+
+    def iter_stdout(self, key: str) -> Iterator[bytes]:
+        """Stream a cached run's stdout in blocks, for copying it into the result store."""
+        out, _ = self._paths(key)
+        with open(out, "rb") as fh:
+            yield from iter(lambda: fh.read(_READ_SIZE), b"")
+
+    def put(self, key: str, meta: Dict[str, Any], chunks: Iterable[bytes]) -> bool:
+        """Store a run's stdout (streamed from `chunks`) and metadata; False if stdout is too large."""
+        self._scan()
+        self._prepare()
+        out, meta_path = self._paths(key)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp, meta_tmp = out + suffix, meta_path + suffix
+        size = 0
+        try:
+            with open(tmp, "wb") as fh:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_entry_bytes:
+                        with self._lock:
+                            self._counters["too_large"] += 1
+                        return False
+                    fh.write(chunk)
+            meta = dict(meta, key=key, stdout_bytes=size)
+            with open(meta_tmp, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            os.replace(tmp, out)
+            os.replace(meta_tmp, meta_path)
+        finally:
+            for leftover in (tmp, meta_tmp):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        with self._lock:
+            self._entries[key] = size + os.path.getsize(meta_path)
+            self._entries.move_to_end(key)
+            self._counters["stores"] += 1
+        self._evict(keep=key)
+        return True
+
+    def mark_stale(self, key: str) -> None:
+        """Drop a hit whose outputs are gone."""
+        with self._lock:
+            self._counters["stale"] += 1
+        self.invalidate(key)
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        doomed = []
+        with self._lock:
+            total = sum(self._entries.values())
+            for key in list(self._entries):
+                if len(self._entries) <= self.max_entries and total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                total -= self._entries.pop(key)
+                doomed.append(key)
+            self._counters["evictions"] += len(doomed)
+        for key in doomed:
+            self._remove(key)
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one entry, or every entry when `key` is None; returns how many were dropped."""
+        self._scan()
+        with self._lock:
+            keys = list(self._entries) if key is None else [key] if key in self._entries else []
+            for k in keys:
+                del self._entries[k]
+        for k in keys:
+            self._remove(k)
+        return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def stats(self, reset: bool = False) -> Dict[str, Any]:
+        self._scan()
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counters)
+            out.update(
+                enabled=self.enabled,
+                entries=len(self._entries),
+                bytes=sum(self._entries.values()),
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                directory=self.directory,
+            )
+            if reset:
+                for name in self._counters:
+                    self._counters[name] = 0
+        return out
+
+
+def provenance(meta: Dict[str, Any], hit: bool) -> Dict[str, Any]:
+    """The `cache` block returned alongside a job's stdout."""
+    out = {k: v for k, v in meta.items() if k != "stdout_bytes"}
+    out["hit"] = hit
+    if hit:
+        out["age_seconds"] = round(time.time() - meta["created_at"], 3)
+    return out
+
+
+_CACHE = SparkResultCache()
+
+
+def get_spark_cache() -> SparkResultCache:
+    return _CACHE
+
+
+__all__ = [
+    "SparkResultCache",
+    "get_spark_cache",
+    "cache_key",
+    "default_directory",
+    "fingerprint",
+    "local_fingerprint",
+    "sha256_file",
+    "is_hdfs",
+    "hdfs_path",
+    "provenance",
+]
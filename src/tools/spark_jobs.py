@@ -0,0 +1,432 @@
+"""Background `spark-submit` jobs with IDs, status, log tails and cancellation.
+
+Jobs run on a private event loop thread so they outlive the tool call that
+submitted them. At most `max_concurrent` jobs run at once; the rest wait in
+submission order. Each job's stdout/stderr is kept in a byte-bounded ring of
+recent lines; lines pushed out of the ring are appended to a per-job spill
+file, so a chatty job costs at most `log_buffer_bytes` of memory per stream
+while its full log remains on disk. Logs can hold credentials or data, so
+`log_dir` defaults to `$XDG_CACHE_HOME/etl-mcp-serv/spark-logs` and must be
+private to the user (see `paths.py`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import os
+import shutil
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .paths import cache_dir, ensure_private_dir
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_LOG_BUFFER_BYTES = 256 * 1024
+DEFAULT_MAX_JOBS = 100
+DEFAULT_CANCEL_GRACE = 5.0
+_READ_SIZE = 64 * 1024
+
+ACTIVE_STATES = ("queued", "running")
+
+
+class LogBuffer:
+    """Recent lines of one output stream, bounded by bytes, spilling to disk."""
+
+    def __init__(self, max_bytes: int, spill_path: str) -> None:
+        self.max_bytes = max(1, int(max_bytes))
+        self.spill_path = spill_path
+        self.lines: Deque[bytes] = collections.deque()
+        self.buffered = 0
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.spilled_lines = 0
+        self._partial = b""
+        self._spill: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        data = self._partial + data
+        *complete, self._partial = data.split(b"\n")
+        if len(self._partial) > self.max_bytes:
+            # a single unterminated line larger than the buffer: flush it as-is
+            complete.append(self._partial)
+            self._partial = b""
+        with self._lock:
+            for line in complete:
+                self._append(line)
+
+    def finish(self) -> None:
+        with self._lock:
+            if self._partial:
+                self._append(self._partial)
+                self._partial = b""
+            if self._spill is not None:
+                self._spill.flush()
+
+    def _append(self, line: bytes) -> None:
+        self.lines.append(line)
+        self.buffered += len(line) + 1
+        self.total_lines += 1
+        while self.buffered > self.max_bytes and len(self.lines) > 1:
+            old = self.lines.popleft()
+            self.buffered -= len(old) + 1
+            if self._spill is None:
+                self._spill = open(self.spill_path, "ab")
+            self._spill.write(old + b"\n")
+            self.spilled_lines += 1
+
+    def tail(self, lines: int) -> List[str]:
+        """Return up to the last `lines` lines, reading back from the spill file if needed."""
+        with self._lock:
+            recent = list(self.lines)[-lines:] if lines > 0 else []
+            missing = lines - len(recent)
+            if missing > 0 and self.spilled_lines:
+                if self._spill is not None:
+                    self._spill.flush()
+                recent = _tail_file(self.spill_path, missing) + recent
+        return [line.decode(errors="replace") for line in recent]
+
+    def iter_bytes(self, block: int = _READ_SIZE) -> Iterator[bytes]:
+        """The whole stream of a finished job: spill file blocks, then the buffered lines."""
+        if self.spilled_lines:
+            with self._lock:
+                if self._spill is not None:
+                    self._spill.flush()
+            with open(self.spill_path, "rb") as fh:
+                while True:
+                    data = fh.read(block)
+                    if not data:
+                        break
+                    yield data
+        with self._lock:
+            lines = list(self.lines)
+        for i in range(0, len(lines), 1024):
+            yield b"".join(line + b"\n" for line in lines[i : i + 1024])
+
+    def close(self, remove: bool = False) -> None:
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+        if remove:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lines": self.total_lines,
+            "bytes": self.total_bytes,
+            "buffered_bytes": self.buffered,
+            "spilled_lines": self.spilled_lines,
+            "spill_file": self.spill_path if self.spilled_lines else None,
+        }
+
+
+def _tail_file(path: str, lines: int) -> List[bytes]:
+    """Last `lines` lines of a file, reading backwards in blocks."""
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            pos = fh.tell()
+            data = b""
+            while pos > 0 and data.count(b"\n") <= lines:
+                step = min(_READ_SIZE, pos)
+                pos -= step
+                fh.seek(pos)
+                data = fh.read(step) + data
+    except OSError:
+        return []
+    return data.rstrip(b"\n").split(b"\n")[-lines:] if data else []
+
+
+class SparkJob:
+    """One submitted application and its bounded logs."""
+
+    def __init__(self, app_path: str, args: List[str], timeout: Optional[float], log_dir: str, buffer_bytes: int) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.app_path = app_path
+        self.args = list(args)
+        self.timeout = timeout
+        self.state = "queued"
+        self.returncode: Optional[int] = None
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.pid: Optional[int] = None
+        self.stdout = LogBuffer(buffer_bytes, os.path.join(log_dir, f"{self.id}.stdout.log"))
+        self.stderr = LogBuffer(buffer_bytes, os.path.join(log_dir, f"{self.id}.stderr.log"))
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.future: Optional[Future] = None
+        self.cancel_requested = False
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    def describe(self) -> Dict[str, Any]:
+        end = self.finished or time.time()
+        return {
+            "job_id": self.id,
+            "app_path": self.app_path,
+            "args": self.args,
+            "state": self.state,
+            "returncode": self.returncode,
+            "error": self.error,
+            "pid": self.pid,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": round(end - self.started, 3) if self.started else None,
+            "stdout": self.stdout.stats(),
+            "stderr": self.stderr.stats(),
+        }
+
+
+class SparkJobManager:
+    """Runs `spark-submit` jobs in the background with a concurrency limit."""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        log_buffer_bytes: int = DEFAULT_LOG_BUFFER_BYTES,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        log_dir: Optional[str] = None,
+        default_timeout: Optional[float] = None,
+    ) -> None:
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.log_buffer_bytes = int(log_buffer_bytes)
+        self.max_jobs = max(1, int(max_jobs))
+        self.log_dir = log_dir or cache_dir("spark-logs")
+        self.default_timeout = default_timeout
+        self._jobs: "collections.OrderedDict[str, SparkJob]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def configure(
+        self,
+        max_concurrent: Optional[int] = None,
+        log_buffer_bytes: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        log_dir: Optional[str] = None,
+        default_timeout: Optional[float] = None,
+    ) -> None:
+        """Update limits; a new concurrency limit applies to jobs submitted afterwards."""
+        with self._lock:
+            if max_concurrent is not None:
+                self.max_concurrent = max(1, int(max_concurrent))
+                self._slots = None
+            if log_buffer_bytes is not None:
+                self.log_buffer_bytes = int(log_buffer_bytes)
+            if max_jobs is not None:
+                self.max_jobs = max(1, int(max_jobs))
+            if log_dir:
+                self.log_dir = log_dir
+            if default_timeout is not None:
+                self.default_timeout = float(default_timeout) or None
+
+    # ---------- loop thread ----------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="spark-jobs", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # created lazily on the manager loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        return self._slots
+
+    # ---------- public API ----------
+
+    def submit(self, app_path: str, args: Optional[List[str]] = None, timeout: Optional[float] = None) -> SparkJob:
+        executable = shutil.which("spark-submit")
+        if executable is None:
+            raise RuntimeError(
+                "spark-submit not found on PATH: install Apache Spark or add `spark-submit` to PATH to run jobs"
+            )
+        ensure_private_dir(self.log_dir, "spark log directory (spark.log_dir)")
+        job = SparkJob(
+            app_path,
+            args or [],
+            timeout if timeout is not None else self.default_timeout,
+            self.log_dir,
+            self.log_buffer_bytes,
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job, executable), self._ensure_loop())
+        return job
+
+    def get(self, job_id: str) -> SparkJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def jobs(self) -> List[SparkJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str, grace: float = DEFAULT_CANCEL_GRACE) -> SparkJob:
+        """Cancel a queued job or terminate (then kill) a running one."""
+        job = self.get(job_id)
+        if not job.active or self._loop is None:
+            return job
+        job.cancel_requested = True
+        asyncio.run_coroutine_threadsafe(self._terminate(job, grace), self._loop).result(grace + 5)
+        return job
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> SparkJob:
+        """Wait (from any event loop) for a job to finish."""
+        job = self.get(job_id)
+        if job.future is not None:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        return job
+
+    def close(self) -> None:
+        """Kill running jobs and stop the loop thread."""
+        for job in self.jobs():
+            if job.active:
+                try:
+                    self.cancel(job.id, grace=1.0)
+                except Exception:
+                    pass
+                if job.future is not None:
+                    job.future.cancel()
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._slots = None
+            jobs, self._jobs = list(self._jobs.values()), collections.OrderedDict()
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=5)
+            loop.close()
+        for job in jobs:
+            job.stdout.close(remove=True)
+            job.stderr.close(remove=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states = collections.Counter(job.state for job in self._jobs.values())
+        return {"max_concurrent": self.max_concurrent, "jobs": dict(states)}
+
+    # ---------- internals ----------
+
+    def _evict_finished(self) -> None:
+        """Drop the oldest finished jobs (and their spill files) beyond `max_jobs`."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [j.id for j in self._jobs.values() if not j.active][: max(0, excess)]:
+            job = self._jobs.pop(job_id)
+            job.stdout.close(remove=True)
+            job.stderr.close(remove=True)
+
+    async def _pump(self, stream: Optional[asyncio.StreamReader], buf: LogBuffer) -> None:
+        if stream is None:
+            return
+        while True:
+            chunk = await stream.read(_READ_SIZE)
+            if not chunk:
+                break
+            buf.write(chunk)
+        buf.finish()
+
+    async def _run(self, job: SparkJob, executable: str) -> None:
+        async with self._semaphore():
+            if job.cancel_requested:
+                job.state, job.finished = "cancelled", time.time()
+                return
+            try:
+                job.proc = await asyncio.create_subprocess_exec(
+                    executable,
+                    job.app_path,
+                    *job.args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                job.state, job.error, job.finished = "failed", str(exc), time.time()
+                return
+            job.pid, job.started, job.state = job.proc.pid, time.time(), "running"
+            pumps = asyncio.gather(self._pump(job.proc.stdout, job.stdout), self._pump(job.proc.stderr, job.stderr))
+            try:
+                await asyncio.wait_for(job.proc.wait(), job.timeout)
+            except asyncio.TimeoutError:
+                await self._terminate(job, DEFAULT_CANCEL_GRACE)
+                job.state = "timed_out"
+            await pumps
+            job.returncode = job.proc.returncode
+            job.finished = time.time()
+            if job.state == "running":
+                if job.cancel_requested:
+                    job.state = "cancelled"
+                else:
+                    job.state = "succeeded" if job.returncode == 0 else "failed"
+            job.stdout.close()
+            job.stderr.close()
+            job.proc = None
+
+    async def _terminate(self, job: SparkJob, grace: float) -> None:
+        proc = job.proc
+        if proc is None:
+            # still queued: `_run` sees the flag once it gets a slot
+            if job.state == "queued":
+                job.state, job.finished = "cancelled", time.time()
+            return
+        if proc.returncode is not None:
+            return
+        # spark-submit is a launcher script: signal its whole process group so
+        # the JVM (which holds the log pipes) goes down with it
+        try:
+            _signal_group(proc, signal.SIGTERM)
+            await asyncio.wait_for(proc.wait(), grace)
+        except asyncio.TimeoutError:
+            _signal_group(proc, signal.SIGKILL)
+            await proc.wait()
+        except ProcessLookupError:
+            pass
+        # reap stragglers still holding the pipes
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def _signal_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(proc.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        proc.send_signal(sig)
+
+
+_MANAGER = SparkJobManager()
+
+
+def get_job_manager() -> SparkJobManager:
+    return _MANAGER
+
+
+def close_job_manager() -> None:
+    _MANAGER.close()
+
+
+__all__ = ["LogBuffer", "SparkJob", "SparkJobManager", "get_job_manager", "close_job_manager"]
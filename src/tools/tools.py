@@ -1,41 +1,106 @@
 from __future__ import annotations
 
 import asyncio
+import glob
 import json
+import logging
+import os
+import posixpath
 import shutil
-import subprocess
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from .registry import tool
+from . import encoders
+from .advisor import advise, explain, get_query_log
+from .cache import get_query_cache, is_cacheable, is_read_only
+from .catalog import get_catalog
+from .coalesce import get_single_flight
+from .cursors import get_cursor_store
+from .db_executor import QueryCancelled, get_db_executor, interruptible
+from .hdfs_download import cli_head_lines, cli_read_range, download_many, head_lines, read_range
+from .hdfs_listing import DirectoryCache, get_directory_cache, list_dir, walk_cli, walk_webhdfs
+from .hdfs_upload import upload_many
+from .incremental import extract, get_watermark_store
+from .loader import bulk_load
+from .metrics import get_metrics
+from .pipeline import run_pipeline
+from .pool import get_pool_manager
+from .profiling import get_profiler
+from .registry import get_tool, tool
+from .results import get_result_store
+from .sampling import preview
+from .spark_cache import (
+    cache_key,
+    fingerprint,
+    get_spark_cache,
+    hdfs_path,
+    is_hdfs,
+    local_fingerprint,
+    provenance,
+    sha256_file,
+)
+from .spark_jobs import LogBuffer, SparkJob, get_job_manager
+from .webhdfs import WebHDFSError, get_webhdfs_client, webhdfs_url
 
+logger = logging.getLogger(__name__)
 
-@tool()
-async def run_spark_job(app_path: str, args: Optional[List[str]] = None, timeout: float = 300.0) -> str:
+
+@tool(max_concurrency=4, max_queue=16, priority="low", coalesce=False)
+async def run_spark_job(
+    app_path: str,
+    args: Optional[List[str]] = None,
+    timeout: float = 300.0,
+    cache: Optional[bool] = None,
+    inputs: Optional[List[str]] = None,
+    outputs: Optional[List[str]] = None,
+    checksum: bool = False,
+) -> str:
     """Run a Spark job using `spark-submit` if available, otherwise provide guidance.
 
-    This function prefers calling the `spark-submit` CLI (non-blocking via asyncio).
+    The job runs through the background job manager and this call waits for
+    it, so output is held in bounded log buffers rather than fully in memory.
+    Output larger than the result store threshold is streamed to a spill file
+    and returned as a handle (see `result_read`).
+    For long jobs prefer `spark_submit` plus `spark_job_status`/`spark_job_logs`.
     If `spark-submit` isn't on PATH but `pyspark` is importable, it will return a message
     describing how to run it programmatically. This keeps the project lightweight while
     providing helpful behavior when Spark is available.
+
+    With the result cache on (`cache=True`, or `spark.result_cache` when
+    `cache` is omitted) a successful run returns JSON `{"stdout", "cache"}`;
+    stdout over the result store threshold comes as `stdout_handle` (read it
+    with `result_read`) instead, on a hit as on a miss.
+    A call with the same app (a local file's SHA-256, an HDFS file's
+    checksum or listing), `args` and `inputs` (local paths or `hdfs://`
+    URIs, fingerprinted by size/mtime, or by content with
+    `checksum=True`) as an earlier successful run is answered from the cache
+    without running spark-submit; `cache` then carries the original job's
+    provenance. `outputs` are recorded and must still exist for a hit.
+    Failed runs are never cached. See `spark_cache.py`.
     """
     args = args or []
+    key: Optional[str] = None
+    meta: Optional[Dict[str, Any]] = None
+    use_cache = get_spark_cache().enabled if cache is None else cache
+    if use_cache:
+        key, meta, cached = await _spark_cache_lookup(app_path, args, inputs or [], outputs or [], checksum)
+        if cached is not None:
+            return cached
     if shutil.which("spark-submit"):
-        # call spark-submit asynchronously
-        proc = await asyncio.create_subprocess_exec(
-            "spark-submit",
-            app_path,
-            *args,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+        manager = get_job_manager()
+        job = manager.submit(app_path, args, timeout=timeout)
         try:
-            out, err = await asyncio.wait_for(proc.communicate(), timeout=timeout)
-        except asyncio.TimeoutError:
-            proc.kill()
+            await manager.wait(job.id)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(manager.cancel, job.id)
+            raise
+        if job.state == "timed_out":
             return "spark-submit timed out"
-        if proc.returncode == 0:
-            return out.decode(errors="ignore")
-        return f"spark-submit failed (rc={proc.returncode}):\n" + err.decode(errors="ignore")
+        if job.state == "succeeded":
+            if meta is not None:
+                return await _spark_cache_store(job, key, meta)
+            return await _job_result(job, job.stdout, "stdout")
+        return f"spark-submit failed (rc={job.returncode}):\n" + await _job_result(job, job.stderr, "stderr")
 
     # fallback message when spark isn't available
     try:
@@ -52,14 +117,291 @@ async def run_spark_job(app_path: str, args: Optional[List[str]] = None, timeout
         )
 
 
-@tool()
-async def hdfs_list(path: str) -> List[str]:
+def _job_output(buf: LogBuffer) -> str:
+    """Buffered output of a finished job, noting where spilled lines went."""
+    lines = buf.tail(len(buf.lines))
+    text = "\n".join(lines) + ("\n" if lines else "")
+    if buf.spilled_lines:
+        text = f"[{buf.spilled_lines} earlier lines in {buf.spill_path}]\n" + text
+    return text
+
+
+async def _job_result(job: SparkJob, buf: LogBuffer, stream: str) -> str:
+    """A finished job's stream inline, or spilled to the result store when large."""
+    store = get_result_store()
+    if not buf.spilled_lines and buf.total_bytes <= store.threshold:
+        return _job_output(buf)
+    summary = {"job_id": job.id, "stream": stream, "returncode": job.returncode, "tail": buf.tail(20)}
+    return await asyncio.to_thread(store.spill_chunks, buf.iter_bytes(), "run_spark_job", "text/plain", summary)
+
+
+async def _hdfs_fingerprint(uri: str, checksum: bool) -> Dict[str, Any]:
+    """Fingerprint an HDFS file or tree from a fresh (uncached) listing."""
+    path = hdfs_path(uri)
+    fresh = DirectoryCache(ttl=0)
+    if _use_webhdfs():
+        import httpx
+
+        client = get_webhdfs_client()
+        try:
+            entries, truncated = await walk_webhdfs(client, path, cache=fresh)
+            files = [e for e in entries if e["type"] == "file"]
+            if checksum:
+                sem = asyncio.Semaphore(8)
+
+                async def file_checksum(p: str) -> str:
+                    async with sem:
+                        return (await client.checksum(p)).get("bytes", "")
+
+                stamps = await asyncio.gather(*(file_checksum(e["path"]) for e in files))
+            else:
+                stamps = [e["mtime"] for e in files]
+        except WebHDFSError as exc:
+            if exc.status == 404:
+                return fingerprint(uri, "hdfs", None)
+            raise
+        except httpx.TransportError as exc:
+            raise _webhdfs_unavailable(exc) from exc
+        mode = "checksum" if checksum else "mtime"
+    else:
+        # the CLI has no cheap per-file checksum in listings: size/mtime (minute resolution) only
+        try:
+            entries, truncated = await walk_cli(path, cache=fresh)
+        except RuntimeError as exc:
+            if "No such file" in str(exc):
+                return fingerprint(uri, "hdfs", None)
+            raise
+        files = [e for e in entries if e["type"] == "file"]
+        stamps = [e["mtime"] for e in files]
+        mode = "mtime"
+    triples = [
+        (posixpath.relpath(e["path"], path) if e["path"] != path else "", e["size"], stamp)
+        for e, stamp in zip(files, stamps)
+    ]
+    out = fingerprint(uri, "hdfs", triples, mode)
+    if truncated:
+        out["truncated"] = True
+    return out
+
+
+async def _output_exists(path: str) -> bool:
+    if not is_hdfs(path):
+        return os.path.exists(path[len("file://"):] if path.startswith("file://") else path)
+    if _use_webhdfs():
+        return await get_webhdfs_client().exists(hdfs_path(path))
+    proc = await asyncio.create_subprocess_exec(
+        "hdfs", "dfs", "-test", "-e", hdfs_path(path), stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+    )
+    return await proc.wait() == 0
+
+
+async def _spark_cache_lookup(
+    app_path: str, args: List[str], inputs: List[str], outputs: List[str], checksum: bool
+) -> Tuple[Optional[str], Dict[str, Any], Optional[str]]:
+    """Return (key, metadata, cached result); key is None when the run cannot be cached."""
+    meta: Dict[str, Any] = {"app_path": app_path, "args": args, "outputs": outputs}
+
+    def fingerprint_of(path: str, by_content: bool) -> Any:
+        if is_hdfs(path):
+            return _hdfs_fingerprint(path, by_content)
+        return asyncio.to_thread(local_fingerprint, path, by_content)
+
+    async def app_identity() -> Dict[str, Any]:
+        """`app_sha256` of a local file, else the listing `app_fingerprint` of an HDFS file."""
+        if is_hdfs(app_path):
+            app = await _hdfs_fingerprint(app_path, True)
+            if not app["exists"] or app["files"] != 1:
+                return {}
+            return {"app_fingerprint": app["digest"], "app_fingerprint_mode": app["mode"]}
+        local = app_path[len("file://"):] if app_path.startswith("file://") else app_path
+        if not os.path.isfile(local):
+            return {}
+        return {"app_sha256": await asyncio.to_thread(sha256_file, local)}
+
+    identity, *fps = await asyncio.gather(app_identity(), *(fingerprint_of(p, checksum) for p in inputs))
+    meta["inputs"] = fps
+    if not identity:
+        meta["reason"] = f"app {app_path!r} is not a local or HDFS file"
+    elif any(f.get("truncated") for f in fps):
+        meta["reason"] = "an input has too many files to fingerprint"
+    if "reason" in meta:
+        return None, meta, None
+    meta.update(identity)
+    key = cache_key(identity.get("app_sha256") or identity["app_fingerprint"], args, meta["inputs"])
+
+    store = get_spark_cache()
+    hit = await asyncio.to_thread(store.get, key)
+    if hit is None:
+        return key, meta, None
+    if not all(await asyncio.gather(*(_output_exists(p) for p in hit.get("outputs", [])))):
+        await asyncio.to_thread(store.mark_stale, key)
+        return key, meta, None
+    info = provenance(hit, hit=True)
+    summary = {"job_id": hit.get("job_id"), "stream": "stdout", "cache_hit": True}
+    try:
+        stdout = await asyncio.to_thread(_stdout_fields, store.iter_stdout(key), hit.get("stdout_bytes", 0), summary)
+    except OSError:  # evicted or cleared since `get`
+        await asyncio.to_thread(store.invalidate, key)
+        return key, meta, None
+    return key, meta, _spark_cache_payload(stdout, info)
+
+
+def _stdout_fields(chunks: Iterable[bytes], size: int, summary: Dict[str, Any]) -> Dict[str, Any]:
+    """`{"stdout": text}` up to the result store threshold, else `{"stdout_handle": ...}` streamed to it."""
+    store = get_result_store()
+    if size <= store.threshold:
+        return {"stdout": b"".join(chunks).decode("utf-8", errors="replace")}
+    return {"stdout_handle": store.store_chunks(chunks, "run_spark_job", "text/plain", summary)}
+
+
+def _spark_cache_payload(stdout: Dict[str, Any], info: Dict[str, Any]) -> str:
+    summary = {k: info.get(k) for k in ("hit", "key", "job_id")}
+    return get_result_store().maybe_spill(
+        json.dumps({**stdout, "cache": info}), "run_spark_job", "application/json", summary
+    )
+
+
+async def _spark_cache_store(job: SparkJob, key: Optional[str], meta: Dict[str, Any]) -> str:
+    """Cache a succeeded job's stdout (when cacheable) and return the JSON result."""
+    stored = False
+    if key is not None:
+        meta.update(
+            job_id=job.id,
+            created_at=job.finished or time.time(),
+            run_seconds=round((job.finished or time.time()) - (job.started or job.submitted), 3),
+        )
+        stored = await asyncio.to_thread(get_spark_cache().put, key, meta, job.stdout.iter_bytes())
+    if not stored:
+        meta.setdefault("reason", "stdout exceeds the cache entry limit")
+    summary = {"job_id": job.id, "stream": "stdout", "cache_hit": False}
+    stdout = await asyncio.to_thread(_stdout_fields, job.stdout.iter_bytes(), job.stdout.total_bytes, summary)
+    return _spark_cache_payload(stdout, dict(provenance(meta, hit=False), key=key, stored=stored))
+
+
+def _spark_job(job_id: str) -> SparkJob:
+    try:
+        return get_job_manager().get(job_id)
+    except KeyError:
+        raise RuntimeError(f"unknown spark job {job_id!r} (finished jobs are retained up to a limit)") from None
+
+
+@tool(priority="high", coalesce=False)
+async def spark_submit(app_path: str, args: Optional[List[str]] = None, timeout: Optional[float] = None) -> str:
+    """Submit a Spark job in the background and return its job ID and status as JSON.
+
+    Returns immediately; at most `spark.max_concurrent_jobs` jobs run at once
+    and the rest are queued. Poll with `spark_job_status`, read output with
+    `spark_job_logs` and stop with `spark_job_cancel`. `timeout` (seconds)
+    kills the job if it runs longer.
+    """
+    job = get_job_manager().submit(app_path, args or [], timeout=timeout)
+    return json.dumps(job.describe())
+
+
+@tool(priority="high")
+async def spark_job_status(job_id: Optional[str] = None) -> str:
+    """Return a job's state, return code and log sizes as JSON; all jobs when `job_id` is omitted."""
+    if job_id is None:
+        return json.dumps([job.describe() for job in get_job_manager().jobs()])
+    return json.dumps(_spark_job(job_id).describe())
+
+
+@tool(priority="high")
+async def spark_job_logs(job_id: str, stream: str = "stderr", lines: int = 100) -> str:
+    """Return the last `lines` lines of a job's `stdout` or `stderr` (Spark logs to stderr)."""
+    if stream not in ("stdout", "stderr"):
+        raise ValueError("stream must be 'stdout' or 'stderr'")
+    job = _spark_job(job_id)
+    buf = job.stdout if stream == "stdout" else job.stderr
+    return "\n".join(await asyncio.to_thread(buf.tail, max(0, lines)))
+
+
+@tool(priority="high")
+async def spark_job_cancel(job_id: str) -> str:
+    """Cancel a queued or running job (SIGTERM, then SIGKILL after a grace period)."""
+    job = _spark_job(job_id)
+    if not job.active:
+        return f"job {job_id} already {job.state}"
+    await asyncio.to_thread(get_job_manager().cancel, job_id)
+    return f"job {job_id} {job.state}"
+
+
+@tool(priority="high")
+async def spark_cache_stats(reset: bool = False, clear: bool = False) -> str:
+    """Return Spark result cache counters (hits, misses, stores, evictions, ...) as JSON.
+
+    `reset` zeroes the counters after reading them; `clear` drops all entries.
+    """
+    cache = get_spark_cache()
+    stats = await asyncio.to_thread(cache.stats, reset)
+    if clear:
+        await asyncio.to_thread(cache.clear)
+    return json.dumps(stats)
+
+
+def _use_webhdfs() -> bool:
+    """WebHDFS wins when a namenode URL is configured or the `hdfs` CLI is missing."""
+    return webhdfs_url() is not None or not shutil.which("hdfs")
+
+
+def _webhdfs_unavailable(exc: Exception) -> RuntimeError:
+    return RuntimeError(
+        f"No HDFS client available ({exc}): configure a WebHDFS namenode URL "
+        "(hdfs.namenode_url / WEBHDFS_URL) or install the Hadoop CLI (hdfs)."
+    )
+
+
+@tool(coalesce=True)
+async def hdfs_list(
+    path: str,
+    recursive: bool = False,
+    details: bool = False,
+    pattern: Optional[str] = None,
+    partitions: Optional[Dict[str, str]] = None,
+    max_depth: Optional[int] = None,
+    concurrency: int = 16,
+    limit: int = 100_000,
+) -> List[Any]:
     """List files in an HDFS path.
 
-    Tries to use the `hdfs` CLI (`hdfs dfs -ls -C`) if available, otherwise tries a
-    Python HDFS client (`hdfs` package). Returns a list of paths or raises RuntimeError with guidance.
+    Uses the async WebHDFS client (pooled HTTP connections, no subprocess) when a
+    namenode URL is configured, otherwise the `hdfs` CLI (`hdfs dfs -ls -C`), and
+    finally WebHDFS on the default namenode address. Returns a list of paths or
+    raises RuntimeError with guidance.
+
+    - `recursive=True` walks subdirectories (WebHDFS: up to `concurrency`
+      listings in flight; CLI: one `hdfs dfs -ls -R`), optionally to `max_depth`.
+    - `details=True` returns `{"path", "type", "size", "mtime", "replication"}`
+      objects instead of path strings.
+    - `pattern` globs the path relative to `path`; `partitions` such as
+      `{"dt": "2024-01-*"}` prune non-matching `key=value` directories.
+    - Listings are cached for a few seconds (see `hdfs_listing.py`); at most
+      `limit` entries are returned.
     """
-    if shutil.which("hdfs"):
+    walk = recursive or details or pattern is not None or partitions
+    if _use_webhdfs():
+        import httpx
+
+        try:
+            if not walk:
+                return [e["path"] for e in await list_dir(get_webhdfs_client(), path)]
+            entries, truncated = await walk_webhdfs(
+                get_webhdfs_client(),
+                path,
+                recursive=recursive,
+                max_depth=max_depth,
+                pattern=pattern,
+                partitions=partitions,
+                concurrency=concurrency,
+                limit=limit,
+            )
+        except httpx.TransportError as exc:
+            raise _webhdfs_unavailable(exc) from exc
+    elif walk:
+        entries, truncated = await walk_cli(
+            path, recursive=recursive, max_depth=max_depth, pattern=pattern, partitions=partitions, limit=limit
+        )
+    else:
         cmd = ["hdfs", "dfs", "-ls", "-C", path]
         proc = await asyncio.create_subprocess_exec(
             *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
@@ -70,81 +412,704 @@ async def hdfs_list(path: str) -> List[str]:
         lines = out.decode().splitlines()
         return [ln.strip() for ln in lines if ln.strip()]
 
-    try:
-        from hdfs import InsecureClient  # type: ignore
+    if truncated:
+        logger.warning("hdfs_list %s truncated at %d entries", path, limit)
+    return entries if details else [e["path"] for e in entries]
 
-        client = InsecureClient("http://localhost:50070")
-        # simple listing
-        return client.list(path)
-    except Exception:
-        raise RuntimeError(
-            "No HDFS client available: install Hadoop CLI (hdfs) or the `hdfs` Python package and configure the client."
-        )
 
+@tool(max_concurrency=4, priority="low", coalesce=False)
+async def hdfs_put(
+    local_path: str,
+    hdfs_path: str,
+    parallelism: int = 8,
+    overwrite: bool = False,
+    skip_unchanged: bool = True,
+    verify: Optional[str] = None,
+) -> str:
+    """Upload a local file, directory or glob to HDFS. Returns success message or raises RuntimeError.
 
-@tool()
-async def hdfs_put(local_path: str, hdfs_path: str) -> str:
-    """Upload a local file to HDFS. Returns success message or raises RuntimeError."""
-    if shutil.which("hdfs"):
-        cmd = ["hdfs", "dfs", "-put", local_path, hdfs_path]
-        proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-        out, err = await proc.communicate()
-        if proc.returncode != 0:
-            raise RuntimeError("hdfs put failed: " + err.decode(errors="ignore"))
-        return out.decode(errors="ignore") or "uploaded"
+    Backend selection matches `hdfs_list`. Over WebHDFS:
 
-    try:
-        from hdfs import InsecureClient  # type: ignore
+    - a directory is uploaded recursively under `hdfs_path`; glob matches land
+      in `hdfs_path` by file name;
+    - up to `parallelism` files are streamed concurrently in fixed-size chunks;
+    - unchanged destination files are skipped (`skip_unchanged`); other
+      existing files need `overwrite=True`. `verify` picks the test:
+      `checksum` (same size and matching HDFS checksum; reads every candidate
+      in full, fast only with the optional `crc32c` package), `mtime` (same
+      size and the HDFS copy is newer than the local file) or `size`. The
+      default is `checksum` when `crc32c` is installed, else `mtime`, which
+      can miss same-size edits (clock skew, `cp -p`/rsync/tar keeping old
+      mtimes): pass `verify="checksum"` when that matters.
 
-        client = InsecureClient("http://localhost:50070")
-        client.upload(hdfs_path, local_path)
-        return "uploaded"
-    except Exception:
-        raise RuntimeError("No HDFS client available: install Hadoop CLI or `hdfs` python package.")
+    A single file returns `"uploaded <path>"` / `"skipped <path> (unchanged)"`;
+    directories and globs return a JSON summary with per-file status, bytes,
+    seconds and MB/s. The CLI backend uploads everything in one `hdfs dfs -put`
+    and does not skip unchanged files.
+    """
+    return await _hdfs_put(local_path, hdfs_path, parallelism, overwrite, skip_unchanged, verify)
 
 
-@tool()
-async def run_sql_query(conn_str: str, query: str, fetch: int = 100) -> str:
-    """Run SQL and return JSON-serializable results (stringified JSON for the tool payload).
+async def _hdfs_put(
+    local_path: str,
+    hdfs_path: str,
+    parallelism: int = 8,
+    overwrite: bool = False,
+    skip_unchanged: bool = True,
+    verify: Optional[str] = None,
+) -> str:
+    """`hdfs_put` without the tool wrapper, for tools that already hold an admission slot."""
+    if _use_webhdfs():
+        import httpx
 
-    - If SQLAlchemy is available we use it.
-    - If conn_str points to sqlite (sqlite:///...) we use the stdlib sqlite3.
+        single = os.path.isfile(local_path)
+        try:
+            summary = await upload_many(
+                get_webhdfs_client(),
+                local_path,
+                hdfs_path,
+                parallelism=parallelism,
+                overwrite=overwrite,
+                skip_unchanged=skip_unchanged,
+                fail_fast=single,
+                verify=verify,
+            )
+        except httpx.TransportError as exc:
+            raise _webhdfs_unavailable(exc) from exc
+        except (OSError, WebHDFSError) as exc:
+            raise RuntimeError(f"hdfs put failed: {exc}") from exc
+        finally:
+            get_directory_cache().invalidate(hdfs_path)
+        if not single:
+            return json.dumps(summary)
+        result = summary["files"][0]
+        if result["status"] == "skipped":
+            return f"skipped {result['hdfs']} (unchanged)"
+        return f"uploaded {result['hdfs']}"
+
+    if os.path.isfile(local_path) or os.path.isdir(local_path):
+        sources = [local_path]
+    else:
+        sources = sorted(p for p in glob.glob(local_path) if os.path.isfile(p))
+        if not sources:
+            raise RuntimeError(f"hdfs put failed: no local files match {local_path!r}")
+    cmd = ["hdfs", "dfs", "-put"] + (["-f"] if overwrite else []) + sources + [hdfs_path]
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    out, err = await proc.communicate()
+    get_directory_cache().invalidate(hdfs_path)
+    if proc.returncode != 0:
+        raise RuntimeError("hdfs put failed: " + err.decode(errors="ignore"))
+    return out.decode(errors="ignore") or "uploaded"
+
+
+@tool(coalesce=True)
+async def hdfs_head(
+    path: str,
+    lines: int = 10,
+    offset: int = 0,
+    length: Optional[int] = None,
+    max_bytes: int = 1024 * 1024,
+) -> str:
+    """Preview an HDFS file without downloading it.
+
+    Returns the first `lines` lines starting at byte `offset` (reading at most
+    `max_bytes`), or, when `length` is given, exactly that byte range. Bytes
+    are decoded as UTF-8 with replacement characters. The transfer stops as
+    soon as enough data has arrived.
     """
-    # try SQLAlchemy first
+    if _use_webhdfs():
+        import httpx
+
+        client = get_webhdfs_client()
+        try:
+            if length is not None:
+                data = await read_range(client, path, offset=offset, length=length)
+            else:
+                data = await head_lines(client, path, lines=lines, offset=offset, max_bytes=max_bytes)
+        except httpx.TransportError as exc:
+            raise _webhdfs_unavailable(exc) from exc
+    elif length is not None:
+        data = await cli_read_range(path, offset, length)
+    else:
+        data = await cli_head_lines(path, lines, offset=offset, max_bytes=max_bytes)
+    return data.decode("utf-8", errors="replace")
+
+
+@tool(max_concurrency=4, priority="low", coalesce=False)
+async def hdfs_get(hdfs_path: str, local_path: str, parallelism: int = 8, overwrite: bool = False) -> str:
+    """Download an HDFS file or directory to local disk. Returns success message or raises RuntimeError.
+
+    Files are streamed to disk in chunks (never held in memory) and written
+    via a `.part` file renamed on completion. A directory is mirrored under
+    `local_path` with up to `parallelism` files downloading at once and a JSON
+    summary (per-file bytes, seconds, MB/s) is returned. The CLI backend runs
+    a single `hdfs dfs -get`.
+    """
+    if _use_webhdfs():
+        import httpx
+
+        try:
+            summary = await download_many(
+                get_webhdfs_client(), hdfs_path, local_path, parallelism=parallelism, overwrite=overwrite
+            )
+        except httpx.TransportError as exc:
+            raise _webhdfs_unavailable(exc) from exc
+        except (OSError, WebHDFSError) as exc:
+            raise RuntimeError(f"hdfs get failed: {exc}") from exc
+        if summary.pop("single"):
+            return f"downloaded {summary['files'][0]['local']}"
+        return json.dumps(summary)
+
+    cmd = ["hdfs", "dfs", "-get"] + (["-f"] if overwrite else []) + [hdfs_path, local_path]
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError("hdfs get failed: " + err.decode(errors="ignore"))
+    return out.decode(errors="ignore") or "downloaded"
+
+
+def _cursor_page(
+    handle_id: Optional[str], columns: List[str], rows: List[Any], done: bool, format: str
+) -> str:
+    page: Dict[str, Any] = {"cursor": None if done else handle_id, "columns": columns, "done": done}
+    if format == "rows":
+        page["rows"] = encoders.to_rows(columns, rows)
+    elif format == "columns":
+        page["data"] = encoders.to_columns(columns, rows)["data"]
+    elif format == "csv":
+        page["csv"] = encoders.to_csv(columns, rows)
+    else:
+        page["result"] = json.loads(encoders.encode_result(columns, rows, format))
+    return json.dumps(page, default=str)
+
+
+def _fetch_rows(conn_str: str, query: str, fetch: int) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """Execute `query` and return its column names and up to `fetch` row tuples."""
+    # try SQLAlchemy first; engines are cached per connection string
     try:
-        from sqlalchemy import create_engine, text  # type: ignore
+        from sqlalchemy import text  # type: ignore
 
-        engine = create_engine(conn_str)
-        with engine.connect() as conn:
+        engine = get_pool_manager().engine(conn_str)
+        with engine.connect() as conn, interruptible(conn):
             result = conn.execute(text(query))
-            rows = [dict(r) for r in result.fetchmany(fetch)]
-            return json.dumps(rows, default=str)
+            cols = list(result.keys()) if result.returns_rows else []
+            return cols, [tuple(r) for r in result.fetchmany(fetch)] if cols else []
+    except QueryCancelled:
+        raise
     except Exception:
         pass
 
-    # fallback to sqlite3 for local sqlite urls
+    # fallback to sqlite3 for local sqlite urls, borrowing a pooled connection
     if conn_str.startswith("sqlite"):
-        import sqlite3
-
-        # extract path part for sqlite:///path.db or sqlite:///:memory:
-        if conn_str.startswith("sqlite:///"):
-            path = conn_str.replace("sqlite:///", "")
-        elif conn_str == "sqlite:///:memory:":
-            path = ":memory:"
-        else:
-            path = conn_str
-
-        conn = sqlite3.connect(path)
-        cur = conn.cursor()
-        cur.execute(query)
-        cols = [d[0] for d in cur.description] if cur.description else []
-        rows = []
-        for r in cur.fetchmany(fetch):
-            rows.append({k: v for k, v in zip(cols, r)})
-        conn.close()
-        return json.dumps(rows, default=str)
+        with get_pool_manager().connection(conn_str) as conn, interruptible(conn):
+            cur = conn.cursor()
+            cur.execute(query)
+            cols = [d[0] for d in cur.description] if cur.description else []
+            rows = cur.fetchmany(fetch)
+            cur.close()
+        return cols, rows
 
     raise RuntimeError("No SQL client available: install sqlalchemy or use a sqlite connection string.")
 
 
-__all__ = ["run_spark_job", "hdfs_list", "hdfs_put", "run_sql_query"]
+def _coalescable_query(arguments: Dict[str, Any]) -> bool:
+    """Only plain read-only queries share an execution; cursors are per caller."""
+    return not arguments["cursor"] and is_cacheable(arguments["query"])
+
+
+@tool(coalesce=_coalescable_query)
+async def run_sql_query(
+    conn_str: str,
+    query: str,
+    fetch: int = 100,
+    cursor: bool = False,
+    format: str = "rows",
+    use_cache: bool = True,
+    timeout: Optional[float] = None,
+) -> str:
+    """Run SQL and return JSON-serializable results (stringified JSON for the tool payload).
+
+    - If SQLAlchemy is available we use it.
+    - If conn_str points to sqlite (sqlite:///...) we use the stdlib sqlite3.
+    - Engines and sqlite connections are pooled per connection string (see `pool.py`).
+    - `format` selects the encoding: `rows` (list of objects, the default),
+      `columns` (names once, one array per column), `csv`, or `binary` (a
+      columnar file in the results directory, returned by reference).
+    - With `cursor=True` the result set is kept open and the payload is
+      `{"cursor", "columns", "done", ...}` plus the page in the chosen format;
+      pass the cursor id to `sql_fetch_page` for the following pages. A
+      sqlite database outside WAL mode is locked by an open statement, so
+      there each page re-runs the query with LIMIT/OFFSET instead (nothing
+      stays locked between pages; deep pages cost more).
+    - Read-only queries are served from the result cache (see `cache.py`)
+      unless `use_cache=False`; sqlite entries are invalidated when the
+      database changes.
+    - Payloads above the result store threshold are written to disk and
+      returned as a `{"result_handle", ...}` summary; read them with
+      `result_read` or the `etl-result://{handle}/{chunk}` resource.
+    - For a representative sample or approximate counts of a large table use
+      `sql_preview`, whose cost is bounded by a row budget.
+    - The statement runs on the database executor (see `db_executor.py`), not
+      the event loop; writes to a sqlite file are serialized on its own
+      worker. After `timeout` seconds (default: `sql.query_timeout`) the
+      statement is interrupted and the call fails.
+    """
+    encoders.check_format(format)
+    db = get_db_executor()
+    write = not is_read_only(query)
+    if cursor:
+        store = get_cursor_store()
+        started = time.perf_counter()
+        handle = await db.run(conn_str, store.open, conn_str, query, write=write, timeout=timeout)
+        get_query_log().record(conn_str, query, time.perf_counter() - started)
+        rows = await db.run(conn_str, store.page, handle, fetch, timeout=timeout) if handle.columns else []
+        if not handle.columns:
+            store.close(handle.id)
+        return _cursor_page(handle.id, handle.columns, rows, handle.done or not handle.columns, format)
+
+    key = get_query_cache().key(conn_str, query, fetch) if use_cache else None
+    started = time.perf_counter()
+    if key is None:
+        cols, rows = await db.run(conn_str, _fetch_rows, conn_str, query, fetch, write=write, timeout=timeout)
+    else:
+        cols, rows, hit = await db.run(conn_str, _cached_fetch_rows, conn_str, query, fetch, key, timeout=timeout)
+        if hit:
+            return _sql_payload(cols, rows, format)
+    get_query_log().record(conn_str, query, time.perf_counter() - started, len(rows))
+    return _sql_payload(cols, rows, format)
+
+
+def _cached_fetch_rows(
+    conn_str: str, query: str, fetch: int, key: Tuple[str, str, int]
+) -> Tuple[List[str], List[Tuple[Any, ...]], bool]:
+    """Serve a read-only query from the result cache or run and cache it; the bool is True on a hit.
+
+    Runs on the database executor: `version` may open a sqlite connection.
+    """
+    cache = get_query_cache()
+    # read the version before executing so a concurrent write invalidates the entry
+    version = cache.version(conn_str)
+    hit = cache.get(key, version)
+    if hit is not None:
+        return hit[0], hit[1], True
+    cols, rows = _fetch_rows(conn_str, query, fetch)
+    cache.put(key, cols, rows, version)
+    return cols, rows, False
+
+
+def _sql_payload(cols: List[str], rows: List[Tuple[Any, ...]], format: str) -> str:
+    """Encode a result, spilling it to the result store when it is too large to return inline."""
+    text = encoders.encode_result(cols, rows, format)
+    if format == "binary":
+        return text  # already a file reference
+    content_type = "text/csv" if format == "csv" else "application/json"
+    summary = {"columns": list(cols), "row_count": len(rows), "format": format}
+    return get_result_store().maybe_spill(text, "run_sql_query", content_type, summary)
+
+
+@tool()
+async def sql_fetch_page(
+    cursor_id: str, fetch: int = 100, format: str = "rows", timeout: Optional[float] = None
+) -> str:
+    """Fetch the next page from a cursor opened by `run_sql_query(cursor=True)`.
+
+    The cursor is closed automatically once the result set is exhausted; idle
+    cursors expire after a TTL. A page that takes longer than `timeout`
+    seconds is interrupted, which closes the cursor.
+    """
+    encoders.check_format(format)
+    store = get_cursor_store()
+    handle = store.get(cursor_id)
+    rows = await get_db_executor().run("", store.page, handle, fetch, timeout=timeout)
+    return _cursor_page(handle.id, handle.columns, rows, handle.done, format)
+
+
+@tool(max_concurrency=2, max_queue=8, priority="low", coalesce=False)
+async def sql_bulk_load(
+    conn_str: str,
+    table: str,
+    path: str,
+    format: Optional[str] = None,
+    batch_size: int = 5000,
+    create_table: bool = True,
+    if_exists: str = "append",
+    delimiter: str = ",",
+) -> str:
+    """Stream a local CSV or JSONL file into a SQL table and return a JSON load report.
+
+    - Rows are inserted with `executemany` in transactions of `batch_size`
+      rows, so memory stays flat regardless of file size.
+    - `format` is inferred from the extension (.csv/.tsv/.jsonl/.ndjson) when omitted.
+    - With `create_table=True` a missing table is created from a schema
+      inferred from the first rows; `if_exists="replace"` drops it first.
+    - sqlite targets use stdlib `sqlite3` with bulk-load pragmas, others SQLAlchemy.
+    """
+    report = await get_db_executor().run(
+        conn_str,
+        bulk_load,
+        conn_str,
+        table,
+        path,
+        format=format,
+        batch_size=batch_size,
+        create_table=create_table,
+        if_exists=if_exists,
+        delimiter=delimiter,
+        write=True,
+    )
+    return json.dumps(report)
+
+
+@tool(max_concurrency=4, priority="low", coalesce=False)
+async def sql_incremental_extract(
+    conn_str: str,
+    table: str,
+    watermark_column: str,
+    columns: Optional[List[str]] = None,
+    batch_size: int = 5000,
+    max_batches: Optional[int] = None,
+    export_path: Optional[str] = None,
+    format: str = "jsonl",
+    source: Optional[str] = None,
+    ack: Optional[str] = None,
+    commit: bool = False,
+) -> str:
+    """Extract only the rows added since the last run, tracked by a watermark column.
+
+    - `watermark_column` must increase monotonically (an id, `updated_at`, ...);
+      rows are read in keyset-paginated batches of `batch_size`, so the cost
+      follows the change volume when the column is indexed. Rows sharing
+      the value a batch ends on join that batch; more than 100,000 of them
+      is an error, so prefer a selective column over a date or batch id.
+    - The last watermark per `source` (default: table, column and a hash of
+      the connection string) is kept in a local state store.
+    - With `export_path` batches are appended to a `jsonl` or `csv` file and
+      checkpointed after each one, so an interrupted run resumes where it
+      stopped. This is the reliable way to extract. The file's directory
+      must be owned by the current user and not writable by group/others.
+    - Without `export_path` one batch (or `max_batches`) is returned inline
+      as `data` together with a `commit_token`, and the watermark does NOT
+      move: pass the token back as `ack` on the next call (or with
+      `max_batches=0` to only acknowledge) once the rows are safely stored.
+      Unacknowledged rows are returned again. `commit=True` advances the
+      watermark immediately instead; rows lost in transit (or in an expired
+      spilled result) are then skipped for good.
+    - Use `sql_watermarks` to inspect or reset the stored watermarks.
+    """
+    report = await get_db_executor().run(
+        conn_str,
+        extract,
+        conn_str,
+        table,
+        watermark_column,
+        columns=columns,
+        batch_size=batch_size,
+        max_batches=max_batches,
+        export_path=export_path,
+        format=format,
+        source=source,
+        ack=ack,
+        commit=commit,
+    )
+    if "data" in report:
+        report["data"] = encoders.to_rows(report.pop("columns"), report["data"])
+    summary = {k: v for k, v in report.items() if k != "data"}
+    return get_result_store().maybe_spill(
+        json.dumps(report, default=str), "sql_incremental_extract", "application/json", summary
+    )
+
+
+@tool(priority="high", coalesce=False)
+async def sql_watermarks(source: Optional[str] = None, reset: bool = False) -> str:
+    """List stored incremental-extract watermarks, or show / reset one `source`.
+
+    `reset=True` forgets the watermark so the next extract starts from the beginning.
+    """
+    store = get_watermark_store()
+    if source is None:
+        if reset:
+            raise ValueError("reset requires a source")
+        return json.dumps(await asyncio.to_thread(store.list))
+    if reset:
+        return "reset" if await asyncio.to_thread(store.delete, source) else "not found"
+    state = await asyncio.to_thread(store.get, source)
+    if state is None:
+        raise RuntimeError(f"no watermark stored for {source!r}")
+    return json.dumps(state)
+
+
+async def _pipeline_upload(local_path: str, hdfs_path: str, overwrite: bool) -> None:
+    # not the `hdfs_put` tool: waiting for its slot while holding this one can deadlock
+    await _hdfs_put(local_path, hdfs_path, overwrite=overwrite)
+
+
+@tool(max_concurrency=2, priority="low", coalesce=False)
+async def etl_pipeline(spec: Dict[str, Any]) -> str:
+    """Run a streaming SQL → transform → load pipeline inside the server.
+
+    `spec` (an object or its JSON text) has:
+    - `source`: `{"conn_str", "query", "batch_size"}`, read through a cursor;
+    - `transform`: optional list of steps, each one of
+      `{"select": [cols]}`, `{"rename": {old: new}}`,
+      `{"filter": {"column", "op", "value"}}` (op: = != < <= > >= in not_in is_null not_null),
+      `{"cast": {col: "int"|"float"|"str"|"bool"}, "errors": "raise"|"null"}`;
+    - `sink`: `{"type": "file", "path", "format": "jsonl"|"csv"}`,
+      `{"type": "table", "conn_str", "table", "create_table", "if_exists"}` or
+      `{"type": "hdfs", "path", "format", "overwrite"}`;
+    - `queue_size`: batches buffered between stages (default 4).
+
+    Stages run concurrently over bounded queues, so memory stays constant.
+    Rows are never returned: the result is a JSON report with per-stage
+    row counts, busy/wait seconds and rows/sec.
+    """
+    if isinstance(spec, str):
+        spec = json.loads(spec)
+    return json.dumps(await run_pipeline(spec, uploader=_pipeline_upload))
+
+
+@tool()
+async def sql_preview(
+    conn_str: str,
+    query: Optional[str] = None,
+    table: Optional[str] = None,
+    rows: int = 20,
+    method: str = "auto",
+    approx: bool = False,
+    columns: Optional[List[str]] = None,
+    row_budget: int = 100_000,
+    seed: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """Preview a table or query at bounded cost: a random sample plus optional approximate counts.
+
+    - Pass `table` or a read-only `query`. `rows` random rows are returned.
+    - `method`: `rowid` probes random rowids of a sqlite table (an index seek
+      per row, O(rows log n)); `reservoir` streams the result and keeps a
+      uniform sample of the first `row_budget` rows only, so rows past the
+      budget are never picked; `auto` picks `rowid` for sqlite tables.
+      `sample_scope` reports what the sample covers: `"table"`,
+      `"all rows"` or `"first N rows"`.
+    - `approx=True` adds `approx.count` and per-column `approx.distinct`
+      (HyperLogLog, ~0.8% error) from one streaming pass of at most
+      `row_budget` rows. `complete: false` means the budget cut the pass
+      short and the counts cover only the rows scanned (a sqlite table's
+      count is then the catalog estimate).
+    - `columns` restricts a `table` preview to those columns; `seed` makes
+      the sample reproducible.
+    Use this instead of `run_sql_query` when a representative look or a
+    cardinality estimate is enough and the full scan would be slow.
+    """
+    result = await get_db_executor().run(
+        conn_str,
+        preview,
+        conn_str,
+        query=query,
+        table=table,
+        rows=rows,
+        method=method,
+        approx=approx,
+        columns=columns,
+        row_budget=row_budget,
+        seed=seed,
+        timeout=timeout,
+    )
+    return get_result_store().maybe_spill(json.dumps(result, default=str), "sql_preview", "application/json")
+
+
+@tool(coalesce=True)
+async def sql_catalog(
+    conn_str: str,
+    table: Optional[str] = None,
+    refresh: bool = False,
+    stats: bool = True,
+    sample_rows: Optional[int] = None,
+) -> str:
+    """Describe a database's tables, views and columns from a cached catalog (JSON).
+
+    - Without `table`: every table and view with its estimated row count,
+      primary key and a `column: type` map.
+    - With `table`: columns (type, nullability, default, key position),
+      indexes, foreign keys and, with `stats=True`, per-column null
+      fraction, distinct count and min/max over the first `sample_rows` rows.
+    - Results are cached per connection string; sqlite catalogs are rebuilt
+      when `PRAGMA schema_version` changes (row estimates are re-read after
+      the TTL), others after a TTL or with `refresh=True`. Row counts are
+      estimates (`sqlite_stat1` or max rowid).
+    """
+    catalog = get_catalog()
+    if table is None:
+        result = await get_db_executor().run(conn_str, catalog.describe, conn_str, refresh)
+    else:
+        try:
+            result = await get_db_executor().run(
+                conn_str, catalog.table, conn_str, table, refresh, stats, sample_rows
+            )
+        except KeyError as exc:
+            raise RuntimeError(exc.args[0]) from None
+    return json.dumps(result, default=str)
+
+
+@tool(coalesce=True)
+async def sql_explain(conn_str: str, query: str) -> str:
+    """Show sqlite's `EXPLAIN QUERY PLAN` for a statement with slow steps flagged (JSON).
+
+    Flags: `full_scan` (table read end to end), `index_scan` (whole index
+    read), `automatic_index` (sqlite builds a throwaway index on every run)
+    and `temp_btree` (an extra sort for ORDER BY / GROUP BY / DISTINCT).
+    The statement is not executed.
+    """
+    return json.dumps(await get_db_executor().run(conn_str, explain, conn_str, query))
+
+
+@tool(max_concurrency=1, priority="low", coalesce=False)
+async def sql_index_advisor(
+    conn_str: str,
+    queries: Optional[List[str]] = None,
+    top: int = 20,
+    dry_run: bool = False,
+    repeat: int = 3,
+) -> str:
+    """Suggest indexes for a sqlite workload and estimate their benefit (JSON).
+
+    - The workload is `queries`, or else the `top` statements by total time
+      that `run_sql_query` recently executed against `conn_str`.
+    - Each statement's plan is checked for scans and temp B-tree sorts;
+      candidate (covering where possible) indexes are built from the columns
+      it filters, joins and sorts on, and kept only if sqlite's planner uses
+      them on a schema-only copy. Each suggestion has its `CREATE INDEX`
+      statement, the queries it improves and an estimated speedup.
+    - `dry_run=True` copies the database, times the read-only workload
+      (best of `repeat`), creates the indexes and times it again. The
+      source database is never changed.
+    """
+    result = await get_db_executor().run(
+        conn_str, advise, conn_str, queries=queries, top=top, dry_run=dry_run, repeat=repeat
+    )
+    return json.dumps(result, default=str)
+
+
+@tool(priority="high")
+async def sql_cache_stats(reset: bool = False, clear: bool = False) -> str:
+    """Return query result cache counters (hits, misses, evictions, ...) as JSON.
+
+    `reset` zeroes the counters after reading them; `clear` drops all entries.
+    """
+    cache = get_query_cache()
+    stats = cache.stats(reset=reset)
+    if clear:
+        cache.clear()
+    return json.dumps(stats)
+
+
+@tool(priority="high")
+async def sql_close_cursor(cursor_id: str) -> str:
+    """Close a cursor opened by `run_sql_query(cursor=True)` before it is exhausted."""
+    return "closed" if get_cursor_store().close(cursor_id) else "not found"
+
+
+@tool(priority="high")
+async def result_read(handle: str, offset: int = 0, length: Optional[int] = None) -> str:
+    """Read part of a large result that a tool spilled to disk.
+
+    Returns `{"data", "offset", "next_offset", "eof", "total_bytes", ...}`;
+    call again with `offset=next_offset` until `eof`. `length` defaults to the
+    store's chunk size. Handles expire after the configured retention age.
+    """
+    try:
+        return json.dumps(get_result_store().read(handle, offset, length))
+    except KeyError:
+        raise RuntimeError(f"unknown or expired result handle: {handle}") from None
+
+
+@tool(priority="high", coalesce=False)
+async def result_delete(handle: str) -> str:
+    """Delete a spilled result before it expires."""
+    return "deleted" if get_result_store().delete(handle) else "not found"
+
+
+@tool(priority="high")
+async def tool_metrics(format: str = "json", reset: bool = False) -> str:
+    """Return per-tool call counts, errors, in-flight gauges, latency and payload sizes.
+
+    `format="json"` gives a summary with approximate p50/p95/p99 latencies
+    plus single-flight coalescing and database executor counters;
+    `format="prometheus"` gives the full histograms in Prometheus text
+    format for scraping. `reset` zeroes the counters after reading them.
+    """
+    if format not in ("json", "prometheus"):
+        raise ValueError("format must be 'json' or 'prometheus'")
+    metrics = get_metrics()
+    if format == "prometheus":
+        out = metrics.prometheus()
+    else:
+        out = json.dumps(
+            {
+                **metrics.snapshot(),
+                "coalescing": get_single_flight().stats(),
+                "db_executor": get_db_executor().stats(),
+            }
+        )
+    if reset:
+        metrics.reset()
+    return out
+
+
+@tool(priority="high")
+async def profile_tool(name: str, calls: int = 5, cpu: bool = True, memory: bool = False) -> str:
+    """Profile the next `calls` invocations of tool `name` (cProfile and/or tracemalloc).
+
+    Returns the session status as JSON. Profiles land in the rotating profile
+    directory; read the summary with `profile_report` once calls have run.
+    """
+    if get_tool(name) is None:
+        raise RuntimeError(f"unknown tool {name!r}")
+    return json.dumps(get_profiler().arm(name, calls=calls, cpu=cpu, memory=memory))
+
+
+@tool(priority="high")
+async def profile_report(name: Optional[str] = None, top: int = 20, stop: bool = False) -> str:
+    """Return a profiling session's top functions (by cumulative time) and top allocation sites.
+
+    Without `name`, lists all sessions. `stop` disarms a session that still
+    has calls left to sample.
+    """
+    profiler = get_profiler()
+    if name is None:
+        return json.dumps(profiler.sessions())
+    if stop:
+        profiler.disarm(name)
+    try:
+        return json.dumps(await asyncio.to_thread(profiler.report, name, top))
+    except KeyError:
+        raise RuntimeError(f"no profiling session for {name!r}; start one with profile_tool") from None
+
+
+__all__ = [
+    "run_spark_job",
+    "spark_submit",
+    "spark_job_status",
+    "spark_job_logs",
+    "spark_job_cancel",
+    "spark_cache_stats",
+    "hdfs_list",
+    "hdfs_put",
+    "hdfs_head",
+    "hdfs_get",
+    "run_sql_query",
+    "sql_fetch_page",
+    "sql_close_cursor",
+    "sql_cache_stats",
+    "sql_bulk_load",
+    "sql_incremental_extract",
+    "sql_watermarks",
+    "etl_pipeline",
+    "sql_catalog",
+    "sql_preview",
+    "sql_explain",
+    "sql_index_advisor",
+    "result_read",
+    "result_delete",
+    "tool_metrics",
+    "profile_tool",
+    "profile_report",
+]
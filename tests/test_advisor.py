@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import advisor, catalog
+from src.tools import run_sql_query, sql_explain, sql_index_advisor
+
+
+class IndexAdvisorTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "shop.db")
+        self.conn_str = f"sqlite:///{self.db}"
+        conn = sqlite3.connect(self.db)
+        conn.executescript(
+            """
+            CREATE TABLE orders (id INTEGER PRIMARY KEY, cust INTEGER, amount REAL, ts TEXT, status TEXT);
+            CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, country TEXT);
+            """
+        )
+        conn.executemany(
+            "INSERT INTO orders VALUES (?, ?, ?, ?, ?)",
+            [(i, i % 500, i * 0.5, f"2024-{i % 12 + 1:02d}-01", ("open", "done")[i % 2]) for i in range(1, 20_001)],
+        )
+        conn.executemany("INSERT INTO customers VALUES (?, ?, ?)", [(i, f"n{i}", "NZ") for i in range(500)])
+        conn.commit()
+        conn.close()
+        advisor.get_query_log().clear()
+
+    def tearDown(self):
+        advisor.get_query_log().clear()
+        catalog.get_catalog().invalidate()
+        self.tmp.cleanup()
+
+    def test_explain_flags_scans_and_sorts(self):
+        out = json.loads(asyncio.run(sql_explain(self.conn_str, "SELECT id FROM orders WHERE cust = 7 ORDER BY ts")))
+        self.assertEqual([f["issue"] for f in out["flags"]], ["full_scan", "temp_btree"])
+        self.assertEqual(out["flags"][1]["for"], "order by")
+        point = json.loads(asyncio.run(sql_explain(self.conn_str, "SELECT * FROM orders WHERE id = 3")))
+        self.assertEqual(point["flags"], [])
+        self.assertIn("SEARCH", point["plan"][0]["detail"])
+
+    def test_column_references(self):
+        columns = {"orders": {"id", "cust", "amount", "ts", "status"}, "customers": {"id", "name", "country"}}
+        usage, star, aliases = advisor._references(
+            "SELECT o.amount, c.name FROM orders AS o JOIN customers c ON c.id = o.cust "
+            "WHERE status = 'open' AND o.ts >= '2024-06' ORDER BY o.amount",
+            columns,
+        )
+        self.assertEqual((usage["orders"].eq, usage["orders"].range), (["cust", "status"], ["ts"]))
+        self.assertEqual((usage["orders"].order, usage["customers"].eq), (["amount"], ["id"]))
+        self.assertEqual((star, aliases["o"], aliases["c"]), (set(), "orders", "customers"))
+        _, star, _ = advisor._references("SELECT * FROM orders WHERE cust = 1", columns)
+        self.assertEqual(star, {"orders"})
+
+    def test_recorded_workload_gets_validated_suggestions(self):
+        slow = "SELECT id, amount FROM orders WHERE cust = 42 ORDER BY ts"
+        for _ in range(3):
+            asyncio.run(run_sql_query(self.conn_str, slow, use_cache=False))
+        asyncio.run(run_sql_query(self.conn_str, "SELECT name FROM customers WHERE id = 1", use_cache=False))
+        recorded = advisor.get_query_log().workload(self.conn_str)
+        self.assertEqual((recorded[0]["query"], recorded[0]["calls"]), (slow, 3))
+
+        out = json.loads(asyncio.run(sql_index_advisor(self.conn_str, dry_run=True, repeat=2)))
+        self.assertEqual(len(out["workload"]), 2)
+        best = out["suggestions"][0]
+        self.assertEqual((best["table"], best["columns"]), ("orders", ["cust", "ts", "amount"]))
+        self.assertTrue(best["covering"])
+        self.assertTrue(best["benefit"]["removes_sort"])
+        self.assertGreater(best["benefit"]["est_speedup"], 10)
+        self.assertGreater(best["benefit"]["recorded_seconds"], 0)
+        self.assertEqual(best["queries_improved"][0]["flags_after"], [])
+        timed = {q["query"]: q for q in out["dry_run"]["queries"]}
+        self.assertLess(timed[slow]["after_ms"], timed[slow]["before_ms"])
+
+        # the source database was left untouched
+        conn = sqlite3.connect(self.db)
+        try:
+            self.assertEqual(conn.execute("SELECT count(*) FROM sqlite_master WHERE type = 'index'").fetchone()[0], 0)
+        finally:
+            conn.close()
+
+    def test_existing_indexes_and_non_sqlite_sources(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE INDEX orders_cust_ts ON orders (cust, ts, amount)")
+        conn.commit()
+        conn.close()
+        out = advisor.advise(self.conn_str, ["SELECT id, amount FROM orders WHERE cust = 42 ORDER BY ts"])
+        self.assertEqual(out["suggestions"], [])
+        with self.assertRaises(RuntimeError):
+            advisor.explain("postgresql://db/x", "SELECT 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
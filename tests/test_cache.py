@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import cache, pool
+from src.tools import run_sql_query, sql_cache_stats
+
+
+class NormalizeTests(unittest.TestCase):
+    def test_whitespace_collapsed_outside_literals(self):
+        self.assertEqual(
+            cache.normalize_sql("SELECT  a,\n b FROM t WHERE s = 'x  y' ;"),
+            "SELECT a, b FROM t WHERE s = 'x  y'",
+        )
+
+    def test_cacheable(self):
+        self.assertTrue(cache.is_cacheable("select * from t"))
+        self.assertTrue(cache.is_cacheable("WITH x AS (SELECT 1) SELECT * FROM x"))
+        self.assertTrue(cache.is_cacheable("SELECT * FROM t WHERE note = 'delete me'"))
+        self.assertFalse(cache.is_cacheable("DELETE FROM t"))
+        self.assertFalse(cache.is_cacheable("WITH x AS (SELECT 1) DELETE FROM t"))
+        self.assertFalse(cache.is_cacheable("SELECT random()"))
+        self.assertFalse(cache.is_cacheable("SELECT datetime('now')"))
+
+
+class QueryCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+        conn.commit()
+        conn.close()
+        self.conn_str = f"sqlite:///{self.path}"
+        cache.get_query_cache().clear()
+        cache.get_query_cache().stats(reset=True)
+
+    def tearDown(self):
+        cache.get_query_cache().close()
+        pool.close_pools()
+        self.tmp.cleanup()
+
+    def query(self, sql, **kwargs):
+        return json.loads(asyncio.run(run_sql_query(self.conn_str, sql, **kwargs)))
+
+    def test_repeated_query_hits(self):
+        self.query("SELECT id FROM t ORDER BY id")
+        out = self.query("SELECT  id FROM t\nORDER BY id")
+        self.assertEqual(out, [{"id": 1}, {"id": 2}])
+        stats = json.loads(asyncio.run(sql_cache_stats()))
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_hit_serves_other_formats(self):
+        self.query("SELECT id FROM t ORDER BY id")
+        out = self.query("SELECT id FROM t ORDER BY id", format="columns")
+        self.assertEqual(out["data"], [[1, 2]])
+        self.assertEqual(cache.get_query_cache().hits, 1)
+
+    def test_external_write_invalidates(self):
+        self.assertEqual(len(self.query("SELECT id FROM t")), 2)
+        conn = sqlite3.connect(self.path)
+        conn.execute("INSERT INTO t VALUES (3)")
+        conn.commit()
+        conn.close()
+        self.assertEqual(len(self.query("SELECT id FROM t")), 3)
+        self.assertEqual(cache.get_query_cache().invalidations, 1)
+
+    def test_use_cache_false_bypasses(self):
+        self.query("SELECT id FROM t", use_cache=False)
+        self.query("SELECT id FROM t", use_cache=False)
+        self.assertEqual(cache.get_query_cache().stats()["entries"], 0)
+
+    def test_lru_eviction_and_ttl(self):
+        c = cache.QueryCache(max_entries=2, ttl=60.0)
+        for i in range(3):
+            c.put(("db", f"SELECT {i}", 100), ["x"], [(i,)], None)
+        self.assertEqual(c.evictions, 1)
+        self.assertIsNone(c.get(("db", "SELECT 0", 100), None))
+        self.assertEqual(c.get(("db", "SELECT 2", 100), None), (["x"], [(2,)]))
+
+        c = cache.QueryCache(ttl=0.0)
+        c.put(("db", "SELECT 1", 100), ["x"], [(1,)], None)
+        self.assertIsNone(c.get(("db", "SELECT 1", 100), None))
+        self.assertEqual(c.expirations, 1)
+
+    def test_memory_databases_not_cached(self):
+        self.assertIsNone(cache.get_query_cache().key("sqlite:///:memory:", "SELECT 1", 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import catalog
+from src.tools import sql_catalog
+
+
+class CatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "shop.db")
+        self.conn_str = f"sqlite:///{self.db}"
+        conn = sqlite3.connect(self.db)
+        conn.executescript(
+            """
+            CREATE TABLE customers (id INTEGER PRIMARY KEY, email TEXT NOT NULL UNIQUE, country TEXT);
+            CREATE TABLE orders (
+                id INTEGER PRIMARY KEY,
+                customer_id INTEGER REFERENCES customers(id),
+                amount REAL DEFAULT 0
+            );
+            CREATE INDEX orders_customer ON orders (customer_id);
+            CREATE VIEW big_orders AS SELECT * FROM orders WHERE amount > 50;
+            """
+        )
+        conn.executemany(
+            "INSERT INTO customers VALUES (?, ?, ?)",
+            [(i, f"c{i}@x.io", None if i % 4 == 0 else ("NZ", "AU")[i % 2]) for i in range(1, 41)],
+        )
+        conn.executemany("INSERT INTO orders VALUES (?, ?, ?)", [(i, 1 + i % 40, float(i)) for i in range(1, 101)])
+        conn.commit()
+        conn.close()
+        self.catalog = catalog.SchemaCatalog()
+
+    def tearDown(self):
+        catalog.get_catalog().invalidate()
+        self.tmp.cleanup()
+
+    def test_describe_is_cached_until_the_schema_changes(self):
+        first = self.catalog.describe(self.conn_str)
+        self.assertFalse(first["cached"])
+        by_name = {t["name"]: t for t in first["tables"]}
+        self.assertEqual(sorted(by_name), ["big_orders", "customers", "orders"])
+        self.assertEqual(by_name["orders"]["columns"], {"id": "INTEGER", "customer_id": "INTEGER", "amount": "REAL"})
+        self.assertEqual((by_name["orders"]["rows"], by_name["customers"]["primary_key"]), (100, ["id"]))
+        self.assertEqual(by_name["big_orders"]["type"], "view")
+
+        self.assertTrue(self.catalog.describe(self.conn_str)["cached"])
+        conn = sqlite3.connect(self.db)
+        conn.execute("INSERT INTO orders VALUES (101, 1, 1.0)")  # data change: schema unchanged
+        conn.commit()
+        cached = self.catalog.describe(self.conn_str)
+        self.assertTrue(cached["cached"])
+        self.assertEqual({t["name"]: t for t in cached["tables"]}["orders"]["rows"], 100)
+        # once the estimates are older than ttl they are re-read; the schema stays cached
+        self.catalog.configure(ttl=0)
+        cached = self.catalog.describe(self.conn_str)
+        self.assertTrue(cached["cached"])
+        self.assertEqual({t["name"]: t for t in cached["tables"]}["orders"]["rows"], 101)
+        conn.execute("ALTER TABLE orders ADD COLUMN note TEXT")
+        conn.commit()
+        conn.close()
+        after = self.catalog.describe(self.conn_str)
+        self.assertFalse(after["cached"])
+        self.assertIn("note", {t["name"]: t for t in after["tables"]}["orders"]["columns"])
+        self.assertEqual(self.catalog.stats()["invalidations"], 1)
+
+    def test_table_detail_and_column_stats(self):
+        detail = self.catalog.table(self.conn_str, "orders")
+        self.assertEqual(detail["indexes"], [{"name": "orders_customer", "columns": ["customer_id"], "unique": False}])
+        self.assertEqual(
+            detail["foreign_keys"], [{"columns": ["customer_id"], "ref_table": "customers", "ref_columns": ["id"]}]
+        )
+        amount = {c["name"]: c for c in detail["columns"]}["amount"]
+        self.assertEqual((amount["default"], amount["min"], amount["max"]), ("0", 1.0, 100.0))
+        self.assertTrue(amount["unique"])
+        self.assertFalse(detail["stats_cached"])
+        self.assertTrue(self.catalog.table(self.conn_str, "orders")["stats_cached"])
+
+        customers = self.catalog.table(self.conn_str, "customers", sample_rows=20)
+        country = {c["name"]: c for c in customers["columns"]}["country"]
+        self.assertEqual(customers["stats_rows_scanned"], 20)
+        self.assertEqual((country["null_frac"], country["distinct"]), (0.25, 2))
+        with self.assertRaises(KeyError):
+            self.catalog.table(self.conn_str, "nope")
+
+    def test_tool_output(self):
+        listing = json.loads(asyncio.run(sql_catalog(self.conn_str)))
+        self.assertEqual(len(listing["tables"]), 3)
+        detail = json.loads(asyncio.run(sql_catalog(self.conn_str, table="customers", stats=False)))
+        self.assertTrue(detail["cached"])
+        self.assertNotIn("null_frac", detail["columns"][0])
+        self.assertEqual(detail["indexes"][0]["unique"], True)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(sql_catalog(self.conn_str, table="missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
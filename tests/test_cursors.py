@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import cursors, pool
+from src.tools import run_sql_query, sql_close_cursor, sql_fetch_page
+
+
+class CursorHandleTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "test.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(25)])
+        conn.commit()
+        conn.close()
+        self.conn_str = f"sqlite:///{path}"
+
+    def tearDown(self):
+        cursors.close_cursors()
+        pool.close_pools()
+        self.tmp.cleanup()
+
+    def test_pages_stream_from_one_cursor(self):
+        first = json.loads(asyncio.run(run_sql_query(self.conn_str, "SELECT id FROM t ORDER BY id", fetch=10, cursor=True)))
+        self.assertEqual(first["columns"], ["id"])
+        self.assertEqual([r["id"] for r in first["rows"]], list(range(10)))
+        self.assertFalse(first["done"])
+
+        ids = [r["id"] for r in first["rows"]]
+        cursor_id = first["cursor"]
+        while cursor_id:
+            page = json.loads(asyncio.run(sql_fetch_page(cursor_id, fetch=10)))
+            ids.extend(r["id"] for r in page["rows"])
+            cursor_id = page["cursor"]
+        self.assertEqual(ids, list(range(25)))
+        # exhausted cursors are closed and their connection returned to the pool
+        self.assertEqual(cursors.get_cursor_store().stats()["open"], 0)
+        self.assertEqual(pool.get_pool_manager().stats()["sqlite"][self.conn_str]["in_use"], 0)
+
+    def test_open_sqlite_cursors_do_not_block_writers(self):
+        first = json.loads(asyncio.run(run_sql_query(self.conn_str, "SELECT id FROM t ORDER BY id", fetch=10, cursor=True)))
+        writer = sqlite3.connect(self.conn_str[len("sqlite:///"):], timeout=0)
+        writer.execute("INSERT INTO t VALUES (100)")  # would raise "database is locked" under a SHARED lock
+        writer.commit()
+        writer.close()
+        page = json.loads(asyncio.run(sql_fetch_page(first["cursor"], fetch=100)))
+        self.assertEqual([r["id"] for r in page["rows"]], list(range(10, 25)) + [100])
+
+        # a statement that must stay open is reaped early
+        store = cursors.CursorStore(ttl=300.0, lock_ttl=5.0)
+        held = store.open(self.conn_str, "SELECT id FROM t", stream=True)
+        paged = store.open(self.conn_str, "SELECT id FROM t")
+        self.assertEqual((held.holds_lock, paged.holds_lock), (True, False))
+        self.assertEqual(store.reap(now=held.last_used + 6.0), 1)
+        self.assertEqual(store.get(paged.id), paged)
+        store.close_all()
+
+    def test_close_cursor(self):
+        first = json.loads(asyncio.run(run_sql_query(self.conn_str, "SELECT id FROM t", fetch=5, cursor=True)))
+        self.assertEqual(asyncio.run(sql_close_cursor(first["cursor"])), "closed")
+        with self.assertRaises(KeyError):
+            asyncio.run(sql_fetch_page(first["cursor"]))
+
+    def test_idle_handles_are_reaped(self):
+        store = cursors.CursorStore(ttl=60.0)
+        handle = store.open(self.conn_str, "SELECT id FROM t")
+        self.assertEqual(store.reap(now=handle.last_used + 61.0), 1)
+        with self.assertRaises(KeyError):
+            store.get(handle.id)
+
+    def test_open_handles_are_capped(self):
+        store = cursors.CursorStore(max_handles=2)
+        first = store.open(self.conn_str, "SELECT id FROM t")
+        store.open(self.conn_str, "SELECT id FROM t")
+        store.open(self.conn_str, "SELECT id FROM t")
+        self.assertEqual(store.stats()["open"], 2)
+        with self.assertRaises(KeyError):
+            store.get(first.id)
+        store.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import db_executor
+from src.tools import run_sql_query
+
+# counts to 50M: several seconds of sqlite CPU unless interrupted
+SLOW = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 50000000) SELECT count(*) FROM c"
+
+
+class DBExecutorTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "t.db")
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE t (id INTEGER, who TEXT)")
+        conn.execute("INSERT INTO t VALUES (1, 'a')")
+        conn.commit()
+        conn.close()
+        self.conn_str = f"sqlite:///{self.db}"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_slow_query_times_out_without_blocking_the_loop(self):
+        async def scenario():
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+
+            tick_task = asyncio.ensure_future(ticker())
+            start = time.perf_counter()
+            with self.assertRaises(db_executor.QueryTimeout):
+                await run_sql_query(self.conn_str, SLOW, timeout=0.3, use_cache=False)
+            elapsed = time.perf_counter() - start
+            tick_task.cancel()
+            # the loop kept running while the query was busy
+            gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+            return elapsed, len(ticks), max(gaps)
+
+        elapsed, ticks, worst_gap = asyncio.run(scenario())
+        self.assertLess(elapsed, 2.0)
+        self.assertGreater(ticks, 10)
+        self.assertLess(worst_gap, 0.2)
+        # the interrupted connection went back to the pool in a usable state
+        rows = json.loads(asyncio.run(run_sql_query(self.conn_str, "SELECT who FROM t", use_cache=False)))
+        self.assertEqual(rows, [{"who": "a"}])
+
+    def test_cancelling_the_caller_interrupts_the_statement(self):
+        executor = db_executor.DBExecutor(max_workers=1)
+
+        def slow():
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            try:
+                with db_executor.interruptible(conn):
+                    return conn.execute(SLOW).fetchone()
+            finally:
+                conn.close()
+
+        async def scenario():
+            task = asyncio.ensure_future(executor.run(self.conn_str, slow))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # the single worker was freed by the interrupt
+            return await asyncio.wait_for(executor.run(self.conn_str, lambda: "next"), 2.0)
+
+        try:
+            self.assertEqual(asyncio.run(scenario()), "next")
+            self.assertEqual(executor.stats()["cancelled"], 1)
+        finally:
+            executor.shutdown()
+
+    def test_writes_to_one_file_share_a_dedicated_worker(self):
+        executor = db_executor.DBExecutor(max_workers=4)
+        other = f"sqlite:///{os.path.join(self.tmp.name, 'other.db')}"
+
+        def who():
+            time.sleep(0.01)
+            return threading.get_ident()
+
+        async def scenario():
+            writes = [executor.run(self.conn_str, who, write=True) for _ in range(6)]
+            return await asyncio.gather(*writes), await executor.run(other, who, write=True)
+
+        try:
+            idents, other_ident = asyncio.run(scenario())
+            self.assertEqual(len(set(idents)), 1)
+            self.assertNotEqual(other_ident, idents[0])
+            self.assertEqual(executor.stats()["writers"], 2)
+        finally:
+            executor.shutdown()
+
+        # run_sql_query routes non-read-only statements to the file's writer
+        shared = db_executor.get_db_executor()
+        before = shared.stats()["writers"]
+        asyncio.run(run_sql_query(self.conn_str, "UPDATE t SET who = 'b'", use_cache=False))
+        self.assertEqual(shared.stats()["writers"], before + 1)
+
+    def test_busy_writers_are_not_retired(self):
+        executor = db_executor.DBExecutor(max_writers=1)
+        other = f"sqlite:///{os.path.join(self.tmp.name, 'other.db')}"
+        release = threading.Event()
+
+        def blocked():
+            release.wait(5)
+            return threading.get_ident()
+
+        async def scenario():
+            first = asyncio.ensure_future(executor.run(self.conn_str, blocked, write=True))
+            await asyncio.sleep(0.05)
+            # over the limit: the idle newcomer is retired, not the draining writer
+            await executor.run(other, threading.get_ident, write=True)
+            self.assertEqual(executor.stats()["writers"], 1)
+            second = asyncio.ensure_future(executor.run(self.conn_str, threading.get_ident, write=True))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first, await second
+
+        try:
+            first, second = asyncio.run(scenario())
+            # both writes to the file ran on the same thread
+            self.assertEqual(first, second)
+            self.assertEqual(executor.stats()["writers"], 1)
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import encoders, pool, results
+from src.tools import run_sql_query
+
+
+COLUMNS = ["id", "score", "name", "blob"]
+ROWS = [
+    (1, 1.5, "a", b"\x00\x01"),
+    (2, None, "b,c", None),
+    (None, 3.0, None, b""),
+]
+
+
+class EncoderTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = results.get_result_store()
+        self.prev_dir = self.store.directory
+        self.store.configure(directory=self.tmp.name)
+
+    def tearDown(self):
+        self.store.configure(directory=self.prev_dir)
+        pool.close_pools()
+        self.tmp.cleanup()
+
+    def test_columns_format(self):
+        out = json.loads(encoders.encode_result(COLUMNS[:3], [r[:3] for r in ROWS], "columns"))
+        self.assertEqual(out["columns"], ["id", "score", "name"])
+        self.assertEqual(out["data"], [[1, 2, None], [1.5, None, 3.0], ["a", "b,c", None]])
+
+    def test_columns_format_empty_result(self):
+        out = json.loads(encoders.encode_result(["id"], [], "columns"))
+        self.assertEqual(out, {"columns": ["id"], "data": [[]]})
+
+    def test_csv_format(self):
+        out = encoders.encode_result(COLUMNS[:3], [r[:3] for r in ROWS], "csv")
+        parsed = list(csv.reader(io.StringIO(out)))
+        self.assertEqual(parsed[0], ["id", "score", "name"])
+        self.assertEqual(parsed[2], ["2", "", "b,c"])
+
+    def test_binary_round_trip(self):
+        ref = json.loads(encoders.encode_result(COLUMNS, ROWS, "binary"))
+        self.assertEqual(ref["row_count"], 3)
+        self.assertTrue(ref["path"].startswith(self.tmp.name))
+        names, data = encoders.read_columnar(ref["path"])
+        self.assertEqual(names, COLUMNS)
+        self.assertEqual([tuple(r) for r in zip(*data)], ROWS)
+        # binary results share the result store's retention
+        self.assertEqual(self.store.info(ref["result_handle"])["content_type"], encoders.CONTENT_TYPE)
+        self.store.configure(max_age=0.001)
+        time.sleep(0.01)
+        self.store.sweep()
+        self.store.configure(max_age=results.DEFAULT_MAX_AGE)
+        self.assertFalse(os.path.exists(ref["path"]))
+
+    def test_binary_mixed_column_falls_back_to_text(self):
+        path = encoders.write_columnar(["v"], [(1,), ("x",), (2**70,)])
+        _, data = encoders.read_columnar(path)
+        self.assertEqual(data, [["1", "x", str(2**70)]])
+
+    def test_unknown_format_rejected(self):
+        with self.assertRaises(ValueError):
+            encoders.encode_result(COLUMNS, ROWS, "xml")
+
+    def test_run_sql_query_formats(self):
+        path = os.path.join(self.tmp.name, "t.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(1, "a"), (2, "b")])
+        conn.commit()
+        conn.close()
+        conn_str = f"sqlite:///{path}"
+        query = "SELECT id, name FROM t ORDER BY id"
+
+        rows = json.loads(asyncio.run(run_sql_query(conn_str, query)))
+        self.assertEqual(rows, [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        cols = json.loads(asyncio.run(run_sql_query(conn_str, query, format="columns")))
+        self.assertEqual(cols["data"], [[1, 2], ["a", "b"]])
+        self.assertEqual(asyncio.run(run_sql_query(conn_str, query, format="csv")), "id,name\n1,a\n2,b\n")
+        page = json.loads(asyncio.run(run_sql_query(conn_str, query, fetch=5, cursor=True, format="columns")))
+        self.assertEqual(page["data"], [[1, 2], ["a", "b"]])
+        self.assertTrue(page["done"])
+
+
+if __name__ == "__main__":
+    unittest.main()
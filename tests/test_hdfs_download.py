@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import hdfs_listing, webhdfs
+from src.tools import hdfs_get, hdfs_head
+
+from webhdfs_standin import WebHDFSStandIn
+
+
+class StreamingReadTests(unittest.TestCase):
+    def setUp(self):
+        self.server = WebHDFSStandIn().start()
+        webhdfs.configure_webhdfs(url=self.server.url)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.lines = b"".join(f"line-{i}\n".encode() for i in range(10000))
+        self.server.fs.write("/logs/app.log", self.lines)
+
+    def tearDown(self):
+        webhdfs.close_webhdfs()
+        webhdfs.configure_webhdfs(url="")
+        hdfs_listing.get_directory_cache().clear()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_head_lines(self):
+        out = asyncio.run(hdfs_head("/logs/app.log", lines=3))
+        self.assertEqual(out, "line-0\nline-1\nline-2\n")
+        self.assertEqual(self.server.ops["OPEN"], 2)  # namenode redirect + datanode
+
+    def test_head_from_offset_and_byte_range(self):
+        self.assertEqual(asyncio.run(hdfs_head("/logs/app.log", lines=1, offset=7)), "line-1\n")
+        self.assertEqual(asyncio.run(hdfs_head("/logs/app.log", offset=14, length=6)), "line-2")
+
+    def test_download_single_file_into_directory(self):
+        out = asyncio.run(hdfs_get("/logs/app.log", self.tmp.name))
+        target = os.path.join(self.tmp.name, "app.log")
+        self.assertEqual(out, f"downloaded {target}")
+        with open(target, "rb") as fh:
+            self.assertEqual(fh.read(), self.lines)
+        self.assertFalse(os.path.exists(target + ".part"))
+
+    def test_download_refuses_to_overwrite(self):
+        target = os.path.join(self.tmp.name, "app.log")
+        with open(target, "wb") as fh:
+            fh.write(b"keep")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(hdfs_get("/logs/app.log", target))
+        asyncio.run(hdfs_get("/logs/app.log", target, overwrite=True))
+        self.assertEqual(os.path.getsize(target), len(self.lines))
+
+    def test_download_directory_in_parallel(self):
+        for i in range(8):
+            self.server.fs.write(f"/export/dt={i % 2}/part-{i}.csv", os.urandom(1000 + i))
+        dest = os.path.join(self.tmp.name, "export")
+        summary = json.loads(asyncio.run(hdfs_get("/export", dest, parallelism=4)))
+        self.assertEqual((summary["downloaded"], summary["failed"]), (8, 0))
+        self.assertEqual(summary["bytes"], sum(1000 + i for i in range(8)))
+        with open(os.path.join(dest, "dt=1", "part-3.csv"), "rb") as fh:
+            self.assertEqual(fh.read(), self.server.fs.get("/export/dt=1/part-3.csv")["data"])
+
+
+class CliHeadTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        script = os.path.join(self.tmp.name, "hdfs")
+        with open(script, "w") as fh:
+            fh.write("#!/bin/sh\ni=0\nwhile [ $i -lt 100000 ]; do echo \"row-$i\"; i=$((i+1)); done\n")
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = self.tmp.name + os.pathsep + self.old_path
+
+    def tearDown(self):
+        os.environ["PATH"] = self.old_path
+        self.tmp.cleanup()
+
+    def test_cli_head_stops_early(self):
+        self.assertEqual(asyncio.run(hdfs_head("/any", lines=2)), "row-0\nrow-1\n")
+        self.assertEqual(asyncio.run(hdfs_head("/any", offset=6, length=5)), "row-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
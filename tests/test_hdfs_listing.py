@@ -0,0 +1,119 @@
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import hdfs_listing, webhdfs
+from src.tools import hdfs_list, hdfs_put
+
+from webhdfs_standin import WebHDFSStandIn
+
+
+class RecursiveListingTests(unittest.TestCase):
+    def setUp(self):
+        self.server = WebHDFSStandIn().start()
+        webhdfs.configure_webhdfs(url=self.server.url)
+        hdfs_listing.get_directory_cache().clear()
+        fs = self.server.fs
+        for day in ("2024-01-01", "2024-01-02", "2024-02-01"):
+            for part in range(2):
+                fs.write(f"/warehouse/events/dt={day}/part-{part}.parquet", b"x" * (part + 1))
+        fs.write("/warehouse/events/_SUCCESS", b"")
+
+    def tearDown(self):
+        webhdfs.close_webhdfs()
+        webhdfs.configure_webhdfs(url="")
+        hdfs_listing.get_directory_cache().clear()
+        self.server.stop()
+
+    def test_recursive_with_details(self):
+        out = asyncio.run(hdfs_list("/warehouse/events", recursive=True, details=True))
+        files = [e for e in out if e["type"] == "file"]
+        self.assertEqual(len(files), 7)
+        part = next(e for e in out if e["path"] == "/warehouse/events/dt=2024-01-02/part-1.parquet")
+        self.assertEqual(part["size"], 2)
+        self.assertEqual(part["replication"], 3)
+        self.assertGreater(part["mtime"], 0)
+
+    def test_partition_filter_prunes_directories(self):
+        out = asyncio.run(
+            hdfs_list("/warehouse/events", recursive=True, partitions={"dt": "2024-01-*"}, pattern="*.parquet")
+        )
+        self.assertEqual(
+            out,
+            [
+                "/warehouse/events/dt=2024-01-01/part-0.parquet",
+                "/warehouse/events/dt=2024-01-01/part-1.parquet",
+                "/warehouse/events/dt=2024-01-02/part-0.parquet",
+                "/warehouse/events/dt=2024-01-02/part-1.parquet",
+            ],
+        )
+        # root + two matching partitions; dt=2024-02-01 is never listed
+        self.assertEqual(self.server.ops["LISTSTATUS"], 3)
+
+    def test_max_depth_and_limit(self):
+        out = asyncio.run(hdfs_list("/warehouse", recursive=True, max_depth=2))
+        self.assertIn("/warehouse/events/dt=2024-01-01", out)
+        self.assertNotIn("/warehouse/events/dt=2024-01-01/part-0.parquet", out)
+        self.assertEqual(len(asyncio.run(hdfs_list("/warehouse", recursive=True, limit=3))), 3)
+
+    def test_listing_cache_and_invalidation(self):
+        asyncio.run(hdfs_list("/warehouse/events"))
+        before = self.server.requests
+        asyncio.run(hdfs_list("/warehouse/events"))
+        self.assertEqual(self.server.requests, before)
+
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as fh:
+            fh.write(b"1")
+        try:
+            asyncio.run(hdfs_put(fh.name, "/warehouse/events"))
+        finally:
+            os.unlink(fh.name)
+        out = asyncio.run(hdfs_list("/warehouse/events"))
+        self.assertIn(f"/warehouse/events/{os.path.basename(fh.name)}", out)
+
+
+class CliListingTests(unittest.TestCase):
+    LS_OUTPUT = (
+        "drwxr-xr-x   - hdfs supergroup          0 2024-01-01 12:00 /data/dt=1\n"
+        "-rw-r--r--   3 hdfs supergroup         42 2024-01-01 12:01 /data/dt=1/part-0\n"
+        "drwxr-xr-x   - hdfs supergroup          0 2024-01-02 12:00 /data/dt=2\n"
+        "-rw-r--r--   2 hdfs supergroup          7 2024-01-02 12:01 /data/dt=2/part-0\n"
+    )
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        script = os.path.join(self.tmp.name, "hdfs")
+        with open(script, "w") as fh:
+            fh.write("#!/bin/sh\ncat <<'EOF'\n" + self.LS_OUTPUT + "EOF\n")
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = self.tmp.name + os.pathsep + self.old_path
+        hdfs_listing.get_directory_cache().clear()
+
+    def tearDown(self):
+        os.environ["PATH"] = self.old_path
+        hdfs_listing.get_directory_cache().clear()
+        self.tmp.cleanup()
+
+    def test_parse_ls_line(self):
+        entry = hdfs_listing.parse_ls_line(self.LS_OUTPUT.splitlines()[1])
+        self.assertEqual(entry["path"], "/data/dt=1/part-0")
+        self.assertEqual(entry["size"], 42)
+        self.assertEqual(entry["replication"], 3)
+        self.assertEqual(entry["type"], "file")
+        self.assertIsNone(hdfs_listing.parse_ls_line("Found 2 items"))
+
+    def test_recursive_cli_listing(self):
+        out = asyncio.run(hdfs_list("/data", recursive=True, details=True, partitions={"dt": "2"}))
+        self.assertEqual([e["path"] for e in out], ["/data/dt=2", "/data/dt=2/part-0"])
+        self.assertEqual(out[1]["replication"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import hdfs_listing, hdfs_upload, webhdfs
+from src.tools import hdfs_put
+
+from webhdfs_standin import WebHDFSStandIn
+
+
+class ChecksumTests(unittest.TestCase):
+    def test_crc32c_known_vector(self):
+        self.assertEqual(hdfs_upload.crc32c(b"123456789"), 0xE3069283)
+
+    def test_composite_checksum_matches_serialized_form(self):
+        with tempfile.NamedTemporaryFile(delete=False) as fh:
+            fh.write(os.urandom(3000))
+        try:
+            digest = hdfs_upload.hdfs_file_checksum(fh.name, 512, 1024)
+            serialized = struct.pack(">iq", 512, 2).hex() + digest
+            remote = {"algorithm": "MD5-of-2MD5-of-512CRC32C", "bytes": serialized, "length": 28}
+            self.assertTrue(hdfs_upload.local_matches_remote(fh.name, remote, 1024))
+            remote["bytes"] = serialized[:-1] + ("0" if serialized[-1] != "0" else "1")
+            self.assertFalse(hdfs_upload.local_matches_remote(fh.name, remote, 1024))
+            self.assertFalse(hdfs_upload.local_matches_remote(fh.name, {"algorithm": "COMPOSITE-CRC32C"}, 1024))
+        finally:
+            os.unlink(fh.name)
+
+
+class MultiFileUploadTests(unittest.TestCase):
+    def setUp(self):
+        self.server = WebHDFSStandIn().start()
+        webhdfs.configure_webhdfs(url=self.server.url)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "export")
+        os.makedirs(os.path.join(self.src, "dt=1"))
+        for i in range(12):
+            sub = "dt=1" if i % 2 else ""
+            with open(os.path.join(self.src, sub, f"part-{i:04d}.csv"), "wb") as fh:
+                fh.write(f"row-{i}\n".encode() * (i + 1))
+
+    def tearDown(self):
+        webhdfs.close_webhdfs()
+        webhdfs.configure_webhdfs(url="")
+        hdfs_listing.get_directory_cache().clear()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def put(self, *args, **kwargs):
+        return json.loads(asyncio.run(hdfs_put(*args, **kwargs)))
+
+    def test_directory_upload_then_skip_unchanged(self):
+        first = self.put(self.src, "/landing", parallelism=4)
+        self.assertEqual((first["uploaded"], first["skipped"], first["failed"]), (12, 0, 0))
+        data = self.server.fs.get("/landing/dt=1/part-0003.csv")["data"]
+        self.assertEqual(data, b"row-3\n" * 4)
+        self.assertIn("mb_per_s", first["files"][0])
+
+        second = self.put(self.src, "/landing", parallelism=4)
+        self.assertEqual((second["uploaded"], second["skipped"]), (0, 12))
+
+    def test_changed_file_needs_overwrite(self):
+        self.put(self.src, "/landing")
+        path = os.path.join(self.src, "part-0000.csv")
+        with open(path, "wb") as fh:
+            fh.write(b"changed\n")
+        out = self.put(self.src, "/landing")
+        self.assertEqual(out["failed"], 1)
+        self.assertEqual(out["skipped"], 11)
+        out = self.put(self.src, "/landing", overwrite=True)
+        self.assertEqual(out["uploaded"], 1)
+        self.assertEqual(self.server.fs.get("/landing/part-0000.csv")["data"], b"changed\n")
+
+    def test_verify_modes_for_same_size_edits(self):
+        self.put(self.src, "/landing")
+        path = os.path.join(self.src, "part-0000.csv")
+        with open(path, "wb") as fh:
+            fh.write(b"ROW-0\n")  # same size, new content, newer mtime
+        future = time.time() + 60
+        os.utime(path, (future, future))
+        self.assertEqual(self.put(self.src, "/landing", verify="size")["skipped"], 12)
+        self.assertEqual(self.put(self.src, "/landing", verify="mtime")["failed"], 1)
+        os.utime(path, (1, 1))  # an older mtime alone no longer reveals the edit
+        self.assertEqual(self.put(self.src, "/landing", verify="mtime")["skipped"], 12)
+        out = self.put(self.src, "/landing", verify="checksum")
+        self.assertEqual((out["skipped"], out["failed"]), (11, 1))
+        default = self.put(self.src, "/landing")
+        self.assertEqual(default["verify"], hdfs_upload.default_verify())
+        if hdfs_upload._native_crc32c is not None:
+            self.assertEqual(default["failed"], 1)  # checksum catches it
+        with self.assertRaises(ValueError):
+            self.put(self.src, "/landing", verify="md5")
+
+    def test_glob_upload(self):
+        out = self.put(os.path.join(self.src, "dt=1", "*.csv"), "/flat")
+        self.assertEqual(out["uploaded"], 6)
+        self.assertIsNotNone(self.server.fs.get("/flat/part-0001.csv"))
+
+    def test_single_file_skip_message(self):
+        path = os.path.join(self.src, "part-0000.csv")
+        self.assertEqual(asyncio.run(hdfs_put(path, "/one.csv")), "uploaded /one.csv")
+        self.assertEqual(asyncio.run(hdfs_put(path, "/one.csv")), "skipped /one.csv (unchanged)")
+        self.assertEqual(
+            hashlib.md5(self.server.fs.get("/one.csv")["data"]).hexdigest(), hdfs_upload.md5_file(path)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import incremental
+from src.tools import sql_incremental_extract, sql_watermarks
+
+
+class IncrementalExtractTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "src.db")
+        self.conn_str = f"sqlite:///{self.db}"
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, ts TEXT, name TEXT)")
+        conn.execute("CREATE INDEX events_ts ON events (ts)")
+        conn.commit()
+        conn.close()
+        self.insert(range(1, 11))
+        self.store = incremental.get_watermark_store()
+        self.old_path = self.store.path
+        self.store.configure(path=os.path.join(self.tmp.name, "state", "wm.sqlite"))
+
+    def tearDown(self):
+        self.store.configure(path=self.old_path)
+        self.tmp.cleanup()
+
+    def insert(self, ids, ts=None):
+        conn = sqlite3.connect(self.db)
+        conn.executemany(
+            "INSERT INTO events VALUES (?, ?, ?)", [(i, ts or f"2024-01-01T00:00:{i:02d}", f"e{i}") for i in ids]
+        )
+        conn.commit()
+        conn.close()
+
+    def extract(self, **kwargs):
+        kwargs.setdefault("watermark_column", "id")
+        return json.loads(asyncio.run(sql_incremental_extract(self.conn_str, "events", **kwargs)))
+
+    def test_returns_only_new_rows_across_runs(self):
+        first = self.extract(batch_size=4)
+        self.assertEqual([r["id"] for r in first["data"]], [1, 2, 3, 4])
+        self.assertEqual((first["previous_watermark"], first["watermark"], first["done"]), (None, 4, False))
+        rest = self.extract(batch_size=4, max_batches=10, ack=first["commit_token"])
+        self.assertEqual([r["id"] for r in rest["data"]], [5, 6, 7, 8, 9, 10])
+        self.assertTrue(rest["done"])
+        self.assertEqual(self.extract(ack=rest["commit_token"])["data"], [])
+
+        self.insert([11, 12])
+        again = self.extract(columns=["name"], commit=True)
+        self.assertEqual(again["data"], [{"name": "e11", "id": 11}, {"name": "e12", "id": 12}])
+        self.assertTrue(again["committed"])
+        self.assertNotIn("commit_token", again)
+        state = json.loads(asyncio.run(sql_watermarks(first["source"])))
+        self.assertEqual((state["rows_total"], state["watermark"]["value"]), (12, 12))
+
+        self.assertEqual(asyncio.run(sql_watermarks(first["source"], reset=True)), "reset")
+        self.assertEqual(len(self.extract(batch_size=100)["data"]), 12)
+
+    def test_inline_rows_are_redelivered_until_acknowledged(self):
+        first = self.extract(batch_size=4)
+        self.assertFalse(first["committed"])
+        lost = self.extract(batch_size=4)  # the first response never arrived: same rows again
+        self.assertEqual(lost["data"], first["data"])
+        acked = self.extract(batch_size=4, max_batches=0, ack=lost["commit_token"])
+        self.assertEqual((acked["acked"], acked["data"], acked["previous_watermark"]), (lost["commit_token"], [], 4))
+        with self.assertRaises(RuntimeError):  # the other run's token started from the old watermark
+            self.extract(ack=first["commit_token"])
+        with self.assertRaises(RuntimeError):
+            self.extract(ack="nope")
+        self.assertEqual(self.extract(batch_size=4)["data"][0]["id"], 5)
+
+    def test_equal_watermarks_at_a_batch_boundary_are_not_skipped(self):
+        self.insert(range(11, 16), ts="2024-01-01T00:00:10")  # ties with id 10
+        seen = []
+        token = None
+        for _ in range(10):
+            out = self.extract(watermark_column="ts", batch_size=3, ack=token)
+            seen += [r["id"] for r in out["data"]]
+            token = out.get("commit_token")
+            if out["done"]:
+                break
+        self.assertEqual(sorted(seen), list(range(1, 16)))
+
+        # a run of ties longer than max_ties is refused, not read whole
+        batches = incremental.iter_batches(self.conn_str, "events", "ts", batch_size=12, max_ties=5)
+        with self.assertRaises(RuntimeError):
+            list(batches)
+
+    def test_export_checkpoints_each_batch_and_resumes(self):
+        path = os.path.join(self.tmp.name, "out", "events.jsonl")
+        real_checkpoint = self.store.checkpoint
+        calls = {"n": 0}
+
+        def flaky(*args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 2:
+                raise OSError("disk went away")
+            return real_checkpoint(*args, **kwargs)
+
+        self.store.checkpoint = flaky
+        try:
+            with self.assertRaises(OSError):
+                incremental.extract(self.conn_str, "events", "id", batch_size=3, export_path=path)
+        finally:
+            del self.store.checkpoint
+        # the second batch reached the file but was never checkpointed
+        with open(path) as fh:
+            self.assertEqual(len(fh.readlines()), 6)
+
+        out = self.extract(batch_size=3, export_path=path)
+        self.assertEqual((out["rows"], out["watermark"], out["done"]), (7, 10, True))
+        with open(path) as fh:
+            ids = [json.loads(line)["id"] for line in fh]
+        self.assertEqual(ids, list(range(1, 11)))
+
+        csv_path = os.path.join(self.tmp.name, "events.csv")
+        self.extract(export_path=csv_path, format="csv", source="csv-copy")
+        with open(csv_path) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(lines[0], "id,ts,name")
+        self.assertEqual(len(lines), 11)
+
+    def test_concurrent_runs_of_one_source_are_refused(self):
+        source = incremental.default_source(self.conn_str, "events", "id")
+        lock = incremental._source_lock(source)
+        with lock:
+            with self.assertRaises(RuntimeError):
+                incremental.extract(self.conn_str, "events", "id")
+
+    def test_state_and_export_directories_must_be_private(self):
+        shared = os.path.join(self.tmp.name, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with self.assertRaises(RuntimeError):
+            incremental.WatermarkStore(os.path.join(shared, "wm.sqlite")).get("x")
+        with self.assertRaises(RuntimeError):
+            incremental.extract(self.conn_str, "events", "id", export_path=os.path.join(shared, "out.jsonl"))
+        self.assertIsNone(self.store.get(incremental.default_source(self.conn_str, "events", "id")))
+        self.assertTrue(incremental.WatermarkStore().path.endswith(os.path.join("etl-mcp-serv", "watermarks.sqlite")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import loader, pool
+from src.tools import sql_bulk_load
+
+
+class BulkLoadTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "target.db")
+        self.conn_str = f"sqlite:///{self.db}"
+
+    def tearDown(self):
+        pool.close_pools()
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        return path
+
+    def fetch(self, sql):
+        conn = sqlite3.connect(self.db)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_csv_load_creates_typed_table_in_batches(self):
+        lines = ["id,score,name"] + [f"{i},{i / 2},n{i}" for i in range(10)] + ["10,,"]
+        path = self.write("data.csv", "\n".join(lines) + "\n")
+        report = json.loads(asyncio.run(sql_bulk_load(self.conn_str, "items", path, batch_size=4)))
+        self.assertEqual(report["rows"], 11)
+        self.assertEqual(report["batches"], 3)
+        self.assertTrue(report["created"])
+        self.assertEqual(report["columns"], {"id": "INTEGER", "score": "REAL", "name": "TEXT"})
+        self.assertIsNotNone(report["rows_per_sec"])
+        self.assertEqual(self.fetch("SELECT id, score, name FROM items WHERE id = 3"), [(3, 1.5, "n3")])
+        self.assertEqual(self.fetch("SELECT score FROM items WHERE id = 10"), [(None,)])
+
+    def test_jsonl_load_append_and_replace(self):
+        path = self.write("data.jsonl", '{"a": 1, "b": "x"}\n\n{"a": 2, "c": [1, 2]}\n')
+        loader.bulk_load(self.conn_str, "t", path)
+        loader.bulk_load(self.conn_str, "t", path)
+        self.assertEqual(self.fetch("SELECT count(*) FROM t"), [(4,)])
+        self.assertEqual(self.fetch("SELECT a, b, c FROM t ORDER BY rowid LIMIT 2"), [(1, "x", None), (2, None, "[1, 2]")])
+        loader.bulk_load(self.conn_str, "t", path, if_exists="replace")
+        self.assertEqual(self.fetch("SELECT count(*) FROM t"), [(2,)])
+
+    def test_missing_table_without_create(self):
+        path = self.write("data.csv", "a\n1\n")
+        with self.assertRaises(RuntimeError):
+            loader.bulk_load(self.conn_str, "t", path, create_table=False)
+
+    def test_unknown_format(self):
+        path = self.write("data.txt", "a\n1\n")
+        with self.assertRaises(ValueError):
+            loader.bulk_load(self.conn_str, "t", path)
+
+    def test_infer_schema(self):
+        self.assertEqual(
+            loader.infer_schema([("1", "1", "x"), ("2", "2.5", "3")], 3),
+            ["INTEGER", "REAL", "TEXT"],
+        )
+        # leading zeros and non-canonical integers keep the column as TEXT
+        self.assertEqual(
+            loader.infer_schema([("1", "0", "1", "0.5"), ("007", "-3", "+5", "0.25")], 4),
+            ["TEXT", "INTEGER", "TEXT", "REAL"],
+        )
+        # non-finite spellings are words, not REALs
+        self.assertEqual(
+            loader.infer_schema([("nan", "1.5"), ("Infinity", "-inf")], 2),
+            ["TEXT", "TEXT"],
+        )
+
+    def test_leading_zeros_survive_a_load(self):
+        path = self.write("zips.csv", "zip,n\n02134,1\n10001,2\n")
+        loader.bulk_load(self.conn_str, "zips", path)
+        conn = sqlite3.connect(self.db)
+        try:
+            self.assertEqual(conn.execute("SELECT zip FROM zips ORDER BY n").fetchall(), [("02134",), ("10001",)])
+        finally:
+            conn.close()
+
+        # values after the inference sample are not coerced either
+        to_int, to_real = loader._converter("INTEGER"), loader._converter("REAL")
+        self.assertEqual([to_int("007"), to_int("+5"), to_int("42")], ["007", "+5", 42])
+        self.assertEqual([to_real("inf"), to_real("2.5")], ["inf", 2.5])
+        path = self.write("late.csv", "id,score\n1,0.5\n2,1.5\n3,nan\n")
+        loader.bulk_load(self.conn_str, "late", path, infer_rows=2)
+        conn = sqlite3.connect(self.db)
+        try:
+            rows = conn.execute("SELECT score, typeof(score) FROM late ORDER BY id").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(rows, [(0.5, "real"), (1.5, "real"), ("nan", "text")])
+
+
+if __name__ == "__main__":
+    unittest.main()
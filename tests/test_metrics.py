@@ -0,0 +1,92 @@
+import asyncio
+import json
+import sys
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import metrics, registry
+from src.tools import tool_metrics
+
+
+class HistogramTests(unittest.TestCase):
+    def test_quantiles_and_cumulative_buckets(self):
+        hist = metrics.Histogram((1.0, 2.0, 4.0))
+        for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+            hist.observe(value)
+        self.assertEqual(hist.cumulative(), [("1.0", 1), ("2.0", 3), ("4.0", 4), ("+Inf", 5)])
+        self.assertAlmostEqual(hist.quantile(0.5), 1.75)
+        self.assertEqual(hist.quantile(1.0), 4.0)
+        self.assertIsNone(metrics.Histogram((1.0,)).quantile(0.5))
+
+    def test_payload_size(self):
+        self.assertEqual(metrics.payload_size("abc"), 3)
+        self.assertEqual(metrics.payload_size("é"), 2)
+        self.assertEqual(metrics.payload_size(b"\x00" * 5), 5)
+        self.assertEqual(metrics.payload_size(["a", 1]), len('["a", 1]'))
+
+
+class ToolMetricsTests(unittest.TestCase):
+    def setUp(self):
+        metrics.get_metrics().reset()
+
+    def tearDown(self):
+        registry._REGISTRY.clear()
+        registry.configure_scheduler(max_concurrency=0, max_queue=0)
+        metrics.get_metrics().configure(enabled=True)
+        metrics.get_metrics().reset()
+
+    def test_registry_records_calls_errors_and_rejections(self):
+        @registry.tools(name="echo_metrics")
+        async def echo(text: str) -> str:
+            if text == "boom":
+                raise ValueError(text)
+            await asyncio.sleep(0.01)
+            return text * 2
+
+        @registry.tools(name="one_at_a_time", max_concurrency=1, max_queue=0)
+        async def one() -> None:
+            await asyncio.sleep(0.05)
+
+        registry.call_tools_batch([("echo_metrics", ("ab",))] * 3 + [("echo_metrics", ("boom",))])
+        registry.call_tools_batch(["one_at_a_time"] * 2)
+        snap = metrics.get_metrics().snapshot()["tools"]
+        echo_stats = snap["echo_metrics"]
+        self.assertEqual((echo_stats["calls"], echo_stats["ok"], echo_stats["error"]), (4, 3, 1))
+        self.assertEqual(echo_stats["in_flight"], 0)
+        self.assertEqual(echo_stats["request_bytes"], 3 * 2 + 4)
+        self.assertEqual(echo_stats["response_bytes"], 3 * 4)
+        self.assertGreaterEqual(echo_stats["latency_p50"], 0.005)
+        self.assertEqual((snap["one_at_a_time"]["ok"], snap["one_at_a_time"]["rejected"]), (1, 1))
+
+    def test_prometheus_exposition(self):
+        @registry.tools(name="prom_tool")
+        def prom_tool() -> str:
+            return "x" * 100
+
+        registry.call_tool("prom_tool")
+        text = asyncio.run(tool_metrics(format="prometheus"))
+        self.assertIn("# TYPE etl_tool_latency_seconds histogram", text)
+        self.assertIn('etl_tool_calls_total{tool="prom_tool",outcome="ok"} 1', text)
+        self.assertIn('etl_tool_response_bytes_bucket{tool="prom_tool",le="256.0"} 1', text)
+        self.assertIn('etl_tool_latency_seconds_bucket{tool="prom_tool",le="+Inf"} 1', text)
+        self.assertIn('etl_tool_in_flight{tool="prom_tool"} 0', text)
+
+    def test_disabled_and_reset(self):
+        @registry.tools(name="quiet")
+        def quiet() -> None:
+            return None
+
+        metrics.get_metrics().configure(enabled=False)
+        registry.call_tool("quiet")
+        self.assertNotIn("quiet", metrics.get_metrics().snapshot()["tools"])
+        metrics.get_metrics().configure(enabled=True)
+        registry.call_tool("quiet")
+        out = json.loads(asyncio.run(tool_metrics(reset=True)))
+        self.assertEqual(out["tools"]["quiet"]["calls"], 1)
+        self.assertEqual(metrics.get_metrics().snapshot()["tools"]["quiet"]["calls"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
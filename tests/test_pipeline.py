@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import hdfs_listing, pipeline, registry, webhdfs
+from src.tools import etl_pipeline
+
+from webhdfs_standin import WebHDFSStandIn
+
+
+class PipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "src.db")
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE orders (id INTEGER, name TEXT, amount TEXT)")
+        conn.executemany(
+            "INSERT INTO orders VALUES (?, ?, ?)", [(i, f"c{i}", str(i - 5) if i % 7 else "n/a") for i in range(1, 101)]
+        )
+        conn.commit()
+        conn.close()
+        self.source = {"conn_str": f"sqlite:///{self.db}", "query": "SELECT * FROM orders ORDER BY id", "batch_size": 16}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_spec(self, sink, transform=None, **extra):
+        spec = {"source": self.source, "transform": transform or [], "sink": sink, **extra}
+        return json.loads(asyncio.run(etl_pipeline(json.dumps(spec))))
+
+    def test_file_sink_applies_transforms_and_reports_stages(self):
+        path = os.path.join(self.tmp.name, "out", "orders.jsonl")
+        report = self.run_spec(
+            {"type": "file", "path": path},
+            [
+                {"select": ["id", "name", "amount"]},
+                {"rename": {"name": "customer"}},
+                {"cast": {"amount": "float"}, "errors": "null"},
+                {"filter": {"column": "amount", "op": ">", "value": 0}},
+            ],
+            queue_size=2,
+        )
+        with open(path) as fh:
+            rows = [json.loads(line) for line in fh]
+        expected = [i for i in range(6, 101) if i % 7]
+        self.assertEqual([r["id"] for r in rows], expected)
+        self.assertEqual(rows[0], {"id": 6, "customer": "c6", "amount": 1.0})
+        self.assertEqual((report["rows_extracted"], report["rows_loaded"]), (100, len(expected)))
+        self.assertEqual(report["stages"]["extract"]["batches"], 7)
+        self.assertEqual(report["stages"]["transform"]["rows_in"], 100)
+        self.assertEqual(report["queue_size"], 2)
+        self.assertFalse(os.path.exists(path + ".part"))
+
+        csv_path = os.path.join(self.tmp.name, "orders.csv")
+        self.run_spec({"type": "file", "path": csv_path, "format": "csv"}, [{"select": ["id", "name"]}])
+        with open(csv_path) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(lines[:2], ["id,name", "1,c1"])
+        self.assertEqual(len(lines), 101)
+
+    def test_table_sink(self):
+        target = os.path.join(self.tmp.name, "dst.db")
+        sink = {"type": "table", "conn_str": f"sqlite:///{target}", "table": "clean"}
+        transform = [{"filter": {"column": "amount", "op": "!=", "value": "n/a"}}, {"cast": {"amount": "int"}}]
+        report = self.run_spec(sink, transform)
+        self.assertTrue(report["sink"]["created"])
+        self.assertEqual(report["sink"]["columns"]["amount"], "INTEGER")
+        self.run_spec({**sink, "if_exists": "append"}, transform)
+        conn = sqlite3.connect(target)
+        try:
+            count, total = conn.execute("SELECT COUNT(*), SUM(amount) FROM clean").fetchone()
+        finally:
+            conn.close()
+        kept = [i - 5 for i in range(1, 101) if i % 7]
+        self.assertEqual((count, total), (2 * len(kept), 2 * sum(kept)))
+
+    def test_hdfs_sink_uploads_the_staged_file(self):
+        server = WebHDFSStandIn().start()
+        webhdfs.configure_webhdfs(url=server.url)
+        scheduler = registry.get_scheduler()
+        old_limit = scheduler.max_concurrency
+        # one global slot, held by the pipeline: the upload must not queue for another
+        scheduler.configure(max_concurrency=1)
+        try:
+            sink = {"type": "hdfs", "path": "/landing/orders.jsonl"}
+            spec = {"source": self.source, "transform": [{"select": ["id"]}], "sink": sink}
+            report = json.loads(asyncio.run(asyncio.wait_for(etl_pipeline(json.dumps(spec)), 10)))
+            data = server.fs.get("/landing/orders.jsonl")["data"]
+            self.assertEqual(data.decode().splitlines()[:2], ['{"id": 1}', '{"id": 2}'])
+            self.assertEqual(report["sink"]["bytes"], len(data))
+        finally:
+            scheduler.configure(max_concurrency=old_limit or 0)
+            webhdfs.close_webhdfs()
+            webhdfs.configure_webhdfs(url="")
+            hdfs_listing.get_directory_cache().clear()
+            server.stop()
+
+    def test_invalid_specs_and_failures_leave_no_output(self):
+        with self.assertRaises(pipeline.PipelineError):
+            pipeline.validate({"source": self.source, "sink": {"type": "s3"}})
+        with self.assertRaises(pipeline.PipelineError):
+            pipeline.compile_transforms([{"cast": {"amount": "decimal"}}])
+        with self.assertRaises(pipeline.PipelineError):
+            pipeline.compile_transforms([{"select": ["id"], "rename": {"id": "x"}}])
+
+        path = os.path.join(self.tmp.name, "bad.jsonl")
+        with self.assertRaises(ValueError):  # "n/a" cannot be cast
+            self.run_spec({"type": "file", "path": path}, [{"cast": {"amount": "int"}}])
+        with self.assertRaises(pipeline.PipelineError):
+            self.run_spec({"type": "file", "path": path}, [{"select": ["missing"]}])
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["src.db"])
+
+
+if __name__ == "__main__":
+    unittest.main()
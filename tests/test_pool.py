@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import pool
+from src.tools import run_sql_query
+
+
+class SQLitePoolTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(1, "a"), (2, "b"), (3, "c")])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        pool.close_pools()
+        self.tmp.cleanup()
+
+    def test_connection_is_reused(self):
+        p = pool.SQLitePool(self.path, size=2)
+        first = p.acquire()
+        p.release(first)
+        second = p.acquire()
+        self.assertIs(first, second)
+        p.release(second)
+        self.assertEqual(p.stats()["created"], 1)
+        self.assertEqual(p.stats()["reused"], 1)
+        p.close()
+
+    def test_overflow_connections_are_closed_on_release(self):
+        p = pool.SQLitePool(self.path, size=1)
+        a, b = p.acquire(), p.acquire()
+        p.release(a)
+        p.release(b)
+        self.assertEqual(p.stats()["idle"], 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            b.execute("SELECT 1")
+        p.close()
+
+    def test_idle_eviction(self):
+        p = pool.SQLitePool(self.path, size=2, idle_timeout=0.0)
+        conn = p.acquire()
+        p.release(conn)
+        self.assertEqual(p.evict_idle(), 1)
+        self.assertEqual(p.stats()["idle"], 0)
+        p.close()
+
+    def test_unhealthy_connection_is_replaced(self):
+        p = pool.SQLitePool(self.path, size=2, ping_after=0.0)
+        conn = p.acquire()
+        p.release(conn)
+        conn.close()
+        fresh = p.acquire()
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(fresh.execute("SELECT count(*) FROM t").fetchone()[0], 3)
+        p.release(fresh)
+        p.close()
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        p = pool.SQLitePool(self.path, size=1)
+        conn = p.acquire()
+        conn.execute("INSERT INTO t VALUES (4, 'd')")
+        p.release(conn)
+        conn = p.acquire()
+        self.assertEqual(conn.execute("SELECT count(*) FROM t").fetchone()[0], 3)
+        p.release(conn)
+        p.close()
+
+    def test_run_sql_query_uses_pool(self):
+        conn_str = f"sqlite:///{self.path}"
+        out = asyncio.run(run_sql_query(conn_str, "SELECT id, name FROM t ORDER BY id", fetch=2))
+        self.assertEqual(json.loads(out), [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        asyncio.run(run_sql_query(conn_str, "SELECT 1"))
+        stats = pool.get_pool_manager().stats()["sqlite"][conn_str]
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["idle"], 1)
+
+    def test_close_pools_closes_idle_connections(self):
+        conn_str = f"sqlite:///{self.path}"
+        with pool.get_pool_manager().connection(conn_str) as conn:
+            pass
+        pool.close_pools()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import profiling, registry
+
+
+def _busy_work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profiler = profiling.Profiler(directory=self.tmp.name, max_files=4)
+        self.old = profiling._PROFILER
+        profiling._PROFILER = self.profiler
+
+    def tearDown(self):
+        profiling._PROFILER = self.old
+        registry._REGISTRY.clear()
+        self.tmp.cleanup()
+
+    def test_samples_next_n_calls_of_named_tool(self):
+        @registry.tools(name="crunch")
+        async def crunch(n: int) -> int:
+            return _busy_work(n)
+
+        @registry.tools(name="other")
+        def other() -> None:
+            return None
+
+        self.profiler.arm("crunch", calls=2)
+        for _ in range(3):
+            registry.call_tool("crunch", 20000)
+        registry.call_tool("other")
+        report = self.profiler.report("crunch")
+        self.assertEqual((report["state"], report["sampled"]), ("done", 2))
+        self.assertTrue(any("_busy_work" in f["function"] for f in report["top_functions"]))
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+        with self.assertRaises(KeyError):
+            self.profiler.report("other")
+
+    def test_memory_sampling_reports_allocation_sites(self):
+        @registry.tools(name="allocate")
+        def allocate() -> int:
+            blob = [bytes(1000) for _ in range(2000)]
+            return len(blob)
+
+        self.profiler.arm("allocate", calls=1, cpu=False, memory=True)
+        registry.call_tool("allocate")
+        report = self.profiler.report("allocate")
+        self.assertEqual(report["top_functions"], [])
+        self.assertTrue(report["top_allocations"])
+        self.assertIn(os.path.basename(__file__), report["top_allocations"][0]["site"])
+        self.assertGreater(report["samples"][0]["allocated_bytes"], 0)
+
+    def test_directory_rotation_and_errors_recorded(self):
+        @registry.tools(name="flaky")
+        def flaky() -> None:
+            raise ValueError("nope")
+
+        self.profiler.arm("flaky", calls=6)
+        for _ in range(6):
+            with self.assertRaises(ValueError):
+                registry.call_tool("flaky")
+        self.assertEqual(len(os.listdir(self.tmp.name)), 4)
+        report = self.profiler.report("flaky")
+        self.assertEqual(report["sampled"], 6)
+        self.assertIn("ValueError", report["samples"][0]["error"])
+
+    def test_directory_must_be_private(self):
+        @registry.tools(name="plain")
+        def plain() -> str:
+            return "ok"
+
+        self.profiler.arm("plain", calls=2)
+        shared = os.path.join(self.tmp.name, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        self.profiler.configure(directory=shared)
+        self.assertEqual(registry.call_tool("plain"), "ok")  # the call still succeeds
+        self.assertIn("not_saved", self.profiler.report("plain")["samples"][0])
+        self.assertEqual(os.listdir(shared), [])
+        with self.assertRaises(RuntimeError):
+            self.profiler.arm("plain")
+        self.assertTrue(profiling.Profiler().directory.endswith(os.path.join("etl-mcp-serv", "profiles")))
+
+    def test_admin_tools(self):
+        from src.tools import profile_report, profile_tool
+
+        @registry.tools(name="tiny")
+        async def tiny() -> str:
+            return "ok"
+
+        status = json.loads(asyncio.run(profile_tool("tiny", calls=3)))
+        self.assertEqual((status["state"], status["remaining"]), ("armed", 3))
+        registry.call_tool("tiny")
+        out = json.loads(asyncio.run(profile_report("tiny", stop=True)))
+        self.assertEqual((out["state"], out["sampled"]), ("done", 1))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(profile_tool("missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
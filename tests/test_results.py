@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import results
+from src.tools import result_delete, result_read, run_sql_query
+
+
+class ResultStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = results.ResultStore(self.tmp.name, threshold=1024, chunk_bytes=1024)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_small_output_stays_inline(self):
+        self.assertEqual(self.store.maybe_spill("short"), "short")
+        self.assertEqual(self.store.stats()["results"], 0)
+
+    def test_large_output_is_spilled_and_read_back_in_chunks(self):
+        text = "".join(f"línea {i}\n" for i in range(2000))
+        payload = json.loads(self.store.maybe_spill(text, "t", summary={"rows": 2000}))
+        self.assertEqual(payload["bytes"], len(text.encode()))
+        self.assertEqual(payload["lines"], 2000)
+        self.assertEqual(payload["summary"], {"rows": 2000})
+        self.assertTrue(payload["preview"].startswith("línea 0\n"))
+        self.assertTrue(payload["preview"].endswith("\n"))
+        self.assertEqual(payload["uri"], f"etl-result://{payload['result_handle']}")
+
+        parts, offset = [], 0
+        while True:
+            page = self.store.read(payload["result_handle"], offset, 1000)
+            parts.append(page["data"])
+            offset = page["next_offset"]
+            if page["eof"]:
+                break
+        self.assertEqual("".join(parts), text)  # no multi-byte character was split
+        self.assertEqual(self.store.chunk(payload["result_handle"], 0)[:7], "línea 0")
+        with self.assertRaises(IndexError):
+            self.store.chunk(payload["result_handle"], payload["chunks"])
+
+    def test_streamed_chunks_and_retention(self):
+        self.store.configure(max_bytes=5000)
+        handles = []
+        for _ in range(3):
+            payload = json.loads(self.store.spill_chunks(iter([b"x" * 1500, b"y" * 500])))
+            handles.append(payload["result_handle"])
+        # 6000 bytes > 5000: the oldest result was evicted
+        with self.assertRaises(KeyError):
+            self.store.read(handles[0])
+        self.assertEqual(self.store.read(handles[2], 1500, 10)["data"], "y" * 10)
+        self.assertEqual(self.store.stats()["evicted"], 1)
+
+        self.store.configure(max_age=0.05)
+        time.sleep(0.1)
+        with self.assertRaises(KeyError):
+            self.store.read(handles[2])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_rejects_unknown_handles_and_picks_up_existing_files(self):
+        with self.assertRaises(KeyError):
+            self.store.read("../../etc/passwd")
+        handle = json.loads(self.store.spill_chunks([b"z" * 2048]))["result_handle"]
+        fresh = results.ResultStore(self.tmp.name)
+        self.assertEqual(fresh.read(handle, 0, 4)["data"], "zzzz")
+        self.assertTrue(fresh.delete(handle))
+        self.assertFalse(fresh.delete(handle))
+
+    def test_spill_directory_must_be_private(self):
+        private = os.path.join(self.tmp.name, "spill")
+        results.ResultStore(private, threshold=0).spill_chunks([b"x"])
+        self.assertEqual(os.stat(private).st_mode & 0o777, 0o700)
+        shared = os.path.join(self.tmp.name, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with self.assertRaises(RuntimeError):
+            results.ResultStore(shared).spill_chunks([b"x"])
+        self.assertTrue(results.ResultStore().directory.endswith(os.path.join("etl-mcp-serv", "spill")))
+
+
+class SQLSpillTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db = os.path.join(self.tmp.name, "t.db")
+        conn = sqlite3.connect(db)
+        conn.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"name-{i}") for i in range(500)])
+        conn.commit()
+        conn.close()
+        self.conn_str = f"sqlite:///{db}"
+        self.store = results.get_result_store()
+        self.old = (self.store.directory, self.store.threshold)
+        self.store.configure(directory=os.path.join(self.tmp.name, "spill"), threshold=2048)
+
+    def tearDown(self):
+        self.store.clear()
+        self.store.configure(directory=self.old[0], threshold=self.old[1])
+        self.tmp.cleanup()
+
+    def test_large_query_returns_handle(self):
+        small = json.loads(asyncio.run(run_sql_query(self.conn_str, "SELECT * FROM t", fetch=3, use_cache=False)))
+        self.assertEqual(len(small), 3)
+
+        payload = json.loads(asyncio.run(run_sql_query(self.conn_str, "SELECT * FROM t", fetch=500, use_cache=False)))
+        self.assertEqual(payload["summary"], {"columns": ["id", "name"], "row_count": 500, "format": "rows"})
+        self.assertEqual(payload["content_type"], "application/json")
+        handle = payload["result_handle"]
+        page = json.loads(asyncio.run(result_read(handle, 0, 100000)))
+        self.assertTrue(page["eof"])
+        self.assertEqual(len(json.loads(page["data"])), 500)
+
+        self.assertEqual(asyncio.run(result_delete(handle)), "deleted")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(result_read(handle))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import sampling
+from src.tools import sql_preview
+
+
+class SketchTests(unittest.TestCase):
+    def test_hyperloglog_estimates(self):
+        big = sampling.HyperLogLog()
+        for i in range(50_000):
+            big.add(i)
+            big.add(i)  # duplicates do not count
+        self.assertLess(abs(big.estimate() - 50_000) / 50_000, 0.03)
+
+        small = sampling.HyperLogLog()
+        for value in ["a", "b", "c", 2, 2.0, b"a"]:
+            small.add(value)
+        self.assertEqual(small.estimate(), 5)  # 2 and 2.0 are one value; "a" and b"a" are two
+
+        other = sampling.HyperLogLog()
+        for i in range(40_000, 60_000):
+            other.add(i)
+        big.merge(other)
+        self.assertLess(abs(big.estimate() - 60_000) / 60_000, 0.03)
+
+    def test_reservoir_is_uniform_and_reproducible(self):
+        first, seen = sampling.reservoir_sample(iter(range(1000)), 10, random.Random(7))
+        again, _ = sampling.reservoir_sample(iter(range(1000)), 10, random.Random(7))
+        self.assertEqual((len(first), seen, first), (10, 1000, again))
+        hits = [0] * 10
+        rng = random.Random(1)
+        for _ in range(2000):
+            sample, _ = sampling.reservoir_sample(iter(range(10)), 3, rng)
+            for v in sample:
+                hits[v] += 1
+        # every element is kept with probability 3/10
+        self.assertTrue(all(abs(h / 2000 - 0.3) < 0.05 for h in hits), hits)
+
+
+class PreviewTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db = os.path.join(self.tmp.name, "big.db")
+        conn = sqlite3.connect(db)
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, kind TEXT, user INTEGER)")
+        conn.executemany(
+            "INSERT INTO events VALUES (?, ?, ?)",
+            [(i, f"k{i % 7}", i % 1000 if i % 10 else None) for i in range(1, 20_001)],
+        )
+        conn.commit()
+        conn.close()
+        self.conn_str = f"sqlite:///{db}"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def preview(self, **kwargs):
+        return json.loads(asyncio.run(sql_preview(self.conn_str, **kwargs)))
+
+    def test_rowid_sampling_spans_the_table(self):
+        out = self.preview(table="events", rows=50, seed=3, columns=["id", "kind"])
+        self.assertEqual(out["method"], "rowid")
+        self.assertEqual(out["columns"], ["id", "kind"])
+        ids = [r["id"] for r in out["rows"]]
+        self.assertEqual(len(set(ids)), 50)
+        self.assertGreater(max(ids) - min(ids), 10_000)
+        self.assertNotIn("rows_scanned", out)
+        self.assertEqual(out["sample_scope"], "table")
+        self.assertEqual(self.preview(table="events", rows=50, seed=3, columns=["id", "kind"])["rows"], out["rows"])
+
+    def test_approximate_counts_within_a_budget(self):
+        full = self.preview(table="events", rows=5, approx=True, row_budget=50_000)
+        self.assertTrue(full["complete"])
+        self.assertEqual((full["approx"]["count"], full["approx"]["count_exact"]), (20_000, True))
+        self.assertEqual(full["approx"]["distinct"]["kind"], 7)
+        self.assertEqual(full["approx"]["non_null"]["user"], 18_000)
+        self.assertLess(abs(full["approx"]["distinct"]["user"] - 900), 30)  # multiples of 10 are null
+
+        cut = self.preview(query="SELECT kind, user FROM events", rows=5, approx=True, row_budget=5_000)
+        self.assertEqual((cut["method"], cut["rows_scanned"], cut["complete"]), ("reservoir", 5_000, False))
+        self.assertEqual((cut["approx"]["count"], cut["approx"]["count_exact"]), (5_000, False))
+        self.assertEqual(len(cut["rows"]), 5)
+        # the reservoir only ever saw the first 5000 rows of the query
+        self.assertEqual(cut["sample_scope"], "first 5000 rows")
+        early = self.preview(query="SELECT id FROM events ORDER BY id", rows=50, row_budget=5_000)
+        self.assertTrue(all(r["id"] <= 5_000 for r in early["rows"]))
+        whole = self.preview(query="SELECT kind FROM events", rows=5, row_budget=50_000)
+        self.assertEqual(whole["sample_scope"], "all rows")
+
+        table_cut = self.preview(table="events", rows=5, approx=True, row_budget=5_000)
+        self.assertEqual((table_cut["approx"]["count"], table_cut["approx"]["count_source"]), (20_000, "max_rowid"))
+
+    def test_argument_errors(self):
+        with self.assertRaises(ValueError):
+            self.preview()
+        with self.assertRaises(ValueError):
+            self.preview(query="SELECT 1", method="rowid")
+        with self.assertRaises(ValueError):
+            self.preview(query="DELETE FROM events")
+        self.assertEqual(self.preview(table="events", rows=1, approx=True)["approx"]["count"], 20_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
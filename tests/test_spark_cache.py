@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import hdfs_listing, results, spark_cache, spark_jobs, webhdfs
+from src.tools import result_read, run_spark_job, spark_cache_stats
+
+from webhdfs_standin import WebHDFSStandIn
+
+# records every real run next to the app file, then prints the app and its args
+FAKE_SPARK_SUBMIT = """#!/bin/sh
+echo run >> "$(dirname "$1")/runs.log"
+case "$2" in
+  fail) echo "boom" >&2; exit 2 ;;
+esac
+echo "$(cat "$1") $*"
+"""
+
+
+class SparkResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        script = os.path.join(self.tmp.name, "spark-submit")
+        with open(script, "w") as fh:
+            fh.write(FAKE_SPARK_SUBMIT)
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = self.tmp.name + os.pathsep + self.old_path
+        spark_jobs.get_job_manager().configure(log_dir=os.path.join(self.tmp.name, "logs"))
+        self.cache = spark_cache.get_spark_cache()
+        self.old_dir = self.cache.directory
+        self.cache.configure(directory=os.path.join(self.tmp.name, "cache"))
+
+        self.app = self.path("job.py", "v1")
+        self.inputs = os.path.join(self.tmp.name, "in")
+        self.path("in/part-0.csv", "a,b\n")
+        self.outputs = os.path.join(self.tmp.name, "out")
+        os.makedirs(self.outputs)
+
+    def tearDown(self):
+        spark_jobs.close_job_manager()
+        self.cache.clear()
+        self.cache.stats(reset=True)
+        self.cache.configure(directory=self.old_dir, enabled=False)
+        os.environ["PATH"] = self.old_path
+        self.tmp.cleanup()
+
+    def path(self, name, text):
+        full = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as fh:
+            fh.write(text)
+        return full
+
+    def runs(self):
+        with open(os.path.join(self.tmp.name, "runs.log")) as fh:
+            return len(fh.readlines())
+
+    def run_job(self, args=("x",), **kwargs):
+        kwargs.setdefault("cache", True)
+        kwargs.setdefault("inputs", [self.inputs])
+        kwargs.setdefault("outputs", [self.outputs])
+        return json.loads(asyncio.run(run_spark_job(self.app, list(args), **kwargs)))
+
+    def test_hit_returns_stored_stdout_with_provenance(self):
+        first = self.run_job()
+        self.assertEqual(first["stdout"], f"v1 {self.app} x\n")
+        self.assertEqual((first["cache"]["hit"], first["cache"]["stored"]), (False, True))
+
+        second = self.run_job()
+        self.assertEqual(self.runs(), 1)
+        self.assertEqual(second["stdout"], first["stdout"])
+        info = second["cache"]
+        self.assertTrue(info["hit"])
+        self.assertEqual((info["key"], info["job_id"]), (first["cache"]["key"], first["cache"]["job_id"]))
+        self.assertEqual((info["outputs"], info["args"]), ([self.outputs], ["x"]))
+        self.assertEqual((info["inputs"][0]["files"], info["inputs"][0]["bytes"]), (1, 4))
+        self.assertGreaterEqual(info["age_seconds"], 0)
+        self.assertIn("run_seconds", info)
+        self.assertEqual(info["app_sha256"], spark_cache.sha256_file(self.app))
+
+        # not opted in: runs as before and returns plain stdout
+        self.assertEqual(asyncio.run(run_spark_job(self.app, ["x"])), f"v1 {self.app} x\n")
+        self.assertEqual(self.runs(), 2)
+        stats = json.loads(asyncio.run(spark_cache_stats()))
+        self.assertEqual((stats["hits"], stats["stores"], stats["entries"]), (1, 1, 1))
+
+    def test_large_stdout_comes_back_as_a_handle_on_hits_too(self):
+        store = results.get_result_store()
+        old = (store.directory, store.threshold)
+        store.configure(directory=os.path.join(self.tmp.name, "spill"), threshold=4096)
+        self.path("job.py", "x" * 5000)
+        try:
+            first, second = self.run_job(), self.run_job()
+            self.assertEqual((second["cache"]["hit"], self.runs()), (True, 1))
+            for out in (first, second):
+                self.assertNotIn("stdout", out)
+                handle = out["stdout_handle"]["result_handle"]
+                page = json.loads(asyncio.run(result_read(handle, 0, 10000)))
+                self.assertEqual(page["data"], f"{'x' * 5000} {self.app} x\n")
+        finally:
+            store.clear()
+            store.configure(directory=old[0], threshold=old[1])
+
+    def test_changes_to_app_args_inputs_or_outputs_miss(self):
+        self.run_job()
+        self.assertFalse(self.run_job(args=["y"])["cache"]["hit"])
+        self.path("in/part-0.csv", "a,b,c\n")
+        self.assertFalse(self.run_job()["cache"]["hit"])
+        self.path("in/part-1.csv", "")
+        self.assertFalse(self.run_job()["cache"]["hit"])
+        self.path("job.py", "v2")
+        changed = self.run_job()
+        self.assertFalse(changed["cache"]["hit"])
+        self.assertTrue(changed["stdout"].startswith("v2 "))
+        self.assertTrue(self.run_job()["cache"]["hit"])
+        self.assertEqual(self.runs(), 5)
+
+        shutil.rmtree(self.outputs)  # a hit whose outputs are gone is re-run
+        self.assertFalse(self.run_job()["cache"]["hit"])
+        self.assertEqual((self.runs(), self.cache.stats()["stale"]), (6, 1))
+
+        # touching an input without changing it misses by mtime, hits by checksum
+        os.makedirs(self.outputs)
+        self.run_job(checksum=True)
+        os.utime(os.path.join(self.inputs, "part-0.csv"), (1, 1))
+        self.assertTrue(self.run_job(checksum=True)["cache"]["hit"])
+        self.assertFalse(self.run_job()["cache"]["hit"])
+
+    def test_failures_and_uncacheable_apps_are_not_stored(self):
+        out = asyncio.run(run_spark_job(self.app, ["fail"], cache=True))
+        self.assertTrue(out.startswith("spark-submit failed (rc=2)"))
+        asyncio.run(run_spark_job(self.app, ["fail"], cache=True))
+        self.assertEqual((self.runs(), self.cache.stats()["stores"]), (2, 0))
+
+        missing = json.loads(asyncio.run(run_spark_job(os.path.join(self.tmp.name, "nope.py"), cache=True)))
+        self.assertEqual((missing["cache"]["stored"], missing["cache"]["key"]), (False, None))
+        self.assertIn("not a local or HDFS file", missing["cache"]["reason"])
+
+    def test_lru_and_size_eviction_survive_restarts(self):
+        directory = os.path.join(self.tmp.name, "lru")
+        cache = spark_cache.SparkResultCache(directory, max_entries=2)
+        keys = [spark_cache.cache_key("app", [str(i)], []) for i in range(3)]
+        for key in keys[:2]:
+            self.assertTrue(cache.put(key, {"created_at": 0}, [b"out\n"]))
+        cache.get(keys[0])  # keys[1] is now least recently used
+        cache.put(keys[2], {"created_at": 0}, [b"out\n"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get(keys[1]))
+
+        reopened = spark_cache.SparkResultCache(directory, max_entries=2, max_entry_bytes=8)
+        self.assertEqual(reopened.read_stdout(keys[0]), "out\n")
+        self.assertEqual(reopened.stats()["entries"], 2)
+        self.assertFalse(reopened.put(keys[1], {}, [b"12345", b"67890"]))
+        self.assertEqual(reopened.stats()["too_large"], 1)
+        reopened.configure(max_bytes=1)
+        self.assertEqual(reopened.stats()["entries"], 0)
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_cache_directory_must_be_private(self):
+        directory = os.path.join(self.tmp.name, "private")
+        cache = spark_cache.SparkResultCache(directory)
+        self.assertTrue(cache.put(spark_cache.cache_key("app", [], []), {}, [b"out\n"]))
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+        self.assertEqual([n for n in os.listdir(directory) if n.endswith(".tmp")], [])
+
+        os.chmod(directory, 0o777)
+        with self.assertRaises(RuntimeError):
+            spark_cache.SparkResultCache(directory).stats()
+        self.assertTrue(spark_cache.default_directory().endswith(os.path.join("etl-mcp-serv", "spark-results")))
+
+    def test_hdfs_inputs_are_fingerprinted_from_listings(self):
+        server = WebHDFSStandIn().start()
+        webhdfs.configure_webhdfs(url=server.url)
+        try:
+            server.fs.write("/data/events/part-0", b"12345")
+            server.fs.mkdirs("/data/out")
+            kwargs = {"inputs": ["hdfs://nn:8020/data/events"], "outputs": ["hdfs:///data/out"]}
+            first = self.run_job(**kwargs)
+            self.assertEqual(first["cache"]["inputs"][0]["bytes"], 5)
+            self.assertNotIn("app_fingerprint", first["cache"])  # a local app is hashed
+            self.assertTrue(self.run_job(**kwargs)["cache"]["hit"])
+            server.fs.write("/data/events/part-0", b"123456")
+            self.assertFalse(self.run_job(**kwargs)["cache"]["hit"])
+            server.fs.delete("/data/out")
+            self.assertFalse(self.run_job(**kwargs)["cache"]["hit"])
+            self.assertEqual(self.runs(), 3)
+        finally:
+            webhdfs.close_webhdfs()
+            webhdfs.configure_webhdfs(url="")
+            hdfs_listing.get_directory_cache().clear()
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import spark_jobs
+from src.tools import run_spark_job, spark_job_cancel, spark_job_logs, spark_job_status, spark_submit
+
+FAKE_SPARK_SUBMIT = """#!/bin/sh
+case "$1" in
+  sleep) echo started; sleep "$2"; echo done ;;
+  chatty) i=0; while [ $i -lt "$2" ]; do echo "log line $i" >&2; i=$((i+1)); done; echo ok ;;
+  fail) echo "boom: $2" >&2; exit 3 ;;
+  *) echo "ran $*" ;;
+esac
+"""
+
+
+class SparkJobManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        script = os.path.join(self.tmp.name, "spark-submit")
+        with open(script, "w") as fh:
+            fh.write(FAKE_SPARK_SUBMIT)
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = self.tmp.name + os.pathsep + self.old_path
+        self.manager = spark_jobs.get_job_manager()
+        self.manager.configure(max_concurrent=2, log_dir=os.path.join(self.tmp.name, "logs"))
+
+    def tearDown(self):
+        spark_jobs.close_job_manager()
+        self.manager.configure(
+            max_concurrent=spark_jobs.DEFAULT_MAX_CONCURRENT, log_buffer_bytes=spark_jobs.DEFAULT_LOG_BUFFER_BYTES
+        )
+        os.environ["PATH"] = self.old_path
+        self.tmp.cleanup()
+
+    def submit(self, *args, **kwargs):
+        return json.loads(asyncio.run(spark_submit(*args, **kwargs)))["job_id"]
+
+    def status(self, job_id):
+        return json.loads(asyncio.run(spark_job_status(job_id)))
+
+    def wait_for(self, job_id, states=("succeeded", "failed", "cancelled", "timed_out"), timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            info = self.status(job_id)
+            if info["state"] in states:
+                return info
+            time.sleep(0.02)
+        self.fail(f"job {job_id} still {info['state']}")
+
+    def test_submit_returns_before_job_finishes(self):
+        start = time.monotonic()
+        job_id = self.submit("sleep", ["0.5"])
+        self.assertLess(time.monotonic() - start, 0.4)
+        info = self.wait_for(job_id)
+        self.assertEqual((info["state"], info["returncode"]), ("succeeded", 0))
+        self.assertEqual(asyncio.run(spark_job_logs(job_id, stream="stdout")), "started\ndone")
+
+    def test_concurrency_limit_queues_jobs(self):
+        self.manager.configure(max_concurrent=1)
+        first = self.submit("sleep", ["5"])
+        second = self.submit("app.py")
+        self.wait_for(first, states=("running",))
+        time.sleep(0.1)
+        self.assertEqual(self.status(second)["state"], "queued")
+        self.assertIn("cancelled", asyncio.run(spark_job_cancel(first)))
+        self.assertEqual(self.wait_for(second)["state"], "succeeded")
+
+    def test_cancel_queued_job(self):
+        self.manager.configure(max_concurrent=1)
+        first = self.submit("sleep", ["5"])
+        second = self.submit("app.py")
+        asyncio.run(spark_job_cancel(second))
+        self.assertEqual(self.status(second)["state"], "cancelled")
+        asyncio.run(spark_job_cancel(first))
+        self.assertEqual(self.wait_for(first)["state"], "cancelled")
+
+    def test_chatty_job_spills_to_disk(self):
+        self.manager.configure(log_buffer_bytes=1024)
+        job_id = self.submit("chatty", ["2000"])
+        info = self.wait_for(job_id)
+        stderr = info["stderr"]
+        self.assertEqual(stderr["lines"], 2000)
+        self.assertLessEqual(stderr["buffered_bytes"], 1024)
+        self.assertGreater(stderr["spilled_lines"], 1900)
+        tail = asyncio.run(spark_job_logs(job_id, lines=200)).splitlines()
+        self.assertEqual(tail[0], "log line 1800")
+        self.assertEqual(tail[-1], "log line 1999")
+
+    def test_timeout_and_unknown_job(self):
+        job_id = self.submit("sleep", ["5"], timeout=0.2)
+        self.assertEqual(self.wait_for(job_id)["state"], "timed_out")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(spark_job_status("missing"))
+
+    def test_log_dir_must_be_private(self):
+        shared = os.path.join(self.tmp.name, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        self.manager.configure(log_dir=shared)
+        with self.assertRaises(RuntimeError):
+            self.manager.submit("app.py")
+        self.assertTrue(spark_jobs.SparkJobManager().log_dir.endswith(os.path.join("etl-mcp-serv", "spark-logs")))
+
+    def test_run_spark_job_waits_and_reports_failure(self):
+        self.assertEqual(asyncio.run(run_spark_job("app.py", ["a"])), "ran app.py a\n")
+        out = asyncio.run(run_spark_job("fail", ["bad input"]))
+        self.assertEqual(out, "spark-submit failed (rc=3):\nboom: bad input\n")
+        self.assertEqual(asyncio.run(run_spark_job("sleep", ["5"], timeout=0.2)), "spark-submit timed out")
+
+    def test_large_output_is_returned_as_a_result_handle(self):
+        from src.tools import result_read, results
+
+        store = results.get_result_store()
+        old = (store.directory, store.threshold)
+        store.configure(directory=os.path.join(self.tmp.name, "spill"), threshold=4096)
+        self.manager.configure(log_buffer_bytes=1024)
+        try:
+            out = asyncio.run(run_spark_job("chatty", ["2000"]))  # stdout is small
+            self.assertEqual(out, "ok\n")
+            out = asyncio.run(run_spark_job("fail", ["x" * 5000]))
+            prefix, payload = out.split("\n", 1)
+            self.assertEqual(prefix, "spark-submit failed (rc=3):")
+            payload = json.loads(payload)
+            self.assertEqual(payload["summary"]["stream"], "stderr")
+            page = json.loads(asyncio.run(result_read(payload["result_handle"], 0, 10000)))
+            self.assertEqual(page["data"], "boom: " + "x" * 5000 + "\n")
+        finally:
+            store.clear()
+            store.configure(directory=old[0], threshold=old[1])
+
+
+class LogBufferTests(unittest.TestCase):
+    def test_partial_lines_are_joined(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            buf = spark_jobs.LogBuffer(64, os.path.join(tmp, "out.log"))
+            buf.write(b"hel")
+            buf.write(b"lo\nwor")
+            buf.write(b"ld")
+            buf.finish()
+            self.assertEqual(buf.tail(5), ["hello", "world"])
+            buf.close(remove=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
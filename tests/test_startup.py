@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.core import manifest
+from src.tools import registry
+
+# other suites clear the registry in tearDown; keep the real tools around
+_TOOLS = dict(registry._REGISTRY)
+
+# seconds for manifest load + stub registration in a fresh interpreter
+STARTUP_BUDGET = float(os.environ.get("ETL_MCP_STARTUP_BUDGET", "0.25"))
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from src.core import app
+from src.core.manifest import LazyTools
+
+class Server:
+    def __init__(self):
+        self.tools = {}
+    def add_tool(self, fn, name=None, description=None):
+        self.tools[name] = fn
+
+server = Server()
+tools = LazyTools("src.tools")
+count = app.register_tools(server, tools, sys.argv[1])
+elapsed = time.perf_counter() - start
+loaded_early = "src.tools" in sys.modules
+import asyncio
+stats = json.loads(asyncio.run(server.tools["sql_cache_stats"]()))
+print(json.dumps({"count": count, "elapsed": elapsed, "loaded_early": loaded_early,
+                  "loaded_after_call": tools.loaded, "stats_keys": sorted(stats)}))
+"""
+
+
+class Server:
+    def __init__(self):
+        self.tools = {}
+
+    def add_tool(self, fn, name=None, description=None):
+        self.tools[name] = (fn, description)
+
+
+class ManifestTests(unittest.TestCase):
+    def setUp(self):
+        registry._REGISTRY.update(_TOOLS)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_manifest_describes_tools_and_caches(self):
+        built = manifest.get_manifest("src.tools", self.path)
+        entry = next(t for t in built["tools"] if t["name"] == "run_sql_query")
+        self.assertEqual(entry["schema"]["required"], ["conn_str", "query"])
+        self.assertEqual(entry["schema"]["properties"]["fetch"], {"type": "integer", "default": 100})
+        hdfs = next(t for t in built["tools"] if t["name"] == "hdfs_list")
+        self.assertEqual(hdfs["schema"]["properties"]["pattern"]["type"], ["string", "null"])
+        self.assertEqual(manifest.load_manifest(self.path, "src.tools"), built)
+
+        with open(self.path) as fh:
+            stale = json.load(fh)
+        stale["fingerprint"] = "old"
+        manifest.write_manifest(stale, self.path)
+        self.assertIsNone(manifest.load_manifest(self.path, "src.tools"))
+
+    def test_untrusted_manifests_are_ignored(self):
+        built = manifest.get_manifest("src.tools", self.path)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+        os.chmod(self.path, 0o666)  # writable by others: rebuilt rather than trusted
+        self.assertIsNone(manifest.load_manifest(self.path, "src.tools"))
+        os.chmod(self.path, 0o600)
+
+        planted = json.loads(json.dumps(built))
+        planted["tools"][0]["params"].append({"name": "x; import os", "kind": "KEYWORD_ONLY", "annotation": None})
+        manifest.write_manifest(planted, self.path)
+        self.assertIsNone(manifest.load_manifest(self.path, "src.tools"))
+
+        # annotations are parsed against a fixed table, never evaluated
+        self.assertIs(manifest._resolve_annotation("().__class__.__base__.__subclasses__()"), manifest.Any)
+        self.assertIs(manifest._resolve_annotation("List[os]"), manifest.Any)
+        self.assertEqual(manifest._resolve_annotation("Optional[Dict[str, Any]]"), manifest.Optional[manifest.Dict[str, manifest.Any]])
+        self.assertEqual(manifest._resolve_annotation("int | None"), manifest.Optional[int])
+
+    def test_stub_keeps_signature_and_loads_on_first_call(self):
+        built = manifest.get_manifest("src.tools", self.path)
+        loaded = []
+        tools = manifest.LazyTools("src.tools", on_load=loaded.append)
+        entry = next(t for t in built["tools"] if t["name"] == "sql_cache_stats")
+        stub = manifest.make_stub(entry, tools)
+        self.assertEqual(str(manifest.inspect.signature(stub)), "(reset: bool = False, clear: bool = False) -> str")
+        self.assertFalse(tools.loaded)
+        self.assertIn("hits", json.loads(asyncio.run(stub())))
+        self.assertEqual(len(loaded), 1)
+
+    def test_register_tools_uses_manifest(self):
+        from src.core import app
+
+        server = Server()
+        count = app.register_tools(server, manifest.LazyTools("src.tools"), self.path)
+        self.assertEqual(count, len(server.tools))
+        self.assertIn("hdfs_get", server.tools)
+        self.assertTrue(server.tools["hdfs_get"][1].startswith("Download an HDFS file"))
+
+
+class StartupBudgetTests(unittest.TestCase):
+    def test_cold_start_with_cached_manifest_is_lazy_and_fast(self):
+        registry._REGISTRY.update(_TOOLS)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            manifest.get_manifest("src.tools", path)
+            proc = subprocess.run(
+                [sys.executable, "-c", STARTUP_SCRIPT, path], capture_output=True, text=True, timeout=60
+            )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        out = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.assertGreater(out["count"], 10)
+        self.assertFalse(out["loaded_early"])
+        self.assertTrue(out["loaded_after_call"])
+        self.assertIn("hits", out["stats_keys"])
+        self.assertLess(out["elapsed"], STARTUP_BUDGET, f"startup took {out['elapsed']:.3f}s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
+import asyncio
 import sys
+import threading
+import time
 import unittest
 
 # Ensure project src is importable
@@ -31,11 +34,236 @@ class RegistryTests(unittest.TestCase):
 
         self.assertIn("async_tool", registry.list_tools())
         # call via async helper
-        import asyncio
-
         out = asyncio.run(registry.call_tool_async("async_tool", 2, 3))
         self.assertEqual(out, 5)
 
+    def test_sync_calls_share_one_loop(self):
+        @registry.tools(name="loop_id")
+        async def loop_id() -> int:
+            return id(asyncio.get_running_loop())
+
+        self.assertEqual(registry.call_tool("loop_id"), registry.call_tool("loop_id"))
+
+    def test_call_tool_inside_running_loop(self):
+        @registry.tools(name="double")
+        async def double(x: int) -> int:
+            return 2 * x
+
+        async def caller():
+            return registry.call_tool("double", 21)
+
+        self.assertEqual(asyncio.run(caller()), 42)
+
+    def test_batch_runs_concurrently_and_collects_errors(self):
+        @registry.tools(name="slow")
+        async def slow(x: int) -> int:
+            await asyncio.sleep(0.2)
+            return x
+
+        @registry.tools(name="blocking")
+        def blocking(x: int) -> int:
+            time.sleep(0.2)
+            return -x
+
+        @registry.tools(name="broken")
+        async def broken() -> None:
+            raise ValueError("nope")
+
+        calls = [("slow", (i,)) for i in range(10)] + [
+            {"name": "blocking", "args": [1]},
+            "broken",
+            ("missing", None, {"x": 1}),
+        ]
+        start = time.monotonic()
+        out = registry.call_tools_batch(calls, concurrency=16)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(out[:11], list(range(10)) + [-1])
+        self.assertIsInstance(out[11], ValueError)
+        self.assertIsInstance(out[12], KeyError)
+
+    def test_batch_respects_concurrency_cap(self):
+        active = {"now": 0, "peak": 0}
+
+        @registry.tools(name="track")
+        async def track() -> None:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+
+        registry.call_tools_batch(["track"] * 20, concurrency=3)
+        self.assertEqual(active["peak"], 3)
+
+
+class SchedulerTests(unittest.TestCase):
+    def tearDown(self):
+        registry._REGISTRY.clear()
+        registry.configure_scheduler(max_concurrency=0, max_queue=0)
+
+    def test_per_tool_limit_declared_on_decorator(self):
+        active = {"now": 0, "peak": 0}
+
+        @registry.tools(name="heavy", max_concurrency=2)
+        async def heavy() -> None:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.02)
+            active["now"] -= 1
+
+        registry.call_tools_batch(["heavy"] * 8)
+        self.assertEqual(active["peak"], 2)
+        self.assertEqual(registry.get_scheduler().stats()["tools"]["heavy"]["admitted"], 8)
+
+    def test_full_queue_rejects_immediately(self):
+        @registry.tools(name="narrow", max_concurrency=1, max_queue=1)
+        async def narrow() -> str:
+            await asyncio.sleep(0.2)
+            return "ok"
+
+        start = time.monotonic()
+        out = registry.call_tools_batch(["narrow"] * 3)
+        self.assertEqual(out[:2], ["ok", "ok"])
+        self.assertIsInstance(out[2], registry.ToolRejected)
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_priority_order_and_deadline(self):
+        registry.configure_scheduler(max_concurrency=1)
+        order = []
+
+        @registry.tools(name="gate")
+        async def gate() -> None:
+            await asyncio.sleep(0.1)
+
+        @registry.tools(name="cheap", priority="high")
+        async def cheap(tag: str) -> None:
+            order.append(tag)
+
+        @registry.tools(name="bulk", priority="low")
+        async def bulk(tag: str) -> None:
+            order.append(tag)
+
+        out = registry.call_tools_batch(
+            [
+                "gate",
+                ("bulk", ("low",)),
+                {"name": "bulk", "args": ["dropped"], "timeout": 0.02},
+                ("cheap", ("high",)),
+            ]
+        )
+        self.assertEqual(order, ["high", "low"])
+        self.assertIsInstance(out[2], registry.ToolDeadlineExceeded)
+        stats = registry.get_scheduler().stats()
+        self.assertEqual((stats["running"], stats["queued"]), (0, 0))
+        self.assertEqual(stats["tools"]["bulk"]["expired"], 1)
+
+    def test_sync_tools_and_call_options(self):
+        registry.configure_scheduler(max_concurrency=1)
+        release = threading.Event()
+
+        @registry.tools(name="hold")
+        def hold() -> None:
+            release.wait(5)
+
+        @registry.tools(name="quick")
+        async def quick() -> str:
+            return "done"
+
+        worker = threading.Thread(target=registry.call_tool, args=("hold",))
+        worker.start()
+        time.sleep(0.05)
+        with registry.call_options(timeout=0.05):
+            with self.assertRaises(registry.ToolDeadlineExceeded):
+                registry.call_tool("quick")
+        release.set()
+        worker.join()
+        self.assertEqual(registry.call_tool("quick"), "done")
+
+
+class CoalescingTests(unittest.TestCase):
+    def tearDown(self):
+        registry._REGISTRY.clear()
+        registry.get_single_flight().configure(enabled=True)
+
+    def test_identical_concurrent_calls_share_one_execution(self):
+        runs = []
+
+        @registry.tools(name="listing", coalesce=True)
+        async def listing(path: str, recursive: bool = False) -> list:
+            runs.append(path)
+            await asyncio.sleep(0.05)
+            return [path + "/a"]
+
+        out = registry.call_tools_batch(
+            [("listing", ("/x",)), ("listing", (), {"path": "/x"}), ("listing", ("/x", False)), ("listing", ("/y",))]
+        )
+        self.assertEqual(out, [["/x/a"]] * 3 + [["/y/a"]])
+        self.assertEqual(sorted(runs), ["/x", "/y"])
+        stats = registry.get_single_flight().stats()["tools"]["listing"]
+        self.assertEqual((stats["executions"], stats["coalesced"], stats["in_flight"]), (2, 2, 0))
+        # once the call has finished, the next one executes again
+        registry.call_tool("listing", "/x")
+        self.assertEqual(runs.count("/x"), 2)
+
+    def test_errors_are_shared_and_predicate_limits_coalescing(self):
+        runs = []
+
+        @registry.tools(name="query", coalesce=lambda a: a["sql"].startswith("SELECT"))
+        async def query(sql: str) -> str:
+            runs.append(sql)
+            await asyncio.sleep(0.05)
+            if "bad" in sql:
+                raise ValueError(sql)
+            return "ok"
+
+        out = registry.call_tools_batch([("query", ("SELECT bad",))] * 2 + [("query", ("INSERT 1",))] * 2)
+        self.assertIsInstance(out[0], ValueError)
+        self.assertIs(out[0], out[1])
+        self.assertEqual(out[2:], ["ok", "ok"])
+        self.assertEqual(sorted(runs), ["INSERT 1", "INSERT 1", "SELECT bad"])
+
+    def test_side_effecting_tools_are_never_coalesced(self):
+        runs = []
+
+        @registry.tools(name="upload", coalesce=False)
+        async def upload(path: str) -> None:
+            runs.append(path)
+            await asyncio.sleep(0.02)
+
+        registry.call_tools_batch([("upload", ("/p",))] * 3)
+        self.assertEqual(len(runs), 3)
+        with self.assertRaises(ValueError):
+            registry.get_single_flight().configure(tools={"upload": True})
+
+    def test_sync_tools_coalesce_across_threads(self):
+        runs = []
+
+        @registry.tools(name="slow_sync", coalesce=True)
+        def slow_sync(n: int) -> int:
+            runs.append(n)
+            time.sleep(0.1)
+            return n * 2
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.call_tool("slow_sync", 4))) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [8, 8, 8])
+        self.assertEqual(runs, [4])
+
+    def test_disabled_globally(self):
+        runs = []
+
+        @registry.tools(name="counted", coalesce=True)
+        async def counted() -> None:
+            runs.append(1)
+            await asyncio.sleep(0.02)
+
+        registry.get_single_flight().configure(enabled=False)
+        registry.call_tools_batch(["counted"] * 3)
+        self.assertEqual(len(runs), 3)
+
 
 if __name__ == "__main__":
     unittest.main()
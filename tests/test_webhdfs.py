@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Ensure project src is importable
+sys.path.insert(0, "src")
+
+from src.tools import hdfs_listing, webhdfs
+from src.tools import hdfs_list, hdfs_put
+
+from webhdfs_standin import WebHDFSStandIn
+
+
+class WebHDFSTests(unittest.TestCase):
+    def setUp(self):
+        self.server = WebHDFSStandIn().start()
+        webhdfs.configure_webhdfs(url=self.server.url)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        webhdfs.close_webhdfs()
+        webhdfs.configure_webhdfs(url="")
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_list_returns_full_paths(self):
+        self.server.fs.write("/data/a.csv", b"1")
+        self.server.fs.write("/data/b.csv", b"2")
+        self.server.fs.mkdirs("/data/sub")
+        out = asyncio.run(hdfs_list("/data"))
+        self.assertEqual(out, ["/data/a.csv", "/data/b.csv", "/data/sub"])
+
+    def test_list_missing_path_raises(self):
+        with self.assertRaises(RuntimeError):
+            asyncio.run(hdfs_list("/nope"))
+
+    def test_put_streams_file_and_resolves_directory_target(self):
+        local = os.path.join(self.tmp.name, "part-0000.csv")
+        payload = os.urandom(3 * webhdfs.DEFAULT_CHUNK_SIZE + 17)
+        with open(local, "wb") as fh:
+            fh.write(payload)
+        self.server.fs.mkdirs("/landing")
+        out = asyncio.run(hdfs_put(local, "/landing"))
+        self.assertEqual(out, "uploaded /landing/part-0000.csv")
+        self.assertEqual(self.server.fs.get("/landing/part-0000.csv")["data"], payload)
+
+    def test_put_refuses_to_overwrite(self):
+        local = os.path.join(self.tmp.name, "f.txt")
+        with open(local, "wb") as fh:
+            fh.write(b"x")
+        self.server.fs.write("/f.txt", b"old")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(hdfs_put(local, "/f.txt"))
+
+    def test_connections_are_reused_within_a_loop(self):
+        self.server.fs.mkdirs("/d")
+        cache = hdfs_listing.get_directory_cache()
+        ttl = cache.ttl
+        cache.configure(ttl=0)
+
+        async def many():
+            for _ in range(20):
+                await hdfs_list("/d")
+
+        try:
+            asyncio.run(many())
+        finally:
+            cache.configure(ttl=ttl)
+        self.assertEqual(self.server.requests, 20)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_unreachable_namenode_reports_guidance(self):
+        webhdfs.configure_webhdfs(url="http://127.0.0.1:9")
+        with self.assertRaises(RuntimeError) as ctx:
+            asyncio.run(hdfs_list("/"))
+        self.assertIn("namenode", str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+"""In-process WebHDFS stand-in used by the HDFS tests and benchmarks.
+
+Implements the subset of the WebHDFS REST API the tools use on top of an
+in-memory file tree, including the namenode -> datanode redirect on CREATE
+and chunked request bodies. Served by a threaded HTTP/1.1 server on an
+ephemeral port so keep-alive connection reuse can be observed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import posixpath
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+PREFIX = "/webhdfs/v1"
+
+
+class FakeHDFS:
+    """An in-memory namespace: path -> {"type", "data", "mtime", "replication"}."""
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Dict[str, Any]] = {"/": self._dir()}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _dir() -> Dict[str, Any]:
+        return {"type": "DIRECTORY", "data": b"", "mtime": int(time.time() * 1000), "replication": 0}
+
+    def mkdirs(self, path: str) -> None:
+        path = posixpath.normpath(path)
+        with self.lock:
+            parts = [p for p in path.split("/") if p]
+            cur = ""
+            for p in parts:
+                cur += "/" + p
+                node = self.nodes.get(cur)
+                if node is None:
+                    self.nodes[cur] = self._dir()
+                elif node["type"] != "DIRECTORY":
+                    raise FileExistsError(cur)
+
+    def write(self, path: str, data: bytes, replication: int = 3) -> None:
+        path = posixpath.normpath(path)
+        self.mkdirs(posixpath.dirname(path))
+        with self.lock:
+            self.nodes[path] = {
+                "type": "FILE",
+                "data": data,
+                "mtime": int(time.time() * 1000),
+                "replication": replication,
+            }
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        return self.nodes.get(posixpath.normpath(path) if path != "/" else "/")
+
+    def children(self, path: str) -> Dict[str, Dict[str, Any]]:
+        path = posixpath.normpath(path)
+        prefix = path.rstrip("/") + "/"
+        with self.lock:
+            return {
+                p[len(prefix):]: n
+                for p, n in self.nodes.items()
+                if p.startswith(prefix) and p != path and "/" not in p[len(prefix):]
+            }
+
+    def delete(self, path: str) -> bool:
+        path = posixpath.normpath(path)
+        with self.lock:
+            hit = [p for p in self.nodes if p == path or p.startswith(path.rstrip("/") + "/")]
+            for p in hit:
+                del self.nodes[p]
+            return bool(hit)
+
+
+def file_status(suffix: str, node: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "accessTime": node["mtime"],
+        "blockSize": 134217728 if node["type"] == "FILE" else 0,
+        "group": "supergroup",
+        "length": len(node["data"]),
+        "modificationTime": node["mtime"],
+        "owner": "hdfs",
+        "pathSuffix": suffix,
+        "permission": "644" if node["type"] == "FILE" else "755",
+        "replication": node["replication"],
+        "type": node["type"],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # buffer each response so headers and body leave in one segment
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: "WebHDFSStandIn"
+
+    def log_message(self, *args: Any) -> None:  # keep test output quiet
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    # ---------- helpers ----------
+
+    def _send(self, status: int, body: bytes = b"", ctype: str = "application/json", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _json(self, status: int, obj: Any) -> None:
+        self._send(status, json.dumps(obj).encode())
+
+    def _error(self, status: int, exc: str, message: str) -> None:
+        self._json(status, {"RemoteException": {"exception": exc, "message": message}})
+
+    def _body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _parse(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path[len(PREFIX):] if url.path.startswith(PREFIX) else url.path
+        with self.server.stats_lock:
+            self.server.requests += 1
+            self.server.ops[query.get("op", "")] = self.server.ops.get(query.get("op", ""), 0) + 1
+        return path or "/", query
+
+    # ---------- verbs ----------
+
+    def do_GET(self) -> None:
+        path, q = self._parse()
+        fs = self.server.fs
+        node = fs.get(path)
+        op = q.get("op")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if node is None:
+            return self._error(404, "FileNotFoundException", f"File does not exist: {path}")
+        if op == "GETFILESTATUS":
+            return self._json(200, {"FileStatus": file_status("", node)})
+        if op == "LISTSTATUS":
+            if node["type"] == "FILE":
+                return self._json(200, {"FileStatuses": {"FileStatus": [file_status("", node)]}})
+            entries = [file_status(name, n) for name, n in sorted(fs.children(path).items())]
+            return self._json(200, {"FileStatuses": {"FileStatus": entries}})
+        if op == "OPEN":
+            if q.get("datanode") != "true":
+                host, port = self.server.server_address[:2]
+                return self._send(307, headers={"Location": f"http://{host}:{port}{self.path}&datanode=true"})
+            data = node["data"]
+            offset = int(q.get("offset", 0))
+            length = q.get("length")
+            end = len(data) if length is None else offset + int(length)
+            return self._send(200, data[offset:end], ctype="application/octet-stream")
+        if op == "GETFILECHECKSUM":
+            digest = hashlib.md5(node["data"]).hexdigest()
+            return self._json(
+                200, {"FileChecksum": {"algorithm": "MD5", "bytes": digest, "length": len(node["data"])}}
+            )
+        return self._error(400, "IllegalArgumentException", f"unsupported op {op}")
+
+    def do_PUT(self) -> None:
+        path, q = self._parse()
+        fs = self.server.fs
+        op = q.get("op")
+        if op == "MKDIRS":
+            fs.mkdirs(path)
+            return self._json(200, {"boolean": True})
+        if op == "CREATE":
+            overwrite = q.get("overwrite", "false") == "true"
+            if q.get("datanode") != "true":
+                self._body()
+                existing = fs.get(path)
+                if existing is not None and (existing["type"] == "DIRECTORY" or not overwrite):
+                    return self._error(403, "FileAlreadyExistsException", f"{path} already exists")
+                host, port = self.server.server_address[:2]
+                location = f"http://{host}:{port}{PREFIX}{path}?op=CREATE&datanode=true&overwrite={str(overwrite).lower()}"
+                return self._send(307, headers={"Location": location})
+            fs.write(path, self._body(), replication=int(q.get("replication", 3)))
+            return self._send(201, headers={"Location": f"hdfs://standin{path}"})
+        self._body()
+        return self._error(400, "IllegalArgumentException", f"unsupported op {op}")
+
+    def do_DELETE(self) -> None:
+        path, q = self._parse()
+        return self._json(200, {"boolean": self.server.fs.delete(path)})
+
+
+class WebHDFSStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fs: Optional[FakeHDFS] = None, latency: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.fs = fs or FakeHDFS()
+        self.latency = latency
+        self.stats_lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.ops: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "WebHDFSStandIn":
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()